@@ -0,0 +1,257 @@
+"""Pack per-building hourly ResStock load curves into one matrix file per utility.
+
+CAIRO runs read electricity total, PV and gas for every building assigned to a
+utility. Reading those from ``{bldg_id}-{upgrade}.parquet`` files means one
+footer read per building (~15k for ConEd) on every run. This step packs each
+(state, upgrade, utility) into a single uncompressed Arrow IPC file::
+
+    load_curve_matrix/state=NY/upgrade=00/utility=coned/load_matrix.arrow
+
+with one row per building (sorted by ``bldg_id``, which doubles as the offset
+index) and ``fixed_size_list<float>[8760]`` columns ``electricity_total``,
+``electricity_pv`` and ``natural_gas_total``. ``utils.cairo.build_bldg_id_to_load_filepath``
+and ``utils.mid.patches._return_loads_combined`` memory-map the file and slice
+rows by building ID; see ``utils.loads.open_load_matrix`` for the format.
+The matrix records the name, size and mtime of every hourly file it packs;
+runs fall back to the parquet files (with a warning) once any of those change,
+so re-run this step after refreshing hourly loads.
+
+Usage (from project root)::
+
+    uv run python data/resstock/load_curve/build_load_matrix.py \\
+        --path-input /ebs/data/nrel/resstock/res_2024_amy2018_2_sb \\
+        --state NY --upgrade-ids "00 02"
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pyarrow.dataset as pad
+import pyarrow.parquet as pq
+
+from utils.loads import (
+    LOAD_MATRIX_COLUMNS,
+    N_HOURS,
+    load_matrix_path,
+    write_load_matrix,
+)
+
+
+def utility_building_ids(path_utility_assignment: Path) -> dict[str, list[int]]:
+    """Map ``sb.electric_utility`` -> sorted bldg_ids from a utility assignment parquet."""
+    df = (
+        pl.scan_parquet(str(path_utility_assignment))
+        .select("bldg_id", "sb.electric_utility")
+        .drop_nulls("sb.electric_utility")
+        .collect()
+    )
+    out: dict[str, list[int]] = {}
+    for utility, group in df.group_by("sb.electric_utility"):
+        name = str(utility[0])
+        out[name] = sorted(int(b) for b in group["bldg_id"].to_list())
+    return out
+
+
+def hourly_filepaths(hourly_dir: Path) -> dict[int, Path]:
+    """Map bldg_id -> ``{bldg_id}-{upgrade}.parquet`` path in *hourly_dir*."""
+    paths: dict[int, Path] = {}
+    for parquet_file in hourly_dir.glob("*.parquet"):
+        try:
+            paths[int(parquet_file.stem.split("-")[0])] = parquet_file
+        except ValueError:
+            continue
+    return paths
+
+
+def read_load_blocks(
+    paths: list[Path],
+) -> tuple[pd.DatetimeIndex, dict[str, np.ndarray]]:
+    """Read the matrix columns for *paths* in one multi-file Arrow scan.
+
+    Returns the first file's 8760 timestamps and ``(n_bldg, 8760)`` blocks
+    keyed by matrix column name, rows in *paths* order.
+    """
+    timestamps = pd.DatetimeIndex(
+        pq.read_table(paths[0], columns=["timestamp"]).column("timestamp").to_numpy()
+    )
+    if len(timestamps) != N_HOURS:
+        raise ValueError(
+            f"Expected {N_HOURS} rows in {paths[0]}, got {len(timestamps)}"
+        )
+    schema = pq.read_schema(paths[0])
+    source_cols = list(LOAD_MATRIX_COLUMNS.values())
+    table = pad.dataset(
+        [str(p) for p in paths], format="parquet", schema=schema
+    ).to_table(columns=source_cols)
+    if table.num_rows != len(paths) * N_HOURS:
+        raise ValueError(
+            f"Expected {len(paths) * N_HOURS} rows ({len(paths)} bldgs × {N_HOURS}) "
+            f"but got {table.num_rows}"
+        )
+    blocks = {
+        name: table.column(src).to_numpy().reshape(len(paths), N_HOURS)
+        for name, src in LOAD_MATRIX_COLUMNS.items()
+    }
+    return timestamps, blocks
+
+
+def build_utility_matrix(
+    hourly_dir: Path,
+    utility: str,
+    bldg_ids: list[int],
+    filepaths: dict[int, Path],
+    *,
+    dtype: str = "float64",
+) -> Path | None:
+    """Pack one utility's buildings from *hourly_dir*; return the written path.
+
+    Returns ``None`` when none of *bldg_ids* has an hourly file (e.g. an
+    upgrade that does not apply to any of the utility's buildings). Raises if
+    only some are missing, so a matrix never silently drops buildings.
+    """
+    present = [b for b in bldg_ids if b in filepaths]
+    if not present:
+        return None
+    missing = len(bldg_ids) - len(present)
+    if missing:
+        raise FileNotFoundError(
+            f"{missing:,} of {len(bldg_ids):,} {utility} buildings have no hourly "
+            f"file in {hourly_dir}. Refusing to write a partial load matrix."
+        )
+
+    sources = [filepaths[b] for b in present]
+    timestamps, blocks = read_load_blocks(sources)
+    out_path = load_matrix_path(hourly_dir, utility)
+    return write_load_matrix(
+        out_path,
+        np.asarray(present),
+        timestamps,
+        blocks,
+        dtype=dtype,
+        source_files=sources,
+    )
+
+
+def process_upgrade(
+    path_input: Path,
+    state: str,
+    upgrade: str,
+    utility_bldgs: dict[str, list[int]],
+    *,
+    utilities: list[str] | None = None,
+    dtype: str = "float64",
+) -> list[Path]:
+    """Write one load matrix per utility for (state, upgrade)."""
+    hourly_dir = path_input / f"load_curve_hourly/state={state}/upgrade={upgrade}"
+    if not hourly_dir.exists():
+        raise FileNotFoundError(
+            f"Hourly input directory does not exist: {hourly_dir} "
+            f"(state={state} upgrade={upgrade})."
+        )
+    filepaths = hourly_filepaths(hourly_dir)
+    print(f"  Found {len(filepaths):,} hourly files in {hourly_dir}")
+
+    written: list[Path] = []
+    for utility in sorted(utilities or utility_bldgs):
+        bldg_ids = utility_bldgs.get(utility)
+        if not bldg_ids:
+            print(f"  {utility}: no buildings assigned, skipping")
+            continue
+        t0 = time.time()
+        out_path = build_utility_matrix(
+            hourly_dir, utility, bldg_ids, filepaths, dtype=dtype
+        )
+        if out_path is None:
+            print(f"  {utility}: no hourly files for this upgrade, skipping")
+            continue
+        size_mb = out_path.stat().st_size / 1e6
+        print(
+            f"  {utility}: {len(bldg_ids):,} bldgs -> {out_path} "
+            f"({size_mb:,.0f} MB, {time.time() - t0:.1f}s)"
+        )
+        written.append(out_path)
+    return written
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Pack hourly ResStock load curves into one memory-mappable matrix "
+            "file per (state, upgrade, utility)."
+        )
+    )
+    parser.add_argument(
+        "--path-input",
+        required=True,
+        help="Root of the ResStock release (local), e.g. .../res_2024_amy2018_2_sb",
+    )
+    parser.add_argument(
+        "--path-utility-assignment",
+        default=None,
+        help=(
+            "Utility assignment parquet. Defaults to "
+            "<path-input>/metadata_utility/state=<state>/utility_assignment.parquet"
+        ),
+    )
+    parser.add_argument("--state", required=True, help="Two-letter state code, e.g. NY")
+    parser.add_argument(
+        "--upgrade-ids",
+        required=True,
+        help='Space-separated upgrade IDs, e.g. "00 02"',
+    )
+    parser.add_argument(
+        "--utilities",
+        default=None,
+        help="Space-separated utilities to build (default: all in the assignment)",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=["float32", "float64"],
+        default="float64",
+        help="Storage dtype for the load blocks (default: float64)",
+    )
+    args = parser.parse_args()
+
+    path_input = Path(args.path_input)
+    if not path_input.exists():
+        print(f"Error: input path does not exist: {path_input}", file=sys.stderr)
+        sys.exit(1)
+    path_ua = (
+        Path(args.path_utility_assignment)
+        if args.path_utility_assignment is not None
+        else path_input
+        / f"metadata_utility/state={args.state}/utility_assignment.parquet"
+    )
+    utilities = args.utilities.split() if args.utilities else None
+
+    utility_bldgs = utility_building_ids(path_ua)
+    print(f"Loaded utility assignment: {len(utility_bldgs)} utilities from {path_ua}")
+
+    for upgrade in args.upgrade_ids.split():
+        print(f"\n{'=' * 60}")
+        print(f"Processing state={args.state}, upgrade={upgrade.zfill(2)}")
+        print(f"{'=' * 60}")
+        process_upgrade(
+            path_input,
+            args.state,
+            upgrade.zfill(2),
+            utility_bldgs,
+            utilities=utilities,
+            dtype=args.dtype,
+        )
+
+    print("\nAll done.")
+
+
+if __name__ == "__main__":
+    main()
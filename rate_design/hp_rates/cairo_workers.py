@@ -0,0 +1,150 @@
+"""Warm fork-server for CAIRO runs.
+
+A cold ``cairo_run`` starts ``python -m rate_design.hp_rates.run_scenario``:
+a fresh interpreter that imports CAIRO, pandas, dask and polars and applies
+every ``utils.mid.patches`` monkey-patch before it reads a single input.
+That fixed cost is paid four times per quartet.
+
+With ``warm_workers: true`` in the pipeline YAML, ``run_batch`` instead
+starts one ``multiprocessing`` fork-server that imports ``run_scenario``
+(and with it CAIRO and the patches) once.  Each run is a job sent to the
+server over its local Unix socket; the server forks a child that calls
+``run_scenario.main(argv)`` and exits.  Every run still lives in its own
+process — memory is returned to the OS when it exits, exactly as with a
+subprocess — but starts from an already-imported interpreter.
+
+Both modes set ``RUN_SUBMITTED_AT_ENV`` so ``run_scenario`` logs
+``TIMING startup`` (submission to ``main()``), which is how the two are
+compared.  ``python -m rate_design.hp_rates.cairo_workers --measure-startup N``
+measures the startup part alone, without running a scenario.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+from multiprocessing import forkserver
+from multiprocessing.process import BaseProcess
+
+log = logging.getLogger(__name__)
+
+# Imported once by the fork-server; every forked run inherits them.
+PRELOAD_MODULES = ["rate_design.hp_rates.run_scenario"]
+
+# Wall-clock (``time.time()``) at which the pipeline submitted the run.
+RUN_SUBMITTED_AT_ENV = "CAIRO_RUN_SUBMITTED_AT"
+
+
+def start_fork_server(modules: list[str] = PRELOAD_MODULES) -> None:
+    """Start the fork-server and pay the CAIRO import cost up front.
+
+    Idempotent.  The server is shared by every run in this process and is
+    shut down by ``multiprocessing`` at interpreter exit.
+    """
+    t0 = time.perf_counter()
+    multiprocessing.set_forkserver_preload(modules)
+    forkserver.ensure_running()
+    # The server only accepts jobs once its preloads are imported, so a
+    # no-op child blocks until the server is actually warm.
+    probe = multiprocessing.get_context("forkserver").Process(target=int)
+    probe.start()
+    probe.join()
+    log.info("Warm CAIRO fork-server ready in %.1fs", time.perf_counter() - t0)
+
+
+def _run_job(argv: list[str], submitted_at: float) -> None:
+    """Fork-server child: run one scenario as ``run_scenario.py <argv>``."""
+    from rate_design.hp_rates import run_scenario
+
+    os.environ[RUN_SUBMITTED_AT_ENV] = repr(submitted_at)
+    run_scenario.main(argv)
+
+
+class WarmRun:
+    """A run forked from the fork-server, with the ``Popen`` calls we use."""
+
+    def __init__(self, process: BaseProcess) -> None:
+        self._process = process
+
+    @property
+    def pid(self) -> int:
+        assert self._process.pid is not None
+        return self._process.pid
+
+    def wait(self) -> int:
+        self._process.join()
+        assert self._process.exitcode is not None
+        return self._process.exitcode
+
+
+def start_warm_run(argv: list[str], *, name: str) -> WarmRun:
+    """Fork a child from the warm server that runs ``run_scenario.main(argv)``."""
+    ctx = multiprocessing.get_context("forkserver")
+    process = ctx.Process(target=_run_job, args=(argv, time.time()), name=name)
+    process.start()
+    return WarmRun(process)
+
+
+def measure_startup(
+    repeats: int, modules: list[str] = PRELOAD_MODULES
+) -> dict[str, list[float]]:
+    """Seconds to a ready interpreter, cold subprocess vs. warm fork.
+
+    ``cold`` times ``python -c "import <modules>"`` in a fresh interpreter
+    (the startup a cold ``cairo_run`` pays before ``main()``); ``warm`` times
+    forking and joining a no-op child of a fork-server that preloaded
+    *modules*; ``server`` is the one-off cost of starting that server.
+    """
+    imports = "; ".join(f"import {m}" for m in modules)
+    cold = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", imports], check=True)
+        cold.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    start_fork_server(modules)
+    server = time.perf_counter() - t0
+
+    ctx = multiprocessing.get_context("forkserver")
+    warm = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        probe = ctx.Process(target=int)
+        probe.start()
+        probe.join()
+        warm.append(time.perf_counter() - t0)
+    return {"cold": cold, "warm": warm, "server": [server]}
+
+
+def _cli() -> None:
+    """Entry point: ``uv run python -m rate_design.hp_rates.cairo_workers``."""
+    parser = argparse.ArgumentParser(
+        description="Measure CAIRO run startup, cold subprocess vs. warm fork-server."
+    )
+    parser.add_argument(
+        "--measure-startup",
+        type=int,
+        default=3,
+        metavar="N",
+        help="Number of cold and warm starts to time (default 3).",
+    )
+    args = parser.parse_args()
+
+    timings = measure_startup(args.measure_startup)
+    print(f"python {sys.version.split()[0]}, preload {' '.join(PRELOAD_MODULES)}")
+    for mode, seconds in timings.items():
+        print(
+            f"{mode:>6}: median {statistics.median(seconds):.2f}s "
+            f"(min {min(seconds):.2f}s, max {max(seconds):.2f}s, n={len(seconds)})"
+        )
+
+
+if __name__ == "__main__":
+    _cli()
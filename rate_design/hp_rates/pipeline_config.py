@@ -8,12 +8,15 @@ tariff stems, paths, and canonical run names from a loaded config.
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from utils.data_prep.marginal_costs.mc_bundle import mc_bundle_path
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -168,6 +171,12 @@ class RunDefaults:
     periods_yaml: str
     sample_size: int | None = None
     elasticity: float = 0.0
+    # Shared post-timeshift load cache root. Delivery and supply variants of a
+    # quartet (same utility/upgrade/year/sample) then memory-map one copy.
+    load_cache_dir: str | None = None
+    # Root of the prebuilt MC bundles (``generate_mc_bundle.py``). Runs read
+    # their variant's bundle instead of loading and aligning MCs from S3.
+    mc_bundle_dir: str | None = None
 
 
 @dataclass(frozen=True, slots=True)
@@ -186,6 +195,7 @@ class PipelineConfig:
     max_concurrent_cairo_runs: int
     concurrent_variants: bool
     output_base: str
+    warm_workers: bool
 
     scenarios: dict[str, ScenarioConfig]
     run_defaults: RunDefaults
@@ -313,6 +323,12 @@ def supply_mc_path(base_path: str, *, include_supply: bool) -> str:
     return base_path.replace("/data.parquet", "/zero.parquet")
 
 
+def mc_input_year(config: PipelineConfig) -> int:
+    """Year of the MC inputs (``/year=YYYY/`` in the dist path), else the run year."""
+    match = re.search(r"/year=(\d{4})/", config.run_defaults.mc_dist_and_sub_tx)
+    return int(match.group(1)) if match else config.year
+
+
 # ---------------------------------------------------------------------------
 # YAML loader
 # ---------------------------------------------------------------------------
@@ -349,6 +365,8 @@ def load_pipeline_config(yaml_path: Path) -> PipelineConfig:
         periods_yaml=data.get("periods_yaml", f"periods/{data['utility']}.yaml"),
         sample_size=_parse_optional_int(data.get("sample_size")),
         elasticity=float(data.get("elasticity", 0.0)),
+        load_cache_dir=data.get("load_cache_dir") or None,
+        mc_bundle_dir=data.get("mc_bundle_dir") or None,
     )
 
     return PipelineConfig(
@@ -359,6 +377,7 @@ def load_pipeline_config(yaml_path: Path) -> PipelineConfig:
         max_concurrent_cairo_runs=int(data.get("max_concurrent_cairo_runs", 2)),
         concurrent_variants=bool(data.get("concurrent_variants", False)),
         output_base=data["output_base"],
+        warm_workers=bool(data.get("warm_workers", False)),
         scenarios=scenarios,
         run_defaults=run_defaults,
         bill_change_baseline=_parse_bill_change_baseline(
@@ -693,6 +712,21 @@ def _build_run_entry(
     if is_supply and rd.mc_supply_ancillary:
         entry["path_supply_ancillary_mc"] = rd.mc_supply_ancillary
 
+    if rd.load_cache_dir:
+        entry["path_load_cache"] = rd.load_cache_dir
+
+    if rd.mc_bundle_dir:
+        entry["path_mc_bundle"] = str(
+            mc_bundle_path(
+                rd.mc_bundle_dir,
+                state=config.state,
+                utility=config.utility,
+                mc_year=mc_input_year(config),
+                year_run=config.year,
+                supply=is_supply,
+            )
+        )
+
     if scenario.residual_allocation_delivery is not None:
         entry["residual_allocation_delivery"] = scenario.residual_allocation_delivery
     if scenario.residual_allocation_supply is not None:
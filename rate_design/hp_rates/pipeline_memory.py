@@ -0,0 +1,364 @@
+"""Memory-aware admission control for CAIRO subprocesses.
+
+Each ``cairo_run`` samples the resident set of its ``run_scenario.py``
+process tree (the parent plus its Dask worker processes) and records the
+peak in the batch run index next to the ``.path`` file::
+
+    {batch_dir}/.runs/{run_name}.mem.json
+
+keyed by utility, ``run_type``, delivery/supply, demand-flex on/off and
+building count.
+``run_scenario.py`` writes the key half (``.key.json``) because only it knows
+the resolved building count; ``cairo_run`` merges in the measured peak.
+
+``MemoryGate`` then admits subprocesses against a byte budget (85% of
+``MemTotal`` by default) using each run's predicted peak from those records,
+up to a hard cap of ``max_concurrent_cairo_runs``: small-utility runs fill
+the cap while a ConEd-sized run waits until it has room.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Any, Self
+
+log = logging.getLogger(__name__)
+
+MEM_BUDGET_FRACTION = 0.85
+# Predicted peaks are padded by this factor to absorb run-to-run variation.
+PEAK_RSS_HEADROOM = 1.1
+# No prediction is below this, so a tiny or failed (zero) peak sample cannot
+# let the gate pack runs without limit.
+MIN_PEAK_RSS_BYTES = 10**9
+RSS_SAMPLE_INTERVAL_S = 1.0
+
+
+# ---------------------------------------------------------------------------
+# /proc readers
+# ---------------------------------------------------------------------------
+
+
+def mem_total_bytes() -> int:
+    """``MemTotal`` from ``/proc/meminfo`` in bytes; 0 where unavailable."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _proc_rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _proc_children() -> dict[int, list[int]]:
+    """Map parent pid -> child pids for every process in ``/proc``."""
+    children: dict[int, list[int]] = {}
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces; ppid is the 2nd field after ')'.
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+    return children
+
+
+def process_tree_rss_bytes(pid: int) -> int:
+    """Summed RSS of *pid* and all of its descendants (Linux only)."""
+    children = _proc_children()
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total += _proc_rss_bytes(current)
+        stack.extend(children.get(current, ()))
+    return total
+
+
+class PeakRssSampler:
+    """Background thread tracking the peak process-tree RSS of one pid."""
+
+    def __init__(self, pid: int, interval_s: float = RSS_SAMPLE_INTERVAL_S) -> None:
+        self.pid = pid
+        self.interval_s = interval_s
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._sample, name=f"rss-{pid}", daemon=True
+        )
+
+    def _sample(self) -> None:
+        while True:
+            self.peak_bytes = max(self.peak_bytes, process_tree_rss_bytes(self.pid))
+            if self._stop.wait(self.interval_s):
+                return
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+# ---------------------------------------------------------------------------
+# Run memory records
+# ---------------------------------------------------------------------------
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RunMemoryKey:
+    """What a run's peak RSS depends on.
+
+    ``sample_size`` is the YAML setting (``None`` = every building of the
+    utility), which is all the scheduler knows before a run starts;
+    ``n_buildings`` is the count ``run_scenario.py`` actually simulated.
+    ``run_includes_supply`` separates supply runs from delivery runs (which
+    also build the billing-kWh tables); records written before it existed
+    carry ``None`` and match no run.
+    """
+
+    utility: str
+    run_type: str
+    demand_flex: bool
+    sample_size: int | None
+    n_buildings: int | None = None
+    run_includes_supply: bool | None = None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RunMemoryRecord:
+    """Measured peak RSS of one completed run."""
+
+    run_name: str
+    key: RunMemoryKey
+    peak_rss_bytes: int
+    num_workers: int | None
+    elapsed_s: float
+
+
+def run_key_from_yaml(run: Mapping[str, Any]) -> RunMemoryKey:
+    """Pre-run key for a ``runs:`` entry of a scenario YAML."""
+    elasticity = run.get("elasticity", 0.0)
+    if isinstance(elasticity, Mapping):
+        demand_flex = any(float(v) != 0.0 for v in elasticity.values())
+    else:
+        demand_flex = float(elasticity) != 0.0
+    sample_size = run.get("sample_size")
+    return RunMemoryKey(
+        utility=str(run["utility"]),
+        run_type=str(run.get("run_type", "precalc")),
+        demand_flex=demand_flex,
+        sample_size=int(sample_size) if sample_size is not None else None,
+        run_includes_supply=bool(run.get("run_includes_supply", False)),
+    )
+
+
+def run_key_path(batch_dir: Path, run_name: str) -> Path:
+    return Path(batch_dir) / ".runs" / f"{run_name}.key.json"
+
+
+def run_memory_path(batch_dir: Path, run_name: str) -> Path:
+    return Path(batch_dir) / ".runs" / f"{run_name}.mem.json"
+
+
+def write_run_key(batch_dir: Path, run_name: str, key: RunMemoryKey) -> Path:
+    path = run_key_path(batch_dir, run_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(dataclasses.asdict(key)) + "\n")
+    return path
+
+
+def read_run_key(batch_dir: Path, run_name: str) -> RunMemoryKey | None:
+    path = run_key_path(batch_dir, run_name)
+    if not path.is_file():
+        return None
+    return RunMemoryKey(**json.loads(path.read_text()))
+
+
+def write_run_memory(batch_dir: Path, record: RunMemoryRecord) -> Path:
+    path = run_memory_path(batch_dir, record.run_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(dataclasses.asdict(record), indent=2) + "\n")
+    return path
+
+
+def _record_from_json(payload: dict[str, Any]) -> RunMemoryRecord:
+    return RunMemoryRecord(
+        run_name=payload["run_name"],
+        key=RunMemoryKey(**payload["key"]),
+        peak_rss_bytes=int(payload["peak_rss_bytes"]),
+        num_workers=payload.get("num_workers"),
+        elapsed_s=float(payload.get("elapsed_s", 0.0)),
+    )
+
+
+def read_run_memory_records(batch_dirs: Iterable[Path]) -> list[RunMemoryRecord]:
+    """All ``.mem.json`` records under the given batch dirs; unreadable ones skipped."""
+    records: list[RunMemoryRecord] = []
+    for batch_dir in batch_dirs:
+        for path in sorted((Path(batch_dir) / ".runs").glob("*.mem.json")):
+            try:
+                records.append(_record_from_json(json.loads(path.read_text())))
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                log.warning("Ignoring unreadable run memory record %s: %s", path, exc)
+    return records
+
+
+def predict_peak_rss(
+    records: Iterable[RunMemoryRecord], key: RunMemoryKey
+) -> int | None:
+    """Predicted peak RSS for a run with *key*, or ``None`` without history.
+
+    Uses the largest peak among records with the same utility, run type,
+    delivery/supply variant, demand-flex setting and sample size. Failing
+    that, a sampled run (known ``sample_size``) falls back to the same
+    utility, run type, variant and demand-flex setting with the largest
+    building count, scaled up linearly when the new run is bigger. A
+    full-stock run (``sample_size`` None) has no size to scale by, so without
+    a full-stock record of its own it gets ``None`` (the default reservation)
+    rather than a sampled run's peak. Records with no measured peak are
+    ignored. Predictions include ``PEAK_RSS_HEADROOM`` and are never below
+    ``MIN_PEAK_RSS_BYTES``.
+    """
+    same_kind = [
+        r
+        for r in records
+        if r.peak_rss_bytes > 0
+        and r.key.utility == key.utility
+        and r.key.run_type == key.run_type
+        and r.key.run_includes_supply == key.run_includes_supply
+        and r.key.demand_flex == key.demand_flex
+    ]
+    exact = [
+        r.peak_rss_bytes for r in same_kind if r.key.sample_size == key.sample_size
+    ]
+    if exact:
+        peak = max(exact) * PEAK_RSS_HEADROOM
+    else:
+        sized = [r for r in same_kind if r.key.n_buildings]
+        if key.sample_size is None or not sized:
+            return None
+        largest = max(sized, key=lambda r: (r.key.n_buildings or 0, r.peak_rss_bytes))
+        scale = max(1.0, key.sample_size / (largest.key.n_buildings or 1))
+        peak = largest.peak_rss_bytes * scale * PEAK_RSS_HEADROOM
+    return max(int(peak), MIN_PEAK_RSS_BYTES)
+
+
+# ---------------------------------------------------------------------------
+# Admission
+# ---------------------------------------------------------------------------
+
+
+class MemoryGate:
+    """Admit CAIRO subprocesses while their predicted peaks fit in a budget.
+
+    Requests are served first-come first-served, so a large run is never
+    starved by a stream of small ones. A run whose prediction exceeds the
+    whole budget is admitted once nothing else is running. However small
+    the predictions, at most ``max_running`` runs are admitted at once.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        default_run_bytes: int,
+        *,
+        max_running: int | None = None,
+        counts_runs: bool = False,
+    ) -> None:
+        self.budget_bytes = budget_bytes
+        self.default_run_bytes = default_run_bytes
+        self.max_running = max_running
+        # Ignore predictions and reserve ``default_run_bytes`` per run.
+        self.counts_runs = counts_runs
+        self.reserved_bytes = 0
+        self.running = 0
+        self._cond = threading.Condition()
+        self._queue: deque[object] = deque()
+
+    @classmethod
+    def for_host(cls, max_concurrent_runs: int) -> MemoryGate:
+        """Budget ``MEM_BUDGET_FRACTION`` of ``MemTotal``, at most *max_concurrent_runs*.
+
+        Runs without history are assumed to need an equal share of the
+        budget for ``max_concurrent_runs`` runs, so a fresh box behaves like
+        the old count semaphore until peaks have been measured; measured
+        peaks can only lower concurrency below that cap. Where ``MemTotal``
+        is unavailable the gate is a plain run-count limit.
+        """
+        total = mem_total_bytes()
+        n = max(1, max_concurrent_runs)
+        if total <= 0:
+            return cls(
+                budget_bytes=n, default_run_bytes=1, max_running=n, counts_runs=True
+            )
+        budget = int(total * MEM_BUDGET_FRACTION)
+        return cls(budget_bytes=budget, default_run_bytes=budget // n, max_running=n)
+
+    @contextlib.contextmanager
+    def admit(self, run_id: str, predicted_bytes: int | None) -> Iterator[int]:
+        """Block until *run_id* fits; yields the bytes reserved for it."""
+        need = (
+            self.default_run_bytes
+            if predicted_bytes is None or self.counts_runs
+            else predicted_bytes
+        )
+        ticket = object()
+        t0 = time.monotonic()
+        with self._cond:
+            self._queue.append(ticket)
+            while not (
+                self._queue[0] is ticket
+                and (self.max_running is None or self.running < self.max_running)
+                and (
+                    self.running == 0 or self.reserved_bytes + need <= self.budget_bytes
+                )
+            ):
+                self._cond.wait()
+            self._queue.popleft()
+            self.reserved_bytes += need
+            self.running += 1
+            self._cond.notify_all()
+        log.info(
+            "Admitted %s (reserve %.1f GB, %s; %d running, %.1f/%.1f GB) after %.0fs",
+            run_id,
+            need / 1e9,
+            "predicted" if predicted_bytes is not None else "default",
+            self.running,
+            self.reserved_bytes / 1e9,
+            self.budget_bytes / 1e9,
+            time.monotonic() - t0,
+        )
+        try:
+            yield need
+        finally:
+            with self._cond:
+                self.reserved_bytes -= need
+                self.running -= 1
+                self._cond.notify_all()
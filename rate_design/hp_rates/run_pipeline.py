@@ -12,7 +12,8 @@ Architecture
   promotion between stages.
 * **derive_tariffs** computes subclass revenue requirements and derived tariffs
   for multi-rate scenarios that depend on a prior scenario.
-* **run_batch** (master flow) ties everything together in dependency order.
+* **run_batch** (master flow) runs the scenario dependency DAG, starting each
+  quartet (and each dependent's derive step) as soon as its inputs exist.
 
 CAIRO is invoked as a subprocess (``run_scenario.py``) for full memory
 isolation.  Output directories are discovered via run index files written by
@@ -21,12 +22,16 @@ isolation.  Output directories are discovered via run index files written by
 
 from __future__ import annotations
 
+import contextvars
 import json
 import logging
 import os
 import subprocess
 import sys
 import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import yaml
@@ -52,7 +57,24 @@ from utils.mid.copy_calibrated_tariff_from_run import (
 from utils.pre.season_config import load_winter_months_from_periods
 from utils.scenario_config import _parse_resstock_overrides
 
+from rate_design.hp_rates.cairo_workers import (
+    RUN_SUBMITTED_AT_ENV,
+    WarmRun,
+    start_fork_server,
+    start_warm_run,
+)
 from rate_design.hp_rates.pipeline_derive import DeriveContext, derive_subgroup_tariff
+from rate_design.hp_rates.pipeline_memory import (
+    MemoryGate,
+    PeakRssSampler,
+    RunMemoryKey,
+    RunMemoryRecord,
+    predict_peak_rss,
+    read_run_key,
+    read_run_memory_records,
+    run_key_from_yaml,
+    write_run_memory,
+)
 
 
 log = logging.getLogger(__name__)
@@ -62,20 +84,60 @@ log = logging.getLogger(__name__)
 # Concurrency gate
 # ---------------------------------------------------------------------------
 
-_cairo_semaphore: threading.Semaphore | None = None
+_cairo_gate: MemoryGate | None = None
+_warm_workers = False
+_mem_records: list[RunMemoryRecord] = []
+_mem_records_lock = threading.Lock()
+
+
+def _init_warm_workers(enabled: bool) -> None:
+    """Start the warm CAIRO fork-server when ``warm_workers`` is set.
+
+    See ``rate_design.hp_rates.cairo_workers``: runs are forked from a server
+    that has already imported CAIRO and the patches instead of starting a
+    fresh interpreter each time.
+    """
+    global _warm_workers  # noqa: PLW0603
+    _warm_workers = enabled
+    if enabled:
+        start_fork_server()
 
 
-def _init_semaphore(max_concurrent: int) -> None:
-    """Initialise the module-level CAIRO concurrency semaphore.
+def _init_gate(max_concurrent: int, history_dirs: list[Path]) -> None:
+    """Initialise the module-level CAIRO memory gate and peak-RSS history.
 
     Called once by ``run_batch`` before any tasks are submitted.  Using a
-    module-level semaphore (rather than passing it through Prefect) avoids
-    serialisation issues — the semaphore lives in the Prefect worker process
-    and gates ``subprocess.run`` calls from ``cairo_run`` tasks that execute
-    in the same process via ``ThreadPoolTaskRunner``.
+    module-level gate (rather than passing it through Prefect) avoids
+    serialisation issues — the gate lives in the Prefect worker process and
+    admits ``run_scenario.py`` subprocesses from ``cairo_run`` tasks that
+    execute in the same process via ``ThreadPoolTaskRunner``.
+
+    *history_dirs* are the batch directories whose ``.runs/*.mem.json``
+    records seed the peak-RSS predictions.
     """
-    global _cairo_semaphore  # noqa: PLW0603
-    _cairo_semaphore = threading.Semaphore(max_concurrent)
+    global _cairo_gate  # noqa: PLW0603
+    _cairo_gate = MemoryGate.for_host(max_concurrent)
+    records = read_run_memory_records(history_dirs)
+    with _mem_records_lock:
+        _mem_records[:] = records
+    log.info(
+        "CAIRO memory budget %.1f GB (default reservation %.1f GB, at most %d "
+        "runs); %d peak-RSS records from %d batches",
+        _cairo_gate.budget_bytes / 1e9,
+        _cairo_gate.default_run_bytes / 1e9,
+        _cairo_gate.max_running,
+        len(records),
+        len(history_dirs),
+    )
+
+
+def _predict_run_rss(yaml_path: Path, run_id: str) -> tuple[RunMemoryKey, int | None]:
+    """Pre-run memory key and predicted peak RSS for *run_id* in *yaml_path*."""
+    with yaml_path.open(encoding="utf-8") as f:
+        runs = yaml.safe_load(f)["runs"]
+    key = run_key_from_yaml(runs[run_id])
+    with _mem_records_lock:
+        return key, predict_peak_rss(_mem_records, key)
 
 
 # ---------------------------------------------------------------------------
@@ -121,18 +183,27 @@ def cairo_run(
     out to ``run_scenario.py`` for full memory isolation — CAIRO + Dask +
     pandas consume several GB per run and Python's allocator does not return
     memory to the OS, so in-process execution caused OOM on larger utilities.
+    With ``warm_workers: true`` the process is instead forked from a warm
+    fork-server that has already imported CAIRO (``cairo_workers``), which
+    keeps the isolation but skips interpreter and import startup.
 
     **Resume**: if the run index file already exists, the run is skipped and
     the previously recorded output directory is returned.
 
-    **Concurrency**: gated by ``_cairo_semaphore`` (initialised by
-    ``run_batch``).  The semaphore limits how many CAIRO subprocesses run
-    simultaneously across the whole pipeline.  When ``run_quartet`` overlaps
-    delivery and supply (``concurrent_variants: true``) it passes a halved
-    ``num_workers`` here — otherwise both subprocesses would each
-    independently size their Dask worker pool from ``process_workers`` in the
-    YAML, oversubscribing CPU/memory and risking an OOM kill.  In sequential
-    mode only one subprocess is alive, so no override is passed.
+    **Concurrency**: admitted by ``_cairo_gate`` (initialised by
+    ``run_batch``), which starts a subprocess only when fewer than
+    ``max_concurrent_cairo_runs`` are alive and its predicted peak RSS fits
+    in the batch-wide memory budget.  The prediction comes from the
+    ``.runs/*.mem.json`` peaks of earlier runs with the same utility, run
+    type, variant, demand-flex setting and sample size; this run's own measured peak
+    (summed over the subprocess and its Dask workers) is recorded the same
+    way once it succeeds.  When more than one subprocess can be alive at once
+    (several quartets under ``run_batch``, or ``concurrent_variants: true``),
+    ``run_quartet`` passes a split ``num_workers`` here (see
+    ``_workers_per_run``) — otherwise each subprocess would independently
+    size its Dask worker pool from ``process_workers`` in the YAML,
+    oversubscribing CPU/memory and risking an OOM kill.  When only one can
+    be alive, no override is passed.
 
     Args:
         run_id: Canonical run name (e.g. ``md_bge_default_precalc_delivery``).
@@ -155,14 +226,11 @@ def cairo_run(
         log.info("Skipping %s — already completed at %s", run_id, output_dir)
         return output_dir
 
-    assert _cairo_semaphore is not None, (
-        "Semaphore not initialised — call _init_semaphore() before submitting tasks."
+    assert _cairo_gate is not None, (
+        "Memory gate not initialised — call _init_gate() before submitting tasks."
     )
 
-    cmd = [
-        sys.executable,
-        "-m",
-        "rate_design.hp_rates.run_scenario",
+    args = [
         "--state",
         state,
         "--scenario-config",
@@ -171,20 +239,48 @@ def cairo_run(
         run_id,
     ]
     if is_delivery:
-        cmd.append("--billing-kwh")
+        args.append("--billing-kwh")
     if num_workers is not None:
-        cmd.extend(["--num-workers", str(num_workers)])
-
-    log.info("Acquiring semaphore for %s", run_id)
-    with _cairo_semaphore:
-        log.info("Running: %s", " ".join(cmd))
-        result = subprocess.run(cmd, check=False)
-
-    if result.returncode != 0:
+        args.extend(["--num-workers", str(num_workers)])
+
+    key, predicted = _predict_run_rss(yaml_path, run_id)
+    log.info("Waiting for memory to admit %s", run_id)
+    with _cairo_gate.admit(run_id, predicted):
+        t0 = time.monotonic()
+        if _warm_workers:
+            log.info("Running (warm): run_scenario %s", " ".join(args))
+            proc: subprocess.Popen | WarmRun = start_warm_run(args, name=run_id)
+        else:
+            cmd = [sys.executable, "-m", "rate_design.hp_rates.run_scenario", *args]
+            log.info("Running: %s", " ".join(cmd))
+            env = {**os.environ, RUN_SUBMITTED_AT_ENV: repr(time.time())}
+            proc = subprocess.Popen(cmd, env=env)
+        with PeakRssSampler(proc.pid) as sampler:
+            returncode = proc.wait()
+        elapsed = time.monotonic() - t0
+
+    if returncode != 0:
         raise RuntimeError(
-            f"CAIRO subprocess failed for {run_id} (exit code {result.returncode})"
+            f"CAIRO subprocess failed for {run_id} (exit code {returncode})"
         )
 
+    record = RunMemoryRecord(
+        run_name=run_id,
+        key=read_run_key(batch_dir, run_id) or key,
+        peak_rss_bytes=sampler.peak_bytes,
+        num_workers=num_workers,
+        elapsed_s=elapsed,
+    )
+    write_run_memory(batch_dir, record)
+    with _mem_records_lock:
+        _mem_records.append(record)
+    log.info(
+        "%s peak RSS %.1f GB (predicted %s)",
+        run_id,
+        sampler.peak_bytes / 1e9,
+        f"{predicted / 1e9:.1f} GB" if predicted is not None else "n/a",
+    )
+
     if not _run_is_complete(batch_dir, run_id):
         raise RuntimeError(
             f"CAIRO completed for {run_id} but no run index file found at "
@@ -529,6 +625,8 @@ def run_quartet(
     batch_dir: Path,
     process_workers: int,
     concurrent: bool,
+    max_alive_runs: int | None = None,
+    on_precalc: Callable[[dict[str, Path]], None] | None = None,
 ) -> dict[str, Path]:
     """Run one scenario's full quartet: 2 stages × 2 variants = 4 CAIRO runs.
 
@@ -543,22 +641,26 @@ def run_quartet(
     preflight — this flow only constructs canonical run names and dispatches.
 
     Within each stage, ``concurrent`` decides whether the delivery and supply
-    runs overlap, which in turn decides the Dask worker count:
-
-    * **Sequential** (``concurrent=False``, the default): supply is gated on
-      delivery, so only one CAIRO subprocess is ever alive. No
-      ``--num-workers`` override is passed and ``run_scenario.py`` applies its
-      own ``min(process_workers, os.cpu_count())`` — the run gets the full box.
-    * **Concurrent** (``concurrent=True``): both subprocesses run at once, so
-      each is given half the *effective* worker count via ``--num-workers`` to
-      avoid oversubscribing CPU/memory. The effective count is
-      ``min(process_workers, os.cpu_count())`` — the value ``run_scenario.py``
-      would use on its own — halved (minimum 1). Halving ``process_workers``
-      alone is not sufficient: on a small instance (e.g. 4 vCPUs) with
+    runs overlap. Together with the other quartets running alongside this one
+    (``max_alive_runs``), that decides the Dask worker count:
+
+    * **One run alive** (a lone quartet with ``concurrent=False``, the
+      default): supply is gated on delivery, so only one CAIRO subprocess is
+      ever alive. No ``--num-workers`` override is passed and
+      ``run_scenario.py`` applies its own
+      ``min(process_workers, os.cpu_count())`` — the run gets the full box.
+    * **Several runs alive** (``concurrent=True``, or ``run_batch`` running
+      several quartets at once): each run is given an equal share of the
+      *effective* worker count via ``--num-workers`` (see
+      ``_workers_per_run``) to avoid oversubscribing CPU/memory. The
+      effective count is ``min(process_workers, os.cpu_count())`` — the value
+      ``run_scenario.py`` would use on its own — divided by the number of
+      runs that can be alive (minimum 1). Dividing ``process_workers`` alone
+      is not sufficient: on a small instance (e.g. 4 vCPUs) with
       ``process_workers=8``, a *single* run already clamps to
       ``min(8, 4) = 4``, so halving 8 → 4 changes nothing and two concurrent
       subprocesses still spawn 4 Dask workers each (8 total on 4 cores),
-      causing OOM kills. Halving the already-clamped value instead
+      causing OOM kills. Dividing the already-clamped value instead
       (``min(8, 4) // 2 = 2``) keeps the pair within the box's core count.
 
     Args:
@@ -568,17 +670,63 @@ def run_quartet(
         yaml_path: Path to the generated scenario YAML.
         batch_dir: Batch output directory (contains ``.runs/`` index).
         process_workers: ``process_workers`` from the pipeline YAML. Only used
-            when ``concurrent`` is True (see above).
+            when more than one run can be alive (see above).
         concurrent: ``concurrent_variants`` from the pipeline YAML. Whether
             each stage's delivery and supply runs overlap.
+        max_alive_runs: CAIRO subprocesses that can be alive at once across
+            the batch (``run_batch`` passes the gate's cap, bounded by its
+            scenario count). Defaults to this quartet's own: 2 when
+            ``concurrent``, else 1.
+        on_precalc: Called with the precalc output dirs once the precalc
+            stage has finished and its calibrated tariffs are promoted, i.e.
+            as soon as a dependent scenario's ``derive_tariffs`` inputs exist.
 
     Returns:
         Mapping of ``{stage}_{variant}`` to the output directory path for
         each of the four runs.
     """
+    return _run_quartet_stages(
+        scenario_name,
+        state=state,
+        utility=utility,
+        yaml_path=yaml_path,
+        batch_dir=batch_dir,
+        process_workers=process_workers,
+        concurrent=concurrent,
+        max_alive_runs=max_alive_runs,
+        on_precalc=on_precalc,
+    )
+
+
+def _workers_per_run(process_workers: int, max_alive_runs: int) -> int | None:
+    """``--num-workers`` for each CAIRO run when *max_alive_runs* can overlap.
+
+    ``None`` (no override; ``run_scenario.py`` takes the full box) when only
+    one run can be alive; otherwise the effective worker count
+    ``min(process_workers, os.cpu_count())`` split evenly, minimum 1.
+    """
+    if max_alive_runs <= 1:
+        return None
+    return max(1, min(process_workers, os.cpu_count() or 1) // max_alive_runs)
+
+
+def _run_quartet_stages(
+    scenario_name: str,
+    *,
+    state: str,
+    utility: str,
+    yaml_path: Path,
+    batch_dir: Path,
+    process_workers: int,
+    concurrent: bool,
+    max_alive_runs: int | None = None,
+    on_precalc: Callable[[dict[str, Path]], None] | None = None,
+) -> dict[str, Path]:
+    """Body of ``run_quartet``; tasks are submitted to the calling flow's runner."""
     results: dict[str, Path] = {}
-    num_workers = (
-        max(1, min(process_workers, os.cpu_count() or 1) // 2) if concurrent else None
+    num_workers = _workers_per_run(
+        process_workers,
+        max_alive_runs if max_alive_runs is not None else (2 if concurrent else 1),
     )
 
     # --- Stage 1: precalc ---
@@ -603,6 +751,9 @@ def run_quartet(
         [p.name for p in promoted],
     )
 
+    if on_precalc is not None:
+        on_precalc(dict(results))
+
     # --- Stage 2: calibrated ---
     cal_d_dir, cal_s_dir = _run_stage(
         canonical_run_name(state, utility, scenario_name, "calibrated", "delivery"),
@@ -686,6 +837,36 @@ def preflight(
 # ---------------------------------------------------------------------------
 
 
+def _scenario_order(scenarios: list[ScenarioConfig]) -> list[ScenarioConfig]:
+    """Order *scenarios* so each comes after its selected ``depends_on``.
+
+    Dependencies outside *scenarios* are ignored (they must have completed in
+    an earlier invocation; ``check_dependency`` verifies that).  Raises
+    ``ValueError`` on a dependency cycle.
+    """
+    by_name = {s.name: s for s in scenarios}
+    ordered: list[ScenarioConfig] = []
+    marks: dict[str, str] = {}
+
+    def visit(scenario: ScenarioConfig, chain: list[str]) -> None:
+        if marks.get(scenario.name) == "done":
+            return
+        if marks.get(scenario.name) == "visiting":
+            raise ValueError(
+                "Scenario dependency cycle: " + " -> ".join([*chain, scenario.name])
+            )
+        marks[scenario.name] = "visiting"
+        dep = by_name.get(scenario.depends_on or "")
+        if dep is not None:
+            visit(dep, [*chain, scenario.name])
+        marks[scenario.name] = "done"
+        ordered.append(scenario)
+
+    for scenario in scenarios:
+        visit(scenario, [])
+    return ordered
+
+
 @flow(name="run-batch")
 def run_batch(
     yaml_path: Path,
@@ -693,11 +874,22 @@ def run_batch(
     *,
     scenarios: list[str] | None = None,
 ) -> None:
-    """Master flow: load config, preflight, run scenarios in dependency order.
-
-    Scenarios without ``depends_on`` (independent) are run first; scenarios
-    with dependencies run after their dependency has completed (with a
-    ``derive_tariffs`` step in between).
+    """Master flow: load config, preflight, run the scenario dependency DAG.
+
+    Every scenario gets its own driver thread that runs its ``run_quartet``
+    subflow as soon as its inputs exist: independent scenarios start
+    immediately, and a dependent scenario runs ``derive_tariffs`` + its
+    quartet as soon as its dependency's precalc stage has finished and
+    promoted its calibrated tariffs (the dependency's calibrated stage runs
+    alongside).  Each quartet keeps its own Prefect flow run (grouping and
+    retries); ``_cairo_gate`` is the batch-wide gate on concurrent CAIRO
+    subprocesses, so wall-clock time approaches the DAG's critical path.
+    Since several quartets can run at once, each quartet's Dask worker count
+    is split over the runs the gate can admit together (see
+    ``_workers_per_run``).
+
+    A failed scenario does not stop unrelated branches; its dependents are
+    skipped and ``run_batch`` raises once everything else has finished.
 
     Args:
         yaml_path: Path to the pipeline YAML (e.g. ``pipeline_bge.yaml``).
@@ -708,8 +900,6 @@ def run_batch(
     from rate_design.hp_rates.pipeline_config import load_pipeline_config
 
     config = load_pipeline_config(yaml_path)
-    _init_semaphore(config.max_concurrent_cairo_runs)
-
     batch_dir = Path(config.output_base) / config.state / config.utility / batch
 
     # --- Preflight (validates mount, inputs; generates YAML + tariff maps) ---
@@ -719,47 +909,99 @@ def run_batch(
     # unmounted /data.sb.
     batch_dir.mkdir(parents=True, exist_ok=True)
 
-    # --- Partition scenarios into independent and dependent ---
+    # Peak-RSS history: this batch (on resume) plus earlier batches of the
+    # same utility.
+    history_dirs = sorted(
+        d for d in batch_dir.parent.glob("*") if (d / ".runs").is_dir()
+    )
+    _init_gate(config.max_concurrent_cairo_runs, history_dirs)
+    _init_warm_workers(config.warm_workers)
+
     selected = list(config.scenarios.values())
     if scenarios is not None:
         selected = [s for s in selected if s.name in scenarios]
+    ordered = _scenario_order(selected)
+    # CAIRO subprocesses that can be alive at once: the gate's cap, or fewer
+    # when the DAG cannot have that many runs in flight.
+    max_alive_runs = max(
+        1,
+        min(
+            config.max_concurrent_cairo_runs,
+            len(ordered) * (2 if config.concurrent_variants else 1),
+        ),
+    )
 
-    independent = [s for s in selected if s.depends_on is None]
-    dependent = [s for s in selected if s.depends_on is not None]
-
-    # --- Run independent scenarios ---
-    for scenario in independent:
-        run_quartet(
-            scenario.name,
-            state=config.state,
-            utility=config.utility,
-            yaml_path=scenarios_yaml,
-            batch_dir=batch_dir,
-            process_workers=config.process_workers,
-            concurrent=config.concurrent_variants,
-        )
-
-    # --- Run dependent scenarios (after dependency + derive step) ---
-    for scenario in dependent:
-        assert scenario.depends_on is not None
-        dep_outputs = check_dependency(
-            batch_dir, config.state, config.utility, scenario.depends_on
-        )
-        dep_precalc = {
-            "precalc_delivery": dep_outputs["precalc_delivery"],
-            "precalc_supply": dep_outputs["precalc_supply"],
+    # Set once a scenario's precalc outputs are promoted (or it has failed).
+    precalc_ready = {s.name: threading.Event() for s in ordered}
+    precalc_dirs: dict[str, dict[str, Path]] = {}
+
+    def run_scenario_node(scenario: ScenarioConfig) -> dict[str, Path]:
+        def publish_precalc(results: dict[str, Path]) -> None:
+            precalc_dirs[scenario.name] = {
+                "precalc_delivery": results["precalc_delivery"],
+                "precalc_supply": results["precalc_supply"],
+            }
+            precalc_ready[scenario.name].set()
+
+        try:
+            dep = scenario.depends_on
+            if dep is not None:
+                if dep in precalc_ready:
+                    precalc_ready[dep].wait()
+                    if dep not in precalc_dirs:
+                        raise RuntimeError(
+                            f"Skipping {scenario.name!r}: dependency {dep!r} "
+                            "failed before its precalc stage completed"
+                        )
+                    dep_precalc = precalc_dirs[dep]
+                else:
+                    dep_outputs = check_dependency(
+                        batch_dir, config.state, config.utility, dep
+                    )
+                    dep_precalc = {
+                        "precalc_delivery": dep_outputs["precalc_delivery"],
+                        "precalc_supply": dep_outputs["precalc_supply"],
+                    }
+                derive_tariffs(config, scenario, dep_precalc)
+            return run_quartet(
+                scenario.name,
+                state=config.state,
+                utility=config.utility,
+                yaml_path=scenarios_yaml,
+                batch_dir=batch_dir,
+                process_workers=config.process_workers,
+                concurrent=config.concurrent_variants,
+                max_alive_runs=max_alive_runs,
+                on_precalc=publish_precalc,
+            )
+        finally:
+            # Release dependents waiting on a scenario that failed.
+            precalc_ready[scenario.name].set()
+
+    # Driver threads only wait on futures and events; each copies the flow
+    # run context so its run_quartet call is a subflow of this flow.
+    failures: dict[str, BaseException] = {}
+    with ThreadPoolExecutor(
+        max_workers=max(len(ordered), 1), thread_name_prefix="scenario"
+    ) as pool:
+        futures = {
+            pool.submit(contextvars.copy_context().run, run_scenario_node, s): s.name
+            for s in ordered
         }
-        derive_tariffs(config, scenario, dep_precalc)
-        run_quartet(
-            scenario.name,
-            state=config.state,
-            utility=config.utility,
-            yaml_path=scenarios_yaml,
-            batch_dir=batch_dir,
-            process_workers=config.process_workers,
-            concurrent=config.concurrent_variants,
-        )
-
+        for future in as_completed(futures):
+            name = futures[future]
+            exc = future.exception()
+            if exc is None:
+                log.info("run_batch: scenario %s complete", name)
+            else:
+                log.error("run_batch: scenario %s failed: %s", name, exc)
+                failures[name] = exc
+
+    if failures:
+        raise RuntimeError(
+            f"run_batch: {len(failures)} of {len(ordered)} scenario(s) failed for "
+            f"batch {batch}: {sorted(failures)}"
+        ) from next(iter(failures.values()))
     log.info("run_batch: all scenarios complete for batch %s", batch)
 
 
@@ -13,6 +13,7 @@ import sys
 import time
 from collections.abc import Iterator
 from dataclasses import dataclass
+from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any, cast
 
@@ -30,6 +31,8 @@ from cairo.rates_tool.systemsimulator import (
     _return_revenue_requirement_target,
 )
 
+from rate_design.hp_rates.cairo_workers import RUN_SUBMITTED_AT_ENV
+from rate_design.hp_rates.pipeline_memory import RunMemoryKey, write_run_key
 from utils import get_aws_region
 from utils.cairo import (
     _fetch_prototype_ids_by_electric_util,
@@ -37,13 +40,24 @@ from utils.cairo import (
     add_bulk_tx_and_dist_and_sub_tx_marginal_cost,
     build_bldg_id_to_load_filepath,
 )
+from utils.data_prep.marginal_costs.mc_bundle import open_mc_bundle, with_supply
 from utils.demand_flex import apply_demand_flex
+from utils.input_cache import InputCache, array_digest, files_fingerprint
+from utils.loads import load_cache_path
 from utils.mid.patches import (
     BillingKwhTables,
     _return_loads_combined,
+    bat_check_run_type,
+    bills_parquet_on_write,
     prepare_billing_kwh,
     write_billing_kwh,
 )
+from utils.mid.precalc_solver import (
+    PrecalcSolution,
+    solve_precalc,
+    write_tariff_final_config,
+)
+from utils.post.run_manifest import write_manifest_entry
 from utils.pre.generate_precalc_mapping import generate_default_precalc_mapping
 from utils.scenario_config import (
     RevenueRequirementConfig,
@@ -110,10 +124,23 @@ def assert_output_dir_is_mounted(
 
 
 @contextlib.contextmanager
-def _timed(label: str) -> Iterator[None]:
+def _timed(label: str, cache: InputCache | None = None) -> Iterator[None]:
+    """Log ``TIMING <label>``; with *cache*, also the block's hit/miss outcome."""
     t0 = time.perf_counter()
+    if cache is not None:
+        cache.last = None
     yield
-    log.info("TIMING %s: %.1fs", label, time.perf_counter() - t0)
+    elapsed = time.perf_counter() - t0
+    if cache is not None and cache.last is not None:
+        log.info(
+            "TIMING %s: %.1fs (cache %s; %s)",
+            label,
+            elapsed,
+            cache.last,
+            cache.summary(),
+        )
+    else:
+        log.info("TIMING %s: %.1fs", label, elapsed)
 
 
 def _scenario_config_from_utility(state: str, utility: str) -> Path:
@@ -163,6 +190,14 @@ class ScenarioSettings:
     customer_count_override: float | None = None
     kwh_scale_factor: float | None = None
     subclass_config: dict[str, Any] | None = None
+    # Root of the shared post-timeshift load cache (see
+    # utils.loads.load_cache_path) and of the shared input cache
+    # (utils.input_cache, under inputs/). None disables both.
+    path_load_cache: Path | None = None
+    # Prebuilt aligned MC bundle for this run's variant (see
+    # utils.data_prep.marginal_costs.mc_bundle). Used only when its recorded
+    # sources match the MC paths above; None loads MCs from the sources.
+    path_mc_bundle: Path | None = None
 
 
 def apply_prototype_sample(
@@ -348,6 +383,18 @@ def _build_settings_from_yaml_run(
             str(ancillary_raw).strip(), path_config
         )
     subclass_config: dict[str, Any] | None = run.get("subclass_config")
+    load_cache_raw = run.get("path_load_cache")
+    path_load_cache = (
+        _resolve_path(str(load_cache_raw).strip(), path_config)
+        if load_cache_raw and str(load_cache_raw).strip()
+        else None
+    )
+    mc_bundle_raw = run.get("path_mc_bundle")
+    path_mc_bundle = (
+        _resolve_path(str(mc_bundle_raw).strip(), path_config)
+        if mc_bundle_raw and str(mc_bundle_raw).strip()
+        else None
+    )
     output_dir = _resolve_output_dir(run, run_num, output_dir_override)
     run_name = run_name_override or run.get("run_name") or f"run_{run_num}"
     return ScenarioSettings(
@@ -404,10 +451,12 @@ def _build_settings_from_yaml_run(
         customer_count_override=rr_config.customer_count_override,
         kwh_scale_factor=rr_config.kwh_scale_factor,
         subclass_config=subclass_config,
+        path_load_cache=path_load_cache,
+        path_mc_bundle=path_mc_bundle,
     )
 
 
-def _parse_args() -> argparse.Namespace:
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description=("Run heat-pump scenario using YAML config.")
     )
@@ -518,7 +567,53 @@ def _parse_args() -> argparse.Namespace:
             "to preserve the original (possibly negative) electricity_net."
         ),
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--closed-form-precalc",
+        action="store_true",
+        default=False,
+        dest="closed_form_precalc",
+        help=(
+            "Calibrate precalc runs whose tariffs are all flat/TOU energy-only "
+            "in closed form (utils.mid.precalc_solver) and bill them as default "
+            "runs. Off by default: precalc runs are calibrated by CAIRO."
+        ),
+    )
+    parser.add_argument(
+        "--load-cache-dir",
+        type=Path,
+        default=None,
+        dest="load_cache_dir",
+        help=(
+            "Root of the shared post-timeshift load cache. Overrides "
+            "path_load_cache from the scenario YAML. Runs on the same utility, "
+            "upgrade, year and sample memory-map one copy of the load arrays; "
+            "other shared inputs are cached under <root>/inputs."
+        ),
+    )
+    parser.add_argument(
+        "--mc-bundle",
+        type=Path,
+        default=None,
+        dest="mc_bundle",
+        help=(
+            "Prebuilt aligned MC bundle (generate_mc_bundle.py). Overrides "
+            "path_mc_bundle from the scenario YAML; ignored with a warning when "
+            "it was built from other MC paths."
+        ),
+    )
+    parser.add_argument(
+        "--tariff-variants",
+        type=Path,
+        default=None,
+        dest="tariff_variants",
+        help=(
+            "YAML of electric tariff variants (variants: {name: "
+            "{path_tariffs_electric, path_tariff_maps_electric}}). Loads the "
+            "run's building stock, loads and marginal costs once and bills each "
+            "variant against them as run '<run_name>_<name>'."
+        ),
+    )
+    args = parser.parse_args(argv)
     if args.scenario_config is None and args.utility is None:
         parser.error("Provide either --scenario-config or --utility.")
     return args
@@ -548,6 +643,10 @@ def _resolve_settings(args: argparse.Namespace) -> ScenarioSettings:
         settings.path_tou_supply_capacity_mc = args.path_tou_supply_capacity_mc
     if args.path_supply_ancillary_mc and settings.run_includes_supply:
         settings.path_supply_ancillary_mc = args.path_supply_ancillary_mc
+    if args.load_cache_dir is not None:
+        settings.path_load_cache = args.load_cache_dir
+    if args.mc_bundle is not None:
+        settings.path_mc_bundle = args.mc_bundle
     return settings
 
 
@@ -653,21 +752,13 @@ def _write_scenario_settings(run_output_dir: Path, settings: ScenarioSettings) -
     log.info(".... Saved scenario settings: %s", out_path)
 
 
-def run(
-    settings: ScenarioSettings,
-    num_workers: int | None = None,
-    *,
-    billing_kwh: bool = False,
-    floor_electricity_net: bool = True,
-) -> Path | None:
-    log.info(
-        ".... Beginning %s residential (non-LMI) rate scenario simulation: %s",
-        settings.state,
-        settings.run_name,
-    )
+def _demand_flex_enabled(settings: ScenarioSettings) -> bool:
+    if isinstance(settings.elasticity, dict):
+        return any(v != 0.0 for v in settings.elasticity.values())
+    return settings.elasticity != 0.0
 
-    assert_output_dir_is_mounted(settings.path_results)
 
+def _configure_workers(settings: ScenarioSettings, num_workers: int | None) -> None:
     _effective_workers = (
         num_workers
         if num_workers is not None
@@ -681,25 +772,57 @@ def run(
         os.cpu_count() or 1,
     )
 
-    # Phase 1 ---------------------------------------------------------------
-    with _timed("_load_prototype_ids_for_run"):
-        prototype_ids = _load_prototype_ids_for_run(
-            settings.path_utility_assignment,
-            settings.utility,
-            settings.sample_size,
-        )
 
-    with _timed("_initialize_tariffs"):
-        tariffs_params, tariff_map_df = _initialize_tariffs(
-            tariff_map=settings.path_tariff_maps_electric,
-            building_stock_sample=prototype_ids,
-            tariff_paths=settings.path_tariffs_electric,
-        )
+@dataclass(slots=True)
+class RunInputs:
+    """Tariff-independent inputs of a run: building stock, loads and MCs.
 
-    with _timed("_build_precalc_period_mapping"):
-        precalc_mapping = _build_precalc_period_mapping(settings.path_tariffs_electric)
+    Loaded once by ``load_inputs``; ``run_tariff_variants`` bills any number
+    of tariffs against one instance. ``rr_target_orig`` is the RR
+    decomposition on the original loads (``revenue_requirement``,
+    ``marginal_system_prices``, ``costs_by_type``).
+    """
+
+    prototype_ids: list[int]
+    customer_metadata: pd.DataFrame
+    raw_load_elec: pd.DataFrame | None
+    raw_load_gas: pd.DataFrame
+    bulk_marginal_costs: pd.DataFrame
+    dist_and_sub_tx_marginal_costs: pd.Series
+    rr_target_orig: tuple[Any, Any, Any]
+    cache: InputCache
+
+
+def load_inputs(
+    settings: ScenarioSettings,
+    *,
+    floor_electricity_net: bool = True,
+) -> RunInputs:
+    """Phases 1-2 of ``run``: everything that does not depend on the tariffs."""
+    assert_output_dir_is_mounted(settings.path_results)
+
+    # Inputs shared across the runs of a quartet live next to the load cache.
+    cache = InputCache(settings.path_load_cache)
 
-    with _timed("return_buildingstock"):
+    # Phase 1 ---------------------------------------------------------------
+    with _timed("_load_prototype_ids_for_run", cache):
+        prototype_ids = cache.get_or_compute(
+            "prototype_ids",
+            lambda: {
+                "utility_assignment": cache.fingerprint(
+                    settings.path_utility_assignment
+                ),
+                "utility": settings.utility,
+                "sample_size": settings.sample_size,
+            },
+            lambda: _load_prototype_ids_for_run(
+                settings.path_utility_assignment,
+                settings.utility,
+                settings.sample_size,
+            ),
+        )
+
+    with _timed("return_buildingstock", cache):
         if settings.customer_count_override is not None:
             customer_count = settings.customer_count_override
             log.info(
@@ -712,25 +835,50 @@ def run(
                 settings.utility,
                 storage_options=_storage_options(),
             )
-        customer_metadata = return_buildingstock(
-            load_scenario=settings.path_resstock_metadata,
-            building_stock_sample=prototype_ids,
-            customer_count=customer_count,
-            columns=_buildingstock_columns(settings),
+        columns = _buildingstock_columns(settings)
+        customer_metadata = cache.get_or_compute(
+            "buildingstock",
+            lambda: {
+                "metadata": cache.fingerprint(settings.path_resstock_metadata),
+                "bldg_ids": array_digest(prototype_ids),
+                "customer_count": customer_count,
+                "columns": columns,
+            },
+            lambda: return_buildingstock(
+                load_scenario=settings.path_resstock_metadata,
+                building_stock_sample=prototype_ids,
+                customer_count=customer_count,
+                columns=columns,
+            ),
         )
 
     with _timed("build_bldg_id_to_load_filepath"):
         bldg_id_to_load_filepath = build_bldg_id_to_load_filepath(
             path_resstock_loads=settings.path_resstock_loads,
             building_ids=prototype_ids,
+            utility=settings.utility,
         )
 
-    with _timed("_return_loads_combined"):
+    load_cache_dir = (
+        load_cache_path(
+            settings.path_load_cache,
+            settings.path_resstock_loads,
+            utility=settings.utility,
+            year_run=settings.year_run,
+            sample_size=settings.sample_size,
+        )
+        if settings.path_load_cache is not None
+        else None
+    )
+    with _timed("_return_loads_combined", cache):
         raw_load_elec, raw_load_gas = _return_loads_combined(
             target_year=settings.year_run,
             building_ids=prototype_ids,
             load_filepath_key=bldg_id_to_load_filepath,
             force_tz="EST",
+            cache_dir=load_cache_dir,
+            # The load cache lives outside InputCache but shares its counters.
+            on_load_cache=lambda hit: cache.record(hit=hit),
         )
 
     if settings.kwh_scale_factor is not None:
@@ -766,31 +914,64 @@ def run(
     #
     # MC prices are exogenous; load shifting changes total MC dollars, not prices.
 
-    # Load supply MCs: Energy + Capacity (bulk supply).
-    # Both paths are required (enforced by ScenarioSettings dataclass).
-    # _load_supply_marginal_costs detects Cambium paths internally and routes
-    # to the appropriate loader (e.g. RI uses a Cambium file for both).
-    bulk_marginal_costs = _load_supply_marginal_costs(
-        settings.path_supply_energy_mc,
-        settings.path_supply_capacity_mc,
+    # A prebuilt bundle (generate_mc_bundle.py) holds the same supply and
+    # delivery MCs already aligned to year_run; read it when it was built from
+    # this run's MC paths, otherwise load and align them from the sources.
+    mc_bundle = open_mc_bundle(
+        settings.path_mc_bundle,
         settings.year_run,
-        ancillary_path=settings.path_supply_ancillary_mc,
-    )
-
-    # Load and combine delivery MCs: Bulk Tx + Dist+Sub-Tx
-    # Align to supply MC index to ensure all MCs share the same DatetimeIndex
-    dist_and_sub_tx_marginal_costs = add_bulk_tx_and_dist_and_sub_tx_marginal_cost(
-        path_dist_and_sub_tx_mc=settings.path_dist_and_sub_tx_mc,
-        path_bulk_tx_mc=settings.path_bulk_tx_mc,
-        target_index=pd.DatetimeIndex(bulk_marginal_costs.index),
-    )
-    sell_rate = _return_export_compensation_rate(
-        year_run=settings.year_run,
-        solar_pv_compensation=settings.solar_pv_compensation,
-        solar_pv_export_import_ratio=1.0,
-        tariff_dict=tariffs_params,
+        supply_energy=settings.path_supply_energy_mc,
+        supply_capacity=settings.path_supply_capacity_mc,
+        supply_ancillary=settings.path_supply_ancillary_mc,
+        dist_and_sub_tx=settings.path_dist_and_sub_tx_mc,
+        bulk_tx=settings.path_bulk_tx_mc,
     )
+    if mc_bundle is not None:
+        with _timed("read_mc_bundle"):
+            bulk_marginal_costs = mc_bundle.supply_marginal_costs()
+            dist_and_sub_tx_marginal_costs = mc_bundle.delivery_marginal_costs()
+        mc_index = pd.DatetimeIndex(bulk_marginal_costs.index)
+    else:
+        # Load supply MCs: Energy + Capacity (bulk supply).
+        # Both paths are required (enforced by ScenarioSettings dataclass).
+        # _load_supply_marginal_costs detects Cambium paths internally and routes
+        # to the appropriate loader (e.g. RI uses a Cambium file for both).
+        with _timed("_load_supply_marginal_costs", cache):
+            bulk_marginal_costs = cache.get_or_compute(
+                "supply_mc",
+                lambda: {
+                    "energy": cache.fingerprint(settings.path_supply_energy_mc),
+                    "capacity": cache.fingerprint(settings.path_supply_capacity_mc),
+                    "ancillary": cache.fingerprint(settings.path_supply_ancillary_mc),
+                    "year_run": settings.year_run,
+                },
+                lambda: _load_supply_marginal_costs(
+                    settings.path_supply_energy_mc,
+                    settings.path_supply_capacity_mc,
+                    settings.year_run,
+                    ancillary_path=settings.path_supply_ancillary_mc,
+                ),
+            )
 
+        # Load and combine delivery MCs: Bulk Tx + Dist+Sub-Tx
+        # Align to supply MC index to ensure all MCs share the same DatetimeIndex
+        mc_index = pd.DatetimeIndex(bulk_marginal_costs.index)
+        with _timed("add_bulk_tx_and_dist_and_sub_tx_marginal_cost", cache):
+            dist_and_sub_tx_marginal_costs = cache.get_or_compute(
+                "delivery_mc",
+                lambda: {
+                    "dist_and_sub_tx": cache.fingerprint(
+                        settings.path_dist_and_sub_tx_mc
+                    ),
+                    "bulk_tx": cache.fingerprint(settings.path_bulk_tx_mc),
+                    "target_index": array_digest(mc_index),
+                },
+                lambda: add_bulk_tx_and_dist_and_sub_tx_marginal_cost(
+                    path_dist_and_sub_tx_mc=settings.path_dist_and_sub_tx_mc,
+                    path_bulk_tx_mc=settings.path_bulk_tx_mc,
+                    target_index=mc_index,
+                ),
+            )
     # FIND TOTAL RESIDUAL AND HOURLY MC's
     # Decomposes the revenue requirement into total marginal costs and residual.
     # RR = total_MC + residual, where total_MC = sum of hourly (MC_price × load)
@@ -806,10 +987,117 @@ def run(
     # supply runs, per-subclass supply costs are derived from run 2 BAT data
     # (via compute_subclass_rr --run-dir-supply), not from raw Cambium prices.
 
-    if isinstance(settings.elasticity, dict):
-        demand_flex_enabled = any(v != 0.0 for v in settings.elasticity.values())
+    # The pipeline attaches this run's measured peak RSS to this key.
+    write_run_key(
+        settings.path_results,
+        settings.run_name,
+        RunMemoryKey(
+            utility=settings.utility,
+            run_type=settings.run_type,
+            demand_flex=_demand_flex_enabled(settings),
+            sample_size=settings.sample_size,
+            n_buildings=len(prototype_ids),
+            run_includes_supply=settings.run_includes_supply,
+        ),
+    )
+
+    # RR decomposition on the original loads: the no-flex result, and the
+    # demand-flex Phase 1a frozen residual. Identical across the runs of a
+    # quartet that share loads, MCs and RR, so it goes through the cache.
+    def _rr_target_orig() -> tuple[Any, Any, Any]:
+        rr, msp, _msc, by_type = _return_revenue_requirement_target(
+            building_load=raw_load_elec,
+            sample_weight=customer_metadata[["bldg_id", "weight"]],
+            revenue_requirement_target=settings.rr_total,
+            residual_cost=None,
+            residual_cost_frac=None,
+            bulk_marginal_costs=bulk_marginal_costs,
+            distribution_marginal_costs=dist_and_sub_tx_marginal_costs,
+            low_income_strategy=None,
+        )
+        return rr, msp, by_type
+
+    with _timed("_return_revenue_requirement_target", cache):
+        rr_target_orig = cache.get_or_compute(
+            "rr_target",
+            lambda: {
+                "loads": files_fingerprint(bldg_id_to_load_filepath.values()),
+                "bldg_ids": array_digest(prototype_ids),
+                "year_run": settings.year_run,
+                "kwh_scale_factor": settings.kwh_scale_factor,
+                "floor_electricity_net": floor_electricity_net,
+                "metadata": cache.fingerprint(settings.path_resstock_metadata),
+                "customer_count": customer_count,
+                "supply_mc": array_digest(bulk_marginal_costs.to_numpy()),
+                "delivery_mc": array_digest(dist_and_sub_tx_marginal_costs.to_numpy()),
+                "mc_index": array_digest(mc_index),
+                "rr_total": settings.rr_total,
+            },
+            _rr_target_orig,
+        )
+
+    return RunInputs(
+        prototype_ids=prototype_ids,
+        customer_metadata=customer_metadata,
+        raw_load_elec=raw_load_elec,
+        raw_load_gas=raw_load_gas,
+        bulk_marginal_costs=bulk_marginal_costs,
+        dist_and_sub_tx_marginal_costs=dist_and_sub_tx_marginal_costs,
+        rr_target_orig=rr_target_orig,
+        cache=cache,
+    )
+
+
+def _simulate_tariffs(
+    settings: ScenarioSettings,
+    inputs: RunInputs,
+    *,
+    billing_kwh: bool,
+    reuse_inputs: bool,
+    closed_form_precalc: bool = False,
+) -> Path | None:
+    """Phase 3 of ``run``: bill ``settings``' tariffs against *inputs*.
+
+    With *reuse_inputs*, every pandas input is handed to CAIRO as a shallow
+    (copy-on-write) copy so *inputs* stays intact for the next tariff;
+    otherwise the original loads are released once demand flex has shifted
+    them.
+    """
+    prototype_ids = inputs.prototype_ids
+    customer_metadata = inputs.customer_metadata
+    raw_load_elec = inputs.raw_load_elec
+    raw_load_gas = inputs.raw_load_gas
+    bulk_marginal_costs = inputs.bulk_marginal_costs
+    dist_and_sub_tx_marginal_costs = inputs.dist_and_sub_tx_marginal_costs
+    rr_target_orig = inputs.rr_target_orig
+    assert raw_load_elec is not None, "RunInputs were already consumed by a run"
+    if reuse_inputs:
+        prototype_ids = list(prototype_ids)
+        customer_metadata = customer_metadata.copy(deep=False)
+        raw_load_elec = raw_load_elec.copy(deep=False)
+        raw_load_gas = raw_load_gas.copy(deep=False)
+        bulk_marginal_costs = bulk_marginal_costs.copy(deep=False)
+        dist_and_sub_tx_marginal_costs = dist_and_sub_tx_marginal_costs.copy(deep=False)
     else:
-        demand_flex_enabled = settings.elasticity != 0.0
+        inputs.raw_load_elec = None
+    demand_flex_enabled = _demand_flex_enabled(settings)
+
+    with _timed("_initialize_tariffs"):
+        tariffs_params, tariff_map_df = _initialize_tariffs(
+            tariff_map=settings.path_tariff_maps_electric,
+            building_stock_sample=prototype_ids,
+            tariff_paths=settings.path_tariffs_electric,
+        )
+
+    with _timed("_build_precalc_period_mapping"):
+        precalc_mapping = _build_precalc_period_mapping(settings.path_tariffs_electric)
+
+    sell_rate = _return_export_compensation_rate(
+        year_run=settings.year_run,
+        solar_pv_compensation=settings.solar_pv_compensation,
+        solar_pv_export_import_ratio=1.0,
+        tariff_dict=tariffs_params,
+    )
 
     if demand_flex_enabled:
         flex = apply_demand_flex(
@@ -827,7 +1115,13 @@ def run(
             dist_and_sub_tx_marginal_costs=dist_and_sub_tx_marginal_costs,
             path_tou_supply_energy_mc=settings.path_tou_supply_energy_mc,
             path_tou_supply_capacity_mc=settings.path_tou_supply_capacity_mc,
+            path_tou_mc_bundle=(
+                with_supply(settings.path_mc_bundle, True)
+                if settings.path_mc_bundle is not None
+                else None
+            ),
             run_includes_subclasses=settings.run_includes_subclasses,
+            original_rr_target=(rr_target_orig[0], rr_target_orig[2]),
         )
 
         revenue_requirement: float | dict[str, float] | None = (
@@ -855,21 +1149,10 @@ def run(
                 {k: f"${v:,.0f}" for k, v in revenue_requirement.items()},
             )
     else:
-        (
-            revenue_requirement,
-            marginal_system_prices,
-            _marginal_system_costs,
-            costs_by_type,
-        ) = _return_revenue_requirement_target(
-            building_load=raw_load_elec,
-            sample_weight=customer_metadata[["bldg_id", "weight"]],
-            revenue_requirement_target=settings.rr_total,
-            residual_cost=None,
-            residual_cost_frac=None,
-            bulk_marginal_costs=bulk_marginal_costs,
-            distribution_marginal_costs=dist_and_sub_tx_marginal_costs,
-            low_income_strategy=None,
-        )
+        revenue_requirement, marginal_system_prices, costs_by_type = rr_target_orig
+        if reuse_inputs:
+            marginal_system_prices = marginal_system_prices.copy(deep=False)
+            costs_by_type = costs_by_type.copy(deep=False)
         effective_load_elec = raw_load_elec
         elasticity_tracker = pd.DataFrame()
         if settings.run_includes_subclasses:
@@ -878,9 +1161,36 @@ def run(
     # Phase 3 ---------------------------------------------------------------
     # Precalc calibrates rates against shifted loads so the resulting
     # tariff recovers the (lower) RR from the demand-flex load profile.
-    with _timed("bs.simulate"):
+    # With closed_form_precalc, flat/TOU energy-only tariffs are calibrated in
+    # closed form and billed as a default run (BAT balance still checked as
+    # precalc); anything else goes through CAIRO's precalc.
+    cairo_run_type = settings.run_type
+    precalc_solution: PrecalcSolution | None = None
+    if (
+        settings.run_type == "precalc"
+        and closed_form_precalc
+        and revenue_requirement is not None
+    ):
+        with _timed("solve_precalc"):
+            precalc_solution = solve_precalc(
+                tariffs_params,
+                tariff_map_df,
+                precalc_mapping,
+                customer_metadata,
+                effective_load_elec,
+                revenue_requirement,
+            )
+        if precalc_solution is not None:
+            tariffs_params = precalc_solution.tariffs
+            cairo_run_type = "default"
+
+    with (
+        _timed("bs.simulate"),
+        bat_check_run_type(settings.run_type),
+        bills_parquet_on_write(),
+    ):
         bs = MeetRevenueSufficiencySystemWide(
-            run_type=settings.run_type,
+            run_type=cairo_run_type,
             year_run=settings.year_run,
             year_dollar_conversion=settings.year_dollar_conversion,
             process_workers=settings.process_workers,
@@ -911,6 +1221,8 @@ def run(
     save_file_loc = getattr(bs, "save_file_loc", None)
     if save_file_loc is not None:
         run_output_dir = Path(save_file_loc)
+        if precalc_solution is not None:
+            write_tariff_final_config(run_output_dir, precalc_solution.tariffs)
         dist_and_sub_tx_mc_path = run_output_dir / "delivery_all_marginal_costs.csv"
         dist_and_sub_tx_marginal_costs.to_csv(dist_and_sub_tx_mc_path, index=True)
         log.info(".... Saved dist+sub-tx marginal costs: %s", dist_and_sub_tx_mc_path)
@@ -929,8 +1241,9 @@ def run(
         write_billing_kwh(run_output_dir, billing_kwh_tables)
 
     log.info(
-        ".... Completed %s residential (non-LMI) rate scenario simulation",
+        ".... Completed %s residential (non-LMI) rate scenario simulation: %s",
         settings.state,
+        settings.run_name,
     )
 
     if save_file_loc is not None:
@@ -938,30 +1251,221 @@ def run(
     return None
 
 
-def _write_run_index(settings: ScenarioSettings, output_dir: Path) -> None:
-    """Write a run index file so the pipeline can discover the output dir."""
+def run(
+    settings: ScenarioSettings,
+    num_workers: int | None = None,
+    *,
+    billing_kwh: bool = False,
+    floor_electricity_net: bool = True,
+    closed_form_precalc: bool = False,
+) -> Path | None:
+    log.info(
+        ".... Beginning %s residential (non-LMI) rate scenario simulation: %s",
+        settings.state,
+        settings.run_name,
+    )
+    _configure_workers(settings, num_workers)
+    inputs = load_inputs(settings, floor_electricity_net=floor_electricity_net)
+    if inputs.cache.root is not None:
+        log.info("TIMING input cache: %s", inputs.cache.summary())
+    return _simulate_tariffs(
+        settings,
+        inputs,
+        billing_kwh=billing_kwh,
+        reuse_inputs=False,
+        closed_form_precalc=closed_form_precalc,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tariff variants
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class TariffVariant:
+    """One set of electric tariffs to bill against shared run inputs.
+
+    ``path_tariff_maps_electric=None`` keeps the base run's tariff map.
+    """
+
+    name: str
+    path_tariffs_electric: dict[str, Path]
+    path_tariff_maps_electric: Path | None = None
+
+
+def _variant_settings(
+    settings: ScenarioSettings, variant: TariffVariant
+) -> ScenarioSettings:
+    return dataclasses.replace(
+        settings,
+        run_name=f"{settings.run_name}_{variant.name}",
+        path_tariffs_electric=dict(variant.path_tariffs_electric),
+        path_tariff_maps_electric=(
+            variant.path_tariff_maps_electric or settings.path_tariff_maps_electric
+        ),
+    )
+
+
+def _load_tariff_variants(
+    path: Path, settings: ScenarioSettings
+) -> list[TariffVariant]:
+    """Parse a ``--tariff-variants`` YAML.
+
+    Format::
+
+        variants:
+          <name>:
+            path_tariffs_electric: {<key>: <tariff json>, ...}
+            path_tariff_maps_electric: <tariff map csv>  # optional
+
+    Relative paths resolve against the state config dir, as in scenario
+    YAMLs, and each variant's tariffs are reconciled with its tariff map.
+    """
+    with path.open(encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    raw_variants = _require_mapping(data.get("variants"), "variants")
+    if not raw_variants:
+        raise ValueError(f"No variants defined in {path}")
+    path_config = _state_config(settings.state)
+    variants = []
+    for name, raw in raw_variants.items():
+        raw = _require_mapping(raw, f"variants.{name}")
+        map_value = raw.get("path_tariff_maps_electric")
+        path_map = (
+            _resolve_path(str(map_value), path_config)
+            if map_value is not None
+            else None
+        )
+        variants.append(
+            TariffVariant(
+                name=str(name),
+                path_tariffs_electric=_parse_path_tariffs(
+                    _require_value(raw, "path_tariffs_electric"),
+                    path_map or settings.path_tariff_maps_electric,
+                    path_config,
+                    "electric",
+                ),
+                path_tariff_maps_electric=path_map,
+            )
+        )
+    return variants
+
+
+def run_tariff_variants(
+    settings: ScenarioSettings,
+    variants: list[TariffVariant],
+    num_workers: int | None = None,
+    *,
+    billing_kwh: bool = False,
+    floor_electricity_net: bool = True,
+    closed_form_precalc: bool = False,
+) -> dict[str, Path | None]:
+    """Bill every tariff variant against one load of the building stock and MCs.
+
+    Equivalent to one ``run`` per variant (named ``{run_name}_{variant}``),
+    but buildingstock, loads, marginal costs and the original RR
+    decomposition are loaded once. Returns each variant's output dir.
+    """
+    names = [v.name for v in variants]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate tariff variant names: {names}")
+    log.info(
+        ".... Beginning %s tariff-variant simulation: %s (%d variants)",
+        settings.state,
+        settings.run_name,
+        len(variants),
+    )
+    _configure_workers(settings, num_workers)
+    with _timed("load_inputs"):
+        inputs = load_inputs(settings, floor_electricity_net=floor_electricity_net)
+    if inputs.cache.root is not None:
+        log.info("TIMING input cache: %s", inputs.cache.summary())
+
+    outputs: dict[str, Path | None] = {}
+    for variant in variants:
+        with _timed(f"variant {variant.name}"):
+            outputs[variant.name] = _simulate_tariffs(
+                _variant_settings(settings, variant),
+                inputs,
+                billing_kwh=billing_kwh,
+                reuse_inputs=True,
+                closed_form_precalc=closed_form_precalc,
+            )
+    return outputs
+
+
+def _write_run_index(
+    settings: ScenarioSettings, output_dir: Path, *, started_at: datetime
+) -> None:
+    """Write a run index file so the pipeline can discover the output dir.
+
+    Also records the run in the batch's Parquet run manifest, which
+    post-processing reads instead of listing run directories on S3.
+    """
     index_path = settings.path_results / ".runs" / f"{settings.run_name}.path"
     index_path.parent.mkdir(parents=True, exist_ok=True)
     index_path.write_text(str(output_dir))
     log.info(".... Wrote run index: %s", index_path)
+    with _timed("run manifest"):
+        write_manifest_entry(
+            settings.path_results, settings.run_name, output_dir, started_at=started_at
+        )
 
 
-def main() -> None:
+def _run_started_at() -> datetime:
+    """When this run was submitted (set by ``cairo_run``), else now."""
+    submitted_at = os.environ.get(RUN_SUBMITTED_AT_ENV)
+    if submitted_at is not None:
+        return datetime.fromtimestamp(float(submitted_at), UTC)
+    return datetime.now(UTC)
+
+
+def _log_startup() -> None:
+    """Log time from pipeline submission to here (set by ``cairo_run``)."""
+    submitted_at = os.environ.get(RUN_SUBMITTED_AT_ENV)
+    if submitted_at is not None:
+        log.info("TIMING startup: %.1fs", time.time() - float(submitted_at))
+
+
+def main(argv: list[str] | None = None) -> None:
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s %(name)s %(levelname)s %(message)s",
         datefmt="%H:%M:%S",
     )
-    args = _parse_args()
+    _log_startup()
+    started_at = _run_started_at()
+    args = _parse_args(argv)
     settings = _resolve_settings(args)
+    if args.tariff_variants is not None:
+        variants = _load_tariff_variants(args.tariff_variants, settings)
+        outputs = run_tariff_variants(
+            settings,
+            variants,
+            num_workers=args.num_workers,
+            billing_kwh=args.billing_kwh,
+            floor_electricity_net=not args.no_floor_electricity_net,
+            closed_form_precalc=args.closed_form_precalc,
+        )
+        for variant in variants:
+            variant_output_dir = outputs[variant.name]
+            if variant_output_dir is not None:
+                _write_run_index(
+                    _variant_settings(settings, variant),
+                    variant_output_dir,
+                    started_at=started_at,
+                )
+        return
     output_dir = run(
         settings,
         num_workers=args.num_workers,
         billing_kwh=args.billing_kwh,
         floor_electricity_net=not args.no_floor_electricity_net,
+        closed_form_precalc=args.closed_form_precalc,
     )
     if output_dir is not None:
-        _write_run_index(settings, output_dir)
+        _write_run_index(settings, output_dir, started_at=started_at)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 """Tests for utils.cairo (Cambium loader and related)."""
 
+import logging
 from pathlib import Path
 
 import pandas as pd
@@ -12,7 +13,15 @@ from utils.cairo import (
     _load_cambium_marginal_costs,
     apply_runtime_tou_demand_response,
     assign_hourly_periods,
+    build_bldg_id_to_load_filepath,
     process_residential_hourly_demand_response_shift,
+    shift_tou_load_matrix,
+)
+from utils.loads import (
+    LOAD_MATRIX_COLUMNS,
+    N_HOURS,
+    load_matrix_path,
+    write_load_matrix,
 )
 
 # Example CSV with same structure as Cambium (5 metadata rows, then header + 8760 data rows)
@@ -21,7 +30,7 @@ EXAMPLE_CSV = (
     / "rate_design"
     / "hp_rates"
     / "ny"
-    / "data"
+    / "config"
     / "marginal_costs"
     / "example_marginal_costs.csv"
 )
@@ -223,3 +232,95 @@ def test_flex_shift_negative_period_net_stays_finite() -> None:
     assert np.all(np.isfinite(shifted))
     assert np.all(np.isfinite(hourly_shift))
     assert shifted.sum() == pytest.approx(hourly["electricity_net"].sum())
+
+
+def test_shift_tou_load_matrix_matches_long_format() -> None:
+    """Matrix engine gives the same shifts and tracker as the long-format path."""
+    rng = np.random.default_rng(0)
+    hour_periods = np.tile([0] * 16 + [1] * 5 + [0] * 3, 7)
+    net = rng.normal(1.0, 1.0, (4, len(hour_periods)))
+    net[2] -= 1.2  # near-zero / negative period sums take the guarded path
+    bldg_ids = np.array([40, 10, 30, 20])
+    period_rate = pd.Series(
+        [0.10, 0.30], index=pd.Index([0, 1], name="energy_period"), name="rate"
+    )
+    hourly = pd.DataFrame(
+        {
+            "bldg_id": np.repeat(bldg_ids, len(hour_periods)),
+            "energy_period": np.tile(hour_periods, len(bldg_ids)),
+            "electricity_net": net.ravel(),
+        }
+    )
+
+    shifted, hourly_shift, tracker = process_residential_hourly_demand_response_shift(
+        hourly, period_rate, demand_elasticity=-0.2
+    )
+    m_shifted, m_hourly_shift, m_tracker = shift_tou_load_matrix(
+        net, hour_periods, bldg_ids, period_rate, demand_elasticity=-0.2
+    )
+
+    np.testing.assert_allclose(m_shifted.ravel(), shifted)
+    np.testing.assert_allclose(m_hourly_shift.ravel(), hourly_shift)
+    pd.testing.assert_frame_equal(m_tracker, tracker)
+    np.testing.assert_allclose(m_shifted.sum(axis=1), net.sum(axis=1))
+
+
+def test_runtime_demand_response_row_order_independent() -> None:
+    """Shuffled (non building-major) frames shift the same rows as sorted ones."""
+    times = pd.date_range("2025-01-01", periods=24 * 7, freq="h", tz="EST")
+    idx = pd.MultiIndex.from_product([[3, 1, 2], times], names=["bldg_id", "time"])
+    rng = np.random.default_rng(1)
+    raw = pd.DataFrame(
+        {
+            "electricity_net": rng.random(len(idx)) + 0.5,
+            "load_data": rng.random(len(idx)) + 1.0,
+        },
+        index=idx,
+    )
+    tariff = _build_single_season_tou_tariff()
+
+    shifted, tracker = apply_runtime_tou_demand_response(
+        raw, tou_bldg_ids=[3, 2], tou_tariff=tariff, demand_elasticity=-0.1
+    )
+    shuffled, shuffled_tracker = apply_runtime_tou_demand_response(
+        raw.sample(frac=1.0, random_state=0),
+        tou_bldg_ids=[3, 2],
+        tou_tariff=tariff,
+        demand_elasticity=-0.1,
+    )
+
+    pd.testing.assert_frame_equal(shuffled.loc[shifted.index], shifted)
+    pd.testing.assert_frame_equal(shuffled_tracker, tracker)
+    pd.testing.assert_series_equal(
+        shifted.loc[1, "electricity_net"], raw.loc[1, "electricity_net"]
+    )
+    np.testing.assert_allclose(
+        (shifted["load_data"] - raw["load_data"]).to_numpy(),
+        (shifted["electricity_net"] - raw["electricity_net"]).to_numpy(),
+    )
+
+
+def test_stale_load_matrix_falls_back_to_parquet_listing(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    hourly = tmp_path / "res" / "load_curve_hourly" / "state=NY" / "upgrade=00"
+    hourly.mkdir(parents=True)
+    sources = [hourly / f"{bid}-0.parquet" for bid in (1, 2)]
+    for src in sources:
+        src.write_bytes(b"v1")
+    matrix = write_load_matrix(
+        load_matrix_path(hourly, "coned"),
+        np.array([1, 2]),
+        pd.date_range("2018-01-01 01:00", periods=N_HOURS, freq="h"),
+        {name: np.zeros((2, N_HOURS)) for name in LOAD_MATRIX_COLUMNS},
+        source_files=sources,
+    )
+
+    fresh = build_bldg_id_to_load_filepath(hourly, utility="coned")
+    assert fresh == {1: matrix, 2: matrix}
+
+    sources[1].write_bytes(b"v2, rewritten")
+    caplog.set_level(logging.WARNING, logger="utils.cairo")
+    stale = build_bldg_id_to_load_filepath(hourly, utility="coned")
+    assert stale == {1: sources[0], 2: sources[1]}
+    assert "is stale" in caplog.text
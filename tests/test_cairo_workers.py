@@ -0,0 +1,13 @@
+"""Tests for rate_design/hp_rates/cairo_workers.py startup measurement."""
+
+from __future__ import annotations
+
+from rate_design.hp_rates.cairo_workers import measure_startup
+
+
+def test_measure_startup_times_cold_and_warm_starts():
+    timings = measure_startup(2, modules=["json"])
+    assert len(timings["cold"]) == 2
+    assert len(timings["warm"]) == 2
+    assert len(timings["server"]) == 1
+    assert all(t > 0 for seconds in timings.values() for t in seconds)
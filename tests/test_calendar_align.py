@@ -0,0 +1,81 @@
+"""Tests for utils/calendar_align.py (shared year remap and timeshift)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from utils.calendar_align import (
+    hours_8760,
+    offset_years,
+    replace_year,
+    timeshift_frame,
+    weekday_shift_hours,
+)
+from utils.mid.patches import _timeshift_load_blocks
+
+
+def test_hours_8760_leap_year_keeps_feb29_and_drops_dec31():
+    times = pd.DatetimeIndex(hours_8760(2024))
+
+    assert len(times) == 8760
+    assert times[0] == pd.Timestamp("2024-01-01 00:00")
+    assert times[-1] == pd.Timestamp("2024-12-30 23:00")
+    assert (times.strftime("%m-%d") == "02-29").sum() == 24
+
+
+def test_replace_year_matches_timestamp_replace():
+    times = pd.date_range("2025-01-01", periods=8760, freq="h")
+
+    shifted, keep = replace_year(times.to_numpy(), 2023)
+
+    assert keep.all()
+    expected = pd.DatetimeIndex([t.replace(year=2023) for t in times])
+    assert pd.DatetimeIndex(shifted).equals(expected)
+
+
+def test_offset_years_drops_feb29_in_common_year():
+    times = pd.date_range("2024-02-28", "2024-03-01 23:00", freq="h").to_numpy()
+
+    shifted, keep = offset_years(times, 1)
+
+    assert keep.sum() == 48
+    kept = shifted[keep]
+    assert len(np.unique(kept)) == len(kept)
+    assert np.unique(kept.astype("datetime64[D]")).astype(str).tolist() == [
+        "2025-02-28",
+        "2025-03-01",
+    ]
+
+
+def test_timeshift_frame_aligns_weekdays_and_keeps_tz():
+    times = pd.date_range("2018-01-01", periods=8760, freq="h", tz="EST", name="time")
+    df = pd.DataFrame({"mc": np.arange(8760, dtype=float)}, index=times)
+
+    shifted = timeshift_frame(df, 2025)
+
+    assert weekday_shift_hours(2018, 2025) == 48
+    assert shifted.index.name == "time"
+    assert str(pd.DatetimeIndex(shifted.index).tz) == "EST"
+    assert shifted.index[0] == pd.Timestamp("2025-01-01", tz="EST")
+    # Wed Jan 1 2025 takes Wed Jan 3 2018.
+    assert shifted["mc"].iloc[0] == 48.0
+    assert shifted.index[0].weekday() == times[48].weekday()
+
+
+def test_load_and_mc_timeshift_agree():
+    times = pd.date_range("2018-01-01 01:00", periods=8760, freq="h")
+    values = np.random.default_rng(0).uniform(0, 5, 8760)
+
+    unique_times, arrays = _timeshift_load_blocks(
+        2025,
+        times.to_numpy(),
+        values[None, :].copy(),
+        np.zeros((1, 8760)),
+        np.zeros((1, 8760)),
+        force_tz=None,
+    )
+    mc = timeshift_frame(pd.DataFrame({"mc": values}, index=times), 2025)
+
+    assert unique_times.equals(mc.index)
+    np.testing.assert_array_equal(arrays["load_data"], mc["mc"].to_numpy())
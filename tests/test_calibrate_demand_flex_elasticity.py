@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import Any, cast
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cairo import assign_hourly_periods, extract_tou_period_rates
+from utils.loads import BuildingLoads
+from utils.pre.calibrate_demand_flex_elasticity import (
+    UtilityContext,
+    diagnose_season,
+    diagnose_utility,
+    sweep_season,
+)
+from utils.pre.compute_tou import Season, SeasonTouSpec
+
+ELASTICITIES = [-0.04, -0.1, -0.22, -0.5]
+
+
+def _tou_tariff() -> dict:
+    # Winter (Jan-Mar, Oct-Dec): periods 0/1; summer: periods 2/3; peak 16-19.
+    weekday = []
+    for month in range(1, 13):
+        off, on = (0, 1) if month in {1, 2, 3, 10, 11, 12} else (2, 3)
+        weekday.append([on if 16 <= h < 20 else off for h in range(24)])
+    weekend = [[row[0]] * 24 for row in weekday]
+    rates = [0.10, 0.25, 0.12, 0.30]
+    return {
+        "items": [
+            {
+                "energyratestructure": [[{"rate": r, "adj": 0.01}] for r in rates],
+                "energyweekdayschedule": weekday,
+                "energyweekendschedule": weekend,
+            }
+        ]
+    }
+
+
+def _specs() -> list[SeasonTouSpec]:
+    return [
+        SeasonTouSpec(
+            season=Season(name="winter", months=[1, 2, 3, 10, 11, 12]),
+            base_rate=0.11,
+            peak_hours=[16, 17, 18, 19],
+            peak_offpeak_ratio=2.4,
+        ),
+        SeasonTouSpec(
+            season=Season(name="summer", months=[4, 5, 6, 7, 8, 9]),
+            base_rate=0.13,
+            peak_hours=[16, 17, 18, 19],
+            peak_offpeak_ratio=2.4,
+        ),
+    ]
+
+
+def _loads(bldg_ids: list[int], seed: int = 0) -> pd.DataFrame:
+    times = pd.date_range("2018-01-01", periods=8760, freq="h")
+    rng = np.random.default_rng(seed)
+    net = rng.gamma(2.0, 0.6, size=(len(bldg_ids), len(times)))
+    # A net exporter with a zero-sum period exercises the share guard.
+    net[1] -= net[1].mean()
+    index = pd.MultiIndex.from_product([bldg_ids, times], names=["bldg_id", "time"])
+    return pd.DataFrame({"electricity_net": net.ravel()}, index=index)
+
+
+def _mc() -> pd.DataFrame:
+    times = pd.date_range("2025-01-01", periods=8760, freq="h")
+    mc = np.where(np.asarray(cast(Any, times).hour) >= 16, 0.05, 0.0)
+    return pd.DataFrame({"timestamp": times, "mc_kwh": mc})
+
+
+def test_sweep_season_matches_per_elasticity_diagnose():
+    bldg_ids = [11, 7, 23, 5]
+    loads_df = _loads(bldg_ids)
+    tariff = _tou_tariff()
+    period_rate = extract_tou_period_rates(tariff).groupby("energy_period")["rate"]
+    period_rate = period_rate.first()
+    time_idx = pd.DatetimeIndex(loads_df.index.get_level_values("time").unique())
+    period_map = assign_hourly_periods(time_idx, tariff)
+    net_2d = loads_df["electricity_net"].to_numpy().reshape(len(bldg_ids), -1)
+    common: dict[str, Any] = {
+        "utility": "test",
+        "period_rate": period_rate,
+        "period_map": period_map,
+        "hp_weights": {11: 120.0, 7: 80.0, 23: 95.0},
+        "total_weighted_customers": 10_000.0,
+        "hp_weighted_customers": 300.0,
+        "mc_df": _mc(),
+    }
+
+    for spec in _specs():
+        swept = sweep_season(
+            season_spec=spec,
+            net_2d=net_2d,
+            time_idx=time_idx,
+            bldg_ids=np.asarray(bldg_ids),
+            elasticities=ELASTICITIES,
+            **common,
+        )
+        assert [sr.elasticity for sr in swept] == ELASTICITIES
+        for eps, got in zip(ELASTICITIES, swept):
+            expected = diagnose_season(
+                season_spec=spec, loads_df=loads_df, elasticity=eps, **common
+            )
+            for name, value in dataclasses.asdict(expected).items():
+                assert getattr(got, name) == pytest.approx(value, rel=1e-9), name
+
+
+def test_diagnose_utility_falls_back_for_ragged_loads():
+    bldg_ids = [3, 4]
+    loads_df = _loads(bldg_ids, seed=2)
+    ctx = UtilityContext(
+        utility="test",
+        season_specs=_specs(),
+        tou_tariff=_tou_tariff(),
+        hp_bldg_ids=bldg_ids,
+        hp_weights={3: 10.0, 4: 20.0},
+        total_weighted_customers=1_000.0,
+        hp_weighted_customers=30.0,
+    )
+    swept = diagnose_utility(ctx, loads_df, ELASTICITIES, _mc())
+    from_arrays = diagnose_utility(
+        ctx,
+        BuildingLoads(
+            bldg_ids=np.asarray(bldg_ids),
+            times=pd.DatetimeIndex(loads_df.index.get_level_values("time")[:8760]),
+            values={
+                "electricity_net": loads_df["electricity_net"].to_numpy().reshape(2, -1)
+            },
+        ),
+        ELASTICITIES,
+        _mc(),
+    )
+    assert from_arrays.season_results == swept.season_results
+    # Interleaved rows are not building-major, so every epsilon runs on its own.
+    looped = diagnose_utility(
+        ctx, loads_df.sort_index(level="time"), ELASTICITIES, _mc()
+    )
+
+    assert [(sr.elasticity, sr.season) for sr in swept.season_results] == [
+        (sr.elasticity, sr.season) for sr in looped.season_results
+    ]
+    for a, b in zip(swept.season_results, looped.season_results):
+        assert a.peak_reduction_pct == pytest.approx(b.peak_reduction_pct)
+        assert a.delivery_mc_savings_total == pytest.approx(b.delivery_mc_savings_total)
+    assert swept.seasonal_recommendations == looped.seasonal_recommendations
@@ -5,7 +5,11 @@ from __future__ import annotations
 import polars as pl
 import pytest
 
-from utils.post.compare_cairo_runs import _numeric_cols, compare_artifact
+from utils.post.compare_cairo_runs import (
+    _numeric_cols,
+    _read_csv_from_s3,
+    compare_artifact,
+)
 
 
 @pytest.fixture()
@@ -27,6 +31,22 @@ def _df_to_csv_bytes(df: pl.DataFrame) -> bytes:
     return df.write_csv().encode()
 
 
+def test_read_csv_falls_back_when_parquet_copy_missing(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    csv = pl.DataFrame({"bldg_id": [1], "bill": [1.0]}).write_csv().encode()
+
+    def _fake_get(uri: str) -> bytes:
+        if uri.endswith(".parquet"):
+            raise FileNotFoundError(uri)
+        return csv
+
+    monkeypatch.setattr("utils.post.compare_cairo_runs._s3_get_bytes", _fake_get)
+    df = _read_csv_from_s3("s3://base", "bills/elec_bills_year_target.csv")
+    assert df is not None
+    assert df["bldg_id"].to_list() == [1]
+
+
 class TestNumericCols:
     def test_identifies_numeric_types(self) -> None:
         df = pl.DataFrame(
@@ -2,11 +2,21 @@
 
 from __future__ import annotations
 
+from typing import Any, cast
+
 import numpy as np
 import pandas as pd
 import pytest
 
-from utils.pre.compute_tou import compute_mc_seasonal_ratio
+from utils.pre.compute_tou import (
+    compute_mc_seasonal_ratio,
+    compute_tou_cost_causation_ratio,
+    compute_tou_fit_metric,
+    find_tou_peak_window,
+    hour_of_day_profile,
+    tou_window_grid,
+    window_peak_hours,
+)
 
 
 def test_compute_mc_seasonal_ratio_uses_load_weighted_seasonal_averages() -> None:
@@ -36,3 +46,121 @@ def test_compute_mc_seasonal_ratio_uses_load_weighted_seasonal_averages() -> Non
     # Winter: (0.30 * 3 + 0.10 * 1) / 4 = 0.25.
     # Summer: (0.05 * 3 + 0.15 * 1) / 4 = 0.075.
     assert ratio == pytest.approx(0.25 / 0.075)
+
+
+def _random_mc_and_load(seed: int) -> tuple[pd.Series, pd.Series]:
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2025-01-01", periods=24 * 60, freq="h", tz="UTC")
+    hours = np.array([pd.Timestamp(t).hour for t in idx])
+    mc = pd.Series(rng.uniform(0.05, 0.10, 24)[hours] + rng.normal(0, 0.01, idx.size))
+    load = pd.Series(rng.uniform(1.0, 5.0, idx.size))
+    return mc.set_axis(idx), load.set_axis(idx)
+
+
+# Reference copies of the per-start pandas loop that tou_window_grid replaced.
+
+
+def _reference_fit_metric(
+    combined_mc: pd.Series, hourly_load: pd.Series, peak_hours: list[int]
+) -> float:
+    hour_of_day = cast(Any, pd.DatetimeIndex(combined_mc.index)).hour
+    is_peak = np.isin(hour_of_day, peak_hours)
+
+    peak_load = hourly_load[is_peak].sum()
+    offpeak_load = hourly_load[~is_peak].sum()
+
+    peak_avg = (
+        (combined_mc[is_peak] * hourly_load[is_peak]).sum() / peak_load
+        if peak_load > 0
+        else 0.0
+    )
+    offpeak_avg = (
+        (combined_mc[~is_peak] * hourly_load[~is_peak]).sum() / offpeak_load
+        if offpeak_load > 0
+        else 0.0
+    )
+
+    period_rate = np.where(is_peak, peak_avg, offpeak_avg)
+    residuals = (combined_mc.values - period_rate) ** 2 * hourly_load.values
+    return float(residuals.sum())
+
+
+def _reference_peak_window(
+    metric_by_start: list[float], window_hours: int
+) -> list[int]:
+    """The old find_tou_peak_window loop, over precomputed per-start metrics."""
+    best_metric = np.inf
+    best_peak_hours: list[int] = []
+    for start in range(24):
+        peak_hours = sorted((start + i) % 24 for i in range(window_hours))
+        metric = metric_by_start[start]
+        if metric < best_metric:
+            best_metric = metric
+            best_peak_hours = peak_hours
+    return best_peak_hours
+
+
+def _reference_cost_causation_ratio(
+    combined_mc: pd.Series, hourly_load: pd.Series, peak_hours: list[int]
+) -> float:
+    hour_of_day = cast(Any, pd.DatetimeIndex(combined_mc.index)).hour
+    is_peak = np.isin(hour_of_day, peak_hours)
+
+    peak_dw = (combined_mc[is_peak] * hourly_load[is_peak]).sum()
+    peak_load = hourly_load[is_peak].sum()
+    offpeak_dw = (combined_mc[~is_peak] * hourly_load[~is_peak]).sum()
+    offpeak_load = hourly_load[~is_peak].sum()
+    return float((peak_dw / peak_load) / (offpeak_dw / offpeak_load))
+
+
+def test_tou_window_grid_matches_reference_loop() -> None:
+    mc, load = _random_mc_and_load(0)
+    hours = np.array([pd.Timestamp(t).hour for t in mc.index])
+
+    fit = tou_window_grid(hour_of_day_profile(hours, mc.values, load.values))
+
+    assert fit.metric.shape == (23, 24)
+    for width in range(1, 24):
+        reference = []
+        for start in range(24):
+            peak_hours = window_peak_hours(start, width)
+            assert peak_hours == sorted((start + i) % 24 for i in range(width))
+            reference.append(_reference_fit_metric(mc, load, peak_hours))
+            assert fit.metric[width - 1, start] == pytest.approx(
+                reference[-1], rel=1e-12
+            )
+            assert fit.cost_causation_ratio((width - 1, start)) == pytest.approx(
+                _reference_cost_causation_ratio(mc, load, peak_hours), rel=1e-12
+            )
+        expected = _reference_peak_window(reference, width)
+        assert find_tou_peak_window(mc, load, window_hours=width) == expected
+        assert compute_tou_fit_metric(mc, load, expected) == pytest.approx(
+            min(reference), rel=1e-12
+        )
+        assert compute_tou_cost_causation_ratio(mc, load, expected) == pytest.approx(
+            _reference_cost_causation_ratio(mc, load, expected), rel=1e-12
+        )
+
+
+def test_hour_of_day_profile_stacks_leading_axes() -> None:
+    mc, load = _random_mc_and_load(1)
+    hours = np.array([pd.Timestamp(t).hour for t in mc.index])
+    cohort_loads = np.stack([load.values, load.values[::-1], np.ones(load.size)])
+
+    stacked = tou_window_grid(hour_of_day_profile(hours, mc.values, cohort_loads))
+
+    for i, cohort_load in enumerate(cohort_loads):
+        single = tou_window_grid(hour_of_day_profile(hours, mc.values, cohort_load))
+        np.testing.assert_allclose(stacked.metric[i], single.metric, rtol=1e-12)
+        np.testing.assert_allclose(stacked.peak_avg[i], single.peak_avg, rtol=1e-12)
+
+
+def test_tou_window_grid_flat_mc_has_zero_metric() -> None:
+    hours = np.tile(np.arange(24), 30)
+    load = np.random.default_rng(2).uniform(1e5, 3e5, hours.size)
+
+    fit = tou_window_grid(hour_of_day_profile(hours, np.full(hours.size, 0.1), load))
+
+    np.testing.assert_allclose(fit.metric, 0.0, atol=1e-12)
+    with pytest.raises(ValueError, match="between 1 and 23"):
+        tou_window_grid(hour_of_day_profile(hours, np.zeros(hours.size), load), [24])
@@ -3,10 +3,16 @@ from __future__ import annotations
 import logging
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from utils.demand_flex import find_tou_derivation_path, recompute_tou_precalc_mapping
+from utils.demand_flex import (
+    _cohort_system_loads,
+    cohort_hourly_loads,
+    find_tou_derivation_path,
+    recompute_tou_precalc_mapping,
+)
 from utils.pre.compute_tou import Season, SeasonTouSpec
 
 
@@ -57,6 +63,65 @@ def _make_specs() -> list[SeasonTouSpec]:
     ]
 
 
+def _make_load_elec(bldg_ids: list[int], n_hours: int = 48) -> pd.DataFrame:
+    times = pd.date_range("2025-01-01", periods=n_hours, freq="h", name="time")
+    index = pd.MultiIndex.from_product(
+        [pd.Index(bldg_ids, name="bldg_id"), times], names=["bldg_id", "time"]
+    )
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"electricity_net": rng.uniform(0, 5, len(index))}, index=index)
+
+
+def _groupby_system_load(
+    load_elec: pd.DataFrame, customer_metadata: pd.DataFrame, cohort: set[int]
+) -> pd.Series:
+    """The merge + groupby aggregation the cohort matmul replaces."""
+    sub = load_elec.loc[load_elec.index.get_level_values("bldg_id").isin(cohort)]
+    weighted = sub.reset_index().merge(customer_metadata, on="bldg_id")
+    weighted["electricity_net"] *= weighted["weight"]
+    return weighted.groupby("time")["electricity_net"].sum()
+
+
+def test_cohort_hourly_loads_weights_each_cohort() -> None:
+    loads = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+    weights = np.array([10.0, 1.0, 0.5])
+    cohorts = [np.array([True, False, True]), np.array([False, True, False])]
+
+    curves = cohort_hourly_loads(loads, weights, cohorts)
+
+    np.testing.assert_allclose(curves, [[12.5, 23.0], [3.0, 4.0]])
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_cohort_system_loads_match_groupby(shuffle: bool) -> None:
+    load_elec = _make_load_elec([11, 12, 13, 14])
+    if shuffle:
+        load_elec = load_elec.sample(frac=1.0, random_state=0)
+    customer_metadata = pd.DataFrame(
+        {"bldg_id": [11, 12, 13, 14], "weight": [1.5, 2.0, 0.5, 3.0]}
+    )
+    cohorts = [{11, 13}, {12}, {11, 12, 13}]
+
+    result = _cohort_system_loads(load_elec, customer_metadata, cohorts)
+
+    assert result.n_bldg == 4
+    for k, cohort in enumerate(cohorts):
+        expected = _groupby_system_load(load_elec, customer_metadata, cohort)
+        assert result.times.equals(pd.DatetimeIndex(expected.index))
+        np.testing.assert_allclose(result.curves[k], expected.to_numpy())
+
+
+def test_cohort_system_loads_unweighted_buildings_count_zero() -> None:
+    load_elec = _make_load_elec([1, 2])
+    customer_metadata = pd.DataFrame({"bldg_id": [1], "weight": [2.0]})
+
+    result = _cohort_system_loads(load_elec, customer_metadata, [{1, 2}, set()])
+
+    expected = 2.0 * load_elec.loc[1, "electricity_net"].to_numpy()
+    np.testing.assert_allclose(result.curves[0], expected)
+    np.testing.assert_array_equal(result.curves[1], 0.0)
+
+
 def test_find_tou_derivation_path_key_only(tmp_path: Path) -> None:
     ddir = tmp_path / "tou_derivation"
     ddir.mkdir()
@@ -0,0 +1,209 @@
+"""Tests for utils/input_cache.py content-addressed run input cache."""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.input_cache import (
+    InputCache,
+    _s3_client,
+    array_digest,
+    files_fingerprint,
+    path_fingerprint,
+)
+
+
+def _mc_frame() -> pd.DataFrame:
+    index = pd.date_range("2025-01-01", periods=8760, freq="h", tz="EST")
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Marginal Energy Costs ($/kWh)": rng.random(8760),
+            "Marginal Capacity Costs ($/kWh)": rng.random(8760),
+        },
+        index=index,
+    )
+
+
+def _counted(value):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return value
+
+    return compute, calls
+
+
+def test_roundtrip_hits_after_first_miss(tmp_path: Path):
+    cache = InputCache(tmp_path)
+    frame = _mc_frame()
+    by_type = pd.Series({"Total Marginal Costs ($)": 12.5}, name="costs")
+    value = (1234.5, frame, by_type)
+    compute, calls = _counted(value)
+
+    first = cache.get_or_compute("rr_target", lambda: {"a": 1}, compute)
+    assert first is value
+    assert (cache.hits, cache.misses, cache.last) == (0, 1, "miss")
+
+    again = InputCache(tmp_path)
+    rr, msp, costs = again.get_or_compute("rr_target", lambda: {"a": 1}, compute)
+    assert calls == [1]
+    assert (again.hits, again.misses, again.last) == (1, 0, "hit")
+    assert rr == 1234.5
+    pd.testing.assert_frame_equal(msp, frame, check_freq=False)
+    pd.testing.assert_series_equal(costs, by_type)
+
+
+def test_building_ids_and_float_dicts(tmp_path: Path):
+    cache = InputCache(tmp_path)
+    for kind, value in [
+        ("prototype_ids", [30, 10, 20]),
+        ("subclass_rr", {"hp": 1.5, "non-hp": 2}),
+    ]:
+        cache.get_or_compute(kind, dict, lambda v=value: v)
+        assert InputCache(tmp_path).get_or_compute(kind, dict, list) == value
+
+
+def test_different_parts_miss(tmp_path: Path):
+    cache = InputCache(tmp_path)
+    cache.get_or_compute("supply_mc", lambda: {"year": 2025}, _mc_frame)
+    compute, calls = _counted(_mc_frame())
+    cache.get_or_compute("supply_mc", lambda: {"year": 2026}, compute)
+    assert calls == [1]
+    assert cache.summary() == "0 hits / 2 misses"
+
+
+def test_uncacheable_values_are_recomputed(tmp_path: Path):
+    cache = InputCache(tmp_path)
+    int_columns = pd.DataFrame({1: [1.0], 2: [2.0]})
+    compute, calls = _counted(int_columns)
+    cache.get_or_compute("msc", dict, compute)
+    cache.get_or_compute("msc", dict, compute)
+    assert calls == [1, 1]
+    assert not any((tmp_path / "inputs" / "msc").iterdir())
+
+
+def test_unserialisable_frames_are_recomputed(tmp_path: Path):
+    cache = InputCache(tmp_path)
+    mixed = pd.DataFrame({"value": [1, "x"]})  # pa.ArrowInvalid / ArrowTypeError
+    compute, calls = _counted(mixed)
+    assert cache.get_or_compute("mixed", dict, compute) is mixed
+    assert cache.get_or_compute("mixed", dict, compute) is mixed
+    assert calls == [1, 1]
+    assert not any((tmp_path / "inputs" / "mixed").iterdir())
+
+
+def test_numpy_building_ids_are_cached(tmp_path: Path):
+    ids = [np.int64(30), 10, np.int32(20)]
+    InputCache(tmp_path).get_or_compute("prototype_ids", dict, lambda: ids)
+    again = InputCache(tmp_path)
+    assert again.get_or_compute("prototype_ids", dict, list) == [30, 10, 20]
+    assert again.last == "hit"
+
+
+def test_disabled_cache_never_fingerprints(tmp_path: Path):
+    cache = InputCache(None)
+
+    def parts():
+        raise AssertionError("parts should not be evaluated")
+
+    assert cache.get_or_compute("x", parts, lambda: 3.0) == 3.0
+    assert cache.last is None and cache.summary() == "0 hits / 0 misses"
+
+
+def test_fingerprints_track_file_changes(tmp_path: Path):
+    data = tmp_path / "mc" / "year=2025" / "data.parquet"
+    data.parent.mkdir(parents=True)
+    data.write_bytes(b"v1")
+    before = (path_fingerprint(tmp_path / "mc"), files_fingerprint([data]))
+
+    data.write_bytes(b"v2-longer")
+    st = data.stat()
+    os.utime(data, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    after = (path_fingerprint(tmp_path / "mc"), files_fingerprint([data]))
+    assert before[0] != after[0]
+    assert before[1] != after[1]
+
+    with pytest.raises(FileNotFoundError):
+        path_fingerprint(tmp_path / "missing.parquet")
+
+
+def test_array_digest_includes_timezone():
+    index = pd.date_range("2025-01-01", periods=24, freq="h")
+    assert array_digest(index) != array_digest(index.tz_localize("EST"))
+    assert array_digest([1, 2, 3]) == array_digest(np.array([1, 2, 3]))
+
+
+def test_s3_fingerprint_ignores_sibling_keys(monkeypatch):
+    listed = [
+        {"Key": "mc/2025.parquet", "ETag": "a"},
+        {"Key": "mc/2025.parquet.bak", "ETag": "b"},
+        {"Key": "mc/2025.parquet/part-0.parquet", "ETag": "c"},
+        {"Key": "mc/2025.parquet_old/part-0.parquet", "ETag": "d"},
+    ]
+    prefixes: list[str] = []
+
+    def paginate(Bucket, Prefix):
+        prefixes.append(Prefix)
+        return [{"Contents": [o for o in listed if o["Key"].startswith(Prefix)]}]
+
+    client = SimpleNamespace(
+        get_paginator=lambda _name: SimpleNamespace(paginate=paginate)
+    )
+    clients: list[object] = []
+
+    def make_client(*_a, **_k):
+        clients.append(client)
+        return client
+
+    monkeypatch.setitem(sys.modules, "boto3", SimpleNamespace(client=make_client))
+    monkeypatch.setenv("AWS_REGION", "us-west-2")
+    _s3_client.cache_clear()
+
+    assert path_fingerprint("s3://bucket/mc/2025.parquet") == [
+        "s3://bucket/mc/2025.parquet",
+        [("mc/2025.parquet", "a"), ("mc/2025.parquet/part-0.parquet", "c")],
+    ]
+    assert path_fingerprint("s3://bucket/mc/2025.parquet/")[1] == [
+        ("mc/2025.parquet", "a"),
+        ("mc/2025.parquet/part-0.parquet", "c"),
+    ]
+    assert prefixes == ["mc/2025.parquet", "mc/2025.parquet"]
+    # One client serves every fingerprint.
+    assert len(clients) == 1
+    _s3_client.cache_clear()
+
+
+def test_files_fingerprint_identifies_s3_loads_by_path(tmp_path: Path, monkeypatch):
+    """S3 load paths (strings or S3Path) are never statted; local ones are."""
+    from cloudpathlib import S3Path
+
+    local = tmp_path / "bldg_3.parquet"
+    local.write_bytes(b"v1")
+    s3_paths = [
+        S3Path("s3://bucket/loads/bldg_1.parquet"),
+        "s3://bucket/loads/bldg_2.parquet",
+    ]
+    stat = os.stat
+    statted: list[str] = []
+
+    def tracking_stat(path, *args, **kwargs):
+        statted.append(str(path))
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", tracking_stat)
+    before = files_fingerprint([*s3_paths, local])
+    assert statted == [str(local)]
+
+    assert files_fingerprint([str(p) for p in s3_paths] + [local]) == before
+    assert files_fingerprint([s3_paths[0], local]) != before
+    local.write_bytes(b"v2-longer")
+    assert files_fingerprint([*s3_paths, local]) != before
@@ -0,0 +1,204 @@
+"""Tests for utils/loads.py packed load matrices."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+
+from utils.loads import (
+    LOAD_CACHE_ARRAYS,
+    LOAD_MATRIX_COLUMNS,
+    N_HOURS,
+    load_cache_path,
+    load_matrix_path,
+    load_matrix_stale_reason,
+    open_load_cache,
+    open_load_matrix,
+    read_building_loads,
+    read_load_matrix_bldg_ids,
+    write_load_cache,
+    write_load_matrix,
+)
+
+TIMESTAMPS = pd.date_range("2018-01-01 01:00", periods=N_HOURS, freq="h", unit="ns")
+
+
+def _blocks(n_bldg: int, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {name: rng.random((n_bldg, N_HOURS)) for name in LOAD_MATRIX_COLUMNS}
+
+
+def test_load_matrix_path_layout():
+    hourly = Path("/data/res_2024/load_curve_hourly/state=NY/upgrade=02")
+    assert load_matrix_path(hourly, "ConEd") == Path(
+        "/data/res_2024/load_curve_matrix/state=NY/upgrade=02/utility=coned/load_matrix.arrow"
+    )
+
+
+def test_load_matrix_roundtrip_sorts_and_slices(tmp_path: Path):
+    ids = np.array([30, 10, 20])
+    blocks = _blocks(3)
+    path = write_load_matrix(tmp_path / "m.arrow", ids, TIMESTAMPS, blocks)
+
+    np.testing.assert_array_equal(read_load_matrix_bldg_ids(path), [10, 20, 30])
+    matrix = open_load_matrix(path)
+    pd.testing.assert_index_equal(matrix.timestamps, TIMESTAMPS, check_names=False)
+
+    rows = matrix.rows_for([20, 30])
+    for name in LOAD_MATRIX_COLUMNS:
+        np.testing.assert_array_equal(matrix.blocks[name][rows], blocks[name][[2, 0]])
+
+
+def test_load_matrix_float32_storage(tmp_path: Path):
+    blocks = _blocks(2)
+    path = write_load_matrix(
+        tmp_path / "m.arrow", np.array([1, 2]), TIMESTAMPS, blocks, dtype="float32"
+    )
+    matrix = open_load_matrix(path)
+    block = matrix.blocks["electricity_total"]
+    assert block.dtype == np.float32
+    np.testing.assert_allclose(block, blocks["electricity_total"], rtol=1e-6)
+
+
+def test_load_matrix_rows_for_missing_id(tmp_path: Path):
+    path = write_load_matrix(
+        tmp_path / "m.arrow", np.array([1, 2]), TIMESTAMPS, _blocks(2)
+    )
+    with pytest.raises(KeyError, match="not in load matrix"):
+        open_load_matrix(path).rows_for([1, 99])
+
+
+def test_write_load_matrix_rejects_bad_shape(tmp_path: Path):
+    blocks = _blocks(2)
+    blocks["electricity_pv"] = blocks["electricity_pv"][:, :100]
+    with pytest.raises(ValueError, match="electricity_pv"):
+        write_load_matrix(tmp_path / "m.arrow", np.array([1, 2]), TIMESTAMPS, blocks)
+
+
+def test_load_matrix_stale_reason_tracks_source_files(tmp_path: Path):
+    hourly = tmp_path / "hourly"
+    hourly.mkdir()
+    sources = [hourly / f"{bid}-0.parquet" for bid in (1, 2)]
+    for src in sources:
+        src.write_bytes(b"v1")
+    path = write_load_matrix(
+        tmp_path / "m.arrow",
+        np.array([1, 2]),
+        TIMESTAMPS,
+        _blocks(2),
+        source_files=sources,
+    )
+    assert load_matrix_stale_reason(path, hourly) is None
+
+    sources[0].write_bytes(b"v2, rewritten")
+    assert "changed" in (load_matrix_stale_reason(path, hourly) or "")
+
+    sources[0].unlink()
+    assert "gone" in (load_matrix_stale_reason(path, hourly) or "")
+
+    unrecorded = write_load_matrix(
+        tmp_path / "old.arrow", np.array([1, 2]), TIMESTAMPS, _blocks(2)
+    )
+    assert "no source fingerprint" in (
+        load_matrix_stale_reason(unrecorded, hourly) or ""
+    )
+
+
+def test_load_cache_path_layout():
+    root = Path("/cache")
+    ny = Path("/data/res_2024/load_curve_hourly/state=NY/upgrade=02")
+    assert load_cache_path(
+        root, ny, utility="ConEd", year_run=2025, sample_size=None
+    ) == Path(
+        "/cache/release=res_2024/state=NY/utility=coned/upgrade=02/year=2025/sample=all"
+    )
+    assert (
+        load_cache_path(root, ny, utility="rie", year_run=2025, sample_size=200).name
+        == "sample=200"
+    )
+
+
+def test_load_cache_roundtrip_is_copy_on_write(tmp_path: Path):
+    times = TIMESTAMPS.tz_localize("EST")
+    rng = np.random.default_rng(1)
+    arrays = {name: rng.random(2 * N_HOURS) for name in LOAD_CACHE_ARRAYS}
+    cache_dir = tmp_path / "entry"
+
+    assert open_load_cache(cache_dir) is None
+    write_load_cache(cache_dir, [7, 3], times, arrays)
+    cached = open_load_cache(cache_dir)
+    assert cached is not None
+    bldg_ids, cached_times, cached_arrays = cached
+
+    np.testing.assert_array_equal(bldg_ids, [7, 3])
+    pd.testing.assert_index_equal(cached_times, times, check_names=False)
+    for name in LOAD_CACHE_ARRAYS:
+        np.testing.assert_array_equal(cached_arrays[name], arrays[name])
+
+    # In-place writes stay private to this process.
+    cached_arrays["load_data"][0] = -1.0
+    reopened = open_load_cache(cache_dir)
+    assert reopened is not None
+    assert reopened[2]["load_data"][0] == arrays["load_data"][0]
+
+
+def test_write_load_cache_keeps_existing_entry(tmp_path: Path):
+    arrays = {name: np.zeros(N_HOURS) for name in LOAD_CACHE_ARRAYS}
+    cache_dir = tmp_path / "entry"
+    write_load_cache(cache_dir, [1], TIMESTAMPS, arrays)
+    write_load_cache(
+        cache_dir, [1], TIMESTAMPS, {k: v + 1.0 for k, v in arrays.items()}
+    )
+    cached = open_load_cache(cache_dir)
+    assert cached is not None
+    assert cached[2]["load_data"].max() == 0.0
+    assert [p.name for p in tmp_path.iterdir()] == ["entry"]
+
+
+NET_COL = "out.electricity.net.energy_consumption"
+
+
+def _write_hourly(loads_dir: Path, bldg_id: int, net: np.ndarray) -> None:
+    loads_dir.mkdir(parents=True, exist_ok=True)
+    pl.DataFrame(
+        {"timestamp": TIMESTAMPS.to_numpy(), NET_COL: net, "other": net * 2}
+    ).write_parquet(loads_dir / f"{bldg_id}-0.parquet")
+
+
+def test_read_building_loads_matches_per_file_concat(tmp_path: Path):
+    rng = np.random.default_rng(3)
+    nets = {bid: rng.random(N_HOURS) for bid in (42, 7, 19)}
+    for bid, net in nets.items():
+        _write_hourly(tmp_path, bid, net)
+
+    loads = read_building_loads([19, 42, 7, 99], tmp_path, {"electricity_net": NET_COL})
+
+    np.testing.assert_array_equal(loads.bldg_ids, [7, 19, 42])
+    pd.testing.assert_index_equal(loads.times, TIMESTAMPS, check_names=False)
+    np.testing.assert_array_equal(
+        loads.values["electricity_net"], np.stack([nets[7], nets[19], nets[42]])
+    )
+
+    expected = (
+        pd.concat(
+            [
+                pd.DataFrame(
+                    {"bldg_id": bid, "time": TIMESTAMPS, "electricity_net": net}
+                )
+                for bid, net in nets.items()
+            ]
+        )
+        .set_index(["bldg_id", "time"])
+        .sort_index()
+    )
+    pd.testing.assert_frame_equal(loads.frame, expected, check_index_type=False)
+    assert loads.frame is loads.frame
+
+
+def test_read_building_loads_no_files(tmp_path: Path):
+    with pytest.raises(FileNotFoundError, match="No load files"):
+        read_building_loads([1, 2], tmp_path, {"electricity_net": NET_COL})
@@ -0,0 +1,153 @@
+"""Tests for utils/data_prep/marginal_costs/mc_bundle.py (prebuilt aligned MCs)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from utils.cairo import (
+    _load_supply_marginal_costs,
+    add_bulk_tx_and_dist_and_sub_tx_marginal_cost,
+)
+from utils.data_prep.marginal_costs.mc_bundle import (
+    McSources,
+    build_mc_bundle,
+    bundle_is_current,
+    mc_bundle_path,
+    open_mc_bundle,
+    read_mc_bundle,
+    read_mc_provenance,
+    with_supply,
+    write_mc_bundle,
+)
+
+YEAR = 2025
+
+
+def _write_mc(path: Path, col: str, year: int, seed: int) -> str:
+    rng = np.random.default_rng(seed)
+    pd.DataFrame(
+        {
+            "timestamp": pd.date_range(f"{year}-01-01", periods=8760, freq="h"),
+            col: rng.uniform(0, 100, 8760),
+        }
+    ).to_parquet(path)
+    return str(path)
+
+
+def _sources(tmp_path: Path) -> McSources:
+    return McSources.from_paths(
+        supply_energy=_write_mc(
+            tmp_path / "energy.parquet", "energy_cost_enduse", YEAR, 1
+        ),
+        supply_capacity=_write_mc(
+            tmp_path / "capacity.parquet", "capacity_cost_enduse", YEAR, 2
+        ),
+        # Other MC year: aligned to the run year by position, as in a run.
+        dist_and_sub_tx=_write_mc(
+            tmp_path / "dist.parquet", "mc_total_per_kwh", YEAR - 1, 3
+        ),
+        bulk_tx=_write_mc(tmp_path / "bulk.parquet", "bulk_tx_cost_enduse", YEAR, 4),
+        supply_ancillary="",
+    )
+
+
+def _bundle(tmp_path: Path) -> tuple[Path, McSources]:
+    sources = _sources(tmp_path)
+    path = mc_bundle_path(
+        tmp_path / "bundles",
+        state="md",
+        utility="BGE",
+        mc_year=YEAR,
+        year_run=YEAR,
+        supply=True,
+    )
+    write_mc_bundle(
+        path,
+        build_mc_bundle(sources, YEAR),
+        sources=sources,
+        year_run=YEAR,
+        key={"utility": "bge"},
+    )
+    return path, sources
+
+
+def test_bundle_path_layout():
+    path = mc_bundle_path(
+        "/cache", state="ny", utility="ConEd", mc_year=2024, year_run=2025, supply=True
+    )
+
+    assert path == Path(
+        "/cache/state=NY/utility=coned/mc_year=2024/year=2025/supply=true/mc_bundle.arrow"
+    )
+    assert with_supply(path, False) == path.parents[1] / "supply=false" / path.name
+
+
+def test_bundle_matches_run_time_loaders(tmp_path: Path):
+    path, sources = _bundle(tmp_path)
+
+    bundle = read_mc_bundle(path)
+    supply = _load_supply_marginal_costs(
+        sources.supply_energy, sources.supply_capacity, YEAR
+    )
+    delivery = add_bulk_tx_and_dist_and_sub_tx_marginal_cost(
+        path_dist_and_sub_tx_mc=sources.dist_and_sub_tx,
+        path_bulk_tx_mc=sources.bulk_tx,
+        target_index=pd.DatetimeIndex(supply.index),
+    )
+
+    pdt.assert_frame_equal(bundle.supply_marginal_costs(), supply)
+    pdt.assert_series_equal(bundle.delivery_marginal_costs(), delivery)
+
+
+def test_provenance_records_sources(tmp_path: Path):
+    path, sources = _bundle(tmp_path)
+
+    provenance = read_mc_provenance(path)
+
+    assert provenance["year_run"] == YEAR
+    assert provenance["utility"] == "bge"
+    assert provenance["sources"]["supply_ancillary"] is None
+    assert provenance["sources"]["bulk_tx"] == sources.bulk_tx
+    assert set(provenance["fingerprints"]) == set(provenance["sources"])
+
+
+def test_open_falls_back_on_mismatch(tmp_path: Path):
+    path, sources = _bundle(tmp_path)
+
+    assert open_mc_bundle(
+        path, YEAR, supply_energy=sources.supply_energy, supply_ancillary=None
+    )
+    assert open_mc_bundle(path, YEAR + 1, supply_energy=sources.supply_energy) is None
+    assert open_mc_bundle(path, YEAR, supply_energy="s3://other/data.parquet") is None
+    assert open_mc_bundle(with_supply(path, False), YEAR) is None
+    assert open_mc_bundle(None, YEAR) is None
+
+
+def test_bundle_is_current_tracks_source_contents(tmp_path: Path):
+    path, sources = _bundle(tmp_path)
+
+    assert bundle_is_current(path, sources, YEAR)
+
+    assert sources.bulk_tx is not None
+    _write_mc(Path(sources.bulk_tx), "bulk_tx_cost_enduse", YEAR, 5)
+
+    assert not bundle_is_current(path, sources, YEAR)
+
+
+def test_open_falls_back_when_sources_changed(tmp_path: Path, caplog):
+    path, sources = _bundle(tmp_path)
+    expected = {"supply_energy": sources.supply_energy, "bulk_tx": sources.bulk_tx}
+
+    assert open_mc_bundle(path, YEAR, **expected)
+
+    assert sources.bulk_tx is not None
+    _write_mc(Path(sources.bulk_tx), "bulk_tx_cost_enduse", YEAR, 5)
+
+    assert open_mc_bundle(path, YEAR, **expected) is None
+    assert "older than its sources ['bulk_tx']" in caplog.text
+    # Sources the run does not pass are not checked.
+    assert open_mc_bundle(path, YEAR, supply_energy=sources.supply_energy)
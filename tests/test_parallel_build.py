@@ -0,0 +1,78 @@
+"""Tests for utils/post/parallel_build.py (per-utility master-build concurrency)."""
+
+from __future__ import annotations
+
+import threading
+
+import polars as pl
+import pytest
+
+from utils.post.parallel_build import (
+    hive_partitions,
+    map_utilities,
+    read_pair,
+    utility_tag,
+)
+
+UTILITIES = ["coned", "nimo", "nyseg", "rge"]
+
+
+def test_map_utilities_sequential_keeps_order_and_tags():
+    assert map_utilities(lambda u: utility_tag(), UTILITIES, max_workers=1) == {
+        u: f"[{u}] " for u in UTILITIES
+    }
+    assert utility_tag() == ""
+
+
+def test_map_utilities_runs_concurrently():
+    # Deadlocks (and times out) unless all four utilities run at once.
+    barrier = threading.Barrier(len(UTILITIES), timeout=10)
+
+    def build(utility: str) -> str:
+        barrier.wait()
+        return utility_tag()
+
+    result = map_utilities(build, UTILITIES, max_workers=len(UTILITIES))
+
+    assert list(result) == UTILITIES
+    assert result == {u: f"[{u}] " for u in UTILITIES}
+
+
+def test_map_utilities_reraises_failure():
+    def build(utility: str) -> str:
+        if utility == "nimo":
+            raise AssertionError(f"[{utility}] building mismatch")
+        return utility
+
+    with pytest.raises(AssertionError, match="nimo"):
+        map_utilities(build, UTILITIES, max_workers=2)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_read_pair_returns_in_argument_order(parallel: bool):
+    def read(path: str) -> str:
+        return f"{utility_tag()}{path}"
+
+    result = map_utilities(
+        lambda u: read_pair(read, "delivery", "supply", parallel=parallel),
+        ["coned"],
+        max_workers=1,
+    )
+
+    assert result == {"coned": ("[coned] delivery", "[coned] supply")}
+
+
+def test_hive_partitions_drop_partition_column():
+    df = pl.DataFrame(
+        {"bldg_id": [1, 2, 3], "sb.electric_utility": ["coned", "nimo", "coned"]}
+    )
+
+    parts = hive_partitions(df)
+
+    assert sorted(parts) == [
+        "sb.electric_utility=coned/data.parquet",
+        "sb.electric_utility=nimo/data.parquet",
+    ]
+    coned = parts["sb.electric_utility=coned/data.parquet"]
+    assert coned.columns == ["bldg_id"]
+    assert coned["bldg_id"].to_list() == [1, 3]
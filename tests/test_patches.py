@@ -3,6 +3,10 @@
 
 from __future__ import annotations
 
+import logging
+from typing import Any, cast
+
+import numpy as np
 import pandas as pd
 import pytest
 from pathlib import Path
@@ -79,6 +83,89 @@ def test_combined_reader_matches_separate_reads(sample_filepaths):
     )
 
 
+def test_combined_reader_matrix_matches_parquet(sample_filepaths, tmp_path):
+    """A packed load matrix yields the same frames as the per-building parquet read."""
+    import pyarrow.parquet as pq
+
+    from utils.loads import LOAD_MATRIX_COLUMNS, write_load_matrix
+    from utils.mid.patches import _return_loads_combined
+
+    bldg_ids = list(sample_filepaths.keys())
+    tables = [pq.read_table(sample_filepaths[b]) for b in bldg_ids]
+    timestamps = pd.DatetimeIndex(tables[0].column("timestamp").to_numpy())
+    blocks = {
+        name: np.stack([t.column(src).to_numpy() for t in tables])
+        for name, src in LOAD_MATRIX_COLUMNS.items()
+    }
+    matrix = write_load_matrix(
+        tmp_path / "load_matrix.arrow", np.asarray(bldg_ids), timestamps, blocks
+    )
+
+    ref_elec, ref_gas = _return_loads_combined(
+        target_year=2025, building_ids=bldg_ids, load_filepath_key=sample_filepaths
+    )
+    new_elec, new_gas = _return_loads_combined(
+        target_year=2025,
+        building_ids=bldg_ids,
+        load_filepath_key={b: matrix for b in bldg_ids},
+    )
+    pd.testing.assert_frame_equal(new_elec, ref_elec)
+    pd.testing.assert_frame_equal(new_gas, ref_gas)
+
+
+def test_combined_reader_cache_hit_matches_fresh_read(sample_filepaths, tmp_path):
+    """A memory-mapped load cache entry yields the same frames as a fresh read."""
+    from utils.mid.patches import _return_loads_combined
+
+    bldg_ids = list(sample_filepaths.keys())
+    cache_dir = tmp_path / "cache"
+    kwargs: dict[str, Any] = {
+        "target_year": 2025,
+        "building_ids": bldg_ids,
+        "load_filepath_key": sample_filepaths,
+    }
+
+    ref_elec, ref_gas = _return_loads_combined(**kwargs)
+    miss_elec, miss_gas = _return_loads_combined(**kwargs, cache_dir=cache_dir)
+    hit_elec, hit_gas = _return_loads_combined(**kwargs, cache_dir=cache_dir)
+
+    for elec, gas in ((miss_elec, miss_gas), (hit_elec, hit_gas)):
+        pd.testing.assert_frame_equal(elec, ref_elec)
+        pd.testing.assert_frame_equal(gas, ref_gas)
+
+
+def test_load_cache_rereads_rebuilt_load_matrix(tmp_path):
+    """A cache entry built from an older load matrix is not reused."""
+    import os
+
+    from utils.loads import LOAD_MATRIX_COLUMNS, write_load_matrix
+    from utils.mid.patches import _return_loads_combined
+
+    times = pd.date_range("2018-01-01 01:00", periods=8760, freq="h")
+    matrix = tmp_path / "load_matrix.arrow"
+    cache_dir = tmp_path / "cache"
+
+    hits: list[bool] = []
+
+    def read(scale: float) -> pd.DataFrame:
+        blocks = {name: np.full((2, 8760), scale) for name in LOAD_MATRIX_COLUMNS}
+        write_load_matrix(matrix, np.array([1, 2]), times, blocks)
+        os.utime(matrix, ns=(int(scale * 1e9), int(scale * 1e9)))
+        elec, _ = _return_loads_combined(
+            2025,
+            [1, 2],
+            {1: matrix, 2: matrix},
+            cache_dir=cache_dir,
+            on_load_cache=hits.append,
+        )
+        return elec
+
+    assert read(1.0)["load_data"].eq(1.0).all()
+    assert read(1.0)["load_data"].eq(1.0).all()  # served from the cache
+    assert read(2.0)["load_data"].eq(2.0).all()
+    assert hits == [False, True, False]  # a stale entry is not counted as a hit
+
+
 def test_vectorized_aggregation_matches_cairo(sample_filepaths):
     """_vectorized_process_building_demand_by_period returns same agg_load as CAIRO."""
     from pathlib import Path
@@ -393,8 +480,16 @@ def test_vectorized_gas_billing_matches_correct_bills(sample_filepaths):
     assert (annual_bills < 10000).all(), f"Bills too high: {annual_bills.to_dict()}"
 
 
-def test_vectorized_billing_with_solar_matches_cairo(sample_filepaths):
-    """Vectorized run_system_revenues with net_metering matches CAIRO's per-building loop."""
+@pytest.mark.parametrize("style", ["net_metering", "net_billing"])
+def test_vectorized_billing_with_solar_matches_cairo(
+    sample_filepaths, monkeypatch, style
+):
+    """Vectorized run_system_revenues with solar compensation matches CAIRO's per-building loop.
+
+    Forces the vectorized path for *style*, so net_billing is compared too
+    even though production runs still send it to CAIRO.
+    """
+    import utils.mid.patches as patches
     from cairo.rates_tool import loads as _cairo_loads_orig
     from cairo.rates_tool.tariffs import get_default_tariff_structures
     from cairo.rates_tool.system_revenues import (
@@ -435,8 +530,9 @@ def test_vectorized_billing_with_solar_matches_cairo(sample_filepaths):
         solar_pv_compensation=None,
     )
 
+    monkeypatch.setattr(patches, "_VECTORIZED_SOLAR_STYLES", frozenset({style}))
     sell_rate = _determine_sell_rate(
-        solar_pv_compensation="net_metering",
+        solar_pv_compensation=style,
         export_import_ratio=1.0,
         year_run=2025,
         tariff_dict=tariff_base,
@@ -446,7 +542,7 @@ def test_vectorized_billing_with_solar_matches_cairo(sample_filepaths):
         aggregated_load=agg_load,
         aggregated_solar=agg_solar,
         solar_compensation_df=sell_rate,
-        solar_compensation_style="net_metering",
+        solar_compensation_style=style,
         prototype_ids=bldg_ids,
         tariff_config=tariff_base,
         tariff_strategy=tariff_map,
@@ -455,7 +551,7 @@ def test_vectorized_billing_with_solar_matches_cairo(sample_filepaths):
         aggregated_load=agg_load,
         aggregated_solar=agg_solar,
         solar_compensation_df=sell_rate,
-        solar_compensation_style="net_metering",
+        solar_compensation_style=style,
         prototype_ids=bldg_ids,
         tariff_config=tariff_base,
         tariff_strategy=tariff_map,
@@ -549,3 +645,569 @@ def test_vectorized_billing_style_none_with_sell_rate(sample_filepaths):
         check_exact=False,
         rtol=1e-4,
     )
+
+
+def _tou_test_calendar() -> tuple[np.ndarray, np.ndarray]:
+    times = cast(Any, pd.date_range("2025-01-01", periods=8760, freq="h"))
+    months = times.month.to_numpy().astype(np.int64)
+    periods = np.where((times.hour >= 16) & (times.hour < 21), 2, 1)
+    return months, periods
+
+
+def test_demand_tier_kw_flat_and_tou_peaks():
+    """Billing kW is the monthly / TOU-period peak split into demand tiers."""
+    from utils.mid.patches import _demand_charge_groups, _demand_tier_kw
+
+    times = cast(Any, pd.date_range("2025-01-01", periods=8760, freq="h"))
+    months = times.month.to_numpy().astype(np.int64)
+    hours = times.hour.to_numpy().astype(np.int64)
+    is_weekday = times.weekday.to_numpy() < 5
+    sched_weekday = [[2 if 16 <= h < 21 else 1 for h in range(24)]] * 12
+    td = {
+        "ur_dc_flat_mat": [[m, 1, 5.0, 10.0] for m in range(12)]
+        + [[m, 2, 1e38, 12.0] for m in range(12)],
+        "ur_dc_tou_mat": [[1, 1, 1e38, 3.0], [2, 1, 1e38, 8.0]],
+        "ur_dc_sched_weekday": sched_weekday,
+        "ur_dc_sched_weekend": [[1] * 24] * 12,
+    }
+    rng = np.random.default_rng(2)
+    kw = rng.random((3, 8760)) * 8.0 - 1.0
+
+    flat_keys, tou_keys, limits = _demand_charge_groups(
+        td, hour_months=months, hour_hours=hours, hour_is_weekday=is_weekday
+    )
+    g_month, g_period, g_tier, out = _demand_tier_kw(
+        kw, np.array([2, 0]), hour_keys=[flat_keys, tou_keys], limits=limits
+    )
+    assert len(g_month) == 12 * 2 + 12 * 2
+
+    on_peak = is_weekday & (hours >= 16) & (hours < 21)
+    for g, (m, p, t) in enumerate(zip(g_month, g_period, g_tier)):
+        in_month = months == m
+        if p == 0:
+            mask = in_month
+        else:
+            mask = in_month & (on_peak if p == 2 else ~on_peak)
+        peak = np.maximum(kw[[2, 0]][:, mask].max(axis=1), 0.0)
+        if p == 0:
+            expected = np.minimum(peak, 5.0) if t == 1 else np.maximum(peak - 5.0, 0)
+        else:
+            expected = peak
+        np.testing.assert_allclose(out[:, g], expected)
+
+
+def test_coded_bill_helpers_match_merge_groupby():
+    """Integer-coded lookups + bincount match the merge/groupby/loop they replace."""
+    from utils.mid.patches import (
+        _agg_row_codes,
+        _apply_fixed_and_min_charges,
+        _coded_lookup,
+        _monthly_bill_frame,
+        _monthly_cost_matrix,
+    )
+
+    tariff_dicts = {
+        "flat": {"ur_monthly_fixed_charge": 10.0, "ur_monthly_min_charge": 0.0},
+        "tou": {"ur_monthly_fixed_charge": 5.0, "ur_monthly_min_charge": 40.0},
+    }
+    rate_rows = pd.DataFrame(
+        {
+            "tariff": ["flat", "tou", "tou", "tou"],
+            "period": [1, 1, 2, 2],
+            "tier": [1, 1, 1, 2],
+            "rate": [0.2, 0.1, 0.3, 0.4],
+        }
+    )
+    bldg_ids = [30, 10, 20, 40]  # 40 has no energy rows
+    bldg_tariff = {30: "flat", 10: "tou", 20: "tou", 40: "flat"}
+    rng = np.random.default_rng(3)
+    rows = []
+    for bid in bldg_ids[:3]:
+        tk = bldg_tariff[bid]
+        for month in range(1, 13):
+            for _, r in rate_rows[rate_rows["tariff"] == tk].iterrows():
+                rows.append((bid, month, r["period"], r["tier"], tk))
+    agg = pd.DataFrame(rows, columns=["bldg_id", "month", "period", "tier", "tariff"])
+    agg["grid_cons"] = rng.random(len(agg)) * 200.0
+    agg = agg.set_index("bldg_id")
+
+    tariff_index = pd.Index(list(tariff_dicts))
+    tariff_pos = {tk: i for i, tk in enumerate(tariff_index)}
+    entries: dict[tuple[int, ...], float] = {
+        (tariff_pos[tk], int(period), int(tier)): float(rate)
+        for tk, period, tier, rate in zip(
+            rate_rows["tariff"],
+            rate_rows["period"],
+            rate_rows["tier"],
+            rate_rows["rate"],
+        )
+    }
+    codes = _agg_row_codes(agg, pd.Index(bldg_ids), tariff_index)
+    rates = _coded_lookup(entries, (codes["tariff"], codes["period"], codes["tier"]))
+    bills = _monthly_cost_matrix(codes, agg["grid_cons"].to_numpy() * rates, 4)
+    bills = _apply_fixed_and_min_charges(
+        bills, [bldg_tariff[b] for b in bldg_ids], tariff_dicts
+    )
+    months = [f"m{m}" for m in range(1, 13)]
+    got = _monthly_bill_frame(bills, bldg_ids, months)
+
+    ref = agg.reset_index().merge(rate_rows, on=["tariff", "period", "tier"])
+    ref["costs"] = ref["grid_cons"] * ref["rate"]
+    ref = (
+        ref.groupby(["bldg_id", "month"])["costs"]
+        .sum()
+        .unstack("month")
+        .reindex(bldg_ids)
+        .fillna(0.0)
+    )
+    for bid in bldg_ids:
+        td = tariff_dicts[bldg_tariff[bid]]
+        ref.loc[bid] = (ref.loc[bid] + td["ur_monthly_fixed_charge"]).clip(
+            lower=td["ur_monthly_min_charge"]
+        )
+    np.testing.assert_allclose(got[months].to_numpy(), ref.to_numpy())
+    np.testing.assert_allclose(got["Annual"], ref.sum(axis=1))
+    assert got.index.tolist() == bldg_ids and got.index.name is None
+
+
+def test_segment_sums_match_indicator_matmul():
+    """reduceat segment sums equal the dense-indicator matmul for any row selection."""
+    from utils.mid.patches import _group_layout, _segment_sums
+
+    months, periods = _tou_test_calendar()
+    rng = np.random.default_rng(4)
+    arrays = {"grid_cons": rng.random((7, 8760)), "load_data": rng.random((7, 8760))}
+    for hour_codes in (months * 100 + periods, months):
+        layout = _group_layout(hour_codes)
+        assert layout.in_order == (hour_codes is months)
+        indicator = (hour_codes[:, None] == layout.codes[None, :]).astype(float)
+        for rows in (np.arange(2, 6), np.array([6, 0, 3])):
+            sums = _segment_sums(arrays, rows, layout)
+            for c, a in arrays.items():
+                np.testing.assert_allclose(sums[c], a[rows] @ indicator)
+
+
+def test_bills_parquet_on_write_long_and_sorted(tmp_path):
+    """Bills parquet is long (bldg_id, month), bldg_id sorted, months in order."""
+    from utils.mid.patches import (
+        _BILL_MONTH_COLS,
+        _long_bills,
+        bills_parquet_on_write,
+    )
+
+    bills_dir = tmp_path / "bills"
+    bills_dir.mkdir()
+    long = pd.DataFrame(
+        {
+            "bldg_id": np.repeat([30, 10], 13),
+            "weight": 1.5,
+            "month": _BILL_MONTH_COLS * 2,
+            "bill_level": np.arange(26, dtype=float),
+        }
+    )
+    with bills_parquet_on_write():
+        long.set_index("bldg_id").to_csv(bills_dir / "elec_bills_year_target.csv")
+        long.to_csv(bills_dir / "other.csv", index=False)
+    long.to_csv(tmp_path / "elec_bills_year_target.csv", index=False)
+
+    got = pd.read_parquet(bills_dir / "elec_bills_year_target.parquet")
+    assert got["bldg_id"].tolist() == [10] * 13 + [30] * 13
+    assert got["month"].tolist()[:13] == _BILL_MONTH_COLS
+    assert got["bill_level"].tolist()[:13] == list(np.arange(13, 26, dtype=float))
+    assert not (bills_dir / "gas_bills_year_target.parquet").exists()
+    assert not (bills_dir / "other.parquet").exists()
+    assert not (tmp_path / "elec_bills_year_target.parquet").exists()
+
+    wide = pd.DataFrame(
+        [[30, *range(13)], [10, *range(13, 26)]], columns=["bldg_id", *_BILL_MONTH_COLS]
+    )
+    melted = _long_bills(wide)
+    assert melted["bldg_id"].tolist() == [10] * 13 + [30] * 13
+    assert melted["month"].tolist()[:13] == _BILL_MONTH_COLS
+
+
+# ---------------------------------------------------------------------------
+# CAIRO equivalence on synthetic loads and tariffs
+# ---------------------------------------------------------------------------
+
+_PEAK_HOURS = [[1 if 16 <= h < 21 else 0 for h in range(24)] for _ in range(12)]
+_ALL_OFF_PEAK = [[0] * 24 for _ in range(12)]
+
+# URDB rate fields by tariff label; energy schedules default to one period.
+SYNTHETIC_TARIFFS: dict[str, dict] = {
+    "flat": {"energyratestructure": [[{"rate": 0.2, "unit": "kWh"}]]},
+    "tou": {
+        "energyratestructure": [
+            [{"rate": 0.15, "unit": "kWh"}],
+            [{"rate": 0.35, "unit": "kWh"}],
+        ],
+        "energyweekdayschedule": _PEAK_HOURS,
+    },
+    "tiered": {
+        "energyratestructure": [
+            [
+                {"rate": 0.12, "max": 400, "unit": "kWh"},
+                {"rate": 0.18, "unit": "kWh"},
+            ]
+        ]
+    },
+    "tou_tiered": {
+        "energyratestructure": [
+            [
+                {"rate": 0.12, "max": 300, "unit": "kWh"},
+                {"rate": 0.18, "unit": "kWh"},
+            ],
+            [
+                {"rate": 0.30, "max": 100, "unit": "kWh"},
+                {"rate": 0.40, "unit": "kWh"},
+            ],
+        ],
+        "energyweekdayschedule": _PEAK_HOURS,
+    },
+    "flat_demand": {
+        "energyratestructure": [[{"rate": 0.1, "unit": "kWh"}]],
+        "flatdemandstructure": [[{"rate": 8.0}]],
+        "flatdemandmonths": [0] * 12,
+        "flatdemandunit": "kW",
+    },
+    "tou_demand": {
+        "energyratestructure": [[{"rate": 0.1, "unit": "kWh"}]],
+        "demandratestructure": [[{"rate": 2.0}], [{"rate": 10.0}]],
+        "demandweekdayschedule": _PEAK_HOURS,
+        "demandweekendschedule": _ALL_OFF_PEAK,
+        "demandrateunit": "kW",
+    },
+    "tiered_demand": {
+        "energyratestructure": [[{"rate": 0.1, "unit": "kWh"}]],
+        "flatdemandstructure": [[{"rate": 5.0, "max": 3.0}, {"rate": 9.0}]],
+        "flatdemandmonths": [0] * 12,
+        "flatdemandunit": "kW",
+    },
+    "gas_tiered": {
+        "energyratestructure": [
+            [
+                {"rate": 1.1, "max": 20, "unit": "therms"},
+                {"rate": 1.4, "unit": "therms"},
+            ]
+        ]
+    },
+}
+SYNTHETIC_IDS = [101, 102, 103]
+
+
+def _synthetic_tariff(tmp_path: Path, label: str) -> tuple[dict, pd.DataFrame]:
+    """PySAM tariff_base and tariff_map for one SYNTHETIC_TARIFFS entry."""
+    import json
+
+    from cairo.rates_tool.tariffs import get_default_tariff_structures
+
+    fields = SYNTHETIC_TARIFFS[label]
+    weekday = fields.get("energyweekdayschedule", _ALL_OFF_PEAK)
+    item = {
+        "label": label,
+        "sector": "Residential",
+        "energyweekdayschedule": weekday,
+        "energyweekendschedule": _ALL_OFF_PEAK,
+        "fixedchargefirstmeter": 10.0,
+        "fixedchargeunits": "$/month",
+        **fields,
+    }
+    path = tmp_path / f"{label}.json"
+    path.write_text(json.dumps({"items": [item]}))
+    tariff_base = get_default_tariff_structures([label], {label: path})
+    tariff_map = pd.DataFrame({"bldg_id": SYNTHETIC_IDS, "tariff_key": label})
+    return tariff_base, tariff_map
+
+
+def _synthetic_loads() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Electricity and gas (therms) frames as _return_loads_combined builds them.
+
+    The first building has rooftop PV (negative in ResStock's convention).
+    """
+    from utils.mid.patches import _timeshift_load_blocks, _wrap_load_frames
+
+    rng = np.random.default_rng(11)
+    n_bldg = len(SYNTHETIC_IDS)
+    hours = np.arange(8760) % 24
+    elec = rng.uniform(0.2, 3.0, (n_bldg, 8760))
+    pv = np.zeros_like(elec)
+    pv[0] = -4.0 * np.clip(np.sin((hours - 6) / 12 * np.pi), 0.0, None)
+    gas = rng.uniform(0.0, 4.0, (n_bldg, 8760))
+    ts = pd.date_range("2018-01-01 01:00", periods=8760, freq="h").to_numpy()
+    times, arrays = _timeshift_load_blocks(2025, ts, elec, pv, gas, force_tz="EST")
+    return _wrap_load_frames(SYNTHETIC_IDS, times, arrays)
+
+
+def _aggregate(fn, load: pd.DataFrame, tariff_base, tariff_map, *, gas=False):
+    return fn(
+        target_year=2025,
+        load_col_key="total_fuel_gas" if gas else "total_fuel_electricity",
+        prototype_ids=SYNTHETIC_IDS,
+        tariff_base=tariff_base,
+        tariff_map=tariff_map,
+        prepassed_load=load,
+        solar_pv_compensation=None,
+    )
+
+
+def _bills(fn, agg_load, agg_solar, tariff_base, tariff_map) -> pd.DataFrame:
+    return fn(
+        aggregated_load=agg_load,
+        aggregated_solar=agg_solar,
+        solar_compensation_df=None,
+        prototype_ids=SYNTHETIC_IDS,
+        tariff_config=tariff_base,
+        tariff_strategy=tariff_map,
+    )
+
+
+@pytest.mark.parametrize("label", ["tiered", "tou_tiered", "gas_tiered"])
+def test_tiered_tariffs_fall_back_to_cairo(tmp_path, monkeypatch, label):
+    """Tiered tariffs go to CAIRO's per-building loop (gas back in kWh)."""
+    import utils.mid.patches as patches
+    from utils.mid.patches import (
+        _GAS_KWH_TO_THERM,
+        _vectorized_process_building_demand_by_period,
+    )
+
+    calls: list[pd.DataFrame] = []
+
+    def fake_orig(**kwargs):
+        calls.append(kwargs["prepassed_load"])
+        return "agg_load", "agg_solar"
+
+    monkeypatch.setattr(patches, "_orig_process_building_demand_by_period", fake_orig)
+    tariff_base, tariff_map = _synthetic_tariff(tmp_path, label)
+    elec, gas_therms = _synthetic_loads()
+    gas = label == "gas_tiered"
+    load = gas_therms if gas else elec
+    before = load["load_data"].to_numpy().copy()
+
+    out = _aggregate(
+        _vectorized_process_building_demand_by_period,
+        load,
+        tariff_base,
+        tariff_map,
+        gas=gas,
+    )
+
+    assert out == ("agg_load", "agg_solar")
+    assert len(calls) == 1
+    expected = before / _GAS_KWH_TO_THERM if gas else before
+    np.testing.assert_allclose(calls[0]["load_data"].to_numpy(), expected)
+    # The caller's (possibly cache-backed) frame is left in therms.
+    np.testing.assert_array_equal(load["load_data"].to_numpy(), before)
+
+
+def _hourly_demand_bills(elec: pd.DataFrame, label: str) -> np.ndarray:
+    """(n_bldg, 12) bills priced straight from hourly grid consumption."""
+    grid = np.clip(elec["electricity_net"].to_numpy(), 0.0, None).reshape(-1, 8760)
+    times = elec.index.get_level_values("time")[:8760]
+    months = times.month.to_numpy()
+    on_peak = (times.weekday.to_numpy() < 5) & np.isin(
+        times.hour.to_numpy(), [16, 17, 18, 19, 20]
+    )
+    bills = np.zeros((grid.shape[0], 12))
+    for m in range(1, 13):
+        in_month = months == m
+        peak = grid[:, in_month].max(axis=1)
+        if label == "flat_demand":
+            demand = 8.0 * peak
+        elif label == "tiered_demand":
+            demand = 5.0 * np.minimum(peak, 3.0) + 9.0 * np.maximum(peak - 3.0, 0.0)
+        else:
+            demand = 2.0 * grid[:, in_month & ~on_peak].max(axis=1) + 10.0 * grid[
+                :, in_month & on_peak
+            ].max(axis=1)
+        bills[:, m - 1] = 0.1 * grid[:, in_month].sum(axis=1) + demand + 10.0
+    return bills
+
+
+@pytest.mark.parametrize("label", ["flat_demand", "tou_demand", "tiered_demand"])
+def test_demand_charge_bills_match_hourly_peaks(tmp_path, label):
+    """Vectorized demand-charge bills equal energy + peak kW × $/kW + fixed charge."""
+    from utils.mid.patches import (
+        _vectorized_process_building_demand_by_period,
+        _vectorized_run_system_revenues,
+    )
+
+    tariff_base, tariff_map = _synthetic_tariff(tmp_path, label)
+    elec, _ = _synthetic_loads()
+    agg_load, agg_solar = _aggregate(
+        _vectorized_process_building_demand_by_period, elec, tariff_base, tariff_map
+    )
+    bills = _bills(
+        _vectorized_run_system_revenues, agg_load, agg_solar, tariff_base, tariff_map
+    )
+
+    np.testing.assert_allclose(
+        bills.iloc[:, :12].to_numpy(), _hourly_demand_bills(elec, label), rtol=1e-9
+    )
+
+
+@pytest.mark.parametrize("label", ["flat_demand", "tou_demand", "tiered_demand"])
+def test_demand_charge_bills_match_cairo(tmp_path, label):
+    """Vectorized demand-charge bills match CAIRO's aggregation + run_system_revenues."""
+    from utils.mid.patches import (
+        _orig_process_building_demand_by_period,
+        _orig_run_system_revenues,
+        _vectorized_process_building_demand_by_period,
+        _vectorized_run_system_revenues,
+    )
+
+    tariff_base, tariff_map = _synthetic_tariff(tmp_path, label)
+    elec, _ = _synthetic_loads()
+
+    ref_load, ref_solar = _aggregate(
+        _orig_process_building_demand_by_period, elec, tariff_base, tariff_map
+    )
+    new_load, new_solar = _aggregate(
+        _vectorized_process_building_demand_by_period, elec, tariff_base, tariff_map
+    )
+
+    pd.testing.assert_frame_equal(
+        _bills(
+            _vectorized_run_system_revenues,
+            new_load,
+            new_solar,
+            tariff_base,
+            tariff_map,
+        ),
+        _bills(_orig_run_system_revenues, ref_load, ref_solar, tariff_base, tariff_map),
+        rtol=1e-6,
+    )
+
+
+def test_demand_rows_keep_cairo_layout_with_billing_kw_attached(tmp_path):
+    """Demand rows stay CAIRO's 12 zero rows; billing kW rides in attrs."""
+    from utils.mid.patches import (
+        _BILLING_KW_ATTR,
+        _BillingKw,
+        _vectorized_process_building_demand_by_period,
+    )
+
+    tariff_base, tariff_map = _synthetic_tariff(tmp_path, "tiered_demand")
+    elec, _ = _synthetic_loads()
+    agg_load, _ = _aggregate(
+        _vectorized_process_building_demand_by_period, elec, tariff_base, tariff_map
+    )
+
+    demand = agg_load[agg_load["charge_type"] == "demand_charge"]
+    assert demand.groupby(level="bldg_id").size().to_dict() == {
+        bid: 12 for bid in SYNTHETIC_IDS
+    }
+    assert (demand[["period", "tier", "grid_cons", "load_data"]] == 0).all().all()
+
+    billing_kw = agg_load.attrs[_BILLING_KW_ATTR]
+    assert isinstance(billing_kw, _BillingKw)
+    assert sorted(billing_kw.rows["tier"].unique()) == [1, 2]
+    assert (billing_kw.rows["period"] == 0).all()
+    # Per-building slices and copies share the rows instead of copying them.
+    assert agg_load.loc[[SYNTHETIC_IDS[0]]].attrs[_BILLING_KW_ATTR] is billing_kw
+    assert agg_load.copy().attrs[_BILLING_KW_ATTR] is billing_kw
+
+
+def test_net_billing_falls_back_to_cairo(tmp_path, monkeypatch):
+    """Net-billing solar compensation is billed by CAIRO's per-building loop."""
+    import utils.mid.patches as patches
+    from utils.mid.patches import (
+        _vectorized_process_building_demand_by_period,
+        _vectorized_run_system_revenues,
+    )
+
+    calls: list[dict] = []
+
+    def fake_orig(**kwargs):
+        calls.append(kwargs)
+        return "cairo_bills"
+
+    monkeypatch.setattr(patches, "_orig_run_system_revenues", fake_orig)
+    tariff_base, tariff_map = _synthetic_tariff(tmp_path, "flat")
+    elec, _ = _synthetic_loads()
+    agg_load, agg_solar = _aggregate(
+        _vectorized_process_building_demand_by_period, elec, tariff_base, tariff_map
+    )
+    sell_rate = {"flat": tariff_base["flat"]}
+
+    out = _vectorized_run_system_revenues(
+        aggregated_load=agg_load,
+        aggregated_solar=agg_solar,
+        solar_compensation_df=sell_rate,
+        solar_compensation_style="net_billing",
+        prototype_ids=SYNTHETIC_IDS,
+        tariff_config=tariff_base,
+        tariff_strategy=tariff_map,
+    )
+
+    assert out == "cairo_bills"
+    assert len(calls) == 1
+    assert calls[0]["solar_compensation_style"] == "net_billing"
+    assert calls[0]["solar_compensation_df"] is sell_rate
+
+
+def test_billing_kw_found_by_frame_identity_without_attrs(tmp_path):
+    """A frame whose attrs were dropped still finds its billing kW by identity."""
+    from utils.mid.patches import (
+        _BILLING_KW_BY_FRAME,
+        _billing_kw_of,
+        _vectorized_process_building_demand_by_period,
+    )
+
+    tariff_base, tariff_map = _synthetic_tariff(tmp_path, "flat_demand")
+    elec, _ = _synthetic_loads()
+    agg_load, _ = _aggregate(
+        _vectorized_process_building_demand_by_period, elec, tariff_base, tariff_map
+    )
+    billing_kw = _billing_kw_of(agg_load)
+    assert billing_kw is not None
+
+    agg_load.attrs.clear()
+    assert _billing_kw_of(agg_load) is billing_kw
+    assert _billing_kw_of(agg_load.copy()) is None
+
+    key = id(agg_load)
+    del agg_load
+    assert key not in _BILLING_KW_BY_FRAME
+
+
+def test_demand_bills_without_billing_kw_fall_back_to_cairo(
+    tmp_path, monkeypatch, caplog
+):
+    """A demand tariff's frame without the billing-kW sidecar is billed by CAIRO."""
+    import utils.mid.patches as patches
+    from utils.mid.patches import (
+        _vectorized_process_building_demand_by_period,
+        _vectorized_run_system_revenues,
+    )
+
+    calls: list[pd.DataFrame] = []
+
+    def fake_orig(**kwargs):
+        calls.append(kwargs["aggregated_load"])
+        return "cairo_bills"
+
+    monkeypatch.setattr(patches, "_orig_run_system_revenues", fake_orig)
+    tariff_base, tariff_map = _synthetic_tariff(tmp_path, "flat_demand")
+    elec, _ = _synthetic_loads()
+    agg_load, agg_solar = _aggregate(
+        _vectorized_process_building_demand_by_period, elec, tariff_base, tariff_map
+    )
+    stripped = agg_load.copy()
+    stripped.attrs.clear()
+
+    assert (
+        _bills(
+            _vectorized_run_system_revenues,
+            stripped,
+            agg_solar,
+            tariff_base,
+            tariff_map,
+        )
+        == "cairo_bills"
+    )
+    assert len(calls) == 1
+    assert calls[0] is stripped
+    assert any(
+        r.levelno == logging.WARNING and "demand_without_billing_kw" in r.getMessage()
+        for r in caplog.records
+    )
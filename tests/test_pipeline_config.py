@@ -10,7 +10,9 @@ import pytest
 import yaml
 
 from rate_design.hp_rates.pipeline_config import (
+    _build_run_entry,
     load_pipeline_config,
+    mc_input_year,
     validate_preflight_inputs,
 )
 
@@ -67,6 +69,20 @@ class TestConcurrentVariants:
         assert config.concurrent_variants is value
 
 
+class TestWarmWorkers:
+    """`warm_workers` forks runs from a pre-imported CAIRO fork-server."""
+
+    def test_defaults_to_cold_subprocesses(self, tmp_path: Path) -> None:
+        config = load_pipeline_config(_write(tmp_path, _minimal_pipeline_yaml()))
+        assert config.warm_workers is False
+
+    def test_explicit_value_is_respected(self, tmp_path: Path) -> None:
+        data = _minimal_pipeline_yaml()
+        data["warm_workers"] = True
+        config = load_pipeline_config(_write(tmp_path, data))
+        assert config.warm_workers is True
+
+
 class TestBillChangeBaseline:
     """`bill_change_baseline` is post-processing-only, so optional at load."""
 
@@ -126,3 +142,30 @@ class TestFuseMountCheck:
         errors = validate_preflight_inputs(config)
         mount_errors = [e for e in errors if "mounted" in e]
         assert len(mount_errors) == 0
+
+
+class TestMcBundleDir:
+    """`mc_bundle_dir` points each run at its variant's prebuilt MC bundle."""
+
+    def test_absent_means_no_bundle(self, tmp_path: Path) -> None:
+        config = load_pipeline_config(_write(tmp_path, _minimal_pipeline_yaml()))
+        assert config.run_defaults.mc_bundle_dir is None
+
+    def test_run_entry_points_at_variant_bundle(self, tmp_path: Path) -> None:
+        data = _minimal_pipeline_yaml()
+        data["mc_bundle_dir"] = "/ebs/cache/mc_bundles"
+        data["marginal_costs"]["dist_and_sub_tx"] = (
+            "s3://bucket/dist/utility=bge/year=2024/data.parquet"
+        )
+        config = load_pipeline_config(_write(tmp_path, data))
+        scenario = config.scenario("default")
+
+        assert mc_input_year(config) == 2024
+        for variant, supply in (("delivery", "false"), ("supply", "true")):
+            entry = _build_run_entry(
+                config, scenario, "batch", "precalc", variant, "run"
+            )
+            assert entry["path_mc_bundle"] == (
+                "/ebs/cache/mc_bundles/state=MD/utility=bge/mc_year=2024/year=2025"
+                f"/supply={supply}/mc_bundle.arrow"
+            )
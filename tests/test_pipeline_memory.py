@@ -0,0 +1,223 @@
+"""Tests for rate_design/hp_rates/pipeline_memory.py admission control."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from rate_design.hp_rates.pipeline_memory import (
+    MIN_PEAK_RSS_BYTES,
+    PEAK_RSS_HEADROOM,
+    MemoryGate,
+    RunMemoryKey,
+    RunMemoryRecord,
+    predict_peak_rss,
+    process_tree_rss_bytes,
+    read_run_key,
+    read_run_memory_records,
+    run_key_from_yaml,
+    write_run_key,
+    write_run_memory,
+)
+
+GB = 10**9
+
+
+def _record(name: str, peak_gb: float, **key: Any) -> RunMemoryRecord:
+    fields: dict[str, Any] = {
+        "utility": "coned",
+        "run_type": "precalc",
+        "demand_flex": False,
+        "sample_size": None,
+        "n_buildings": 15_000,
+        "run_includes_supply": False,
+    } | key
+    return RunMemoryRecord(
+        run_name=name,
+        key=RunMemoryKey(**fields),
+        peak_rss_bytes=int(peak_gb * GB),
+        num_workers=4,
+        elapsed_s=60.0,
+    )
+
+
+def test_run_key_from_yaml():
+    key = run_key_from_yaml(
+        {"utility": "rie", "run_type": "default", "elasticity": {"winter": -0.1}}
+    )
+    assert key == RunMemoryKey("rie", "default", True, None, run_includes_supply=False)
+    key = run_key_from_yaml(
+        {
+            "utility": "rie",
+            "elasticity": 0.0,
+            "sample_size": 50,
+            "run_includes_supply": True,
+        }
+    )
+    assert key == RunMemoryKey("rie", "precalc", False, 50, run_includes_supply=True)
+
+
+def test_records_roundtrip(tmp_path: Path):
+    key = RunMemoryKey("coned", "precalc", True, None, n_buildings=15_000)
+    write_run_key(tmp_path, "run1", key)
+    assert read_run_key(tmp_path, "run1") == key
+    assert read_run_key(tmp_path, "missing") is None
+
+    record = RunMemoryRecord("run1", key, 12 * GB, None, 300.0)
+    write_run_memory(tmp_path, record)
+    (tmp_path / ".runs" / "broken.mem.json").write_text("{")
+    assert read_run_memory_records([tmp_path, tmp_path / "absent"]) == [record]
+
+
+def test_predict_prefers_exact_key():
+    records = [
+        _record("a", 10.0),
+        _record("b", 12.0),
+        _record("c", 20.0, demand_flex=True),
+        _record("d", 3.0, utility="rie"),
+    ]
+    key = RunMemoryKey("coned", "precalc", False, None, run_includes_supply=False)
+    assert predict_peak_rss(records, key) == int(12.0 * GB * PEAK_RSS_HEADROOM)
+    assert (
+        predict_peak_rss(
+            records,
+            RunMemoryKey("psegli", "precalc", False, None, run_includes_supply=False),
+        )
+        is None
+    )
+
+
+def test_predict_scales_from_same_utility():
+    records = [_record("a", 10.0, sample_size=1_000, n_buildings=1_000)]
+    bigger = RunMemoryKey("coned", "precalc", False, 2_000, run_includes_supply=False)
+    assert predict_peak_rss(records, bigger) == int(20.0 * GB * PEAK_RSS_HEADROOM)
+    smaller = RunMemoryKey("coned", "precalc", False, 500, run_includes_supply=False)
+    assert predict_peak_rss(records, smaller) == int(10.0 * GB * PEAK_RSS_HEADROOM)
+
+
+def test_predict_full_stock_or_other_flex_needs_own_history():
+    """Sampled or other-flex peaks never stand in for an unsized or flex run."""
+    records = [
+        _record("a", 4.0, sample_size=1_000, n_buildings=1_000),
+        _record("b", 10.0, sample_size=None, n_buildings=15_000),
+    ]
+    full_stock = RunMemoryKey(
+        "coned", "precalc", False, None, run_includes_supply=False
+    )
+    assert predict_peak_rss(records[:1], full_stock) is None
+    assert predict_peak_rss(records, full_stock) == int(10.0 * GB * PEAK_RSS_HEADROOM)
+    flex = RunMemoryKey("coned", "precalc", True, 500, run_includes_supply=False)
+    assert predict_peak_rss(records, flex) is None
+
+
+def test_predict_separates_delivery_and_supply():
+    records = [_record("d", 10.0), _record("s", 14.0, run_includes_supply=True)]
+    supply = RunMemoryKey("coned", "precalc", False, None, run_includes_supply=True)
+    assert predict_peak_rss(records, supply) == int(14.0 * GB * PEAK_RSS_HEADROOM)
+    # Records from before the variant was keyed match neither variant.
+    legacy = [_record("old", 20.0, run_includes_supply=None)]
+    assert predict_peak_rss(legacy, supply) is None
+
+
+def test_predict_floors_tiny_and_ignores_zero_peaks():
+    key = RunMemoryKey("coned", "precalc", False, None, run_includes_supply=False)
+    assert predict_peak_rss([_record("a", 0.0)], key) is None
+    assert predict_peak_rss([_record("a", 0.001)], key) == MIN_PEAK_RSS_BYTES
+    sampled = [_record("b", 0.0, sample_size=10, n_buildings=10)]
+    assert (
+        predict_peak_rss(
+            sampled,
+            RunMemoryKey("coned", "precalc", False, 20, run_includes_supply=False),
+        )
+        is None
+    )
+
+
+def _hold(gate: MemoryGate, run_id: str, need: int | None, log: list, release):
+    with gate.admit(run_id, need):
+        log.append(run_id)
+        release.wait()
+
+
+def test_memory_gate_packs_by_prediction_and_is_fifo():
+    gate = MemoryGate(budget_bytes=10 * GB, default_run_bytes=5 * GB)
+    admitted: list[str] = []
+    release = {name: threading.Event() for name in "abcd"}
+    needs = {"a": 4 * GB, "b": 4 * GB, "c": 8 * GB, "d": 1 * GB}
+    threads = []
+    for name in "abcd":
+        t = threading.Thread(
+            target=_hold, args=(gate, name, needs[name], admitted, release[name])
+        )
+        t.start()
+        threads.append(t)
+        time.sleep(0.05)
+
+    # a + b fit; c does not, and d queues behind c rather than jumping it.
+    assert admitted == ["a", "b"]
+    release["a"].set()
+    time.sleep(0.05)
+    assert admitted == ["a", "b"]
+    release["b"].set()
+    time.sleep(0.05)
+    assert admitted == ["a", "b", "c", "d"]
+    release["c"].set()
+    release["d"].set()
+    for t in threads:
+        t.join()
+    assert gate.running == 0 and gate.reserved_bytes == 0
+
+
+def test_memory_gate_caps_concurrent_runs():
+    gate = MemoryGate(budget_bytes=100 * GB, default_run_bytes=5 * GB, max_running=2)
+    admitted: list[str] = []
+    release = threading.Event()
+    threads = [
+        threading.Thread(target=_hold, args=(gate, name, 1 * GB, admitted, release))
+        for name in "abc"
+    ]
+    for t in threads:
+        t.start()
+        time.sleep(0.05)
+
+    # Memory fits all three; the cap holds the third back.
+    assert admitted == ["a", "b"]
+    release.set()
+    for t in threads:
+        t.join()
+    assert admitted == ["a", "b", "c"]
+    assert gate.running == 0
+
+
+def test_memory_gate_admits_oversized_run_alone():
+    gate = MemoryGate(budget_bytes=10 * GB, default_run_bytes=5 * GB)
+    with gate.admit("huge", 40 * GB) as reserved:
+        assert reserved == 40 * GB
+        assert gate.running == 1
+
+
+def test_memory_gate_defaults_without_history():
+    gate = MemoryGate(budget_bytes=10 * GB, default_run_bytes=5 * GB)
+    with gate.admit("a", None) as reserved:
+        assert reserved == 5 * GB
+
+
+def test_memory_gate_for_host_counts_runs_without_meminfo(monkeypatch):
+    import rate_design.hp_rates.pipeline_memory as pm
+
+    monkeypatch.setattr(pm, "mem_total_bytes", lambda: 0)
+    gate = MemoryGate.for_host(2)
+    assert gate.counts_runs
+    assert gate.max_running == 2
+    with gate.admit("a", 40 * GB) as reserved:
+        assert reserved == 1
+
+
+@pytest.mark.skipif(not Path("/proc/self/status").exists(), reason="needs /proc")
+def test_process_tree_rss_includes_self():
+    assert process_tree_rss_bytes(os.getpid()) > 0
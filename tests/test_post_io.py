@@ -0,0 +1,56 @@
+"""Tests for utils/post/io.py shared readers."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+import utils.post.io as post_io
+from utils.post.io import parquet_sibling, scan
+
+
+def test_parquet_sibling():
+    assert (
+        parquet_sibling("s3://b/run/bills/elec.csv") == "s3://b/run/bills/elec.parquet"
+    )
+    assert parquet_sibling("s3://b/run/metadata.parquet") is None
+
+
+def test_scan_prefers_parquet_copy_of_csv(tmp_path: Path):
+    csv_path = tmp_path / "elec_bills_year_target.csv"
+    pl.DataFrame(
+        {"bldg_id": [2, 1], "month": ["Jan", "Jan"], "bill_level": [1.0, 2.0]}
+    ).write_csv(csv_path)
+    assert scan(str(csv_path)).collect()["bldg_id"].to_list() == [2, 1]
+
+    pl.DataFrame(
+        {"bldg_id": [1, 2], "month": ["Jan", "Jan"], "bill_level": [2.0, 1.0]},
+        schema_overrides={"bldg_id": pl.Int32},
+    ).write_parquet(csv_path.with_suffix(".parquet"))
+    scanned = scan(str(csv_path)).collect()
+    assert scanned["bldg_id"].to_list() == [1, 2]
+    assert scanned.schema["bldg_id"] == pl.Int32
+
+
+def test_scan_probes_s3_sibling_once_with_storage_options(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    probes: list[tuple[str, object]] = []
+    real_scan_parquet = pl.scan_parquet
+
+    def _fake_scan_parquet(source, storage_options=None, **kwargs):
+        probes.append((source, storage_options))
+        if source == "s3://b/run/bills/elec_bills_year_target.parquet":
+            raise FileNotFoundError(source)
+        return real_scan_parquet(source, storage_options=storage_options, **kwargs)
+
+    monkeypatch.setattr(post_io.pl, "scan_parquet", _fake_scan_parquet)
+    monkeypatch.setattr(post_io.pl, "scan_csv", lambda *_a, **_k: pl.LazyFrame())
+    post_io._s3_parquet_exists.cache_clear()
+    opts = {"aws_region": "us-west-2"}
+    for _ in range(2):
+        scan("s3://b/run/bills/elec_bills_year_target.csv", storage_options=opts)
+    assert probes == [("s3://b/run/bills/elec_bills_year_target.parquet", opts)]
+    post_io._s3_parquet_exists.cache_clear()
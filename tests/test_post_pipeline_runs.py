@@ -5,6 +5,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
+import polars as pl
 import pytest
 import yaml
 
@@ -24,6 +25,7 @@ from utils.post.pipeline_runs import (
     s3_uri,
     upgrade_for_stage,
 )
+from utils.post.run_manifest import MANIFEST_SCHEMA, manifest_dir
 
 BATCH = "md_20260803_a"
 
@@ -194,6 +196,44 @@ class TestFindRunPairs:
         with pytest.raises(FileNotFoundError, match="supply run never completed"):
             find_run_pairs(config, BATCH)
 
+    def test_resolves_from_run_manifest(self, tmp_path: Path) -> None:
+        config = _config(tmp_path)
+        names = [
+            canonical_run_name("md", "bge", "default", "precalc", variant)
+            for variant in ("delivery", "supply")
+        ]
+        manifest = Path(manifest_dir(batch_dir(config, BATCH)))
+        manifest.mkdir(parents=True)
+        for name in names:
+            pl.DataFrame(
+                [{"run_name": name, "output_uri": f"s3://data.sb/x/{name}"}],
+                schema=MANIFEST_SCHEMA,
+            ).write_parquet(manifest / f"{name}.parquet")
+
+        pairs = find_run_pairs(config, BATCH)
+
+        assert list(pairs) == ["default_precalc"]
+        assert pairs["default_precalc"].dir_delivery == f"s3://data.sb/x/{names[0]}"
+        assert pairs["default_precalc"].dir_supply == f"s3://data.sb/x/{names[1]}"
+
+    def test_runs_missing_from_manifest_fall_back_to_index(
+        self, tmp_path: Path
+    ) -> None:
+        config = _config(tmp_path)
+        delivery = canonical_run_name("md", "bge", "default", "precalc", "delivery")
+        manifest = Path(manifest_dir(batch_dir(config, BATCH)))
+        manifest.mkdir(parents=True)
+        pl.DataFrame(
+            [{"run_name": delivery, "output_uri": f"s3://data.sb/x/{delivery}"}],
+            schema=MANIFEST_SCHEMA,
+        ).write_parquet(manifest / f"{delivery}.parquet")
+        _write_run_index(config, "default", "precalc", "supply")
+
+        pair = find_run_pairs(config, BATCH)["default_precalc"]
+
+        assert pair.dir_delivery == f"s3://data.sb/x/{delivery}"
+        assert pair.dir_supply.endswith("_md_bge_default_precalc_supply")
+
     def test_empty_batch_finds_nothing(self, tmp_path: Path) -> None:
         assert find_run_pairs(_config(tmp_path), BATCH) == {}
 
@@ -0,0 +1,286 @@
+"""Tests for utils/mid/precalc_solver.py closed-form precalc calibration."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.mid.precalc_solver import (
+    _RATE,
+    TARIFF_FINAL_CONFIG,
+    hour_periods,
+    solve_precalc,
+    unsupported_reason,
+    write_tariff_final_config,
+)
+from utils.pre.generate_precalc_mapping import generate_default_precalc_mapping
+
+RI_TARIFFS = (
+    Path(__file__).resolve().parent.parent
+    / "rate_design/hp_rates/ri/config/tariffs/electric"
+)
+LOAD_DIR = Path(
+    "/data.sb/nrel/resstock/res_2024_amy2018_2/load_curve_hourly/state=RI/upgrade=00/"
+)
+SAMPLE_IDS = [100147, 100151, 100312, 8584, 85645, 121546]
+TIME_INDEX = pd.date_range("2025-01-01", periods=8760, freq="h", tz="EST")
+
+
+def _pysam_from_urdb(path: Path) -> dict:
+    """URDB ``items[0]`` -> the PySAM dict shape CAIRO bills with (1-based)."""
+    item = json.loads(path.read_text())["items"][0]
+    return {
+        "ur_ec_sched_weekday": [
+            [p + 1 for p in row] for row in item["energyweekdayschedule"]
+        ],
+        "ur_ec_sched_weekend": [
+            [p + 1 for p in row] for row in item["energyweekendschedule"]
+        ],
+        "ur_ec_tou_mat": [
+            [p + 1, t + 1, 1e38, 0, tier["rate"], tier.get("adj", 0.0), 0.0]
+            for p, tiers in enumerate(item["energyratestructure"])
+            for t, tier in enumerate(tiers)
+        ],
+        "ur_monthly_fixed_charge": item.get("fixedchargefirstmeter", 0.0),
+        "ur_monthly_min_charge": item.get("mincharge", 0.0),
+        "ur_dc_enable": 0,
+    }
+
+
+def _loads(bldg_ids: list[int], seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    net = rng.gamma(2.0, 0.6, size=(len(bldg_ids), 8760))
+    net[:, ::7] -= 1.0  # some export hours, floored to 0 when billed
+    index = pd.MultiIndex.from_product(
+        [bldg_ids, TIME_INDEX], names=["bldg_id", "time"]
+    )
+    return pd.DataFrame(
+        {"load_data": np.abs(net).ravel(), "electricity_net": net.ravel()}, index=index
+    )
+
+
+def _weighted_bills(
+    tariffs: dict, tariff_map: pd.DataFrame, meta: pd.DataFrame, loads: pd.DataFrame
+) -> float:
+    """Brute-force hourly billing: sum_b w_b * (12 * fixed + sum_h rate_h * kWh_bh)."""
+    grid = np.maximum(loads["electricity_net"].to_numpy().reshape(len(meta), 8760), 0)
+    total = 0.0
+    keys = tariff_map.set_index("bldg_id")["tariff_key"]
+    for i, (bldg_id, weight) in enumerate(zip(meta["bldg_id"], meta["weight"])):
+        td = tariffs[keys[bldg_id]]
+        rates = {int(r[0]): r[4] + r[5] for r in td["ur_ec_tou_mat"]}
+        hourly_rate = np.vectorize(rates.get)(hour_periods(td, TIME_INDEX))
+        total += weight * (12 * td["ur_monthly_fixed_charge"] + hourly_rate @ grid[i])
+    return total
+
+
+def _case(keys: list[str]):
+    bldg_ids = [1, 2, 3, 4]
+    tariffs = {k: _pysam_from_urdb(RI_TARIFFS / f"{k}.json") for k in keys}
+    mapping = pd.concat(
+        [generate_default_precalc_mapping(RI_TARIFFS / f"{k}.json", k) for k in keys]
+    )
+    tariff_map = pd.DataFrame(
+        {"bldg_id": bldg_ids, "tariff_key": [keys[i % len(keys)] for i in range(4)]}
+    )
+    meta = pd.DataFrame({"bldg_id": bldg_ids, "weight": [120.0, 80.5, 200.0, 55.25]})
+    return tariffs, mapping, tariff_map, meta, _loads(bldg_ids)
+
+
+def test_flat_and_tou_recover_shared_rr():
+    tariffs, mapping, tariff_map, meta, loads = _case(
+        ["rie_flat", "rie_hp_seasonalTOU"]
+    )
+    rr = 2_500_000.0
+
+    solution = solve_precalc(tariffs, tariff_map, mapping, meta, loads, rr)
+
+    assert solution is not None
+    assert len(set(solution.rate_unity.values())) == 1
+    assert _weighted_bills(solution.tariffs, tariff_map, meta, loads) == pytest.approx(
+        rr
+    )
+    # Inputs are left untouched.
+    assert tariffs["rie_flat"]["ur_ec_tou_mat"][0][4] == pytest.approx(0.13854179)
+
+
+def test_subclass_rr_dict_calibrates_each_tariff():
+    tariffs, mapping, tariff_map, meta, loads = _case(
+        ["rie_flat", "rie_hp_seasonalTOU"]
+    )
+    rr = {"rie_flat": 900_000.0, "rie_hp_seasonalTOU": 1_400_000.0}
+
+    solution = solve_precalc(tariffs, tariff_map, mapping, meta, loads, rr)
+
+    assert solution is not None
+    for key, target in rr.items():
+        rows = tariff_map["tariff_key"] == key
+        revenue = _weighted_bills(
+            solution.tariffs,
+            tariff_map[rows],
+            meta[rows.to_numpy()].reset_index(drop=True),
+            loads.loc[meta.loc[rows.to_numpy(), "bldg_id"].tolist()],
+        )
+        assert revenue == pytest.approx(target)
+
+
+def test_tou_shape_matches_cairo_calibrated_tariff():
+    """Calibrated periods keep the rel_value ratios CAIRO's precalc produced."""
+    tariffs, mapping, tariff_map, meta, loads = _case(["rie_hp_seasonalTOU"])
+    solution = solve_precalc(tariffs, tariff_map, mapping, meta, loads, 1e6)
+    assert solution is not None
+
+    ours = [row[4] for row in solution.tariffs["rie_hp_seasonalTOU"]["ur_ec_tou_mat"]]
+    cairo = [
+        tier[0]["rate"]
+        for tier in json.loads(
+            (RI_TARIFFS / "rie_hp_seasonalTOU_calibrated.json").read_text()
+        )["items"][0]["energyratestructure"]
+    ]
+    np.testing.assert_allclose(np.array(ours) / np.array(cairo), ours[0] / cairo[0])
+
+
+def test_unsupported_tariffs_fall_back():
+    tariffs, mapping, tariff_map, meta, loads = _case(["rie_flat"])
+    flat = tariffs["rie_flat"]
+    assert unsupported_reason(flat) is None
+    assert unsupported_reason({**flat, "ur_dc_enable": 1}) == "demand charges"
+    assert unsupported_reason({**flat, "ur_monthly_min_charge": 5.0}) == (
+        "monthly minimum charge"
+    )
+    tiered = [[1, 1, 500.0, 0, 0.1, 0.0, 0.0], [1, 2, 1e38, 0, 0.2, 0.0, 0.0]]
+    assert unsupported_reason({**flat, "ur_ec_tou_mat": tiered}) == (
+        "tiered energy charges"
+    )
+
+    demand = {"rie_flat": {**flat, "ur_dc_enable": 1}}
+    assert solve_precalc(demand, tariff_map, mapping, meta, loads, 1e6) is None
+    assert solve_precalc(tariffs, tariff_map, mapping, meta, loads, {"x": 1.0}) is None
+
+
+def test_write_tariff_final_config_roundtrips(tmp_path: Path):
+    tariffs, mapping, tariff_map, meta, loads = _case(["rie_flat"])
+    solution = solve_precalc(tariffs, tariff_map, mapping, meta, loads, np.float64(1e6))
+    assert solution is not None
+
+    path = write_tariff_final_config(tmp_path, solution.tariffs)
+
+    assert path.name == TARIFF_FINAL_CONFIG
+    assert json.loads(path.read_text()) == solution.tariffs
+
+
+def test_closed_form_matches_cairo_billing():
+    """CAIRO's own bill calculation at the solved rates recovers the RR exactly."""
+    pytest.importorskip("cairo.rates_tool.system_revenues")
+    from cairo.rates_tool.loads import _return_load
+    from cairo.rates_tool.tariffs import get_default_tariff_structures
+
+    from utils.cairo import build_bldg_id_to_load_filepath
+    from utils.mid.patches import (
+        _orig_process_building_demand_by_period,
+        _orig_run_system_revenues,
+    )
+
+    if not LOAD_DIR.exists():
+        pytest.skip("ResStock load dir not accessible")
+    filepaths = build_bldg_id_to_load_filepath(
+        path_resstock_loads=LOAD_DIR, building_ids=SAMPLE_IDS
+    )
+    bldg_ids = list(filepaths)
+    key = "rie_hp_seasonalTOU"
+    tariff_base = get_default_tariff_structures(
+        [key], {key: RI_TARIFFS / f"{key}.json"}
+    )
+    tariff_map = pd.DataFrame({"bldg_id": bldg_ids, "tariff_key": key})
+    meta = pd.DataFrame({"bldg_id": bldg_ids, "weight": 250.0})
+    loads = _return_load(
+        load_type="electricity",
+        target_year=2025,
+        building_stock_sample=bldg_ids,
+        load_filepath_key=filepaths,
+        force_tz="EST",
+    )
+    mapping = generate_default_precalc_mapping(RI_TARIFFS / f"{key}.json", key)
+    rr = 50_000.0
+
+    solution = solve_precalc(tariff_base, tariff_map, mapping, meta, loads, rr)
+    assert solution is not None
+
+    agg_load, agg_solar = _orig_process_building_demand_by_period(
+        target_year=2025,
+        load_col_key="total_fuel_electricity",
+        prototype_ids=bldg_ids,
+        tariff_base=solution.tariffs,
+        tariff_map=tariff_map,
+        prepassed_load=loads,
+        solar_pv_compensation=None,
+    )
+    bills = _orig_run_system_revenues(
+        aggregated_load=agg_load,
+        aggregated_solar=agg_solar,
+        solar_compensation_df=None,
+        prototype_ids=bldg_ids,
+        tariff_config=solution.tariffs,
+        tariff_strategy=tariff_map,
+    )
+    assert (bills["Annual"] * 250.0).sum() == pytest.approx(rr, rel=1e-6)
+
+
+RI_SCENARIOS = (
+    Path(__file__).resolve().parent.parent
+    / "rate_design/hp_rates/ri/config/scenarios/scenarios_rie.yaml"
+)
+
+
+@pytest.mark.parametrize(
+    "run_name",
+    [
+        "ri_rie_default_precalc_delivery",
+        "ri_rie_hp_seasonal_percustomer_passthrough_precalc_delivery",
+    ],
+)
+def test_closed_form_tariff_final_config_matches_cairo_precalc(
+    tmp_path: Path, run_name: str
+):
+    """Same run through CAIRO's precalc and the closed form: same final tariffs."""
+    pytest.importorskip("cairo.rates_tool.system_revenues")
+    import rate_design.hp_rates.run_scenario as rs
+
+    run = rs._load_run_from_yaml(RI_SCENARIOS, run_name)
+    if not Path(run["path_resstock_metadata"]).exists():
+        pytest.skip("ResStock metadata not accessible")
+
+    final_configs = {}
+    for closed_form in (False, True):
+        settings = rs._build_settings_from_yaml_run(
+            run=run,
+            run_num=run_name,
+            state="RI",
+            output_dir_override=tmp_path / f"closed_form={closed_form}",
+            run_name_override=None,
+        )
+        output_dir = rs.run(settings, closed_form_precalc=closed_form)
+        assert output_dir is not None
+        final_configs[closed_form] = json.loads(
+            (output_dir / TARIFF_FINAL_CONFIG).read_text()
+        )
+
+    cairo, closed_form = final_configs[False], final_configs[True]
+    assert closed_form.keys() == cairo.keys()
+    for key, tariff in cairo.items():
+        ours = closed_form[key]
+        assert ours["ur_monthly_fixed_charge"] == pytest.approx(
+            tariff["ur_monthly_fixed_charge"]
+        )
+        assert [row[:_RATE] for row in ours["ur_ec_tou_mat"]] == [
+            row[:_RATE] for row in tariff["ur_ec_tou_mat"]
+        ]
+        np.testing.assert_allclose(
+            [row[_RATE] for row in ours["ur_ec_tou_mat"]],
+            [row[_RATE] for row in tariff["ur_ec_tou_mat"]],
+            rtol=1e-6,
+        )
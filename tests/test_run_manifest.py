@@ -0,0 +1,144 @@
+"""Tests for utils/post/run_manifest.py (batch-level run manifest)."""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from utils.post.run_manifest import (
+    MANIFEST_SCHEMA,
+    clear_manifest_cache,
+    describe_artifacts,
+    find_manifest_run_dir,
+    manifest_dir,
+    manifest_run_dirs,
+    read_run_manifest,
+    write_manifest_entry,
+)
+
+STARTED = datetime(2026, 8, 3, 12, 0, tzinfo=UTC)
+
+
+def _run_dir(batch: Path, run_name: str) -> Path:
+    run_dir = batch / f"20260803_120000_{run_name}"
+    (run_dir / "bills").mkdir(parents=True)
+    (run_dir / "bills" / "elec_bills_year_target.csv").write_text(
+        "bldg_id,month,bill_level\n1,Jan,10.0\n1,Feb,11.0\n2,Jan,9.5"
+    )
+    pl.DataFrame({"bldg_id": [1, 2, 3]}).write_parquet(
+        run_dir / "bills" / "elec_bills_year_target.parquet"
+    )
+    (run_dir / "tariff_final_config.json").write_text("{}\n")
+    return run_dir
+
+
+def test_describe_artifacts_sizes_rows_and_hashes(tmp_path: Path):
+    run_dir = _run_dir(tmp_path, "ri_rie_run1_up00_precalc__flat")
+
+    artifacts = {a["path"]: a for a in describe_artifacts(run_dir)}
+
+    assert list(artifacts) == [
+        "bills/elec_bills_year_target.csv",
+        "bills/elec_bills_year_target.parquet",
+        "tariff_final_config.json",
+    ]
+    csv = run_dir / "bills" / "elec_bills_year_target.csv"
+    assert artifacts["bills/elec_bills_year_target.csv"]["num_rows"] == 3
+    assert artifacts["bills/elec_bills_year_target.csv"]["size_bytes"] == (
+        csv.stat().st_size
+    )
+    assert artifacts["bills/elec_bills_year_target.csv"]["sha256"] == (
+        hashlib.sha256(csv.read_bytes()).hexdigest()
+    )
+    assert artifacts["bills/elec_bills_year_target.parquet"]["num_rows"] == 3
+    assert artifacts["tariff_final_config.json"]["num_rows"] is None
+
+
+def test_write_and_read_manifest(tmp_path: Path):
+    names = ["ri_rie_run1_up00_precalc__flat", "ri_rie_run2_up00_precalc__flat"]
+    for name in names:
+        write_manifest_entry(
+            tmp_path, name, _run_dir(tmp_path, name), started_at=STARTED
+        )
+
+    manifest = read_run_manifest(tmp_path)
+
+    assert manifest.schema == MANIFEST_SCHEMA
+    assert sorted(manifest["run_name"]) == names
+    row = manifest.filter(pl.col("run_name") == names[0]).row(0, named=True)
+    assert row["output_uri"] == str(tmp_path / f"20260803_120000_{names[0]}")
+    assert row["completed_at"] - row["started_at"] == timedelta(
+        seconds=row["elapsed_s"]
+    )
+    assert row["total_bytes"] == sum(a["size_bytes"] for a in row["artifacts"])
+    assert len(row["artifacts"]) == 3
+
+
+def test_rerun_overwrites_its_entry(tmp_path: Path):
+    name = "ri_rie_run1_up00_precalc__flat"
+    run_dir = _run_dir(tmp_path, name)
+    write_manifest_entry(tmp_path, name, run_dir, started_at=STARTED)
+    write_manifest_entry(
+        tmp_path, name, run_dir, started_at=STARTED + timedelta(hours=1)
+    )
+
+    manifest = read_run_manifest(tmp_path)
+
+    assert manifest.height == 1
+    assert manifest["started_at"][0] == STARTED + timedelta(hours=1)
+
+
+def test_fuse_run_dirs_are_recorded_as_s3_uris(tmp_path: Path, monkeypatch):
+    name = "ri_rie_run1_up00_precalc__flat"
+    run_dir = _run_dir(tmp_path, name)
+    monkeypatch.setattr(
+        "utils.post.run_manifest._output_uri",
+        lambda _: f"s3://data.sb/switchbox/cairo/outputs/{run_dir.name}",
+    )
+    write_manifest_entry(tmp_path, name, run_dir, started_at=STARTED)
+
+    assert manifest_run_dirs(str(tmp_path)) == {
+        name: f"s3://data.sb/switchbox/cairo/outputs/{run_dir.name}"
+    }
+
+
+def test_find_manifest_run_dir_matches_fragment(tmp_path: Path):
+    for name in ["ri_rie_run1_up00_precalc__flat", "ri_rie_run12_up02_default__x"]:
+        write_manifest_entry(
+            tmp_path, name, _run_dir(tmp_path, name), started_at=STARTED
+        )
+
+    found = find_manifest_run_dir(f"{tmp_path}/", "_run1_")
+
+    assert found == str(tmp_path / "20260803_120000_ri_rie_run1_up00_precalc__flat")
+    assert find_manifest_run_dir(str(tmp_path), "_run3_") is None
+
+
+@pytest.mark.parametrize("create_dir", [False, True])
+def test_batch_without_manifest_is_empty(tmp_path: Path, create_dir: bool):
+    if create_dir:
+        Path(manifest_dir(tmp_path)).mkdir(parents=True)
+
+    assert read_run_manifest(tmp_path).is_empty()
+    assert manifest_run_dirs(str(tmp_path)) == {}
+
+
+def test_manifest_cache_sees_new_entries(tmp_path: Path):
+    first, second = "ri_rie_run1_up00_precalc__flat", "ri_rie_run2_up00_precalc__flat"
+    assert manifest_run_dirs(str(tmp_path)) == {}
+
+    write_manifest_entry(tmp_path, first, _run_dir(tmp_path, first), started_at=STARTED)
+    assert list(manifest_run_dirs(str(tmp_path))) == [first]
+
+    # A fragment written by another process is only seen after a clear.
+    pl.DataFrame(
+        [{"run_name": second, "output_uri": f"s3://data.sb/x/{second}"}],
+        schema=MANIFEST_SCHEMA,
+    ).write_parquet(Path(manifest_dir(tmp_path)) / f"{second}.parquet")
+    assert sorted(manifest_run_dirs(str(tmp_path))) == [first]
+    clear_manifest_cache()
+    assert sorted(manifest_run_dirs(str(tmp_path))) == [first, second]
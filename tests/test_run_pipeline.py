@@ -0,0 +1,232 @@
+"""Tests for the run_batch scenario DAG in rate_design/hp_rates/run_pipeline.py."""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import rate_design.hp_rates.run_pipeline as rp
+from rate_design.hp_rates import pipeline_config
+from rate_design.hp_rates.pipeline_config import ScenarioConfig
+
+
+def _scenario(name: str, depends_on: str | None = None) -> ScenarioConfig:
+    return ScenarioConfig(name=name, quartet="single_rate", depends_on=depends_on)
+
+
+def _names(scenarios: list[ScenarioConfig]) -> list[str]:
+    return [s.name for s in scenarios]
+
+
+def test_scenario_order_puts_dependencies_first():
+    scenarios = [
+        _scenario("c", depends_on="b"),
+        _scenario("b", depends_on="a"),
+        _scenario("a"),
+        _scenario("x"),
+    ]
+    assert _names(rp._scenario_order(scenarios)) == ["a", "b", "c", "x"]
+
+
+def test_scenario_order_ignores_unselected_dependencies():
+    scenarios = [_scenario("b", depends_on="a"), _scenario("x")]
+    assert _names(rp._scenario_order(scenarios)) == ["b", "x"]
+
+
+def test_scenario_order_rejects_cycles():
+    scenarios = [_scenario("a", depends_on="b"), _scenario("b", depends_on="a")]
+    with pytest.raises(ValueError, match="cycle: a -> b -> a"):
+        rp._scenario_order(scenarios)
+
+
+def test_quartet_stages_publish_precalc_before_calibrated(monkeypatch):
+    calls: list[str] = []
+
+    def fake_stage(delivery_name, supply_name, **_kwargs):
+        calls.append("precalc" if "precalc" in delivery_name else "calibrated")
+        return Path(delivery_name), Path(supply_name)
+
+    monkeypatch.setattr(rp, "_run_stage", fake_stage)
+    monkeypatch.setattr(
+        rp,
+        "_promote_calibrated_tariffs",
+        lambda dirs, **_: calls.append("promote") or [],
+    )
+
+    published: list[dict[str, Path]] = []
+
+    def on_precalc(results: dict[str, Path]) -> None:
+        calls.append("on_precalc")
+        published.append(results)
+
+    results = rp._run_quartet_stages(
+        "default",
+        state="ri",
+        utility="rie",
+        yaml_path=Path("scenarios.yaml"),
+        batch_dir=Path("batch"),
+        process_workers=2,
+        concurrent=False,
+        on_precalc=on_precalc,
+    )
+
+    assert calls == ["precalc", "promote", "on_precalc", "calibrated"]
+    assert set(published[0]) == {"precalc_delivery", "precalc_supply"}
+    assert set(results) == {
+        "precalc_delivery",
+        "precalc_supply",
+        "calibrated_delivery",
+        "calibrated_supply",
+    }
+
+
+def test_workers_per_run_splits_effective_workers(monkeypatch):
+    monkeypatch.setattr(rp.os, "cpu_count", lambda: 4)
+    assert rp._workers_per_run(8, 1) is None
+    assert rp._workers_per_run(8, 2) == 2
+    assert rp._workers_per_run(8, 3) == 1
+    assert rp._workers_per_run(8, 16) == 1
+
+
+def test_run_batch_runs_quartet_subflows_with_split_workers(monkeypatch, tmp_path):
+    """Each scenario runs as a run_quartet subflow sized for the gate's cap."""
+    _fake_batch(
+        monkeypatch, tmp_path, [_scenario(n) for n in ("a", "b", "c", "d", "e")]
+    )
+    calls: dict[str, dict] = {}
+    lock = threading.Lock()
+
+    def fake_quartet(name, *, on_precalc, **kwargs):
+        with lock:
+            calls[name] = kwargs
+        on_precalc({"precalc_delivery": Path("d"), "precalc_supply": Path("s")})
+        return {}
+
+    monkeypatch.setattr(rp, "run_quartet", fake_quartet)
+
+    assert _run_batch_in_thread(tmp_path / "pipeline_rie.yaml") is None
+    assert sorted(calls) == ["a", "b", "c", "d", "e"]
+    # Five quartets but max_concurrent_cairo_runs=4: at most four runs alive.
+    assert {c["max_alive_runs"] for c in calls.values()} == {4}
+
+
+def _fake_batch(monkeypatch, tmp_path: Path, scenarios: list[ScenarioConfig]):
+    """Point run_batch at *scenarios* with preflight and CAIRO patched out."""
+    config = SimpleNamespace(
+        output_base=str(tmp_path),
+        state="ri",
+        utility="rie",
+        scenarios={s.name: s for s in scenarios},
+        max_concurrent_cairo_runs=4,
+        warm_workers=False,
+        process_workers=2,
+        concurrent_variants=False,
+    )
+    monkeypatch.setattr(pipeline_config, "load_pipeline_config", lambda _p: config)
+    monkeypatch.setattr(
+        rp, "preflight", lambda *_a, **_k: tmp_path / "scenarios_rie.yaml"
+    )
+    monkeypatch.setattr(rp, "_init_gate", lambda *_a: None)
+    monkeypatch.setattr(rp, "_init_warm_workers", lambda *_a: None)
+
+
+def _run_batch_in_thread(yaml_path: Path) -> BaseException | None:
+    """Run ``run_batch`` and fail the test instead of hanging on a stuck Event."""
+    outcome: list[BaseException | None] = []
+
+    def target() -> None:
+        try:
+            rp.run_batch.fn(yaml_path, "ri_test")
+            outcome.append(None)
+        except BaseException as exc:  # noqa: BLE001
+            outcome.append(exc)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), "run_batch did not finish"
+    return outcome[0]
+
+
+def test_run_batch_starts_dependent_after_dependency_precalc(monkeypatch, tmp_path):
+    """A dependent derives from its dependency's precalc while the dependency's
+    calibrated stage is still running."""
+    _fake_batch(
+        monkeypatch,
+        tmp_path,
+        [_scenario("hp_seasonal", depends_on="default"), _scenario("default")],
+    )
+    derived = threading.Event()
+    events: list[str] = []
+    lock = threading.Lock()
+
+    def record(event: str) -> None:
+        with lock:
+            events.append(event)
+
+    def fake_quartet(name, *, on_precalc, **_kwargs):
+        record(f"{name}:precalc")
+        on_precalc(
+            {
+                "precalc_delivery": Path(f"{name}_d"),
+                "precalc_supply": Path(f"{name}_s"),
+            }
+        )
+        if name == "default":
+            # Deadlocks unless the dependent is released by on_precalc.
+            assert derived.wait(timeout=10)
+        record(f"{name}:calibrated")
+        return {}
+
+    def fake_derive(config, scenario, dep_precalc):
+        record(f"{scenario.name}:derive")
+        assert dep_precalc == {
+            "precalc_delivery": Path("default_d"),
+            "precalc_supply": Path("default_s"),
+        }
+        derived.set()
+
+    monkeypatch.setattr(rp, "run_quartet", fake_quartet)
+    monkeypatch.setattr(rp, "derive_tariffs", fake_derive)
+
+    assert _run_batch_in_thread(tmp_path / "pipeline_rie.yaml") is None
+    assert events.index("default:precalc") < events.index("hp_seasonal:derive")
+    assert events.index("hp_seasonal:derive") < events.index("default:calibrated")
+
+
+def test_run_batch_skips_dependents_of_failed_scenario(monkeypatch, tmp_path):
+    _fake_batch(
+        monkeypatch,
+        tmp_path,
+        [
+            _scenario("default"),
+            _scenario("hp_seasonal", depends_on="default"),
+            _scenario("hp_flat", depends_on="hp_seasonal"),
+            _scenario("unrelated"),
+        ],
+    )
+    ran: list[str] = []
+
+    def fake_quartet(name, *, on_precalc, **_kwargs):
+        if name == "default":
+            raise RuntimeError("precalc failed")
+        ran.append(name)
+        on_precalc({"precalc_delivery": Path("d"), "precalc_supply": Path("s")})
+        return {}
+
+    derived: list[str] = []
+    monkeypatch.setattr(rp, "run_quartet", fake_quartet)
+    monkeypatch.setattr(
+        rp, "derive_tariffs", lambda _c, scenario, _d: derived.append(scenario.name)
+    )
+
+    exc = _run_batch_in_thread(tmp_path / "pipeline_rie.yaml")
+
+    assert isinstance(exc, RuntimeError)
+    assert "3 of 4 scenario(s) failed" in str(exc)
+    assert "['default', 'hp_flat', 'hp_seasonal']" in str(exc)
+    assert ran == ["unrelated"]
+    assert derived == []
@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+import dataclasses
+import json
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 import pytest
 import yaml
 
+import rate_design.hp_rates.run_scenario as rs
 from rate_design.hp_rates.run_scenario import (
+    RunInputs,
+    ScenarioSettings,
+    TariffVariant,
     _load_run_from_yaml,
+    _load_tariff_variants,
+    _variant_settings,
     assert_output_dir_is_mounted,
 )
+from utils.input_cache import InputCache
 
 
 def test_load_run_from_yaml_inherits_top_level_subclass_config(tmp_path: Path) -> None:
@@ -119,3 +130,231 @@ def test_assert_output_dir_is_mounted_noop_outside_mount_root(
     monkeypatch.setattr(Path, "is_mount", lambda self: False)
 
     assert_output_dir_is_mounted(other_dir, mount_root=mount_root)
+
+
+def _settings(tmp_path: Path) -> ScenarioSettings:
+    tariff_map = tmp_path / "tariff_map.csv"
+    tariff_map.write_text("bldg_id,tariff_key\n1,flat\n", encoding="utf-8")
+    return ScenarioSettings(
+        run_name="ri_rie_run1",
+        run_type="precalc",
+        state="RI",
+        utility="rie",
+        path_results=tmp_path / "out",
+        path_resstock_metadata=tmp_path,
+        path_resstock_loads=tmp_path,
+        path_utility_assignment=tmp_path,
+        path_dist_and_sub_tx_mc=tmp_path,
+        path_tariff_maps_electric=tariff_map,
+        path_tariff_maps_gas=tmp_path,
+        path_tariffs_electric={"flat": tmp_path / "flat.json"},
+        path_tariffs_gas={},
+        rr_total=1.0,
+        subclass_rr=None,
+        run_includes_subclasses=False,
+        residual_allocation_delivery=None,
+        residual_allocation_supply=None,
+        path_electric_utility_stats=tmp_path,
+        path_supply_energy_mc=tmp_path,
+        path_supply_capacity_mc=tmp_path,
+        year_run=2025,
+        year_dollar_conversion=2025,
+        process_workers=1,
+    )
+
+
+def test_load_tariff_variants(tmp_path: Path) -> None:
+    settings = _settings(tmp_path)
+    tou_map = tmp_path / "tou_map.csv"
+    tou_map.write_text("bldg_id,tariff_key\n1,tou\n", encoding="utf-8")
+    variants_path = tmp_path / "variants.yaml"
+    variants_path.write_text(
+        yaml.safe_dump(
+            {
+                "variants": {
+                    "flat_fc10": {
+                        "path_tariffs_electric": {"flat": str(tmp_path / "flat.json")}
+                    },
+                    "tou": {
+                        "path_tariffs_electric": {"tou": str(tmp_path / "tou.json")},
+                        "path_tariff_maps_electric": str(tou_map),
+                    },
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    variants = _load_tariff_variants(variants_path, settings)
+
+    assert variants == [
+        TariffVariant("flat_fc10", {"flat": tmp_path / "flat.json"}),
+        TariffVariant("tou", {"tou": tmp_path / "tou.json"}, tou_map),
+    ]
+    tou = _variant_settings(settings, variants[1])
+    assert tou.run_name == "ri_rie_run1_tou"
+    assert tou.path_tariff_maps_electric == tou_map
+    assert _variant_settings(settings, variants[0]).path_tariff_maps_electric == (
+        settings.path_tariff_maps_electric
+    )
+
+
+def test_load_tariff_variants_checks_tariff_map(tmp_path: Path) -> None:
+    settings = _settings(tmp_path)
+    variants_path = tmp_path / "variants.yaml"
+    variants_path.write_text(
+        yaml.safe_dump(
+            {"variants": {"tou": {"path_tariffs_electric": {"tou": "tou.json"}}}}
+        ),
+        encoding="utf-8",
+    )
+
+    with pytest.raises(ValueError, match="no file"):
+        _load_tariff_variants(variants_path, settings)
+
+
+class _MutatingSimulator:
+    """Stand-in for CAIRO's simulator that bills from its inputs, then mutates
+    every frame it was handed in place, as CAIRO's postprocessing does."""
+
+    def __init__(self, *, building_stock_sample, run_name, output_dir, **_kwargs):
+        self.building_stock_sample = building_stock_sample
+        self.save_file_loc = output_dir / run_name
+
+    def simulate(
+        self,
+        *,
+        tariffs_params,
+        tariff_map,
+        customer_metadata,
+        customer_electricity_load,
+        customer_gas_load,
+        marginal_system_prices,
+        costs_by_type,
+        **_kwargs,
+    ):
+        rate = tariff_map["tariff_key"].map(
+            {k: v["rate"] for k, v in tariffs_params.items()}
+        )
+        kwh = customer_electricity_load.groupby(level="bldg_id")["load_data"].sum()
+        mc = (
+            customer_electricity_load["load_data"].to_numpy().reshape(len(kwh), -1)
+            @ marginal_system_prices.to_numpy()
+        )
+        bills = kwh.to_numpy() * rate.to_numpy() + costs_by_type.sum()
+        self.save_file_loc.mkdir(parents=True)
+        pd.DataFrame(
+            {
+                "bldg_id": kwh.index,
+                "bill": bills,
+                "bat": bills - mc,
+                "weight": customer_metadata["weight"].to_numpy(),
+                "gas": customer_gas_load.groupby(level="bldg_id")["load_data"]
+                .sum()
+                .to_numpy(),
+            }
+        ).to_csv(self.save_file_loc / "bills.csv", index=False)
+
+        customer_electricity_load["load_data"] *= 2.0
+        customer_gas_load["load_data"] += 1.0
+        customer_metadata["weight"] = 0.0
+        marginal_system_prices.iloc[:] = 0.0
+        costs_by_type["extra"] = 1e6
+        self.building_stock_sample.append(-1)
+
+
+def _fake_inputs() -> RunInputs:
+    ids = [1, 2, 3]
+    times = pd.date_range("2025-01-01", periods=24, freq="h", tz="EST")
+    index = pd.MultiIndex.from_product([ids, times], names=["bldg_id", "time"])
+    rng = np.random.default_rng(5)
+    msp = pd.Series(rng.random(24), index=times)
+    return RunInputs(
+        prototype_ids=ids,
+        customer_metadata=pd.DataFrame({"bldg_id": ids, "weight": [1.0, 2.0, 3.0]}),
+        raw_load_elec=pd.DataFrame({"load_data": rng.random(72)}, index=index),
+        raw_load_gas=pd.DataFrame({"load_data": rng.random(72)}, index=index),
+        bulk_marginal_costs=pd.DataFrame({"energy": rng.random(24)}, index=times),
+        dist_and_sub_tx_marginal_costs=pd.Series(rng.random(24), index=times),
+        rr_target_orig=(
+            100.0,
+            msp,
+            pd.Series({"Total Marginal Costs ($)": 12.5}, name="costs"),
+        ),
+        cache=InputCache(None),
+    )
+
+
+def test_tariff_variants_with_reused_inputs_match_separate_runs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    settings = dataclasses.replace(_settings(tmp_path), run_type="default")
+    settings.path_tariff_maps_electric.write_text(
+        "bldg_id,tariff_key\n1,flat\n2,flat\n3,flat\n", encoding="utf-8"
+    )
+    variants = []
+    for name, rate in [("low", 0.1), ("high", 0.3), ("low_again", 0.1)]:
+        tariff = tmp_path / f"{name}.json"
+        tariff.write_text(json.dumps({"rate": rate}), encoding="utf-8")
+        variants.append(TariffVariant(name, {"flat": tariff}))
+
+    def initialize_tariffs(*, tariff_map, building_stock_sample, tariff_paths):
+        params = {k: json.loads(Path(p).read_text()) for k, p in tariff_paths.items()}
+        return params, pd.read_csv(tariff_map)
+
+    monkeypatch.setattr(rs, "load_inputs", lambda *_a, **_k: _fake_inputs())
+    monkeypatch.setattr(rs, "_configure_workers", lambda *_a: None)
+    monkeypatch.setattr(rs, "_initialize_tariffs", initialize_tariffs)
+    monkeypatch.setattr(rs, "_build_precalc_period_mapping", lambda _p: None)
+    monkeypatch.setattr(rs, "_return_export_compensation_rate", lambda **_k: 0.0)
+    monkeypatch.setattr(rs, "MeetRevenueSufficiencySystemWide", _MutatingSimulator)
+    monkeypatch.setattr(rs, "write_billing_kwh", lambda *_a: None)
+
+    reused = rs.run_tariff_variants(settings, variants)
+    reused_dirs = {name: path for name, path in reused.items() if path is not None}
+    assert reused_dirs.keys() == {v.name for v in variants}
+    for variant in variants:
+        separate = dataclasses.replace(
+            _variant_settings(settings, variant),
+            path_results=tmp_path / "separate",
+        )
+        out = rs.run(separate)
+        assert out is not None
+        pd.testing.assert_frame_equal(
+            pd.read_csv(reused_dirs[variant.name] / "bills.csv"),
+            pd.read_csv(out / "bills.csv"),
+        )
+    low, high = (pd.read_csv(reused_dirs[n] / "bills.csv") for n in ("low", "high"))
+    assert (high["bill"] > low["bill"]).all()
+
+
+def test_closed_form_precalc_keeps_precalc_bat_checks(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A closed-form precalc run is simulated as default but BAT-checked as precalc."""
+    import utils.mid.patches as patches
+    from utils.mid.precalc_solver import PrecalcSolution
+
+    seen: dict[str, str | None] = {}
+
+    class RecordingSimulator:
+        def __init__(self, *, run_type, **_kwargs):
+            seen["simulated_as"] = run_type
+
+        def simulate(self, **_kwargs):
+            seen["bat_checked_as"] = patches._bat_check_run_type
+
+    solution = PrecalcSolution(tariffs={"flat": {"rate": 0.2}}, rate_unity={})
+    monkeypatch.setattr(rs, "load_inputs", lambda *_a, **_k: _fake_inputs())
+    monkeypatch.setattr(rs, "_configure_workers", lambda *_a: None)
+    monkeypatch.setattr(
+        rs, "_initialize_tariffs", lambda **_k: ({"flat": {"rate": 0.1}}, None)
+    )
+    monkeypatch.setattr(rs, "_build_precalc_period_mapping", lambda _p: None)
+    monkeypatch.setattr(rs, "_return_export_compensation_rate", lambda **_k: 0.0)
+    monkeypatch.setattr(rs, "solve_precalc", lambda *_a: solution)
+    monkeypatch.setattr(rs, "MeetRevenueSufficiencySystemWide", RecordingSimulator)
+
+    assert rs.run(_settings(tmp_path), closed_form_precalc=True) is None
+    assert seen == {"simulated_as": "default", "bat_checked_as": "precalc"}
+    assert patches._bat_check_run_type is None
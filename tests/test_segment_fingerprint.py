@@ -0,0 +1,79 @@
+"""Tests for utils/post/segment_fingerprint.py (incremental master rebuilds)."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from pathlib import Path
+
+from utils.post.run_manifest import write_manifest_entry
+from utils.post.segment_fingerprint import (
+    files_digest,
+    fingerprint_uri,
+    read_fingerprint,
+    run_fingerprint,
+    segment_digest,
+    write_fingerprint,
+)
+
+
+def _run_dir(batch: Path, name: str, bills: str = "bldg_id,bill\n1,10.0\n") -> Path:
+    run_dir = batch / f"20260803_120000_{name}"
+    (run_dir / "bills").mkdir(parents=True)
+    (run_dir / "bills" / "elec_bills_year_target.csv").write_text(bills)
+    return run_dir
+
+
+def test_run_fingerprint_uses_manifest_hashes(tmp_path: Path):
+    run_dir = _run_dir(tmp_path, "md_bge_default_precalc_delivery")
+    write_manifest_entry(
+        tmp_path,
+        "md_bge_default_precalc_delivery",
+        run_dir,
+        started_at=datetime(2026, 8, 3, tzinfo=UTC),
+    )
+
+    kind, hashes = run_fingerprint(str(run_dir))
+
+    assert kind == "manifest"
+    assert [path for path, _ in hashes] == ["bills/elec_bills_year_target.csv"]
+
+
+def test_run_fingerprint_falls_back_to_listing(tmp_path: Path):
+    run_dir = _run_dir(tmp_path, "md_bge_default_precalc_delivery")
+
+    before = run_fingerprint(str(run_dir))
+    (run_dir / "bills" / "elec_bills_year_target.csv").write_text("bldg_id,bill\n")
+
+    assert before[0] == "listing"
+    assert run_fingerprint(str(run_dir)) != before
+
+
+def test_files_digest_tracks_content(tmp_path: Path):
+    tariff = tmp_path / "bge.json"
+    tariff.write_text('{"rate": 1.0}')
+    before = files_digest([tariff])
+
+    tariff.write_text('{"rate": 1.5}')
+
+    assert files_digest([tariff]) != before
+
+
+def test_baseline_digest_invalidates_dependents():
+    parts = {"segment": "hp_seasonal_precalc", "baseline_digest": "a"}
+
+    assert segment_digest(parts) == segment_digest(dict(parts))
+    assert segment_digest(parts) != segment_digest({**parts, "baseline_digest": "b"})
+
+
+def test_fingerprint_roundtrip(tmp_path: Path):
+    uri = fingerprint_uri(f"{tmp_path}/default_precalc/", "comb_bills_year_target")
+
+    assert uri.endswith("default_precalc/comb_bills_year_target.fingerprint.json")
+    assert read_fingerprint(uri) is None
+
+    write_fingerprint(uri, "abc", {"segment": "default_precalc"})
+
+    assert read_fingerprint(uri) == {
+        "digest": "abc",
+        "parts": {"segment": "default_precalc"},
+    }
@@ -11,10 +11,15 @@ import numpy as np
 import pandas as pd
 import polars as pl
 from cairo.rates_tool import config
-from cairo.rates_tool.loads import __timeshift__
 from cloudpathlib import S3Path
 
+from utils.calendar_align import replace_year, timeshift_frame
 from utils.file_io import get_aws_storage_options
+from utils.loads import (
+    load_matrix_path,
+    load_matrix_stale_reason,
+    read_load_matrix_bldg_ids,
+)
 from utils.types import ElectricUtility
 
 CambiumPathLike = str | Path | S3Path
@@ -117,7 +122,7 @@ def _load_cambium_marginal_costs(
       (float). Costs are in $/MWh. Exactly 8760 rows (hourly). No partition columns
       in the DataFrame (single-file read).
     - Both: we divide cost columns by 1000 to get $/kWh; then common_year alignment,
-      __timeshift__ to target_year, and tz_localize("EST") so output matches CAIRO.
+      timeshift to target_year, and tz_localize("EST") so output matches CAIRO.
     """
     path = _normalize_mc_path(cambium_scenario)
     if not path.exists():
@@ -165,12 +170,10 @@ def _load_cambium_marginal_costs(
     common_years = [2017, 2023, 2034, 2045, 2051]
     year_diff = [abs(y - target_year) for y in common_years]
     common_year = common_years[year_diff.index(min(year_diff))]
-    df.index = pd.DatetimeIndex(
-        [t.replace(year=common_year) for t in df.index],
-        name="time",
-    )
-    df = __timeshift__(df, target_year)
-    df.index = df.index.tz_localize("EST")
+    times, keep = replace_year(df.index.to_numpy(), common_year)
+    df = df.loc[keep].set_axis(pd.DatetimeIndex(times[keep], name="time"))
+    df = timeshift_frame(df, target_year)
+    df.index = pd.DatetimeIndex(df.index).tz_localize("EST")
     df.index.name = "time"
     return df
 
@@ -226,12 +229,13 @@ def _load_supply_mc_column(
 
     common_year = df.index[0].year
     if common_year != target_year:
-        df = __timeshift__(df, target_year)
+        df = timeshift_frame(df, target_year)
 
-    if df.index.tz is None:
-        df.index = df.index.tz_localize("EST")
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is None:
+        df.index = index.tz_localize("EST")
     else:
-        df.index = df.index.tz_convert("EST")
+        df.index = index.tz_convert("EST")
     df.index.name = "time"
     return df
 
@@ -365,16 +369,29 @@ def build_bldg_id_to_load_filepath(
     path_resstock_loads: Path,
     building_ids: list[int] | None = None,
     return_path_base: Path | None = None,
+    *,
+    utility: str | None = None,
 ) -> dict[int, Path]:
     """
     Build a dictionary mapping building IDs to their load file paths.
 
+    When *utility* is given and a packed load matrix exists for it (see
+    ``data/resstock/load_curve/build_load_matrix.py``), every building in the
+    matrix maps to the matrix file itself and only its ``bldg_id`` index is
+    read — no directory listing. ``_return_loads_combined`` recognises that
+    mapping and slices rows from the memory-mapped matrix. A matrix whose
+    recorded hourly source files were since rewritten or removed (see
+    ``utils.loads.load_matrix_stale_reason``) is skipped with a warning.
+    Matrices are local only; S3 load directories always use the parquet
+    listing.
+
     Args:
         path_resstock_loads: Directory containing parquet load files to scan
         building_ids: Optional list of building IDs to include. If None, includes all.
         return_path_base: Base directory for returned paths.
             If None, returns actual file paths from path_resstock_loads.
             If Path, returns paths as return_path_base / filename.
+        utility: Optional utility whose packed load matrix to prefer.
 
     Returns:
         Dictionary mapping building ID (int) to full file path (Path)
@@ -382,11 +399,34 @@ def build_bldg_id_to_load_filepath(
     Raises:
         FileNotFoundError: If path_resstock_loads does not exist
     """
+    building_ids_set = set(building_ids) if building_ids is not None else None
+
+    if (
+        utility is not None
+        and return_path_base is None
+        and not isinstance(path_resstock_loads, S3Path)
+    ):
+        matrix_path = load_matrix_path(path_resstock_loads, utility)
+        if matrix_path.exists():
+            stale = load_matrix_stale_reason(matrix_path, path_resstock_loads)
+            if stale is None:
+                matrix_ids = read_load_matrix_bldg_ids(matrix_path)
+                log.info("Using packed load matrix %s", matrix_path)
+                return {
+                    int(bid): matrix_path
+                    for bid in matrix_ids
+                    if building_ids_set is None or int(bid) in building_ids_set
+                }
+            log.warning(
+                "Packed load matrix %s is stale (%s); reading hourly parquet "
+                "files instead. Rebuild it with build_load_matrix.py.",
+                matrix_path,
+                stale,
+            )
+
     if not path_resstock_loads.exists():
         raise FileNotFoundError(f"Load directory not found: {path_resstock_loads}")
 
-    building_ids_set = set(building_ids) if building_ids is not None else None
-
     bldg_id_to_load_filepath = {}
     for parquet_file in path_resstock_loads.glob("*.parquet"):
         try:
@@ -675,24 +715,6 @@ def _flex_shift_hour_share_from_groups(
     return np.where(np.isfinite(out), out, 0.0)
 
 
-def _zero_unsafe_period_shifts_and_rebalance(
-    targets: pd.DataFrame,
-    *,
-    receiver_period: int,
-    min_abs_kwh: float,
-) -> pd.DataFrame:
-    """Drop shifts for unsafe building-periods; set receiver shift to close the sum per building."""
-    out = targets.copy()
-    unsafe = (out["Q_orig"] <= 0) | (out["Q_orig"].abs() < float(min_abs_kwh))
-    out.loc[unsafe, "load_shift"] = 0.0
-    recv_mask = out["energy_period"] == receiver_period
-    donor_sum = out.loc[~recv_mask].groupby("bldg_id", sort=False)["load_shift"].sum()
-    out.loc[recv_mask, "load_shift"] = (
-        out.loc[recv_mask, "bldg_id"].map(-donor_sum).fillna(0.0).astype(np.float64)
-    )
-    return out
-
-
 def extract_tou_period_rates(tou_tariff: dict) -> pd.DataFrame:
     """Extract period-level TOU rates from a URDB-style tariff.
 
@@ -892,6 +914,180 @@ def _shift_building_hourly_demand(
     return shifted, tracker
 
 
+def _period_sums(
+    values_2d: np.ndarray, hour_pidx: np.ndarray, n_periods: int
+) -> np.ndarray:
+    """Sum ``(n_bldg, n_hours)`` values by hour -> period index with segment reductions."""
+    order = np.argsort(hour_pidx, kind="stable")
+    pidx_sorted = hour_pidx[order]
+    starts = np.flatnonzero(np.r_[True, pidx_sorted[1:] != pidx_sorted[:-1]])
+    sums = np.zeros((values_2d.shape[0], n_periods))
+    if len(order):
+        sums[:, pidx_sorted[starts]] = np.add.reduceat(
+            values_2d[:, order], starts, axis=1
+        )
+    return sums
+
+
+def _receiver_period_index(
+    period_values: np.ndarray, rates: np.ndarray, receiver_period: int | None
+) -> int | None:
+    """Column of the zero-sum sink period: *receiver_period*, else the lowest rate."""
+    if receiver_period is None:
+        return int(np.nanargmin(rates))
+    hits = np.flatnonzero(period_values == receiver_period)
+    return int(hits[0]) if len(hits) else None
+
+
+def _tou_period_load_shift(
+    q_orig: np.ndarray,
+    rates: np.ndarray,
+    demand_elasticity: float,
+    equivalent_flat_tariff: float | None,
+    recv_idx: int | None,
+    min_abs_kwh: float,
+) -> tuple[float, np.ndarray]:
+    """Array form of the period targets, unsafe-period zeroing and receiver rebalance.
+
+    Args:
+        q_orig: ``(n_bldg, n_periods)`` baseline consumption per building-period.
+        rates: ``(n_periods,)`` energy rate per period column.
+        demand_elasticity: Constant demand elasticity parameter.
+        equivalent_flat_tariff: Comparator flat rate; computed from the slice
+            (``sum(Q * P) / sum(Q)``) when ``None``.
+        recv_idx: Receiver period column, or ``None`` for no rebalancing.
+        min_abs_kwh: Minimum positive period sum before a shift is applied.
+
+    Returns:
+        Tuple of the flat comparator rate and the ``(n_bldg, n_periods)``
+        ``load_shift`` array (zero-sum per building when *recv_idx* is set).
+    """
+    if equivalent_flat_tariff is None:
+        class_q = q_orig.sum(axis=0)
+        total_demand = float(class_q.sum())
+        if total_demand <= 0:
+            raise ValueError("Cannot compute equivalent flat tariff with zero demand.")
+        equivalent_flat_tariff = float(np.nansum(class_q * rates) / total_demand)
+
+    load_shift = q_orig * (rates / equivalent_flat_tariff) ** demand_elasticity - q_orig
+    unsafe = (q_orig <= 0) | (np.abs(q_orig) < float(min_abs_kwh))
+    load_shift[unsafe] = 0.0
+    if recv_idx is not None:
+        donors = np.arange(q_orig.shape[1]) != recv_idx
+        load_shift[:, recv_idx] = -np.nansum(load_shift[:, donors], axis=1)
+    return equivalent_flat_tariff, load_shift
+
+
+def _tou_shift_tracker(
+    bldg_ids: np.ndarray,
+    period_values: np.ndarray,
+    q_orig: np.ndarray,
+    q_new: np.ndarray,
+    observed: np.ndarray,
+    rates: np.ndarray,
+    equivalent_flat_tariff: float,
+) -> pd.DataFrame:
+    """Period-level elasticity tracker for the observed building-periods."""
+    b_idx, p_idx = np.nonzero(observed)
+    tracker = pd.DataFrame(
+        {
+            "bldg_id": bldg_ids[b_idx],
+            "energy_period": period_values[p_idx],
+            "Q_orig": q_orig[b_idx, p_idx],
+            "Q_new": q_new[b_idx, p_idx],
+            "rate": rates[p_idx],
+        }
+    ).sort_values(["bldg_id", "energy_period"], ignore_index=True)
+    valid = (
+        (tracker["Q_new"] > 0)
+        & (tracker["Q_orig"] > 0)
+        & (tracker["rate"] != equivalent_flat_tariff)
+    )
+    tracker["epsilon"] = np.nan
+    tracker.loc[valid, "epsilon"] = np.log(
+        tracker.loc[valid, "Q_new"] / tracker.loc[valid, "Q_orig"]
+    ) / np.log(tracker.loc[valid, "rate"] / equivalent_flat_tariff)
+    return tracker
+
+
+def shift_tou_load_matrix(
+    net_2d: np.ndarray,
+    hour_periods: np.ndarray,
+    bldg_ids: np.ndarray,
+    period_rate: pd.Series,
+    demand_elasticity: float,
+    equivalent_flat_tariff: float | None = None,
+    receiver_period: int | None = None,
+    *,
+    min_period_abs_kwh: float | None = None,
+) -> tuple[np.ndarray, np.ndarray, pd.DataFrame]:
+    """Demand-response load shifting over a ``(n_bldg, n_hours)`` net-load matrix.
+
+    Same math as :func:`process_residential_hourly_demand_response_shift`, with
+    every building sharing one hour -> period code vector: period sums are
+    segment reductions, ``load_shift`` is an ``(n_bldg, n_periods)`` array and
+    the hourly shift is a gather of it weighted by the hour shares.
+
+    Args:
+        net_2d: ``(n_bldg, n_hours)`` hourly `electricity_net`, rows in
+            *bldg_ids* order.
+        hour_periods: ``(n_hours,)`` integer `energy_period` per column.
+        bldg_ids: Building ID per row (used for the tracker).
+        period_rate: Series mapping `energy_period -> rate`.
+        demand_elasticity: Constant demand elasticity parameter.
+        equivalent_flat_tariff: Optional comparator flat rate. If omitted,
+            computed endogenously from the matrix.
+        receiver_period: Optional sink period for zero-sum balancing.
+        min_period_abs_kwh: Minimum positive period sum (kWh) required before
+            applying shifts; defaults to ``FLEX_SHIFT_MIN_PERIOD_ABS_KWH``.
+
+    Returns:
+        Tuple of:
+        - shifted_net, ``(n_bldg, n_hours)``
+        - hourly_shift, ``(n_bldg, n_hours)``
+        - period-level elasticity tracker DataFrame
+    """
+    min_k = (
+        float(min_period_abs_kwh)
+        if min_period_abs_kwh is not None
+        else float(FLEX_SHIFT_MIN_PERIOD_ABS_KWH)
+    )
+    period_values, hour_pidx = np.unique(hour_periods, return_inverse=True)
+    n_periods = len(period_values)
+    rates = period_rate.reindex(period_values).to_numpy(dtype=np.float64)
+
+    q_orig = _period_sums(net_2d, hour_pidx, n_periods)
+    flat_tariff, load_shift = _tou_period_load_shift(
+        q_orig,
+        rates,
+        demand_elasticity,
+        equivalent_flat_tariff,
+        _receiver_period_index(period_values, rates, receiver_period),
+        min_k,
+    )
+
+    counts = np.bincount(hour_pidx, minlength=n_periods)
+    hour_share = _flex_shift_hour_share_from_groups(
+        net_2d,
+        q_orig[:, hour_pidx],
+        counts[hour_pidx],
+        min_abs_kwh=min_k,
+    )
+    hourly_shift = load_shift[:, hour_pidx] * hour_share
+    shifted_net = net_2d + hourly_shift
+
+    tracker = _tou_shift_tracker(
+        np.asarray(bldg_ids),
+        period_values,
+        q_orig,
+        q_orig + _period_sums(hourly_shift, hour_pidx, n_periods),
+        np.broadcast_to(counts > 0, q_orig.shape),
+        rates,
+        flat_tariff,
+    )
+    return shifted_net, hourly_shift, tracker
+
+
 def process_residential_hourly_demand_response_shift(
     hourly_load_df: pd.DataFrame,
     period_rate: pd.Series,
@@ -930,83 +1126,53 @@ def process_residential_hourly_demand_response_shift(
         else float(FLEX_SHIFT_MIN_PERIOD_ABS_KWH)
     )
 
-    period_consumption = _build_period_consumption(hourly_load_df)
-    flat_tariff = (
-        _compute_equivalent_flat_tariff(period_consumption, period_rate)
-        if equivalent_flat_tariff is None
-        else equivalent_flat_tariff
+    # Integer-code rows by (building, period); every per-group quantity below
+    # is an (n_bldg, n_periods) array indexed by those codes.
+    bldg_ids, b_idx = np.unique(
+        hourly_load_df["bldg_id"].to_numpy(), return_inverse=True
     )
-    period_targets = _build_period_shift_targets(
-        period_consumption=period_consumption,
-        period_rate=period_rate,
-        demand_elasticity=demand_elasticity,
-        equivalent_flat_tariff=flat_tariff,
-        receiver_period=receiver_period,
+    period_values, p_idx = np.unique(
+        hourly_load_df["energy_period"].to_numpy(), return_inverse=True
     )
-    recv_period = (
-        int(period_targets.loc[period_targets["rate"].idxmin(), "energy_period"])
-        if receiver_period is None
-        else int(receiver_period)
-    )
-    period_targets = _zero_unsafe_period_shifts_and_rebalance(
-        period_targets,
-        receiver_period=recv_period,
-        min_abs_kwh=min_k,
-    )
-
-    # Broadcast period-level targets to hourly rows without a full merge.
-    # period_targets is small (~buildings × periods); hourly_load_df can be
-    # tens of millions of rows.  A merge would double memory; instead we use
-    # groupby.transform for Q_orig and a keyed lookup for load_shift.
-    pt_idx = period_targets.set_index(["bldg_id", "energy_period"])
-    load_shift_map = pt_idx["load_shift"].to_dict()
-
-    grp = hourly_load_df.groupby(["bldg_id", "energy_period"], sort=False)
-    q_orig = grp["electricity_net"].transform("sum")
-    n_in_group = grp["electricity_net"].transform("size")
+    n_bldg, n_periods = len(bldg_ids), len(period_values)
+    group = b_idx * n_periods + p_idx
+    net = hourly_load_df["electricity_net"].to_numpy(dtype=np.float64)
+    rates = period_rate.reindex(period_values).to_numpy(dtype=np.float64)
 
-    hourly_keys = tuple(
-        zip(hourly_load_df["bldg_id"], hourly_load_df["energy_period"], strict=False)
+    q_orig = np.bincount(group, weights=net, minlength=n_bldg * n_periods).reshape(
+        n_bldg, n_periods
     )
-    load_shift_arr = np.array(
-        [load_shift_map.get(k, 0.0) for k in hourly_keys], dtype=np.float64
+    counts = np.bincount(group, minlength=n_bldg * n_periods).reshape(n_bldg, n_periods)
+    flat_tariff, load_shift = _tou_period_load_shift(
+        q_orig,
+        rates,
+        demand_elasticity,
+        equivalent_flat_tariff,
+        _receiver_period_index(period_values, rates, receiver_period),
+        min_k,
     )
-    del hourly_keys
 
     hour_share = _flex_shift_hour_share_from_groups(
-        hourly_load_df["electricity_net"].to_numpy(),
-        q_orig.to_numpy(),
-        n_in_group.to_numpy(),
+        net,
+        q_orig.ravel()[group],
+        counts.ravel()[group],
         min_abs_kwh=min_k,
     )
-    hourly_shift = load_shift_arr * hour_share
-    shifted_net = hourly_load_df["electricity_net"].values + hourly_shift
-
-    # Tracker: period-level elasticity diagnostics (tiny).
-    tracker = (
-        pd.DataFrame(
-            {
-                "bldg_id": hourly_load_df["bldg_id"],
-                "energy_period": hourly_load_df["energy_period"],
-                "electricity_net": hourly_load_df["electricity_net"],
-                "shifted_net": shifted_net,
-            }
-        )
-        .groupby(["bldg_id", "energy_period"], as_index=False)
-        .agg(Q_orig=("electricity_net", "sum"), Q_new=("shifted_net", "sum"))
-    )
-    rate_map = period_rate.to_dict()
-    tracker["rate"] = tracker["energy_period"].map(rate_map)
-    valid = (
-        (tracker["Q_new"] > 0)
-        & (tracker["Q_orig"] > 0)
-        & (tracker["rate"] != flat_tariff)
+    hourly_shift = load_shift.ravel()[group] * hour_share
+    shifted_net = net + hourly_shift
+
+    q_shift = np.bincount(
+        group, weights=hourly_shift, minlength=n_bldg * n_periods
+    ).reshape(n_bldg, n_periods)
+    tracker = _tou_shift_tracker(
+        bldg_ids,
+        period_values,
+        q_orig,
+        q_orig + q_shift,
+        counts > 0,
+        rates,
+        flat_tariff,
     )
-    tracker["epsilon"] = np.nan
-    tracker.loc[valid, "epsilon"] = np.log(
-        tracker.loc[valid, "Q_new"] / tracker.loc[valid, "Q_orig"]
-    ) / np.log(tracker.loc[valid, "rate"] / flat_tariff)
-
     return shifted_net, hourly_shift, tracker
 
 
@@ -1046,6 +1212,28 @@ def _infer_season_groups_from_tariff(
     return groups
 
 
+def _building_major_bldg_ids(
+    index: pd.Index, time_idx: pd.DatetimeIndex
+) -> np.ndarray | None:
+    """Building ID per row block when *index* is ``(bldg_id, time)`` building-major.
+
+    Returns the ``(n_bldg,)`` building IDs when *index* is a MultiIndex and
+    every building occupies one contiguous block of rows whose times equal
+    *time_idx*, so the frame's rows reshape to ``(n_bldg, len(time_idx))``;
+    otherwise ``None``.
+    """
+    n_hours = len(time_idx)
+    if not isinstance(index, pd.MultiIndex) or n_hours == 0 or len(index) % n_hours:
+        return None
+    bldg = np.asarray(index.get_level_values("bldg_id")).reshape(-1, n_hours)
+    if not (bldg == bldg[:, :1]).all():
+        return None
+    times = pd.DatetimeIndex(index.get_level_values("time")).asi8.reshape(-1, n_hours)
+    if not (times == time_idx.asi8).all():
+        return None
+    return bldg[:, 0]
+
+
 def apply_runtime_tou_demand_response(
     raw_load_elec: pd.DataFrame,
     tou_bldg_ids: list[int],
@@ -1097,10 +1285,6 @@ def apply_runtime_tou_demand_response(
     )
     period_map = assign_hourly_periods(time_idx, tou_tariff)
 
-    # Period lookup: 8760 rows (tiny), used to tag each season slice.
-    period_lookup = period_map.reset_index()
-    period_lookup.columns = pd.Index(["time", "energy_period"])
-
     shifted_load_elec = raw_load_elec if inplace else raw_load_elec.copy()
     _log_rss("after shifted_load_elec " + ("(inplace)" if inplace else "copy"))
 
@@ -1114,11 +1298,26 @@ def apply_runtime_tou_demand_response(
         season_groups = _infer_season_groups_from_tariff(period_map)
 
     trackers: list[pd.DataFrame] = []
-    time_level = pd.DatetimeIndex(shifted_load_elec.index.get_level_values("time"))
-    # Use DatetimeIndex.month (not to_series().dt) so the result stays positionally
-    # aligned with the MultiIndex rows for boolean indexing below.
-    month_level = cast(Any, time_level).month
     has_load_data = "load_data" in shifted_load_elec.columns
+    net_col = shifted_load_elec.columns.get_loc("electricity_net")
+    load_col = shifted_load_elec.columns.get_loc("load_data") if has_load_data else None
+    hour_periods_all = period_map.to_numpy()
+
+    # Frames from _return_loads_combined are building-major with the same
+    # sorted hours per building, so the cohort is a (n_tou, n_hours) matrix
+    # whose rows are contiguous row slices of the frame. Other layouts fall
+    # back to the long-format shift with the same positional writeback.
+    layout_ids = _building_major_bldg_ids(shifted_load_elec.index, time_idx)
+    if layout_ids is not None:
+        n_hours = len(time_idx)
+        tou_rows = np.flatnonzero(np.isin(layout_ids, list(tou_set)))
+        hour_months = np.asarray(cast(Any, time_idx).month)
+    else:
+        time_level = pd.DatetimeIndex(shifted_load_elec.index.get_level_values("time"))
+        # Use DatetimeIndex.month (not to_series().dt) so the result stays
+        # positionally aligned with the MultiIndex rows.
+        month_level = cast(Any, time_level).month
+        row_hour = time_idx.get_indexer(time_level)
 
     def _shift_season(season_name: str, season_months: set[int]) -> None:
         """Shift one season's TOU rows in-place on shifted_load_elec."""
@@ -1130,38 +1329,59 @@ def apply_runtime_tou_demand_response(
         if season_eps == 0.0:
             return
 
-        mask = bldg_level.isin(tou_set) & month_level.isin(season_months)
-        season_df = (
-            shifted_load_elec.loc[mask, ["electricity_net"]].copy().reset_index()
-        )
-        if season_df.empty:
-            return
-        season_df = season_df.merge(period_lookup, on="time", how="left")
-        if season_df["energy_period"].dropna().empty:
-            return
-        _log_rss(f"  season '{season_name}' slice ready ({len(season_df)} rows)")
-
-        shifted_net, hourly_shift_arr, tracker = (
-            process_residential_hourly_demand_response_shift(
-                hourly_load_df=season_df,
+        net_all = shifted_load_elec["electricity_net"].to_numpy()
+        if layout_ids is not None:
+            season_hours = np.flatnonzero(np.isin(hour_months, list(season_months)))
+            if not len(season_hours) or not len(tou_rows):
+                return
+            positions = (tou_rows[:, None] * n_hours + season_hours[None, :]).ravel()
+            _log_rss(
+                f"  season '{season_name}' slice ready "
+                f"({len(tou_rows)} bldgs x {len(season_hours)} hours)"
+            )
+            shifted_2d, hourly_shift_2d, tracker = shift_tou_load_matrix(
+                net_all[positions].reshape(len(tou_rows), len(season_hours)),
+                hour_periods_all[season_hours],
+                layout_ids[tou_rows],
                 period_rate=period_rate,
                 demand_elasticity=season_eps,
             )
-        )
+            shifted_net = shifted_2d.ravel()
+            hourly_shift_arr = hourly_shift_2d.ravel()
+            del shifted_2d, hourly_shift_2d
+        else:
+            positions = np.flatnonzero(
+                bldg_level.isin(tou_set) & month_level.isin(season_months)
+            )
+            if not len(positions):
+                return
+            season_df = pd.DataFrame(
+                {
+                    "bldg_id": bldg_level[positions],
+                    "energy_period": hour_periods_all[row_hour[positions]],
+                    "electricity_net": net_all[positions],
+                }
+            )
+            _log_rss(f"  season '{season_name}' slice ready ({len(season_df)} rows)")
+            shifted_net, hourly_shift_arr, tracker = (
+                process_residential_hourly_demand_response_shift(
+                    hourly_load_df=season_df,
+                    period_rate=period_rate,
+                    demand_elasticity=season_eps,
+                )
+            )
+            del season_df
         tracker["season"] = season_name
         trackers.append(tracker)
 
-        # Write shifted values back in-place via the MultiIndex.
-        idx = pd.MultiIndex.from_arrays(
-            [season_df["bldg_id"], season_df["time"]],
-            names=["bldg_id", "time"],
-        )
-        del season_df
-        shifted_load_elec.loc[idx, "electricity_net"] = shifted_net
-        if has_load_data:
-            shifted_load_elec.loc[idx, "load_data"] += hourly_shift_arr
+        # Write shifted values back by row position (no MultiIndex lookup).
+        shifted_load_elec.iloc[positions, net_col] = shifted_net
+        if load_col is not None:
+            shifted_load_elec.iloc[positions, load_col] = (
+                shifted_load_elec["load_data"].to_numpy()[positions] + hourly_shift_arr
+            )
 
-        del shifted_net, hourly_shift_arr, idx
+        del shifted_net, hourly_shift_arr, positions
         _log_rss(f"  season '{season_name}' writeback done")
 
     if season_groups:
@@ -0,0 +1,124 @@
+"""Calendar alignment of hourly profiles across years.
+
+Loads (ResStock AMY2018), supply MCs (ISO prices for one year, Cambium for a
+model year) and runs all live in different calendar years. Two operations move
+a profile from one year to another:
+
+- :func:`offset_years` / :func:`replace_year` relabel timestamps by whole
+  calendar years, keeping month, day and time of day (what Polars'
+  ``dt.offset_by`` and ``Timestamp.replace(year=...)`` do). Feb 29 has no counterpart in a
+  common year, so those rows are flagged for dropping. This is the only place
+  leap days are handled.
+- :func:`timeshift_frame` / :func:`weekday_shift_hours` +
+  :func:`shift_years` are CAIRO's ``__timeshift__`` for 8760-hour profiles:
+  values are rolled by whole days so weekdays line up with the target year,
+  and timestamps move from the source year's Jan 1 to the target's.
+
+Everything is integer offsets on ``datetime64`` arrays; nothing iterates per
+timestamp.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+HOURS_PER_YEAR = 8760
+
+_HOUR = np.timedelta64(1, "h")
+
+
+def _is_leap(years: np.ndarray) -> np.ndarray:
+    return (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+
+
+def _years(times: np.ndarray) -> np.ndarray:
+    return times.astype("datetime64[Y]").astype(np.int64) + 1970
+
+
+def hours_8760(year: int, unit: str = "us") -> np.ndarray:
+    """8760 consecutive hours from Jan 1 00:00 of *year* (naive wall clock).
+
+    Leap years have 8784 hours; CAIRO profiles are 8760 long, so Dec 31 is the
+    day dropped (Feb 29 is kept, matching ResStock and the timeshifted loads).
+    """
+    start = np.datetime64(f"{year}-01-01").astype(f"datetime64[{unit}]")
+    return start + np.arange(HOURS_PER_YEAR) * _HOUR
+
+
+def offset_years(
+    times: np.ndarray, years: int | np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Move naive ``datetime64`` *times* by whole calendar years.
+
+    Month, day and time of day are kept. Returns ``(shifted, keep)``: *keep* is
+    False for Feb 29 rows that land in a common year, which callers drop.
+    """
+    times = np.asarray(times)
+    months = times.astype("datetime64[M]")
+    within_month = times - months
+    shifted_months = months + np.asarray(years, dtype=np.int64) * 12
+    shifted = shifted_months.astype(times.dtype) + within_month
+    feb29 = ((months - months.astype("datetime64[Y]")).astype(np.int64) == 1) & (
+        within_month >= np.timedelta64(28, "D")
+    )
+    keep = ~(feb29 & ~_is_leap(_years(shifted_months)))
+    return shifted, keep
+
+
+def replace_year(times: np.ndarray, year: int) -> tuple[np.ndarray, np.ndarray]:
+    """Set the year of every timestamp to *year* (see :func:`offset_years`)."""
+    times = np.asarray(times)
+    return offset_years(times, year - _years(times))
+
+
+def weekday_shift_hours(source_year: int, target_year: int) -> int:
+    """Hours to roll a *source_year* profile so weekdays match *target_year*."""
+    days = (
+        dt.date(target_year, 1, 1).weekday() - dt.date(source_year, 1, 1).weekday()
+    ) % 7
+    return days * 24
+
+
+def shift_years(times: np.ndarray, target_year: int) -> np.ndarray:
+    """Move *times* so the first timestamp's Jan 1 becomes *target_year*'s Jan 1.
+
+    A fixed offset for every row, so an 8760-hour profile stays 8760
+    consecutive hours (a common-year profile moved into a leap year gains
+    Feb 29 and ends on Dec 30).
+    """
+    times = np.asarray(times)
+    source_year = int(_years(times[:1])[0])
+    delta = np.datetime64(f"{target_year}-01-01", "D") - np.datetime64(
+        f"{source_year}-01-01", "D"
+    )
+    return times + delta
+
+
+def roll_hours(values: np.ndarray, shift_hours: int, axis: int = -1) -> np.ndarray:
+    """Roll hourly *values* back by *shift_hours* along *axis* (a no-op for 0)."""
+    if shift_hours == 0:
+        return values
+    return np.roll(values, -shift_hours, axis=axis)
+
+
+def timeshift_frame(df: pd.DataFrame, target_year: int) -> pd.DataFrame:
+    """Weekday-align an hourly frame to *target_year* (CAIRO ``__timeshift__``).
+
+    The source year is the first timestamp's. A tz-aware index is shifted on
+    its wall clock and keeps its timezone.
+    """
+    index = pd.DatetimeIndex(df.index)
+    wall = index.tz_localize(None) if index.tz is not None else index
+    shift = weekday_shift_hours(int(wall[0].year), target_year)
+    shifted = pd.DatetimeIndex(
+        shift_years(wall.to_numpy(), target_year), name=index.name
+    )
+    if index.tz is not None:
+        shifted = shifted.tz_localize(index.tz)
+    return pd.DataFrame(
+        {col: roll_hours(df[col].to_numpy(), shift) for col in df.columns},
+        index=shifted,
+    )
@@ -458,8 +458,8 @@ def _run_nyiso(
 
     if load_year != year:
         print(f"\n  Remapping timestamps: {load_year} → {year}")
-        utility_hourly = utility_hourly.with_columns(
-            utility_hourly["timestamp"].dt.offset_by(f"{year - load_year}y")
+        utility_hourly = remap_year_if_needed(
+            utility_hourly, "timestamp", load_year, year
         )
 
     output_df = prepare_output(utility_hourly, year)
@@ -0,0 +1,148 @@
+"""Prebuild the aligned marginal-cost bundles for one utility's pipeline runs.
+
+Reads the utility's pipeline YAML and writes one bundle per variant (supply on
+and off) under the YAML's ``mc_bundle_dir`` (see ``mc_bundle.py`` for the
+layout). Each bundle holds the run-year-aligned energy, capacity, ancillary,
+bulk-tx and dist+sub-tx MCs that ``run_scenario.py`` would otherwise load and
+timeshift from S3 on every run.
+
+A bundle is skipped when its recorded source fingerprints (S3 ETags, local
+size/mtime) still match; pass ``--force`` to rebuild anyway. The MC
+regeneration recipes call it with ``--if-configured``, which exits quietly for
+utilities without a pipeline YAML or ``mc_bundle_dir``.
+
+Usage
+-----
+    uv run python utils/data_prep/marginal_costs/generate_mc_bundle.py \\
+        --state md --utility bge
+
+    # Explicit bundle root (overrides the YAML's mc_bundle_dir)
+    uv run python utils/data_prep/marginal_costs/generate_mc_bundle.py \\
+        --state ny --utility coned --mc-bundle-dir /ebs/cache/mc_bundles --force
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from rate_design.hp_rates.pipeline_config import (
+    load_pipeline_config,
+    mc_input_year,
+    supply_mc_path,
+)
+from utils.data_prep.marginal_costs.mc_bundle import (
+    McSources,
+    build_mc_bundle,
+    bundle_is_current,
+    mc_bundle_path,
+    write_mc_bundle,
+)
+from utils.post.pipeline_runs import pipeline_yaml_path
+
+load_dotenv()
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Prebuild run-aligned marginal-cost bundles (supply and delivery) "
+            "for one utility's pipeline runs."
+        )
+    )
+    parser.add_argument(
+        "--state", type=str, required=True, help="State code (e.g. md, ny)."
+    )
+    parser.add_argument(
+        "--utility", type=str, required=True, help="Utility short name (e.g. bge)."
+    )
+    parser.add_argument(
+        "--pipeline-yaml",
+        type=Path,
+        default=None,
+        help="Pipeline YAML (default: {state}/config/scenarios/pipeline_{utility}.yaml).",
+    )
+    parser.add_argument(
+        "--mc-bundle-dir",
+        type=str,
+        default=None,
+        help="Bundle root (default: the pipeline YAML's mc_bundle_dir).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild bundles even when their source fingerprints match.",
+    )
+    parser.add_argument(
+        "--if-configured",
+        action="store_true",
+        help="Exit quietly when there is no pipeline YAML or bundle root.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    yaml_path = args.pipeline_yaml or pipeline_yaml_path(args.state, args.utility)
+    if args.if_configured and not Path(yaml_path).exists():
+        print(f"No pipeline YAML at {yaml_path}; skipping MC bundles")
+        return
+    config = load_pipeline_config(yaml_path)
+    rd = config.run_defaults
+    root = args.mc_bundle_dir or rd.mc_bundle_dir
+    if not root and args.if_configured:
+        print(f"No mc_bundle_dir in {yaml_path}; skipping MC bundles")
+        return
+    if not root:
+        raise SystemExit(
+            f"No bundle root: set mc_bundle_dir in {yaml_path} or pass --mc-bundle-dir"
+        )
+    mc_year = mc_input_year(config)
+
+    print("=" * 60)
+    print(f"MC bundles: {config.state.upper()} / {config.utility}")
+    print(f"  Pipeline YAML:  {yaml_path}")
+    print(f"  MC year:        {mc_year}")
+    print(f"  Run year:       {config.year}")
+    print(f"  Bundle root:    {root}")
+    print("=" * 60)
+
+    for supply in (True, False):
+        sources = McSources.from_paths(
+            supply_energy=supply_mc_path(rd.mc_supply_energy, include_supply=supply),
+            supply_capacity=supply_mc_path(
+                rd.mc_supply_capacity, include_supply=supply
+            ),
+            dist_and_sub_tx=rd.mc_dist_and_sub_tx,
+            bulk_tx=rd.mc_bulk_tx or None,
+            supply_ancillary=rd.mc_supply_ancillary if supply else None,
+        )
+        key = {
+            "state": config.state.upper(),
+            "utility": config.utility,
+            "mc_year": mc_year,
+            "supply": supply,
+        }
+        path = mc_bundle_path(
+            root,
+            state=config.state,
+            utility=config.utility,
+            mc_year=mc_year,
+            year_run=config.year,
+            supply=supply,
+        )
+        print(f"\n── supply={str(supply).lower()} ──")
+        if not args.force and bundle_is_current(path, sources, config.year):
+            print(f"  Up to date: {path}")
+            continue
+        frame = build_mc_bundle(sources, config.year)
+        write_mc_bundle(path, frame, sources=sources, year_run=config.year, key=key)
+        print(f"  Wrote {path} ({len(frame)} rows, columns: {list(frame.columns)})")
+
+    print("\n✓ MC bundle generation completed")
+
+
+if __name__ == "__main__":
+    main()
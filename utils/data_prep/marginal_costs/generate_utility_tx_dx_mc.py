@@ -64,6 +64,7 @@ import polars as pl
 from cloudpathlib import S3Path
 from dotenv import load_dotenv
 
+from utils.calendar_align import shift_years
 from utils.file_io import get_aws_storage_options
 from utils.data_prep.marginal_costs.supply_utils import (
     warn_if_multiple_partition_parquets,
@@ -635,8 +636,14 @@ def main():
 
     if load_year != output_year:
         print(f"\n  Remapping load timestamps: {load_year} → {output_year}")
+        # Relabel the 8760 grid hour for hour, so a leap load year still
+        # yields the output year's CAIRO 8760 timestamps.
         load_df = load_df.with_columns(
-            pl.col("timestamp").dt.offset_by(f"{output_year - load_year}y")
+            pl.Series(
+                "timestamp",
+                shift_years(load_df["timestamp"].to_numpy(), output_year),
+                dtype=load_df.schema["timestamp"],
+            )
         )
 
     mc_df = load_marginal_cost_table(args.mc_table_path)
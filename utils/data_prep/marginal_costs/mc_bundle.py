@@ -0,0 +1,338 @@
+"""Prebuilt, run-aligned marginal-cost bundles.
+
+Every CAIRO run used to prepare its marginal costs from scratch: read the
+supply energy / capacity (/ ancillary) parquets or a Cambium file from S3,
+coerce numerics, remap and timeshift to the run year, then read and align the
+bulk-transmission and dist+sub-tx traces. All of that depends only on the MC
+inputs and the run year, so ``generate_mc_bundle.py`` does it once per
+(state, utility, mc_year, year_run, supply on/off) and writes the result as a
+single uncompressed Arrow IPC file::
+
+    {root}/state=NY/utility=coned/mc_year=2025/year=2025/supply=true/mc_bundle.arrow
+
+with 8760 rows: a ``time`` column (EST) and one $/kWh column per component
+(``energy``, ``capacity``, optionally ``ancillary``, ``dist_and_sub_tx``,
+optionally ``bulk_tx``). The schema metadata holds a JSON provenance header:
+the source paths, their fingerprints at build time, the run year and the
+bundle version.
+
+``run_scenario`` and demand-flex Phase 1.75 read a bundle instead of the
+loaders when its recorded sources match the run's MC paths and their current
+fingerprints (one stat or S3 listing per source) match the ones recorded at
+build time; otherwise they warn and fall back to the loaders. Bundles are built
+with the same loaders (``utils.cairo``), so both paths produce identical
+values. The MC regeneration recipes rebuild stale bundles on the way out.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+
+from utils.input_cache import path_fingerprint
+
+log = logging.getLogger(__name__)
+
+MC_BUNDLE_FILENAME = "mc_bundle.arrow"
+# Bump when the bundle layout or the loaders' output changes.
+MC_BUNDLE_VERSION = 1
+N_HOURS = 8760
+
+# Bundle column -> CAIRO column label.
+SUPPLY_COLUMNS = {
+    "energy": "Marginal Energy Costs ($/kWh)",
+    "capacity": "Marginal Capacity Costs ($/kWh)",
+    "ancillary": "Marginal Ancillary Costs ($/kWh)",
+}
+DELIVERY_MC_NAME = "Marginal Distribution Costs ($/kWh)"
+
+
+def _source(path: str | Path | None) -> str | None:
+    """A source path as recorded in provenance; blank becomes ``None``."""
+    return (str(path).strip() or None) if path is not None else None
+
+
+@dataclass(frozen=True, slots=True)
+class McSources:
+    """The MC input paths a bundle is built from, as a run passes them."""
+
+    supply_energy: str
+    supply_capacity: str
+    dist_and_sub_tx: str
+    bulk_tx: str | None = None
+    supply_ancillary: str | None = None
+
+    @classmethod
+    def from_paths(
+        cls,
+        *,
+        supply_energy: str | Path,
+        supply_capacity: str | Path,
+        dist_and_sub_tx: str | Path,
+        bulk_tx: str | Path | None = None,
+        supply_ancillary: str | Path | None = None,
+    ) -> McSources:
+        """Normalize paths to strings; blank optional paths become ``None``."""
+        return cls(
+            supply_energy=str(supply_energy),
+            supply_capacity=str(supply_capacity),
+            dist_and_sub_tx=str(dist_and_sub_tx),
+            bulk_tx=_source(bulk_tx),
+            supply_ancillary=_source(supply_ancillary),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class McBundle:
+    """A bundle read back by :func:`read_mc_bundle`."""
+
+    path: Path
+    provenance: dict[str, Any]
+    frame: pd.DataFrame  # bundle columns, indexed by EST ``time``
+
+    def supply_marginal_costs(self, *, ancillary: bool = True) -> pd.DataFrame:
+        """Supply MCs as ``_load_supply_marginal_costs`` returns them.
+
+        ``ancillary=False`` drops the ancillary column, matching a load without
+        ``ancillary_path``.
+        """
+        cols = [
+            c
+            for c in SUPPLY_COLUMNS
+            if c in self.frame.columns and (ancillary or c != "ancillary")
+        ]
+        return self.frame[cols].rename(columns=SUPPLY_COLUMNS)
+
+    def delivery_marginal_costs(self) -> pd.Series:
+        """Delivery MC as ``add_bulk_tx_and_dist_and_sub_tx_marginal_cost`` returns it."""
+        delivery = self.frame["dist_and_sub_tx"].copy()
+        if "bulk_tx" in self.frame.columns:
+            delivery = delivery + self.frame["bulk_tx"]
+        delivery.name = DELIVERY_MC_NAME
+        return delivery
+
+
+def mc_bundle_path(
+    root: str | Path,
+    *,
+    state: str,
+    utility: str,
+    mc_year: int,
+    year_run: int,
+    supply: bool,
+) -> Path:
+    """Bundle file for one (state, utility, mc_year, year_run, supply) key."""
+    return (
+        Path(root)
+        / f"state={state.upper()}"
+        / f"utility={utility.lower()}"
+        / f"mc_year={mc_year}"
+        / f"year={year_run}"
+        / f"supply={str(supply).lower()}"
+        / MC_BUNDLE_FILENAME
+    )
+
+
+def with_supply(path: str | Path, supply: bool) -> Path:
+    """The sibling bundle of *path* with supply on or off."""
+    path = Path(path)
+    return path.parent.parent / f"supply={str(supply).lower()}" / path.name
+
+
+def _fingerprint(path: str | Path | None) -> Any:
+    """A source fingerprint in its JSON form, as stored in the provenance."""
+    return json.loads(json.dumps(path_fingerprint(path), default=str))
+
+
+def _fingerprints(sources: McSources) -> dict[str, Any]:
+    return {name: _fingerprint(src) for name, src in asdict(sources).items()}
+
+
+def build_mc_bundle(sources: McSources, year_run: int) -> pd.DataFrame:
+    """Load, timeshift and align every MC component for *year_run*.
+
+    Uses the run-time loaders, so the bundle matches what a run would load.
+    """
+    # Imported here so the path helpers work without CAIRO installed.
+    from utils.cairo import (
+        _align_mc_to_index,
+        _load_supply_marginal_costs,
+        load_bulk_tx_marginal_costs,
+        load_dist_and_sub_tx_marginal_costs,
+    )
+
+    supply = _load_supply_marginal_costs(
+        sources.supply_energy,
+        sources.supply_capacity,
+        year_run,
+        ancillary_path=sources.supply_ancillary,
+    )
+    index = pd.DatetimeIndex(supply.index)
+    frame = supply.rename(columns={v: k for k, v in SUPPLY_COLUMNS.items()})
+    # Components are aligned exactly as add_bulk_tx_and_dist_and_sub_tx_marginal_cost
+    # aligns them, and summed only on read, so the delivery trace is unchanged.
+    frame["dist_and_sub_tx"] = _align_mc_to_index(
+        load_dist_and_sub_tx_marginal_costs(sources.dist_and_sub_tx),
+        index,
+        "dist_and_sub_tx",
+    )
+    if sources.bulk_tx is not None:
+        frame["bulk_tx"] = _align_mc_to_index(
+            load_bulk_tx_marginal_costs(sources.bulk_tx), index, "bulk_tx"
+        )
+    if len(frame) != N_HOURS or frame.isna().any().any():
+        raise ValueError(
+            f"MC bundle for year {year_run} has {len(frame)} rows or null values; "
+            f"expected {N_HOURS} complete rows"
+        )
+    frame.index.name = "time"
+    return frame
+
+
+def write_mc_bundle(
+    path: Path,
+    frame: pd.DataFrame,
+    *,
+    sources: McSources,
+    year_run: int,
+    key: dict[str, Any],
+) -> Path:
+    """Write *frame* with a provenance header as one Arrow IPC record batch."""
+    columns: dict[str, pa.Array] = {"time": pa.array(pd.DatetimeIndex(frame.index))}
+    for col in frame.columns:
+        columns[col] = pa.array(frame[col].to_numpy(dtype="float64"))
+    provenance = {
+        "version": MC_BUNDLE_VERSION,
+        "year_run": year_run,
+        **key,
+        "sources": asdict(sources),
+        "fingerprints": _fingerprints(sources),
+        "built_at": datetime.now(UTC).isoformat(),
+    }
+    table = pa.table(columns).replace_schema_metadata(
+        {b"provenance": json.dumps(provenance, default=str).encode()}
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with (
+        pa.OSFile(str(tmp_path), "wb") as sink,
+        pa.ipc.new_file(sink, table.schema) as writer,
+    ):
+        writer.write_table(table)
+    tmp_path.replace(path)
+    return path
+
+
+def read_mc_provenance(path: Path) -> dict[str, Any]:
+    """The provenance header of a bundle (reads only the schema)."""
+    with pa.memory_map(str(path), "r") as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    if b"provenance" not in metadata:
+        raise ValueError(f"{path} is not an MC bundle (no provenance metadata)")
+    return json.loads(metadata[b"provenance"])
+
+
+def read_mc_bundle(path: Path) -> McBundle:
+    """Read a bundle written by :func:`write_mc_bundle`."""
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    metadata = table.schema.metadata or {}
+    if b"provenance" not in metadata:
+        raise ValueError(f"{path} is not an MC bundle (no provenance metadata)")
+    frame = table.to_pandas().set_index("time")
+    return McBundle(
+        path=Path(path),
+        provenance=json.loads(metadata[b"provenance"]),
+        frame=frame,
+    )
+
+
+def bundle_matches(
+    provenance: dict[str, Any], year_run: int, **expected: str | Path | None
+) -> bool:
+    """Whether a bundle was built by this version for *year_run* from *expected*.
+
+    *expected* names the :class:`McSources` fields that must match, e.g.
+    ``supply_energy=...``; fields not named are not compared.
+    """
+    sources = provenance.get("sources", {})
+    return (
+        provenance.get("version") == MC_BUNDLE_VERSION
+        and provenance.get("year_run") == year_run
+        and all(sources.get(k) == _source(v) for k, v in expected.items())
+    )
+
+
+def changed_sources(
+    provenance: dict[str, Any], **expected: str | Path | None
+) -> list[str]:
+    """The *expected* sources whose contents changed since the bundle was built.
+
+    A source that can no longer be fingerprinted counts as changed.
+    """
+    recorded = provenance.get("fingerprints", {})
+    changed = []
+    for name, src in expected.items():
+        try:
+            current = _fingerprint(_source(src))
+        except FileNotFoundError:
+            current = None
+        if recorded.get(name) != current:
+            changed.append(name)
+    return changed
+
+
+def bundle_is_current(path: Path, sources: McSources, year_run: int) -> bool:
+    """Whether the bundle at *path* was built from *sources* as they are now."""
+    if not path.exists():
+        return False
+    provenance = read_mc_provenance(path)
+    return bundle_matches(provenance, year_run, **asdict(sources)) and provenance.get(
+        "fingerprints"
+    ) == _fingerprints(sources)
+
+
+def open_mc_bundle(
+    path: str | Path | None, year_run: int, **expected: str | Path | None
+) -> McBundle | None:
+    """The bundle at *path* if it matches *expected* (see :func:`bundle_matches`)
+    and none of those sources changed since it was built.
+
+    ``None`` (with a log line saying why) means the caller should load MCs
+    with the regular loaders.
+    """
+    if path is None:
+        return None
+    path = Path(path)
+    if not path.exists():
+        log.info("No MC bundle at %s; loading marginal costs from sources", path)
+        return None
+    bundle = read_mc_bundle(path)
+    if not bundle_matches(bundle.provenance, year_run, **expected):
+        log.warning(
+            "MC bundle %s was built from other inputs (%s, year_run=%s); "
+            "loading marginal costs from sources. Rebuild it with "
+            "generate_mc_bundle.py.",
+            path,
+            bundle.provenance.get("sources"),
+            bundle.provenance.get("year_run"),
+        )
+        return None
+    changed = changed_sources(bundle.provenance, **expected)
+    if changed:
+        log.warning(
+            "MC bundle %s (built %s) is older than its sources %s; loading "
+            "marginal costs from sources. Rebuild it with generate_mc_bundle.py.",
+            path,
+            bundle.provenance.get("built_at"),
+            changed,
+        )
+        return None
+    log.info("Read MC bundle %s", path)
+    return bundle
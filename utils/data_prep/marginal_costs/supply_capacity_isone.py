@@ -39,6 +39,7 @@ from utils.data_prep.marginal_costs.supply_utils import (
     ISONE_UTILITY_CAPACITY_ZONES,
     allocate_annual_exceedance_to_hours,
     build_cairo_8760_timestamps,
+    remap_year_if_needed,
     strip_tz_if_needed,
 )
 
@@ -523,10 +524,7 @@ def compute_isone_supply_capacity_mc(
     # Remap timestamps to price_year if using a different load year
     if capacity_load_year != year:
         print(f"\n  Remapping load timestamps: {capacity_load_year} → {year}")
-        offset = f"{year - capacity_load_year}y"
-        load_df = load_df.with_columns(
-            pl.col("timestamp").dt.offset_by(offset).alias("timestamp")
-        )
+        load_df = remap_year_if_needed(load_df, "timestamp", capacity_load_year, year)
 
     # 5. Allocate FCA cost to top-N annual peak hours
     print("\n── FCA Exceedance Allocation ──")
@@ -2,15 +2,14 @@
 
 from __future__ import annotations
 
-import calendar
 import io
-from datetime import datetime, timedelta
 from pathlib import Path
 
 import polars as pl
 from cloudpathlib import S3Path
 
 from data.pjm import PJM_LMP_S3_BASE
+from utils.calendar_align import hours_8760, offset_years
 from utils.numeric import as_float
 
 # ---------------------------------------------------------------------------
@@ -380,13 +379,17 @@ def load_zone_loads(
 def remap_year_if_needed(
     df: pl.DataFrame, timestamp_col: str, from_year: int, to_year: int
 ) -> pl.DataFrame:
-    """Offset timestamps by integer years when years differ."""
+    """Offset naive timestamps by integer years when years differ.
+
+    Feb 29 rows that land in a common year are dropped (see
+    ``utils.calendar_align.offset_years``).
+    """
     if from_year == to_year:
         return df
-    offset = f"{to_year - from_year}y"
+    shifted, keep = offset_years(df[timestamp_col].to_numpy(), to_year - from_year)
     return df.with_columns(
-        pl.col(timestamp_col).dt.offset_by(offset).alias(timestamp_col)
-    )
+        pl.Series(timestamp_col, shifted, dtype=df.schema[timestamp_col])
+    ).filter(pl.Series(keep))
 
 
 def build_cairo_8760_timestamps(year: int) -> pl.DataFrame:
@@ -400,22 +403,7 @@ def build_cairo_8760_timestamps(year: int) -> pl.DataFrame:
     The 2:00 AM spring-forward slot is included even though that hour does not
     exist in Eastern time — callers are expected to fill it by interpolation
     after a left-join against actual source data."""
-    start = datetime(year, 1, 1, 0, 0, 0)
-    end = datetime(year, 12, 31, 23, 0, 0)
-    timestamps: list[datetime] = []
-    cur = start
-    while cur <= end:
-        timestamps.append(cur)
-        cur += timedelta(hours=1)
-
-    if calendar.isleap(year):
-        timestamps = [t for t in timestamps if not (t.month == 12 and t.day == 31)]
-
-    if len(timestamps) != 8760:
-        raise ValueError(
-            f"Expected 8760 timestamps, got {len(timestamps)} for year {year}"
-        )
-    return pl.DataFrame({"timestamp": timestamps})
+    return pl.DataFrame({"timestamp": hours_8760(year)})
 
 
 def prepare_component_output(
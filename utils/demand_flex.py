@@ -13,18 +13,22 @@ from __future__ import annotations
 import json
 import logging
 import re
+from collections.abc import Collection, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, cast
 
+import numpy as np
 import pandas as pd
 from cairo.rates_tool.systemsimulator import _return_revenue_requirement_target
 
 from utils.cairo import (
+    _building_major_bldg_ids,
     _load_supply_marginal_costs,
     _log_rss,
     apply_runtime_tou_demand_response,
 )
+from utils.data_prep.marginal_costs.mc_bundle import open_mc_bundle
 from utils.pre.compute_tou import (
     SeasonTouSpec,
     combine_marginal_costs,
@@ -216,34 +220,83 @@ def recompute_tou_precalc_mapping(
 
 
 # ---------------------------------------------------------------------------
-# Per-TOU-subclass MC helper
+# Weighted cohort system loads
 # ---------------------------------------------------------------------------
 
 
-def _compute_tou_subclass_mc(
+def cohort_hourly_loads(
+    loads: np.ndarray,
+    weights: np.ndarray,
+    cohorts: Sequence[np.ndarray],
+) -> np.ndarray:
+    """Weighted hourly system load of each building cohort, in one matmul.
+
+    *loads* is ``(n_bldg, n_hours)``, *weights* the ``(n_bldg,)`` sample
+    weights and each cohort a boolean ``(n_bldg,)`` mask. Returns
+    ``(n_cohorts, n_hours)`` where row ``c`` is ``sum_b weights[b] * loads[b]``
+    over the buildings in cohort ``c``.
+    """
+    cohort_weights = np.zeros((len(cohorts), loads.shape[0]))
+    for row, mask in enumerate(cohorts):
+        cohort_weights[row] = np.where(mask, weights, 0.0)
+    return cohort_weights @ loads
+
+
+@dataclass(frozen=True, slots=True)
+class CohortLoads:
+    """Hourly weighted ``electricity_net`` per cohort, from :func:`_cohort_system_loads`."""
+
+    times: pd.DatetimeIndex
+    n_bldg: int
+    curves: np.ndarray  # (n_cohorts, n_hours)
+
+    def series(self, cohort: int) -> pd.Series:
+        return pd.Series(self.curves[cohort], index=self.times)
+
+
+def _cohort_system_loads(
     load_elec: pd.DataFrame,
-    tou_bldg_ids: set[int],
     customer_metadata: pd.DataFrame,
-    mc_prices: pd.Series,
-) -> float:
-    """Compute the weighted annual marginal cost for one TOU subclass.
-
-    Filters *load_elec* to *tou_bldg_ids*, weights by building sample weight,
-    aggregates to an hourly system load, and sums load × MC over the year.
-    The MC price series index is used for alignment (truncating the load to
-    match its length, consistent with how Phase 1.75 handles alignment).
+    cohorts: Sequence[Collection[int]],
+) -> CohortLoads:
+    """Weighted hourly system load of each cohort of building IDs in *load_elec*.
+
+    Building-major frames (as loaded for CAIRO) are viewed as an
+    ``(n_bldg, n_hours)`` matrix without copying; other layouts are first
+    summed into one. Buildings without a sample weight count as weight 0.
     """
-    sample_weights = customer_metadata[["bldg_id", "weight"]]
-    bldg_level = load_elec.index.get_level_values("bldg_id")
-    sub = load_elec.loc[bldg_level.isin(tou_bldg_ids)]
-    weighted = sub.reset_index().merge(sample_weights, on="bldg_id")
-    weighted["electricity_net"] = weighted["electricity_net"] * weighted["weight"]
-    sys_load_raw = weighted.groupby("time")["electricity_net"].sum()
-    sys_load = pd.Series(
-        sys_load_raw.values[: len(mc_prices)],
-        index=pd.DatetimeIndex(mc_prices.index),
+    index = cast(pd.MultiIndex, load_elec.index)
+    times = pd.DatetimeIndex(index.get_level_values("time").unique().sort_values())
+    net = load_elec["electricity_net"].to_numpy()
+    bldg_ids = _building_major_bldg_ids(index, times)
+    if bldg_ids is not None:
+        loads = net.reshape(len(bldg_ids), len(times))
+    else:
+        bldg_codes, uniques = pd.factorize(index.get_level_values("bldg_id"))
+        bldg_ids = np.asarray(uniques)
+        loads = np.zeros((len(bldg_ids), len(times)))
+        np.add.at(
+            loads,
+            (bldg_codes, times.get_indexer(index.get_level_values("time"))),
+            net,
+        )
+    weights = (
+        customer_metadata.set_index("bldg_id")["weight"]
+        .reindex(bldg_ids)
+        .fillna(0.0)
+        .to_numpy(dtype=float)
+    )
+    masks = [np.isin(bldg_ids, list(cohort)) for cohort in cohorts]
+    return CohortLoads(
+        times=times,
+        n_bldg=len(bldg_ids),
+        curves=cohort_hourly_loads(loads, weights, masks),
     )
-    return float((mc_prices * sys_load).sum())
+
+
+def _annual_mc(sys_load: np.ndarray, mc_prices: pd.Series) -> float:
+    """Sum of hourly system load × MC, truncating the load to the MC's length."""
+    return float(np.dot(mc_prices.to_numpy(), sys_load[: len(mc_prices)]))
 
 
 # ---------------------------------------------------------------------------
@@ -267,12 +320,23 @@ def apply_demand_flex(
     dist_and_sub_tx_marginal_costs: pd.Series,
     path_tou_supply_energy_mc: str | Path | None = None,
     path_tou_supply_capacity_mc: str | Path | None = None,
+    path_tou_mc_bundle: str | Path | None = None,
     run_includes_subclasses: bool = False,
+    original_rr_target: tuple[Any, Any] | None = None,
 ) -> DemandFlexResult:
     """Run the full demand-flex pipeline (phases 1a, 1.5, 1.75, 2).
 
     Returns a DemandFlexResult with shifted loads, updated precalc mapping,
     recomputed revenue requirement, and marginal cost outputs.
+
+    ``original_rr_target`` is ``(revenue_requirement, costs_by_type)`` from
+    ``_return_revenue_requirement_target`` on *raw_load_elec*, when the
+    caller already has it (e.g. from the shared input cache); Phase 1a then
+    reuses it instead of recomputing.
+
+    ``path_tou_mc_bundle`` is the supply-on MC bundle for this run (see
+    ``utils.data_prep.marginal_costs.mc_bundle``); Phase 1.75 reads the real
+    supply MCs from it when it was built from the TOU supply MC paths.
     """
     # Identify which tariffs are diurnal TOU
     tou_tariff_keys = [
@@ -307,21 +371,25 @@ def apply_demand_flex(
     # costs) stays fixed. See context/code/cairo/demand_flex_residual_treatment.md.
     _log_rss("apply_demand_flex: before Phase 1a")
     log.info(".... Phase 1a: computing frozen residual from original loads")
-    (
-        full_rr_orig,
-        _msp_orig,
-        _msc_orig,
-        costs_by_type_orig,
-    ) = _return_revenue_requirement_target(
-        building_load=raw_load_elec,
-        sample_weight=customer_metadata[["bldg_id", "weight"]],
-        revenue_requirement_target=rr_total,
-        residual_cost=None,
-        residual_cost_frac=None,
-        bulk_marginal_costs=bulk_marginal_costs,
-        distribution_marginal_costs=dist_and_sub_tx_marginal_costs,
-        low_income_strategy=None,
-    )
+    if original_rr_target is not None:
+        full_rr_orig, costs_by_type_orig = original_rr_target
+    else:
+        (
+            full_rr_orig,
+            _msp_orig,
+            _msc_orig,
+            costs_by_type_orig,
+        ) = _return_revenue_requirement_target(
+            building_load=raw_load_elec,
+            sample_weight=customer_metadata[["bldg_id", "weight"]],
+            revenue_requirement_target=rr_total,
+            residual_cost=None,
+            residual_cost_frac=None,
+            bulk_marginal_costs=bulk_marginal_costs,
+            distribution_marginal_costs=dist_and_sub_tx_marginal_costs,
+            low_income_strategy=None,
+        )
+        del _msp_orig, _msc_orig
     total_mc_orig = float(costs_by_type_orig["Total Marginal Costs ($)"])
     frozen_residual: float = float(full_rr_orig) - total_mc_orig
     log.info(
@@ -331,7 +399,7 @@ def apply_demand_flex(
         float(full_rr_orig),
         total_mc_orig,
     )
-    del full_rr_orig, _msp_orig, _msc_orig, costs_by_type_orig
+    del full_rr_orig, costs_by_type_orig
     _log_rss("apply_demand_flex: after Phase 1a del")
 
     # -- Phase 1.5: shift TOU customers (per TOU tariff) --
@@ -342,25 +410,23 @@ def apply_demand_flex(
     tou_season_specs: dict[str, list[SeasonTouSpec]] = {}
     all_tou_bldg_ids: set[int] = set()
 
-    # Precompute per-TOU-key weighted system loads from the original
-    # (pre-shift) loads.  Phase 2.5 needs these to compute mc_orig_k,
-    # but only as tiny 8760-element Series — not the full load DataFrame.
-    # By capturing them now we can free raw_load_elec before the shift.
-    # Use weight-map multiplication to avoid DataFrame copies that would
-    # double memory for large utilities (e.g. ConEd with ~15k buildings).
-    weight_map = customer_metadata.set_index("bldg_id")["weight"]
-    bldg_level = raw_load_elec.index.get_level_values("bldg_id")
-    time_level = raw_load_elec.index.get_level_values("time")
-    orig_sys_loads: dict[str, pd.Series] = {}
+    tou_bldg_ids_by_key: dict[str, set[int]] = {}
     for tou_key in tou_tariff_keys:
         tou_rows = tariff_map_df[tariff_map_df["tariff_key"] == tou_key]
-        tou_bldg_ids = cast(list[int], tou_rows["bldg_id"].astype(int).tolist())
-        all_tou_bldg_ids.update(tou_bldg_ids)
-        mask = bldg_level.isin(set(tou_bldg_ids))
-        weights = bldg_level[mask].map(weight_map)
-        weighted_load = raw_load_elec.loc[mask, "electricity_net"] * weights.values
-        orig_sys_loads[tou_key] = weighted_load.groupby(time_level[mask]).sum()
-        del mask, weights, weighted_load
+        tou_bldg_ids_by_key[tou_key] = set(tou_rows["bldg_id"].astype(int).tolist())
+        all_tou_bldg_ids.update(tou_bldg_ids_by_key[tou_key])
+
+    # Phase 2.5 needs each TOU subclass's weighted system load from the
+    # original (pre-shift) loads. Capture them now, all in one matmul over
+    # the (n_bldg, 8760) load view, as tiny 8760-element curves so the shift
+    # below can write in place without keeping the original loads alive.
+    orig_sys_loads: CohortLoads | None = None
+    if run_includes_subclasses:
+        orig_sys_loads = _cohort_system_loads(
+            raw_load_elec,
+            customer_metadata,
+            list(tou_bldg_ids_by_key.values()),
+        )
 
     # Make one copy; shifts write in-place.  The original raw_load_elec
     # (caller's reference) is no longer needed inside this function.
@@ -403,6 +469,20 @@ def apply_demand_flex(
         else:
             elasticity_tracker = pd.concat([elasticity_tracker, tracker], axis=0)
 
+    # Shifted system loads for Phase 1.75 (all TOU buildings) and Phase 2.5
+    # (each TOU subclass), again from one matmul over the shifted loads.
+    recompute_precalc = bool(tou_season_specs) and run_type == "precalc"
+    shifted_cohorts: list[Collection[int]] = []
+    if run_includes_subclasses:
+        shifted_cohorts.extend(tou_bldg_ids_by_key.values())
+    if recompute_precalc:
+        shifted_cohorts.append(all_tou_bldg_ids)
+    shifted_sys_loads = (
+        _cohort_system_loads(effective_load_elec, customer_metadata, shifted_cohorts)
+        if shifted_cohorts
+        else None
+    )
+
     # -- Phase 1.75: recompute TOU peak/off-peak cost-causation ratios --
     # The TOU ratio (peak rate / off-peak rate) was derived from the original
     # load shape. Now that loads have shifted, the cost per kWh in each period
@@ -413,7 +493,8 @@ def apply_demand_flex(
     # Only applies to precalc (which calibrates tariff structure); default
     # runs use a pre-calibrated tariff and skip this.
     updated_precalc = precalc_mapping
-    if tou_season_specs and run_type == "precalc":
+    if recompute_precalc:
+        assert shifted_sys_loads is not None
         # TOU cost-causation must always use real (non-zero) bulk supply MCs so that
         # delivery-only and supply runs share identical TOU windows and peak/off-peak
         # ratios. If the Justfile-level real supply MC paths were passed in (via CLI),
@@ -430,10 +511,20 @@ def apply_demand_flex(
                 path_tou_supply_energy_mc,
                 path_tou_supply_capacity_mc,
             )
-            tou_bulk_mc = _load_supply_marginal_costs(
-                path_tou_supply_energy_mc,
-                path_tou_supply_capacity_mc,
-                target_year=year_run,
+            tou_bundle = open_mc_bundle(
+                path_tou_mc_bundle,
+                year_run,
+                supply_energy=path_tou_supply_energy_mc,
+                supply_capacity=path_tou_supply_capacity_mc,
+            )
+            tou_bulk_mc = (
+                tou_bundle.supply_marginal_costs(ancillary=False)
+                if tou_bundle is not None
+                else _load_supply_marginal_costs(
+                    path_tou_supply_energy_mc,
+                    path_tou_supply_capacity_mc,
+                    target_year=year_run,
+                )
             )
 
         log.info(".... Phase 1.75: recomputing TOU precalc mapping from shifted load")
@@ -442,16 +533,11 @@ def apply_demand_flex(
         # The welfare derivation proves HP demand is the correct weight
         # for the HP tariff — non-HP terms vanish because those customers
         # face a flat rate, not the TOU price.
-        sample_weights = customer_metadata[["bldg_id", "weight"]]
-        bldg_level = effective_load_elec.index.get_level_values("bldg_id")
-        tou_load = effective_load_elec.loc[bldg_level.isin(all_tou_bldg_ids)]
-        shifted_weighted = tou_load.reset_index().merge(sample_weights, on="bldg_id")
-        shifted_weighted["electricity_net"] *= shifted_weighted["weight"]
-        shifted_load = shifted_weighted.groupby("time")["electricity_net"].sum()
+        shifted_load = shifted_sys_loads.series(len(shifted_cohorts) - 1)
         log.info(
             ".... Phase 1.75: using %d TOU buildings (of %d total) for load aggregation",
             len(all_tou_bldg_ids),
-            bldg_level.nunique(),
+            shifted_sys_loads.n_bldg,
         )
 
         updated_precalc = recompute_tou_precalc_mapping(
@@ -502,25 +588,13 @@ def apply_demand_flex(
         #   new_RR_k = subclass_MC_shifted_k + frozen_residual_k
         #            = subclass_RR_k + (MC_shifted_k - MC_orig_k)
         # So the MC delta is all run_scenario.py needs to build per-subclass RRs.
-        # mc_orig_k uses the precomputed original system loads (tiny 8760-row
-        # Series captured before the shift), avoiding the need to keep the full
-        # original load DataFrame alive.
+        # Both come from the cohort curves aggregated around Phase 1.5, so
+        # neither the original nor the shifted load frame is re-aggregated here.
+        assert orig_sys_loads is not None and shifted_sys_loads is not None
         mc_prices = marginal_system_prices["Total Marginal Costs ($/kWh)"]
-        for tou_key in tou_tariff_keys:
-            tou_bldg_ids_k = set(
-                tariff_map_df[tariff_map_df["tariff_key"] == tou_key]["bldg_id"]
-                .astype(int)
-                .tolist()
-            )
-            sys_load_orig = orig_sys_loads[tou_key]
-            sys_load_aligned = pd.Series(
-                sys_load_orig.values[: len(mc_prices)],
-                index=pd.DatetimeIndex(mc_prices.index),
-            )
-            mc_orig_k = float((mc_prices * sys_load_aligned).sum())
-            mc_shifted_k = _compute_tou_subclass_mc(
-                effective_load_elec, tou_bldg_ids_k, customer_metadata, mc_prices
-            )
+        for k, tou_key in enumerate(tou_tariff_keys):
+            mc_orig_k = _annual_mc(orig_sys_loads.curves[k], mc_prices)
+            mc_shifted_k = _annual_mc(shifted_sys_loads.curves[k], mc_prices)
             mc_delta_by_tou_tariff[tou_key] = mc_shifted_k - mc_orig_k
             log.info(
                 ".... Subclass MC delta for %s: $%.2f  (orig=$%.2f → shifted=$%.2f)",
@@ -0,0 +1,297 @@
+"""Content-addressed on-disk cache for run_scenario inputs shared across runs.
+
+The four runs of a quartet (precalc/calibrated × delivery/supply) repeat the
+same input steps with identical arguments: prototype IDs, buildingstock
+metadata, supply and delivery marginal costs, and the revenue-requirement
+decomposition on the original loads. ``InputCache`` stores each result once
+under::
+
+    {cache_root}/inputs/{kind}/{digest}/
+
+where ``digest`` hashes the step's arguments, with every input path replaced
+by its fingerprint (local: size + mtime of each file; S3: ETag of each
+object). Editing an input file therefore misses the cache instead of serving
+stale results; there is no invalidation step.
+
+Values are stored as Arrow IPC (DataFrame / Series), ``.npy`` (lists of
+building IDs) or JSON (scalars, dicts of floats). Values of any other type
+are recomputed every time rather than pickled.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any, TypeVar, cast
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import ipc
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Bump to orphan every existing entry when the storage format changes.
+CACHE_VERSION = 1
+INPUTS_SUBDIR = "inputs"
+
+
+# ---------------------------------------------------------------------------
+# Fingerprints
+# ---------------------------------------------------------------------------
+
+
+@functools.cache
+def _s3_client() -> Any:
+    """One S3 client per process, shared by every fingerprint (clients are thread-safe)."""
+    import boto3
+
+    from utils import get_aws_region
+
+    return boto3.client("s3", region_name=get_aws_region())
+
+
+def _s3_fingerprint(uri: str) -> list[tuple[str, str]]:
+    bucket, _, key = uri.removeprefix("s3://").partition("/")
+    key = key.rstrip("/")
+    paginator = _s3_client().get_paginator("list_objects_v2")
+    # A prefix listing covers both single objects and partitioned directories;
+    # keep only the object itself and keys under ``key/``, not siblings that
+    # merely share the prefix (``mc.parquet.bak``, ``mc_old/``).
+    return sorted(
+        (obj["Key"], obj["ETag"])
+        for page in paginator.paginate(Bucket=bucket, Prefix=key)
+        for obj in page.get("Contents", [])
+        if obj["Key"] == key or obj["Key"].startswith(key + "/")
+    )
+
+
+def _local_fingerprint(path: Path) -> list[tuple[str, int, int]]:
+    if path.is_file():
+        st = path.stat()
+        return [(path.name, st.st_size, st.st_mtime_ns)]
+    entries = []
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            st = os.stat(os.path.join(root, name))
+            rel = os.path.relpath(os.path.join(root, name), path)
+            entries.append((rel, st.st_size, st.st_mtime_ns))
+    return sorted(entries)
+
+
+def path_fingerprint(path: str | os.PathLike[str] | None) -> Any:
+    """JSON-able identity of a local or S3 file / directory's current contents."""
+    if path is None:
+        return None
+    text = str(path)
+    if text.startswith("s3://"):
+        return [text, _s3_fingerprint(text)]
+    local = Path(text)
+    if not local.exists():
+        raise FileNotFoundError(f"Cannot fingerprint missing input: {local}")
+    return [str(local.resolve()), _local_fingerprint(local)]
+
+
+def files_fingerprint(paths: Iterable[str | os.PathLike[str]]) -> str:
+    """Digest of a set of local or S3 files.
+
+    Local files are identified by (path, size, mtime). S3 objects (``s3://``
+    strings or ``S3Path``) are identified by their paths only; a request per
+    object per run (thousands of per-building load files) would cost as much
+    as the caches keyed on this save.
+    """
+    h = hashlib.sha256()
+    for path in sorted({str(p) for p in paths}):
+        if path.startswith("s3://"):
+            h.update(f"{path}\n".encode())
+            continue
+        st = os.stat(path)
+        h.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()[:32]
+
+
+def array_digest(values: Any) -> str:
+    """Short digest of an array-like (building IDs, a DatetimeIndex, ...)."""
+    if isinstance(values, pd.DatetimeIndex):
+        arr = values.tz_localize(None).asi8 if values.tz is not None else values.asi8
+        extra = str(values.tz).encode()
+    else:
+        arr = np.asarray(values)
+        extra = str(arr.dtype).encode()
+    h = hashlib.sha256(extra)
+    h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()[:16]
+
+
+def cache_key(kind: str, parts: dict[str, Any]) -> str:
+    payload = json.dumps(
+        {"version": CACHE_VERSION, "kind": kind, "parts": parts},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+# ---------------------------------------------------------------------------
+# Value storage
+# ---------------------------------------------------------------------------
+
+
+def _check_frame(df: pd.DataFrame) -> None:
+    # Arrow stringifies non-string column labels, which would not round-trip.
+    if not all(isinstance(c, str) for c in df.columns):
+        raise TypeError("only DataFrames with string column labels are cached")
+
+
+def _write_item(path: Path, value: Any) -> dict[str, Any]:
+    if isinstance(value, pd.DataFrame):
+        _check_frame(value)
+        table = pa.Table.from_pandas(value)
+        with ipc.new_file(str(path) + ".arrow", table.schema) as writer:
+            writer.write_table(table)
+        return {"type": "frame"}
+    if isinstance(value, pd.Series):
+        table = pa.Table.from_pandas(value.to_frame(name="value"))
+        with ipc.new_file(str(path) + ".arrow", table.schema) as writer:
+            writer.write_table(table)
+        return {"type": "series", "name": value.name}
+    if isinstance(value, list) and all(isinstance(v, (int, np.integer)) for v in value):
+        np.save(str(path) + ".npy", np.asarray(value, dtype=np.int64))
+        return {"type": "int_list"}
+    if isinstance(value, (float, int, np.floating, np.integer)) and not isinstance(
+        value, bool
+    ):
+        return {"type": "float", "value": float(value)}
+    if isinstance(value, dict) and all(
+        isinstance(k, str) and isinstance(v, (float, int, np.floating))
+        for k, v in value.items()
+    ):
+        return {"type": "float_dict", "value": {k: float(v) for k, v in value.items()}}
+    if value is None:
+        return {"type": "none"}
+    raise TypeError(f"cannot cache values of type {type(value).__name__}")
+
+
+def _read_item(path: Path, meta: dict[str, Any]) -> Any:
+    kind = meta["type"]
+    if kind in ("frame", "series"):
+        with pa.memory_map(str(path) + ".arrow") as source:
+            df = ipc.open_file(source).read_all().to_pandas()
+        if kind == "series":
+            return df["value"].rename(meta["name"])
+        return df
+    if kind == "int_list":
+        return np.load(str(path) + ".npy").tolist()
+    if kind in ("float", "float_dict"):
+        return meta["value"]
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown cached item type {kind!r} in {path}")
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+
+@dataclasses.dataclass
+class InputCache:
+    """Memoise run inputs under *root*; ``root=None`` disables the cache.
+
+    ``hits`` / ``misses`` count lookups for this run; ``last`` is the outcome
+    of the most recent lookup (``"hit"``, ``"miss"`` or ``None`` when
+    disabled), for ``TIMING`` log lines.
+    """
+
+    root: Path | None
+    hits: int = 0
+    misses: int = 0
+    last: str | None = None
+    _fingerprints: dict[str, Any] = dataclasses.field(default_factory=dict)
+
+    def fingerprint(self, path: str | os.PathLike[str] | None) -> Any:
+        """``path_fingerprint``, memoised for the lifetime of this run."""
+        if path is None:
+            return None
+        text = str(path)
+        if text not in self._fingerprints:
+            self._fingerprints[text] = path_fingerprint(text)
+        return self._fingerprints[text]
+
+    def entry_dir(self, kind: str, parts: dict[str, Any]) -> Path:
+        assert self.root is not None
+        return Path(self.root) / INPUTS_SUBDIR / kind / cache_key(kind, parts)
+
+    def record(self, *, hit: bool) -> None:
+        """Count a lookup made by a cache outside this class (e.g. the load cache)."""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.last = "hit" if hit else "miss"
+
+    def get_or_compute(
+        self, kind: str, parts: Callable[[], dict[str, Any]], compute: Callable[[], T]
+    ) -> T:
+        """Return the cached value for (*kind*, *parts*) or compute and store it.
+
+        *parts* is a callable so input fingerprints are only taken when the
+        cache is enabled. A tuple result is stored item by item.
+        """
+        if self.root is None:
+            self.last = None
+            return compute()
+
+        entry = self.entry_dir(kind, parts())
+        manifest = entry / "manifest.json"
+        if manifest.exists():
+            self.record(hit=True)
+            meta = json.loads(manifest.read_text())
+            items = [_read_item(entry / str(i), m) for i, m in enumerate(meta["items"])]
+            return cast(T, tuple(items) if meta["tuple"] else items[0])
+
+        self.record(hit=False)
+        value = compute()
+        try:
+            self._publish(entry, value)
+        except TypeError as exc:
+            log.info("Not caching %s: %s", kind, exc)
+        except Exception as exc:  # noqa: BLE001
+            # A value that fails to serialise (e.g. pa.ArrowInvalid on mixed
+            # object columns) or an unwritable cache root only costs the hit.
+            log.warning("Not caching %s: %s: %s", kind, type(exc).__name__, exc)
+        return value
+
+    def _publish(self, entry: Path, value: Any) -> None:
+        """Stage the entry in a sibling temp dir and rename it into place."""
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        try:
+            values = value if isinstance(value, tuple) else (value,)
+            items = [_write_item(tmp_dir / str(i), v) for i, v in enumerate(values)]
+            (tmp_dir / "manifest.json").write_text(
+                json.dumps({"tuple": isinstance(value, tuple), "items": items})
+            )
+            tmp_dir.rename(entry)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            # Lost the race to a concurrent writer; its entry is equivalent.
+            if not (entry / "manifest.json").exists():
+                raise
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def summary(self) -> str:
+        return f"{self.hits} hits / {self.misses} misses"
@@ -7,9 +7,23 @@ specific building IDs for alignment with CAIRO sample runs.
 
 from __future__ import annotations
 
+import dataclasses
+import functools
+import hashlib
+import logging
+import os
+import shutil
+from collections.abc import Iterable, Sequence
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import polars as pl
+import pyarrow as pa
+import pyarrow.dataset as pad
+import pyarrow.parquet as pq
+
+log = logging.getLogger(__name__)
 
 # ResStock column names that match CAIRO's ``total_fuel_electricity`` load key.
 # CAIRO reads (total, pv), makes PV positive, and bills on
@@ -25,6 +39,10 @@ ELECTRIC_PV_COL = "out.electricity.pv.energy_consumption"
 LOAD_CURVE_HOURLY_SUBDIR = "load_curve_hourly/"
 # ResStock load_curve_monthly layout: .../load_curve_monthly/state=XX/upgrade=YY/*.parquet
 LOAD_CURVE_MONTHLY_SUBDIR = "load_curve_monthly/"
+# Packed per-utility load matrices (see data/resstock/load_curve/build_load_matrix.py):
+# .../load_curve_matrix/state=XX/upgrade=YY/utility=<utility>/load_matrix.arrow
+LOAD_CURVE_MATRIX_SUBDIR = "load_curve_matrix/"
+LOAD_MATRIX_FILENAME = "load_matrix.arrow"
 BLDG_ID_COL = "bldg_id"
 
 # Timezone used for hourly load index; must match marginal cost data (see utils/cairo.py).
@@ -198,3 +216,414 @@ def hourly_resstock_load_from_parquet(
     if series.index.tz is None:
         series.index = series.index.tz_localize(HOURLY_LOAD_TZ, ambiguous="infer")
     return series
+
+
+# ---------------------------------------------------------------------------
+# Packed load matrices
+# ---------------------------------------------------------------------------
+
+GAS_LOAD_COL = "out.natural_gas.total.energy_consumption"
+
+# Matrix column -> ResStock hourly column it is packed from.
+LOAD_MATRIX_COLUMNS: dict[str, str] = {
+    "electricity_total": ELECTRIC_LOAD_COL,
+    "electricity_pv": ELECTRIC_PV_COL,
+    "natural_gas_total": GAS_LOAD_COL,
+}
+N_HOURS = 8760
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadMatrix:
+    """Memory-mapped ``(n_bldg, 8760)`` load blocks for one (state, upgrade, utility).
+
+    ``blocks`` values are read-only views onto the mapped file; nothing is
+    parsed or copied until a caller slices rows out of them.
+    """
+
+    path: Path
+    bldg_ids: np.ndarray
+    timestamps: pd.DatetimeIndex
+    blocks: dict[str, np.ndarray]
+
+    def rows_for(self, building_ids: Sequence[int]) -> np.ndarray:
+        """Row offsets for *building_ids* (in the given order).
+
+        Raises ``KeyError`` listing the first few IDs absent from the matrix.
+        """
+        wanted = np.asarray(building_ids, dtype=np.int64)
+        rows = np.searchsorted(self.bldg_ids, wanted)
+        rows = np.clip(rows, 0, len(self.bldg_ids) - 1)
+        missing = self.bldg_ids[rows] != wanted
+        if missing.any():
+            raise KeyError(
+                f"{int(missing.sum())} building IDs not in load matrix {self.path}: "
+                f"{wanted[missing][:10].tolist()}"
+            )
+        return rows
+
+
+def load_matrix_path(path_resstock_loads: Path, utility: str) -> Path:
+    """Packed load-matrix path for the hourly partition dir *path_resstock_loads*.
+
+    ``.../load_curve_hourly/state=NY/upgrade=00`` maps to
+    ``.../load_curve_matrix/state=NY/upgrade=00/utility=<utility>/load_matrix.arrow``.
+    """
+    upgrade_dir = path_resstock_loads
+    state_dir = upgrade_dir.parent
+    release_dir = state_dir.parent.parent
+    return (
+        release_dir
+        / LOAD_CURVE_MATRIX_SUBDIR.rstrip("/")
+        / state_dir.name
+        / upgrade_dir.name
+        / f"utility={utility.lower()}"
+        / LOAD_MATRIX_FILENAME
+    )
+
+
+def write_load_matrix(
+    path: Path,
+    bldg_ids: np.ndarray,
+    timestamps: pd.DatetimeIndex,
+    blocks: dict[str, np.ndarray],
+    *,
+    dtype: str = "float64",
+    source_files: Sequence[Path] | None = None,
+) -> Path:
+    """Write ``(n_bldg, 8760)`` blocks as a single uncompressed Arrow IPC file.
+
+    Each block becomes a ``fixed_size_list<dtype>[8760]`` column, one row per
+    building, sorted by ``bldg_id`` so the ID column doubles as the offset
+    index. The source timestamps are stored once in the schema metadata, and
+    so are the names and :func:`load_source_fingerprint` of *source_files*
+    (the hourly parquet files the blocks were read from) when given, for
+    :func:`load_matrix_stale_reason`. Written as a single record batch so
+    readers get one contiguous buffer per block.
+    """
+    if len(timestamps) != N_HOURS:
+        raise ValueError(f"Expected {N_HOURS} timestamps, got {len(timestamps)}")
+    missing = set(LOAD_MATRIX_COLUMNS).difference(blocks)
+    if missing:
+        raise ValueError(f"Load matrix blocks missing columns: {sorted(missing)}")
+
+    ids = np.asarray(bldg_ids, dtype=np.int64)
+    order = np.argsort(ids, kind="stable")
+    if len(np.unique(ids)) != len(ids):
+        raise ValueError("Load matrix bldg_ids must be unique")
+
+    np_dtype = np.dtype(dtype)
+    arrow_type = pa.from_numpy_dtype(np_dtype)
+    columns: dict[str, pa.Array] = {"bldg_id": pa.array(ids[order])}
+    for name in LOAD_MATRIX_COLUMNS:
+        block = np.asarray(blocks[name])
+        if block.shape != (len(ids), N_HOURS):
+            raise ValueError(
+                f"Block {name} has shape {block.shape}, expected ({len(ids)}, {N_HOURS})"
+            )
+        values = np.ascontiguousarray(block[order], dtype=np_dtype).ravel()
+        columns[name] = pa.FixedSizeListArray.from_arrays(
+            pa.array(values, type=arrow_type), N_HOURS
+        )
+
+    ts_ns = pd.DatetimeIndex(timestamps).as_unit("ns").asi8
+    metadata = {
+        b"timestamps_ns": ",".join(str(int(t)) for t in ts_ns).encode(),
+        b"dtype": np_dtype.name.encode(),
+    }
+    if source_files is not None:
+        names = sorted(Path(f).name for f in source_files)
+        metadata[b"source_files"] = ",".join(names).encode()
+        metadata[b"source_fingerprint"] = load_source_fingerprint(source_files).encode()
+    table = pa.table(columns).replace_schema_metadata(metadata)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with (
+        pa.OSFile(str(tmp_path), "wb") as sink,
+        pa.ipc.new_file(sink, table.schema) as writer,
+    ):
+        writer.write_table(table, max_chunksize=max(len(ids), 1))
+    tmp_path.replace(path)
+    return path
+
+
+def open_load_matrix(path: Path) -> LoadMatrix:
+    """Memory-map a packed load matrix written by :func:`write_load_matrix`."""
+    source = pa.memory_map(str(path), "r")
+    table = pa.ipc.open_file(source).read_all()
+    metadata = table.schema.metadata or {}
+    if b"timestamps_ns" not in metadata:
+        raise ValueError(f"{path} is not a load matrix (no timestamps_ns metadata)")
+    timestamps = pd.DatetimeIndex(
+        np.array(metadata[b"timestamps_ns"].decode().split(","), dtype="int64").view(
+            "datetime64[ns]"
+        )
+    )
+
+    n_bldg = table.num_rows
+    bldg_ids = table.column("bldg_id").to_numpy()
+    blocks: dict[str, np.ndarray] = {}
+    for name in LOAD_MATRIX_COLUMNS:
+        col = table.column(name)
+        if col.num_chunks != 1:
+            raise ValueError(f"{path}: column {name} is not a single contiguous chunk")
+        values = col.chunk(0).flatten().to_numpy(zero_copy_only=True)
+        blocks[name] = values.reshape(n_bldg, N_HOURS)
+    return LoadMatrix(
+        path=Path(path), bldg_ids=bldg_ids, timestamps=timestamps, blocks=blocks
+    )
+
+
+def load_source_fingerprint(paths: Iterable[Path]) -> str:
+    """Digest of (file name, size, mtime) for the hourly files a matrix packs.
+
+    Names rather than full paths, so a release directory that moves (another
+    mount, a renamed data root) keeps its matrices.
+    """
+    h = hashlib.sha256()
+    for path in sorted(Path(p) for p in paths):
+        st = path.stat()
+        h.update(f"{path.name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()[:32]
+
+
+def load_matrix_stale_reason(path: Path, hourly_dir: Path) -> str | None:
+    """Why the matrix at *path* no longer matches its files in *hourly_dir*.
+
+    ``None`` means every recorded source file is still there with the size and
+    mtime it had when the matrix was built (one stat per file; no listing).
+    Matrices written without ``source_files`` cannot be checked and count as
+    stale.
+    """
+    with pa.memory_map(str(path), "r") as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    if b"source_fingerprint" not in metadata:
+        return "it records no source fingerprint"
+    names = metadata[b"source_files"].decode().split(",")
+    files = [hourly_dir / name for name in names if name]
+    missing = [f.name for f in files if not f.exists()]
+    if missing:
+        return f"{len(missing)} source files are gone (e.g. {missing[0]})"
+    if load_source_fingerprint(files) != metadata[b"source_fingerprint"].decode():
+        return "its hourly source files changed since it was built"
+    return None
+
+
+def read_load_matrix_bldg_ids(path: Path) -> np.ndarray:
+    """Read only the ``bldg_id`` offset index of a packed load matrix."""
+    table = pad.dataset(str(path), format="ipc").to_table(columns=["bldg_id"])
+    return table.column("bldg_id").to_numpy()
+
+
+# ---------------------------------------------------------------------------
+# Post-timeshift load cache
+# ---------------------------------------------------------------------------
+
+# Arrays stored per cache entry, all flat (n_bldg * 8760,) float64 in
+# [bldg_id, time] row order: the exact buffers behind the CAIRO load frames.
+LOAD_CACHE_ARRAYS = ("load_data", "pv_generation", "electricity_net", "gas_therms")
+
+
+def load_cache_path(
+    cache_root: Path,
+    path_resstock_loads: Path,
+    *,
+    utility: str,
+    year_run: int,
+    sample_size: int | None,
+) -> Path:
+    """Cache entry directory for one (release, state, utility, upgrade, year_run, sample).
+
+    *path_resstock_loads* is the run's hourly partition dir
+    (``.../{release}/load_curve_hourly/state=NY/upgrade=00``); its release,
+    state and upgrade are levels of the key.
+    """
+    upgrade_dir = Path(path_resstock_loads)
+    state_dir = upgrade_dir.parent
+    release_dir = state_dir.parent.parent
+    sample = "all" if sample_size is None else str(sample_size)
+    return (
+        Path(cache_root)
+        / f"release={release_dir.name}"
+        / state_dir.name
+        / f"utility={utility.lower()}"
+        / upgrade_dir.name
+        / f"year={year_run}"
+        / f"sample={sample}"
+    )
+
+
+def write_load_cache(
+    cache_dir: Path,
+    bldg_ids: Sequence[int],
+    times: pd.DatetimeIndex,
+    arrays: dict[str, np.ndarray],
+    *,
+    source: str = "",
+) -> Path:
+    """Write post-timeshift load arrays as ``.npy`` files under *cache_dir*.
+
+    *source* identifies the load files the arrays were read from (see
+    :func:`load_cache_source`); readers compare it before trusting the entry.
+
+    The entry is staged in a sibling temp directory and renamed into place, so
+    readers never see a partial entry. If another process published the same
+    entry first, its copy is kept and this one is discarded.
+    """
+    missing = set(LOAD_CACHE_ARRAYS).difference(arrays)
+    if missing:
+        raise ValueError(f"Load cache arrays missing: {sorted(missing)}")
+
+    cache_dir = Path(cache_dir)
+    cache_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = cache_dir.with_name(f".{cache_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+
+    np.save(tmp_dir / "bldg_id.npy", np.asarray(bldg_ids, dtype=np.int64))
+    np.save(tmp_dir / "time_ns.npy", pd.DatetimeIndex(times).tz_localize(None).asi8)
+    for name in LOAD_CACHE_ARRAYS:
+        np.save(tmp_dir / f"{name}.npy", np.asarray(arrays[name], dtype=np.float64))
+    tz = pd.DatetimeIndex(times).tz
+    (tmp_dir / "source.txt").write_text(source)
+    (tmp_dir / "tz.txt").write_text("" if tz is None else str(tz))
+
+    try:
+        tmp_dir.rename(cache_dir)
+    except OSError:
+        # Lost the race to a concurrent writer; its entry is equivalent.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return cache_dir
+
+
+def has_load_cache(cache_dir: Path) -> bool:
+    """Whether *cache_dir* holds a published load cache entry."""
+    return (Path(cache_dir) / "tz.txt").exists()
+
+
+def load_cache_source(cache_dir: Path) -> str:
+    """The source fingerprint an entry was written with (``""`` if none)."""
+    path = Path(cache_dir) / "source.txt"
+    return path.read_text() if path.exists() else ""
+
+
+def open_load_cache(
+    cache_dir: Path,
+) -> tuple[np.ndarray, pd.DatetimeIndex, dict[str, np.ndarray]] | None:
+    """Memory-map a load cache entry; ``None`` if *cache_dir* holds no entry.
+
+    Arrays are mapped copy-on-write (``mmap_mode="c"``): concurrent processes
+    share the file's page cache for reads, and any in-place write a caller
+    makes lands in private pages rather than in the cache file.
+    """
+    cache_dir = Path(cache_dir)
+    if not has_load_cache(cache_dir):
+        return None
+    bldg_ids = np.load(cache_dir / "bldg_id.npy")
+    times = pd.DatetimeIndex(np.load(cache_dir / "time_ns.npy").view("datetime64[ns]"))
+    tz = (cache_dir / "tz.txt").read_text().strip()
+    if tz:
+        times = times.tz_localize(tz)
+    arrays = {
+        name: np.load(cache_dir / f"{name}.npy", mmap_mode="c")
+        for name in LOAD_CACHE_ARRAYS
+    }
+    return bldg_ids, times, arrays
+
+
+# ---------------------------------------------------------------------------
+# Columnar building-load reads
+# ---------------------------------------------------------------------------
+
+
+@dataclasses.dataclass(frozen=True)
+class BuildingLoads:
+    """Hourly loads for a building list as ``(n_bldg, n_hours)`` arrays.
+
+    Rows follow ``bldg_ids`` (ascending) and columns follow ``times``
+    (ascending). :attr:`frame` builds the long ``(bldg_id, time)`` MultiIndex
+    DataFrame on first access only.
+    """
+
+    bldg_ids: np.ndarray
+    times: pd.DatetimeIndex
+    values: dict[str, np.ndarray]
+
+    @functools.cached_property
+    def frame(self) -> pd.DataFrame:
+        """``(bldg_id, time)``-indexed frame with one column per entry of ``values``."""
+        index = pd.MultiIndex.from_product(
+            [self.bldg_ids, self.times], names=[BLDG_ID_COL, "time"]
+        )
+        return pd.DataFrame(
+            {name: block.ravel() for name, block in self.values.items()}, index=index
+        )
+
+
+def read_building_loads(
+    bldg_ids: Sequence[int],
+    loads_dir: Path,
+    columns: dict[str, str],
+    *,
+    upgrade: str = "0",
+) -> BuildingLoads:
+    """Read *columns* for *bldg_ids* from ``{bldg_id}-{upgrade}.parquet`` files.
+
+    All files go through one multi-file Arrow dataset scan, which decodes
+    files in parallel on Arrow's thread pool, and the result is reshaped
+    straight into ``(n_bldg, n_hours)`` blocks without a per-building
+    DataFrame.
+
+    Args:
+        bldg_ids: Buildings to read; those without a file are skipped with a
+            warning.
+        loads_dir: Hourly partition directory, e.g.
+            ``.../load_curve_hourly/state=NY/upgrade=00``.
+        columns: Output name -> ResStock column to read.
+        upgrade: Upgrade suffix in the file names.
+
+    Raises:
+        FileNotFoundError: When none of *bldg_ids* has a file.
+        ValueError: When files disagree on their hourly timestamps.
+    """
+    wanted = np.unique(np.asarray(bldg_ids, dtype=np.int64))
+    paths = {int(b): Path(loads_dir) / f"{b}-{upgrade}.parquet" for b in wanted}
+    present = np.array([b for b, p in paths.items() if p.exists()], dtype=np.int64)
+    missing = len(wanted) - len(present)
+    if missing:
+        log.warning("Missing load files for %d of %d buildings", missing, len(wanted))
+    if not len(present):
+        raise FileNotFoundError(
+            f"No load files found in {loads_dir} for {len(wanted)} buildings"
+        )
+
+    files = [str(paths[int(b)]) for b in present]
+    schema = pq.read_schema(files[0])
+    source_cols = list(dict.fromkeys(["timestamp", *columns.values()]))
+    table = pad.dataset(files, format="parquet", schema=schema).to_table(
+        columns=source_cols, use_threads=True
+    )
+    n_bldg = len(present)
+    if table.num_rows % n_bldg:
+        raise ValueError(
+            f"{table.num_rows} rows across {n_bldg} load files in {loads_dir} "
+            "is not a whole number of hours per building"
+        )
+    n_hours = table.num_rows // n_bldg
+
+    ts_col = table.column("timestamp")
+    ts = ts_col.to_numpy().reshape(n_bldg, n_hours)
+    if not (ts == ts[:1]).all():
+        raise ValueError(f"Load files in {loads_dir} have different timestamps")
+    times = pd.DatetimeIndex(ts_col.slice(0, n_hours).to_pandas(), name="time")
+    values = {
+        name: table.column(src).to_numpy().reshape(n_bldg, n_hours)
+        for name, src in columns.items()
+    }
+    if not times.is_monotonic_increasing:
+        order = np.argsort(times.asi8, kind="stable")
+        times = times[order]
+        values = {name: block[:, order] for name, block in values.items()}
+    log.info("Loaded %d buildings x %d hours", n_bldg, n_hours)
+    return BuildingLoads(bldg_ids=present, times=times, values=values)
@@ -25,6 +25,7 @@ from dotenv import load_dotenv
 
 from utils.file_io import get_aws_storage_options
 from utils.loads import ELECTRIC_PV_COL, grid_consumption_expr, scan_resstock_loads
+from utils.post.io import scan
 from utils.pre.season_config import (
     DEFAULT_SEASONAL_DISCOUNT_WINTER_MONTHS,
     get_utility_periods_yaml_path,
@@ -230,7 +231,7 @@ def _load_annual_target_bills(
     storage_options: dict[str, str] | None,
 ) -> pl.LazyFrame:
     return (
-        pl.scan_csv(
+        scan(
             _csv_path(run_dir, "bills/elec_bills_year_target.csv"),
             storage_options=storage_options,
         )
@@ -250,7 +251,7 @@ def _load_cross_subsidy(
     storage_options: dict[str, str] | None,
 ) -> pl.LazyFrame:
     return (
-        pl.scan_csv(
+        scan(
             _csv_path(
                 run_dir, "cross_subsidization/cross_subsidization_BAT_values.csv"
             ),
@@ -770,7 +771,7 @@ def compute_subclass_rr(
         pl.col(col).cast(pl.Float64) for col in cross_subsidy_cols
     ]
     cross_sub_all = (
-        pl.scan_csv(
+        scan(
             _csv_path(
                 run_dir, "cross_subsidization/cross_subsidization_BAT_values.csv"
             ),
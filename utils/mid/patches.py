@@ -8,11 +8,14 @@ Import this module at the top of run_scenario.py (after all other imports):
 
 from __future__ import annotations
 
+import contextlib
 import dataclasses
-import datetime as dt
 import logging
 import resource
+import shutil
 import time
+import weakref
+from collections.abc import Callable, Iterator
 from functools import reduce
 from pathlib import Path
 from typing import Any, cast
@@ -28,6 +31,15 @@ import pyarrow as pa
 import pyarrow.dataset as pad
 import pyarrow.parquet as pq
 
+from utils.calendar_align import roll_hours, shift_years, weekday_shift_hours
+from utils.input_cache import files_fingerprint
+from utils.loads import (
+    load_cache_source,
+    open_load_cache,
+    open_load_matrix,
+    write_load_cache,
+)
+
 # Columns to read from each parquet file in one pass
 _ELEC_RAW_COLS = [
     "bldg_id",
@@ -41,6 +53,11 @@ _GAS_RAW_COLS = [
     "out.natural_gas.total.energy_consumption",
 ]
 _ALL_COLS = list(dict.fromkeys(_ELEC_RAW_COLS + _GAS_RAW_COLS))  # deduplicated, ordered
+_DATA_COLS = [
+    "out.electricity.total.energy_consumption",
+    "out.electricity.pv.energy_consumption",
+    "out.natural_gas.total.energy_consumption",
+]
 
 # kWh -> therms conversion factor (from CAIRO _adjust_gas_loads docstring)
 _GAS_KWH_TO_THERM = 0.0341214116
@@ -64,6 +81,9 @@ def _return_loads_combined(
     building_ids: list[int],
     load_filepath_key: dict[int, Path],
     force_tz: str | None = "EST",
+    *,
+    cache_dir: Path | None = None,
+    on_load_cache: Callable[[bool], None] | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Read electricity and gas loads for all buildings via Arrow-native processing.
 
@@ -73,6 +93,20 @@ def _return_loads_combined(
     All processing is done on numpy arrays extracted from the Arrow table; no
     intermediate pandas DataFrame is created for the full dataset.
 
+    When every building maps to the same packed load matrix (``.arrow``, see
+    ``utils.loads.open_load_matrix``), the matrix is memory-mapped and the
+    requested rows are sliced instead of scanning one parquet file per building.
+
+    When *cache_dir* is given (see ``utils.loads.load_cache_path``), the
+    post-timeshift, post-PV-correction arrays are written there once and later
+    calls memory-map them, so concurrent CAIRO subprocesses on the same
+    (utility, upgrade, year, sample) share page cache instead of each holding
+    a private ~3 GB copy. The returned frames are then backed by copy-on-write
+    maps of the cache files. An entry is reused only if its building IDs, tz
+    and source fingerprint (``files_fingerprint``) all match, so a rebuilt
+    load matrix or re-downloaded local release is re-read.
+    *on_load_cache*, if given, is called with whether the entry was reused.
+
     Returns
     -------
     (raw_load_elec, raw_load_gas) — same structure as _return_load outputs:
@@ -91,13 +125,87 @@ def _return_loads_combined(
 
     # 1. Collect file paths in building_ids order (preserves determinism)
     present_ids = [bid for bid in building_ids if bid in load_filepath_key]
-    paths = [str(load_filepath_key[bid]) for bid in present_ids]
-    n_bldgs = len(present_ids)
-    n_rows = n_bldgs * 8760
+    distinct_paths = {load_filepath_key[bid] for bid in present_ids}
     _log_mem("after path collection")
 
-    # 2. Read timestamps from the first file only — all ResStock buildings share
-    #    the same 8760-hour series, so one file is sufficient.
+    # 2. Shared post-timeshift cache: memory-map a previous run's arrays.
+    source = ""
+    if cache_dir is not None:
+        source = files_fingerprint(distinct_paths)
+        cached = open_load_cache(cache_dir)
+        if cached is not None:
+            cached_ids, unique_times, arrays = cached
+            tz_matches = str(unique_times.tz) == str(force_tz)
+            source_matches = load_cache_source(cache_dir) == source
+            if (
+                np.array_equal(cached_ids, present_ids)
+                and tz_matches
+                and source_matches
+            ):
+                log.info("LOAD_CACHE hit %s", cache_dir)
+                if on_load_cache is not None:
+                    on_load_cache(True)
+                elec, gas = _wrap_load_frames(present_ids, unique_times, arrays)
+                _log_mem("end of _return_loads_combined (cache hit)")
+                return elec, gas
+            log.warning(
+                "LOAD_CACHE stale %s (building IDs, tz or source files differ); "
+                "re-reading loads",
+                cache_dir,
+            )
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        else:
+            log.info("LOAD_CACHE miss %s", cache_dir)
+        if on_load_cache is not None:
+            on_load_cache(False)
+
+    # 3. Read the three data columns as (n_bldgs, 8760) blocks plus the shared
+    #    8760-hour source timestamps. A packed load matrix (every building maps
+    #    to the same .arrow file) is memory-mapped and row-sliced; otherwise the
+    #    per-building parquet files are scanned.
+    if len(distinct_paths) == 1 and Path(next(iter(distinct_paths))).suffix == ".arrow":
+        ts_first, elec_total, elec_pv, gas_total = _read_matrix_load_blocks(
+            Path(next(iter(distinct_paths))), present_ids
+        )
+    else:
+        ts_first, elec_total, elec_pv, gas_total = _read_parquet_load_blocks(
+            [str(load_filepath_key[bid]) for bid in present_ids]
+        )
+    del distinct_paths
+
+    # 4. Timeshift, PV sign correction, therms conversion
+    unique_times, arrays = _timeshift_load_blocks(
+        target_year, ts_first, elec_total, elec_pv, gas_total, force_tz=force_tz
+    )
+    del elec_total, elec_pv, gas_total
+
+    # 5. Publish to the cache, then re-open it so this process also maps the
+    #    shared file pages instead of keeping a private copy.
+    if cache_dir is not None:
+        write_load_cache(cache_dir, present_ids, unique_times, arrays, source=source)
+        cached = open_load_cache(cache_dir)
+        if cached is not None and np.array_equal(cached[0], present_ids):
+            del arrays
+            unique_times, arrays = cached[1], cached[2]
+        _log_mem("after load cache write")
+
+    elec, gas = _wrap_load_frames(present_ids, unique_times, arrays)
+    _log_mem("end of _return_loads_combined")
+    return elec, gas
+
+
+def _read_parquet_load_blocks(
+    paths: list[str],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Read (timestamps, elec_total, elec_pv, gas_total) from per-building parquet files.
+
+    Data blocks are shaped (n_bldgs, 8760) in *paths* order.
+    """
+    n_bldgs = len(paths)
+    n_rows = n_bldgs * 8760
+
+    # Read timestamps from the first file only — all ResStock buildings share
+    # the same 8760-hour series, so one file is sufficient.
     first_table = pq.read_table(paths[0], columns=["timestamp"])
     ts_first = first_table.column("timestamp").to_numpy()
     assert len(ts_first) == 8760, (
@@ -105,30 +213,9 @@ def _return_loads_combined(
     )
     del first_table
 
-    # 3. Compute timeshift parameters from source timestamps
-    source_year = int(pd.Timestamp(ts_first[0]).year)
-    start_day_orig = dt.datetime(source_year, 1, 1).weekday()
-    start_day_target = dt.datetime(target_year, 1, 1).weekday()
-    offset_days = (start_day_target - start_day_orig) % 7
-    offset_hours = offset_days * 24
-
-    # 4. Build the time index (8760 unique values, shared by all buildings)
-    year_offset = pd.Timestamp(f"{target_year}-01-01") - pd.Timestamp(
-        f"{source_year}-01-01"
-    )
-    unique_times = pd.DatetimeIndex(ts_first) + year_offset
-    del ts_first
-    if force_tz is not None:
-        unique_times = unique_times.tz_localize(force_tz)
-
-    # 5. Read only the 3 data columns from all files (skip bldg_id and timestamp).
-    #    Use the first file's schema — ResStock load files share identical schemas.
+    # Read only the 3 data columns from all files (skip bldg_id and timestamp).
+    # Use the first file's schema — ResStock load files share identical schemas.
     schema = pq.read_schema(paths[0])
-    _DATA_COLS = [
-        "out.electricity.total.energy_consumption",
-        "out.electricity.pv.energy_consumption",
-        "out.natural_gas.total.energy_consumption",
-    ]
     ds = pad.dataset(paths, format="parquet", schema=schema)
     table = ds.to_table(columns=_DATA_COLS)
     _log_mem("after to_table (3 data cols, arrow)")
@@ -137,27 +224,74 @@ def _return_loads_combined(
         f"Expected {n_rows} rows ({n_bldgs} bldgs × 8760) but got {len(table)}"
     )
 
-    # 6. Extract numpy arrays and free the Arrow table.
-    #    combine_chunks inside to_numpy creates contiguous copies; after del table
-    #    the chunked Arrow buffers are freed, leaving only the ~3.2 GB numpy arrays.
-    elec_total = table.column(_DATA_COLS[0]).to_numpy()
-    elec_pv = table.column(_DATA_COLS[1]).to_numpy()
-    gas_total = table.column(_DATA_COLS[2]).to_numpy()
+    # Extract numpy arrays and free the Arrow table.
+    # combine_chunks inside to_numpy creates contiguous copies; after del table
+    # the chunked Arrow buffers are freed, leaving only the ~3.2 GB numpy arrays.
+    elec_total = table.column(_DATA_COLS[0]).to_numpy().reshape(n_bldgs, 8760)
+    elec_pv = table.column(_DATA_COLS[1]).to_numpy().reshape(n_bldgs, 8760)
+    gas_total = table.column(_DATA_COLS[2]).to_numpy().reshape(n_bldgs, 8760)
     del table, ds
     _log_mem("after extract numpy + del table")
+    return ts_first, elec_total, elec_pv, gas_total
+
+
+def _read_matrix_load_blocks(
+    path: Path, present_ids: list[int]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Slice (timestamps, elec_total, elec_pv, gas_total) rows from a packed load matrix.
+
+    The matrix is memory-mapped; only the rows for *present_ids* are copied
+    (fancy indexing) and cast to float64, so float32 matrices are widened here.
+    """
+    matrix = open_load_matrix(path)
+    rows = matrix.rows_for(present_ids)
+    elec_total, elec_pv, gas_total = (
+        matrix.blocks[name][rows].astype(np.float64, copy=False)
+        for name in ("electricity_total", "electricity_pv", "natural_gas_total")
+    )
+    ts_first = matrix.timestamps.to_numpy()
+    del matrix
+    _log_mem("after load matrix row slice")
+    return ts_first, elec_total, elec_pv, gas_total
+
+
+def _timeshift_load_blocks(
+    target_year: int,
+    ts_first: np.ndarray,
+    elec_total: np.ndarray,
+    elec_pv: np.ndarray,
+    gas_total: np.ndarray,
+    *,
+    force_tz: str | None,
+) -> tuple[pd.DatetimeIndex, dict[str, np.ndarray]]:
+    """Timeshift (n_bldgs, 8760) load blocks to *target_year* and derive net/therms.
+
+    Returns the shared 8760-hour time index and flat (n_bldgs * 8760,) arrays
+    keyed by ``utils.loads.LOAD_CACHE_ARRAYS``.
+    """
+    n_bldgs = elec_total.shape[0]
+    n_rows = n_bldgs * 8760
 
-    # 7. Vectorized timeshift (AMY2018 → target_year)
+    # 1. Compute the weekday-aligning shift from the source timestamps
+    source_year = int(pd.Timestamp(ts_first[0]).year)
+    offset_hours = weekday_shift_hours(source_year, target_year)
+
+    # 2. Build the time index (8760 unique values, shared by all buildings)
+    unique_times = pd.DatetimeIndex(shift_years(ts_first, target_year))
+    if force_tz is not None:
+        unique_times = unique_times.tz_localize(force_tz)
+
+    # 3. Vectorized timeshift (AMY2018 → target_year)
     if offset_hours > 0:
-        elec_total = np.roll(
-            elec_total.reshape(n_bldgs, 8760), -offset_hours, axis=1
-        ).ravel()
-        elec_pv = np.roll(elec_pv.reshape(n_bldgs, 8760), -offset_hours, axis=1).ravel()
-        gas_total = np.roll(
-            gas_total.reshape(n_bldgs, 8760), -offset_hours, axis=1
-        ).ravel()
+        elec_total = roll_hours(elec_total, offset_hours, axis=1)
+        elec_pv = roll_hours(elec_pv, offset_hours, axis=1)
+        gas_total = roll_hours(gas_total, offset_hours, axis=1)
         _log_mem("after timeshift")
+    elec_total = elec_total.ravel()
+    elec_pv = elec_pv.ravel()
+    gas_total = gas_total.ravel()
 
-    # 8. PV sign correction per building block (replicates CAIRO __load_buildingprofile__)
+    # 4. PV sign correction per building block (replicates CAIRO __load_buildingprofile__)
     elec_net = np.empty(n_rows, dtype=np.float64)
     for i in range(n_bldgs):
         s, e = i * 8760, (i + 1) * 8760
@@ -170,8 +304,28 @@ def _return_loads_combined(
         else:
             elec_net[s:e] = ld_block - pv_block
 
-    # 9. Build MultiIndex [bldg_id, time] from codes — avoids materializing
-    #    135M bldg_id + time values as columns.
+    # 5. Therms conversion
+    gas_therms = gas_total * _GAS_KWH_TO_THERM
+    del gas_total
+
+    return unique_times, {
+        "load_data": elec_total,
+        "pv_generation": elec_pv,
+        "electricity_net": elec_net,
+        "gas_therms": gas_therms,
+    }
+
+
+def _wrap_load_frames(
+    present_ids: list[int],
+    unique_times: pd.DatetimeIndex,
+    arrays: dict[str, np.ndarray],
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Wrap flat load arrays as CAIRO's [bldg_id, time] electricity and gas frames."""
+    n_bldgs = len(present_ids)
+
+    # Build MultiIndex [bldg_id, time] from codes — avoids materializing
+    # 135M bldg_id + time values as columns.
     bldg_level = pd.Index(present_ids, name="bldg_id")
     bldg_codes = np.repeat(np.arange(n_bldgs, dtype=np.intp), 8760)
     time_codes = np.tile(np.arange(8760, dtype=np.intp), n_bldgs)
@@ -182,23 +336,17 @@ def _return_loads_combined(
     )
     _log_mem("after build MultiIndex")
 
-    # 10. Build electricity DataFrame (wraps numpy arrays, no copy)
+    # Wrap numpy arrays (no copy)
     elec = pd.DataFrame(
         {
-            "load_data": elec_total,
-            "pv_generation": elec_pv,
-            "electricity_net": elec_net,
+            "load_data": arrays["load_data"],
+            "pv_generation": arrays["pv_generation"],
+            "electricity_net": arrays["electricity_net"],
         },
         index=mi,
         copy=False,
     )
-
-    # 11. Build gas DataFrame (therms conversion)
-    gas_therms = gas_total * _GAS_KWH_TO_THERM
-    del gas_total
-    gas = pd.DataFrame({"load_data": gas_therms}, index=mi, copy=False)
-
-    _log_mem("end of _return_loads_combined")
+    gas = pd.DataFrame({"load_data": arrays["gas_therms"]}, index=mi, copy=False)
     return elec, gas
 
 
@@ -322,11 +470,312 @@ def write_billing_kwh(
     )
 
 
+# Bills and BAT values are also written as zstd Parquet next to CAIRO's CSVs
+# (long ``(bldg_id, month)`` rows, bldg_id sorted); ``utils.post.io.scan`` and
+# ``utils.post.validate.load`` read the Parquet copy when it exists.
+_BILL_TYPES = ("elec", "gas", "comb")
+_BILL_MONTH_COLS = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+    "Annual",
+]
+
+
+def _write_output_parquet(df: pd.DataFrame, path: Path) -> None:
+    pq.write_table(
+        pa.Table.from_pandas(df, preserve_index=False), path, compression="zstd"
+    )
+
+
+def _long_bills(bills: pd.DataFrame) -> pd.DataFrame:
+    """Bills as ``(bldg_id, month)`` rows, bldg_id sorted, months in calendar order."""
+    if "month" not in bills.columns and set(_BILL_MONTH_COLS) <= set(bills.columns):
+        bills = bills.melt(
+            id_vars=[c for c in bills.columns if c not in _BILL_MONTH_COLS],
+            value_vars=_BILL_MONTH_COLS,
+            var_name="month",
+            value_name="bill_level",
+        )
+    # Stable, so each building keeps CAIRO's Jan..Dec, Annual row order.
+    return bills.sort_values("bldg_id", kind="stable")
+
+
+_BILLS_CSV_NAMES = {f"{bill_type}_bills_year_target.csv" for bill_type in _BILL_TYPES}
+
+
+@contextlib.contextmanager
+def bills_parquet_on_write() -> Iterator[None]:
+    """Write ``bills/{elec,gas,comb}_bills_year_target.parquet`` inside the block.
+
+    CAIRO writes its bills CSVs from inside ``simulate``; while the block runs,
+    each of those ``DataFrame.to_csv`` calls also writes the Parquet copy from
+    the same in-memory frame, so the CSV is never parsed back.
+    """
+    orig_to_csv = pd.DataFrame.to_csv
+
+    def to_csv(self: pd.DataFrame, path_or_buf: Any = None, *args: Any, **kwargs: Any):
+        result = orig_to_csv(self, path_or_buf, *args, **kwargs)
+        csv_path = Path(path_or_buf) if isinstance(path_or_buf, str | Path) else None
+        if (
+            csv_path is not None
+            and csv_path.name in _BILLS_CSV_NAMES
+            and csv_path.parent.name == "bills"
+        ):
+            bills = self
+            # The CSV carries a named index (e.g. bldg_id) as a column.
+            if kwargs.get("index", True) and any(
+                n is not None for n in self.index.names
+            ):
+                bills = self.reset_index()
+            parquet_path = csv_path.with_suffix(".parquet")
+            _write_output_parquet(_long_bills(bills), parquet_path)
+            log.info("Wrote bills parquet: %s", parquet_path)
+        return result
+
+    pd.DataFrame.to_csv = cast(Any, to_csv)
+    try:
+        yield
+    finally:
+        pd.DataFrame.to_csv = cast(Any, orig_to_csv)
+
+
 # ---------------------------------------------------------------------------
 # Phase 2: vectorized tariff aggregation
 # ---------------------------------------------------------------------------
 
 
+def _demand_charge_groups(
+    td: dict,
+    *,
+    hour_months: np.ndarray,
+    hour_hours: np.ndarray,
+    hour_is_weekday: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, dict[tuple[int, int], list[tuple[int, float]]]]:
+    """Per-hour demand group keys and tier limits for a demand-enabled tariff.
+
+    Flat monthly demand (``ur_dc_flat_mat`` rows ``(month0, tier, max_kW,
+    charge)``) is keyed as period 0; time-of-use demand (``ur_dc_tou_mat``
+    rows ``(period, tier, max_kW, charge)``) uses the 1-based period from
+    ``ur_dc_sched_weekday`` / ``ur_dc_sched_weekend``. Returns
+    ``(flat_keys, tou_keys, limits)`` where the key arrays encode
+    ``month * 100 + period`` per hour (``tou_keys`` is empty without a TOU
+    demand table) and ``limits[(month, period)]`` lists ``(tier, max_kW)``
+    sorted by tier.
+    """
+    limits: dict[tuple[int, int], list[tuple[int, float]]] = {}
+    for row in td.get("ur_dc_flat_mat") or []:
+        limits.setdefault((int(row[0]) + 1, 0), []).append((int(row[1]), float(row[2])))
+    flat_keys = hour_months * 100 if limits else np.empty(0, dtype=np.int64)
+
+    tou_limits: dict[int, list[tuple[int, float]]] = {}
+    for row in td.get("ur_dc_tou_mat") or []:
+        tou_limits.setdefault(int(row[0]), []).append((int(row[1]), float(row[2])))
+    tou_keys = np.empty(0, dtype=np.int64)
+    if tou_limits:
+        weekday = np.asarray(td["ur_dc_sched_weekday"], dtype=np.int64)
+        weekend = np.asarray(td["ur_dc_sched_weekend"], dtype=np.int64)
+        hour_dc_periods = np.where(
+            hour_is_weekday,
+            weekday[hour_months - 1, hour_hours],
+            weekend[hour_months - 1, hour_hours],
+        )
+        tou_keys = hour_months * 100 + hour_dc_periods
+        for key in np.unique(tou_keys):
+            period = int(key % 100)
+            if period in tou_limits:
+                limits[(int(key // 100), period)] = tou_limits[period]
+    return flat_keys, tou_keys, {k: sorted(v) for k, v in limits.items()}
+
+
+def _demand_tier_kw(
+    kw_2d: np.ndarray,
+    row_indices: np.ndarray,
+    *,
+    hour_keys: list[np.ndarray],
+    limits: dict[tuple[int, int], list[tuple[int, float]]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Billing demand per (month, period, tier) from hourly kW by grouped max.
+
+    Each array in *hour_keys* assigns every hour a ``month * 100 + period``
+    group; the peak of each group is taken with ``np.maximum.reduceat`` over a
+    stable sort of the hours, then split into tiers: tier ``j`` bills
+    ``clip(peak - max_{j-1}, 0, max_j - max_{j-1})`` kW and the last tier is
+    unbounded. Groups without a demand table entry are dropped.
+
+    Returns ``(group_months, group_periods, group_tiers, kw)`` with ``kw`` of
+    shape ``(len(row_indices), n_groups)``.
+    """
+    months: list[int] = []
+    periods: list[int] = []
+    tiers: list[int] = []
+    columns: list[np.ndarray] = []
+    for keys in hour_keys:
+        if len(keys) == 0:
+            continue
+        order = np.argsort(keys, kind="stable")
+        keys_sorted = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys_sorted[1:] != keys_sorted[:-1]])
+        peaks = np.concatenate(
+            [
+                np.maximum.reduceat(
+                    kw_2d[row_indices[b0 : b0 + _SEGMENT_BLOCK_ROWS]][:, order],
+                    starts,
+                    axis=1,
+                )
+                for b0 in range(0, len(row_indices), _SEGMENT_BLOCK_ROWS)
+            ]
+        )
+        peaks = np.maximum(peaks, 0.0)
+        for g, key in enumerate(keys_sorted[starts]):
+            group = (int(key // 100), int(key % 100))
+            lower = 0.0
+            group_tiers = limits.get(group, [])
+            for j, (tier, limit) in enumerate(group_tiers):
+                upper = np.inf if j == len(group_tiers) - 1 else max(limit, lower)
+                months.append(group[0])
+                periods.append(group[1])
+                tiers.append(tier)
+                columns.append(np.clip(peaks[:, g] - lower, 0.0, upper - lower))
+                lower = upper
+    kw = (
+        np.column_stack(columns)
+        if columns
+        else np.zeros((len(row_indices), 0), dtype=np.float64)
+    )
+    return np.array(months), np.array(periods), np.array(tiers), kw
+
+
+# DataFrame.attrs key under which aggregated loads carry their _BillingKw.
+_BILLING_KW_ATTR = "rdp_billing_kw"
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class _BillingKw:
+    """Billing kW rows of demand-enabled tariffs, carried beside CAIRO's layout.
+
+    The aggregated-load frame keeps CAIRO's 12 zero demand_charge rows per
+    building, so CAIRO's own consumers (``run_system_revenues`` fallbacks,
+    ``_precalc_customer_rates``) see exactly the frame CAIRO's aggregation
+    would give them. The kW per (month, period, tier) that only
+    ``_vectorized_run_system_revenues`` prices ride along in
+    ``frame.attrs[_BILLING_KW_ATTR]``, and in ``_BILLING_KW_BY_FRAME`` by
+    frame identity in case the attrs are dropped on the way (see
+    :func:`_billing_kw_of`). ``rows`` is indexed by bldg_id with columns
+    ``month, period, tier, grid_cons, tariff``. Copying a frame deep-copies
+    its attrs, so ``__deepcopy__`` shares the rows instead.
+    """
+
+    rows: pd.DataFrame
+
+    def __deepcopy__(self, memo: dict) -> _BillingKw:
+        return self
+
+
+# _BillingKw by id() of the aggregated-load frame it was built for, so billing
+# still finds it when an operation between aggregation and billing drops the
+# frame's attrs. Entries are removed when the frame is garbage-collected.
+_BILLING_KW_BY_FRAME: dict[int, _BillingKw] = {}
+
+
+def _attach_billing_kw(frame: pd.DataFrame, billing_kw: _BillingKw) -> None:
+    """Carry *billing_kw* with *frame*, in its attrs and the side table."""
+    frame.attrs[_BILLING_KW_ATTR] = billing_kw
+    key = id(frame)
+    _BILLING_KW_BY_FRAME[key] = billing_kw
+    weakref.finalize(frame, _BILLING_KW_BY_FRAME.pop, key, None)
+
+
+def _billing_kw_of(frame: pd.DataFrame) -> _BillingKw | None:
+    """The :class:`_BillingKw` attached to *frame* (or a copy of it), if any."""
+    billing_kw = frame.attrs.get(_BILLING_KW_ATTR)
+    if isinstance(billing_kw, _BillingKw):
+        return billing_kw
+    return _BILLING_KW_BY_FRAME.get(id(frame))
+
+
+@dataclasses.dataclass(frozen=True)
+class _GroupLayout:
+    """Hour order and segment boundaries for summing 8760 columns by group code.
+
+    ``order`` is a stable argsort of the hour -> group codes, so each group's
+    hours are one contiguous run starting at ``starts[g]`` and
+    ``np.add.reduceat(block[:, order], starts, axis=1)`` gives the group sums.
+    ``codes`` are the sorted unique group codes; ``in_order`` is True when the
+    hours are already grouped in time order (e.g. month-only codes), in which
+    case no column reorder is needed.
+    """
+
+    codes: np.ndarray
+    order: np.ndarray
+    starts: np.ndarray
+    in_order: bool
+
+
+def _group_layout(hour_codes: np.ndarray) -> _GroupLayout:
+    """Build the :class:`_GroupLayout` for an hour -> group code vector."""
+    order = np.argsort(hour_codes, kind="stable")
+    codes_sorted = hour_codes[order]
+    starts = np.flatnonzero(np.r_[True, codes_sorted[1:] != codes_sorted[:-1]])
+    return _GroupLayout(
+        codes=codes_sorted[starts],
+        order=order,
+        starts=starts,
+        in_order=bool((order == np.arange(len(order))).all()),
+    )
+
+
+# Buildings per block in _segment_sums; bounds the (rows, 8760) temporaries.
+_SEGMENT_BLOCK_ROWS = 2048
+
+
+def _layout_block(a: np.ndarray, rows: np.ndarray, layout: _GroupLayout) -> np.ndarray:
+    """Rows *rows* of the ``(n_bldg, 8760)`` array *a*, hours in *layout*'s order.
+
+    A contiguous run of rows is a slice view (copied only to reorder hours);
+    otherwise rows and the hour reorder are gathered in one ``np.ix_``
+    indexing step.
+    """
+    if len(rows) and rows[-1] - rows[0] == len(rows) - 1 and (np.diff(rows) == 1).all():
+        block = a[int(rows[0]) : int(rows[-1]) + 1]
+        return block if layout.in_order else block[:, layout.order]
+    if layout.in_order:
+        return a[rows]
+    return a[np.ix_(rows, layout.order)]
+
+
+def _segment_sums(
+    col_arrays: dict[str, np.ndarray],
+    row_indices: np.ndarray,
+    layout: _GroupLayout,
+) -> dict[str, np.ndarray]:
+    """Sum each ``(n_bldg, 8760)`` column over *layout*'s hour groups.
+
+    Rows are processed in blocks of ``_SEGMENT_BLOCK_ROWS`` gathered by
+    :func:`_layout_block` (a slice view for the usual single-tariff run of
+    rows), so temporaries stay bounded by the block size.
+
+    Returns ``{col: (len(row_indices), n_groups)}``.
+    """
+    n_rows = len(row_indices)
+    out = {c: np.empty((n_rows, len(layout.codes))) for c in col_arrays}
+    for b0 in range(0, n_rows, _SEGMENT_BLOCK_ROWS):
+        b1 = min(b0 + _SEGMENT_BLOCK_ROWS, n_rows)
+        for c, a in col_arrays.items():
+            block = _layout_block(a, row_indices[b0:b1], layout)
+            out[c][b0:b1] = np.add.reduceat(block, layout.starts, axis=1)
+    return out
+
+
 def _vectorized_process_building_demand_by_period(
     target_year: int,
     load_col_key: str,
@@ -339,9 +788,13 @@ def _vectorized_process_building_demand_by_period(
     """
     Vectorized replacement for cairo.rates_tool.loads.process_building_demand_by_period.
 
-    Handles flat and time-of-use tariffs (covers all 12 RI runs, which are all flat or TOU
-    with ur_tou_tier_comb_type=0 and ur_dc_enable=0).
-    Tiered/combined tariffs fall back to CAIRO's original implementation.
+    Handles flat and time-of-use tariffs with the segment-sum path
+    (``_segment_sums``). Tiered and combined TOU+tier tariffs fall back to
+    CAIRO's original implementation. Demand_charge rows follow CAIRO's
+    layout (12 zero rows per building); for tariffs with ``ur_dc_enable == 1``
+    the billing kW (grouped max of grid_cons, split into demand tiers by
+    ``_demand_tier_kw``) is attached to ``agg_load`` as a :class:`_BillingKw`
+    (:func:`_attach_billing_kw`).
 
     Returns
     -------
@@ -351,17 +804,17 @@ def _vectorized_process_building_demand_by_period(
         agg_solar: Index=['bldg_id'], columns=['month','period','tier','net_exports',
                    'self_cons','pv_generation','charge_type','tariff']
     """
+    from cairo.rates_tool import tariffs as tariff_funcs
     from cairo.rates_tool.loads import (
         _return_energy_charge_aggregation_method,
         extract_energy_charge_map,
     )
-    from cairo.rates_tool import tariffs as tariff_funcs
 
     # Use the saved-before-patching original to avoid infinite recursion.
     _orig_pbdbp = _orig_process_building_demand_by_period
 
     # Gas loads arrive in therms (converted from kWh in _return_loads_combined).
-    # The vectorized flat/TOU path below uses therms directly, bypassing CAIRO's
+    # The vectorized paths below use therms directly, bypassing CAIRO's
     # _adjust_gas_loads.  When we fall back to CAIRO's original path for tiered
     # tariffs, we must undo the conversion first because _load_worker will apply
     # _adjust_gas_loads (×0.0341) again — see the tiered fallback block below.
@@ -379,14 +832,10 @@ def _vectorized_process_building_demand_by_period(
         tariff_base=tariff_base, tariff_map=tariff_map, prototype_ids=prototype_ids
     )
 
-    # Classify each tariff once
-    tier_tou_check = {
-        k: _return_energy_charge_aggregation_method(v) for k, v in tariff_dicts.items()
-    }
-
     # Fall back to CAIRO for any tiered or combined tariff
     has_tiered_or_combined = any(
-        v in ("tiered", "combined") for v in tier_tou_check.values()
+        _return_energy_charge_aggregation_method(td) in ("tiered", "combined")
+        for td in tariff_dicts.values()
     )
     if has_tiered_or_combined:
         log.info(
@@ -397,8 +846,10 @@ def _vectorized_process_building_demand_by_period(
             # original path will call _load_worker → _adjust_gas_loads which
             # multiplies by _GAS_KWH_TO_THERM again.  Undo the first conversion
             # so that CAIRO sees kWh and performs a single correct conversion.
-            # In-place is safe: the caller never reads prepassed_load after this.
-            prepassed_load["load_data"] /= _GAS_KWH_TO_THERM
+            # Not in place: the frame may be backed by the shared load cache.
+            prepassed_load = prepassed_load.assign(
+                load_data=prepassed_load["load_data"] / _GAS_KWH_TO_THERM
+            )
         return _orig_pbdbp(
             target_year=target_year,
             load_col_key=load_col_key,
@@ -409,12 +860,12 @@ def _vectorized_process_building_demand_by_period(
             solar_pv_compensation=solar_pv_compensation,
         )
 
-    # --- Numpy-vectorized path for flat / time-of-use tariffs ---
+    # --- Numpy-vectorized path ---
     #
     # Instead of reset_index() (creates a 135M-row DataFrame for 15k buildings),
     # extract numpy arrays reshaped to (n_bldg, 8760), compute derived columns
-    # with numpy, and aggregate via matrix multiplication:
-    #   (n_bldg_tariff, 8760) @ (8760, n_groups) → (n_bldg_tariff, n_groups)
+    # with numpy, and aggregate via segment sums over hours sorted by group:
+    #   (n_bldg_tariff, 8760) → (n_bldg_tariff, n_groups)
     # where n_groups = unique (month, period, tier) combos (≤36 for TOU).
     # This reduces peak memory from ~15 GB to ~3-4 GB.
 
@@ -499,11 +950,12 @@ def _vectorized_process_building_demand_by_period(
 
     energy_parts: list[pd.DataFrame] = []
     solar_parts: list[pd.DataFrame] = []
+    billing_kw_parts: list[pd.DataFrame] = []
+    layouts: dict[tuple[bytes, bytes], _GroupLayout] = {}
 
     for tariff_key, bldg_ids_for_tariff in tariff_to_bldgs.items():
         td = tariff_dicts[tariff_key]
         charge_period_map = tariff_funcs._charge_period_mapping(td)
-        energy_charge_usage_map = extract_energy_charge_map(td)
 
         # 3-D lookup: [month_idx (0-11), hour (0-23), day_type (0=wd,1=we)] → period
         period_lut = np.zeros((12, 24, 2), dtype=np.int32)
@@ -516,38 +968,39 @@ def _vectorized_process_building_demand_by_period(
         day_type_idx = (~is_weekday_8760).astype(np.int32)
         hour_periods = period_lut[months_8760 - 1, hours_8760, day_type_idx]
 
-        # period → tier lookup
+        row_indices = np.array([bldg_to_row[bid] for bid in bldg_ids_for_tariff])
+        n_tariff_bldg = len(row_indices)
+
+        energy_charge_usage_map = extract_energy_charge_map(td)
         max_period = int(energy_charge_usage_map["period"].max())
         tier_lut = np.zeros(max_period + 1, dtype=np.int32)
         for _, row in energy_charge_usage_map.iterrows():
             tier_lut[int(row["period"])] = int(row["tier"])
-        hour_tiers = tier_lut[hour_periods]
-
-        # Encode (month, period, tier) as a single int for np.unique grouping.
-        # Safe when period < 100 and tier < 100 (URDB tariffs use single-digit
-        # values; the max observed is ~12 periods × ~6 tiers).
-        assert hour_periods.max() < 100 and hour_tiers.max() < 100, (
-            f"composite encoding overflow: period_max={hour_periods.max()}, "
-            f"tier_max={hour_tiers.max()}"
-        )
-        composite = months_8760 * 10000 + hour_periods * 100 + hour_tiers
-        unique_composites, hour_group_ids = np.unique(composite, return_inverse=True)
-        n_groups = len(unique_composites)
-        group_months = unique_composites // 10000
-        group_periods = (unique_composites % 10000) // 100
-        group_tiers = unique_composites % 100
-
-        # Indicator matrix: (8760, n_groups) — tiny since n_groups ≤ ~36
-        indicator = np.zeros((n_hours, n_groups), dtype=np.float64)
-        indicator[np.arange(n_hours), hour_group_ids] = 1.0
 
-        row_indices = np.array([bldg_to_row[bid] for bid in bldg_ids_for_tariff])
-        n_tariff_bldg = len(row_indices)
+        # Tariffs sharing a schedule share one group layout.
+        signature = (period_lut.tobytes(), tier_lut.tobytes())
+        layout = layouts.get(signature)
+        if layout is None:
+            hour_tiers = tier_lut[hour_periods]
+            # Encode (month, period, tier) as a single int group code.
+            # Safe when period < 100 and tier < 100 (URDB tariffs use
+            # single-digit values; the max observed is ~12 periods × ~6 tiers).
+            assert hour_periods.max() < 100 and hour_tiers.max() < 100, (
+                f"composite encoding overflow: period_max={hour_periods.max()}, "
+                f"tier_max={hour_tiers.max()}"
+            )
+            layout = _group_layout(
+                months_8760 * 10000 + hour_periods * 100 + hour_tiers
+            )
+            layouts[signature] = layout
+        n_groups = len(layout.codes)
+        group_months = layout.codes // 10000
+        group_periods = (layout.codes % 10000) // 100
+        group_tiers = layout.codes % 100
 
-        # (n_tariff_bldg, 8760) @ (8760, n_groups) → (n_tariff_bldg, n_groups)
-        energy_agg: dict[str, np.ndarray] = {}
-        for col_name, col_2d in load_col_arrays.items():
-            energy_agg[col_name] = col_2d[row_indices] @ indicator
+        # (n_tariff_bldg, 8760) → (n_tariff_bldg, n_groups), n_groups ≤ ~36
+        energy_agg = _segment_sums(load_col_arrays, row_indices, layout)
+        solar_agg = _segment_sums(pv_col_arrays, row_indices, layout)
 
         bids_expanded = np.repeat(np.asarray(bldg_ids_for_tariff), n_groups)
         month_expanded = np.tile(group_months, n_tariff_bldg)
@@ -567,11 +1020,34 @@ def _vectorized_process_building_demand_by_period(
         )
         energy_parts.append(edf)
 
-        if not is_gas and pv_col_arrays:
-            solar_agg: dict[str, np.ndarray] = {}
-            for col_name, col_2d in pv_col_arrays.items():
-                solar_agg[col_name] = col_2d[row_indices] @ indicator
+        if not is_gas and int(td.get("ur_dc_enable", 0) or 0) == 1:
+            flat_keys, tou_keys, dc_limits = _demand_charge_groups(
+                td,
+                hour_months=months_8760,
+                hour_hours=hours_8760,
+                hour_is_weekday=is_weekday_8760,
+            )
+            dc_months, dc_periods, dc_tiers, dc_kw = _demand_tier_kw(
+                grid_cons_2d if grid_cons_2d is not None else load_data_2d,
+                row_indices,
+                hour_keys=[flat_keys, tou_keys],
+                limits=dc_limits,
+            )
+            n_dc = len(dc_months)
+            billing_kw_parts.append(
+                pd.DataFrame(
+                    {
+                        "bldg_id": np.repeat(np.asarray(bldg_ids_for_tariff), n_dc),
+                        "month": np.tile(dc_months, n_tariff_bldg),
+                        "period": np.tile(dc_periods, n_tariff_bldg),
+                        "tier": np.tile(dc_tiers, n_tariff_bldg),
+                        "grid_cons": dc_kw.ravel(),
+                        "tariff": tariff_key,
+                    }
+                )
+            )
 
+        if not is_gas and pv_col_arrays:
             sdf = pd.DataFrame(
                 {
                     "bldg_id": bids_expanded.copy(),
@@ -591,7 +1067,9 @@ def _vectorized_process_building_demand_by_period(
 
     all_energy = pd.concat(energy_parts, ignore_index=True)
 
-    # Demand charge rows (vectorized)
+    # Demand charge rows (vectorized): CAIRO's empty per-month placeholder rows
+    # for every building. Billing kW of demand-enabled tariffs is attached
+    # separately below.
     n_proto = len(prototype_ids)
     tariff_per_bldg = np.array([tariff_map_dict[bid] for bid in prototype_ids])
     demand_dict: dict[str, Any] = {
@@ -611,6 +1089,14 @@ def _vectorized_process_building_demand_by_period(
 
     combined = pd.concat([all_energy, demand_df], ignore_index=True).fillna(0.0)
     combined = combined.set_index("bldg_id")
+    if billing_kw_parts:
+        # Billing kW per (month, period, tier) (period 0 = flat monthly demand)
+        _attach_billing_kw(
+            combined,
+            _BillingKw(
+                pd.concat(billing_kw_parts, ignore_index=True).set_index("bldg_id")
+            ),
+        )
 
     all_solar = (
         pd.concat(solar_parts, ignore_index=True)
@@ -635,6 +1121,93 @@ def _vectorized_process_building_demand_by_period(
 # Phase 3: vectorized bill calculation
 # ---------------------------------------------------------------------------
 
+# Solar compensation styles _vectorized_run_system_revenues prices itself; the
+# others go to CAIRO. net_billing joins once
+# test_vectorized_billing_with_solar_matches_cairo[net_billing] has passed
+# against the pinned CAIRO (the test enables it for its own comparison).
+_VECTORIZED_SOLAR_STYLES = frozenset({"net_metering"})
+
+
+def _coded_lookup(
+    entries: dict[tuple[int, ...], float], keys: tuple[np.ndarray, ...]
+) -> np.ndarray:
+    """Per-row values from a dense integer-indexed table; 0.0 for absent keys.
+
+    *entries* maps integer key tuples (e.g. ``(tariff_code, period, tier)``)
+    to a value; *keys* holds one integer array per axis (negative = unknown,
+    e.g. a tariff missing from the table). Replaces a ``merge`` on the same
+    columns with a single fancy-index gather.
+    """
+    shape = [1] * len(keys)
+    for key in entries:
+        shape = [max(s, k + 1) for s, k in zip(shape, key)]
+    for axis, k in enumerate(keys):
+        if len(k):
+            shape[axis] = max(shape[axis], int(k.max()) + 1)
+    table = np.zeros(shape)
+    for key, value in entries.items():
+        table[key] = value
+    known = np.logical_and.reduce([k >= 0 for k in keys])
+    return np.where(known, table[tuple(np.maximum(k, 0) for k in keys)], 0.0)
+
+
+def _agg_row_codes(
+    frame: pd.DataFrame, bldg_index: pd.Index, tariff_index: pd.Index
+) -> dict[str, np.ndarray]:
+    """Integer codes for aggregated-load rows: building row, tariff, month, period, tier."""
+    return {
+        "bldg": bldg_index.get_indexer(frame.index),
+        "tariff": tariff_index.get_indexer(frame["tariff"]),
+        "month": frame["month"].to_numpy().astype(np.int64),
+        "period": frame["period"].to_numpy().astype(np.int64),
+        "tier": frame["tier"].to_numpy().astype(np.int64),
+    }
+
+
+def _monthly_cost_matrix(
+    codes: dict[str, np.ndarray], costs: np.ndarray, n_bldg: int
+) -> np.ndarray:
+    """Sum per-row *costs* into a ``(n_bldg, 12)`` building × month array."""
+    keep = codes["bldg"] >= 0
+    flat = codes["bldg"][keep] * 12 + codes["month"][keep] - 1
+    return np.bincount(flat, weights=costs[keep], minlength=n_bldg * 12).reshape(
+        n_bldg, 12
+    )
+
+
+def _apply_fixed_and_min_charges(
+    bills: np.ndarray, bldg_tariffs: list[str], tariff_dicts: dict[str, dict]
+) -> np.ndarray:
+    """Add ``ur_monthly_fixed_charge`` and clamp to ``ur_monthly_min_charge``.
+
+    Charges are looked up once per tariff key and broadcast across the
+    ``(n_bldg, 12)`` *bills* array. The minimum applies per month after
+    fixed + energy, and only when positive (CAIRO's 0.0 default is a no-op on
+    non-negative bills).
+    """
+    tariff_index = pd.Index(list(tariff_dicts))
+    fixed = np.array(
+        [td.get("ur_monthly_fixed_charge", 0.0) or 0.0 for td in tariff_dicts.values()]
+    )
+    min_charge = np.array(
+        [td.get("ur_monthly_min_charge", 0.0) or 0.0 for td in tariff_dicts.values()]
+    )
+    codes = tariff_index.get_indexer(bldg_tariffs)
+    bills = bills + fixed[codes, None]
+    floor = min_charge[codes, None]
+    return np.where(floor > 0.0, np.maximum(bills, floor), bills)
+
+
+def _monthly_bill_frame(
+    bills: np.ndarray, prototype_ids: list[int], months: list[str]
+) -> pd.DataFrame:
+    """Wrap ``(n_bldg, 12)`` bills in CAIRO's Jan..Dec + Annual layout."""
+    monthly_wide = pd.DataFrame(bills, index=list(prototype_ids), columns=months)
+    monthly_wide["Annual"] = bills.sum(axis=1)
+    # CAIRO's output has index.names=[None]
+    monthly_wide.index.name = None
+    return monthly_wide
+
 
 def _vectorized_run_system_revenues(
     aggregated_load: pd.DataFrame,
@@ -650,15 +1223,19 @@ def _vectorized_run_system_revenues(
     Vectorized replacement for cairo.rates_tool.system_revenues.run_system_revenues.
 
     Replaces the 1,910-task Dask loop (one dask.delayed per building) with a single
-    vectorized pandas pass that:
-      1. Joins energy charge rates onto aggregated_load
-      2. Sums costs by (bldg_id, month) in one groupby
-      3. Adds fixed charges ($/month) vectorized across all buildings
+    vectorized numpy pass that:
+      1. Gathers energy charge rates for aggregated_load rows from a dense
+         (tariff, period, tier) table
+      2. Sums costs by (bldg_id, month) into an (n_bldg, 12) array, plus demand
+         charges priced from the billing kW attached to aggregated_load
+         (:class:`_BillingKw`)
+      3. Adds fixed charges ($/month) broadcast per tariff
       4. Applies min_charge per month if needed
-      5. Pivots to the wide month-column format CAIRO returns
+      5. Wraps the array in the wide month-column format CAIRO returns
 
-    Handles flat and TOU tariffs with optional net-metering solar compensation.
-    Falls back to original CAIRO for demand charges or net-billing solar.
+    Handles flat, TOU and tiered energy charges, flat and TOU demand charges
+    and optional net-metering solar compensation. Falls back to original CAIRO
+    for net-billing solar (see ``_VECTORIZED_SOLAR_STYLES``).
     """
     import cairo.rates_tool.lookups as lookups
     from cairo.rates_tool import tariffs as tariff_funcs
@@ -683,7 +1260,7 @@ def _vectorized_run_system_revenues(
     else:
         solar_compensation_df_norm = solar_compensation_df
 
-    # Check for features requiring fallback
+    # Charges beyond energy + fixed that need their own pass below
     has_demand = any(td.get("ur_dc_enable", 0) == 1 for td in tariff_dicts.values())
     has_solar_data = any(v is not None for v in solar_compensation_df_norm.values())
     # CAIRO only applies solar compensation when solar_compensation_style is an
@@ -696,22 +1273,12 @@ def _vectorized_run_system_revenues(
         "net_billing",
     )
 
-    if has_demand:
-        log.info("PATCH_FALLBACK _vectorized_run_system_revenues reason=has_demand")
-        return _orig_rsr(
-            aggregated_load=aggregated_load,
-            aggregated_solar=aggregated_solar,
-            solar_compensation_df=solar_compensation_df,
-            solar_compensation_style=solar_compensation_style,
-            process_agg_load=process_agg_load,
-            prototype_ids=prototype_ids,
-            tariff_config=tariff_config,
-            tariff_strategy=tariff_strategy,
-        )
-
-    if has_solar_compensation and solar_compensation_style == "net_billing":
+    if has_solar_compensation and (
+        solar_compensation_style not in _VECTORIZED_SOLAR_STYLES
+    ):
         log.info(
-            "PATCH_FALLBACK _vectorized_run_system_revenues reason=net_billing_unsupported"
+            "PATCH_FALLBACK _vectorized_run_system_revenues reason=%s_unsupported",
+            solar_compensation_style,
         )
         return _orig_rsr(
             aggregated_load=aggregated_load,
@@ -724,21 +1291,18 @@ def _vectorized_run_system_revenues(
             tariff_strategy=tariff_strategy,
         )
 
-    # Build a rate lookup DataFrame from ur_ec_tou_mat across all tariffs.
+    # Build a rate lookup from ur_ec_tou_mat across all tariffs.
     # ur_ec_tou_mat rows are tuples: (period, tier, max_usage, max_usage_units, rate, adjustments[, sell_rate])
     # Effective rate = rate + adjustments (same as calculate_energy_charges in CAIRO).
-    rate_rows = []
-    for tariff_key, td in tariff_dicts.items():
+    # Keyed by (tariff code, period, tier); tariff codes index tariff_dicts.
+    tariff_index = pd.Index(list(tariff_dicts))
+    rate_entries: dict[tuple[int, ...], float] = {}
+    for code, td in enumerate(tariff_dicts.values()):
         for row in td["ur_ec_tou_mat"]:
-            rate_rows.append(
-                {
-                    "tariff": tariff_key,
-                    "period": float(row[0]),
-                    "tier": float(row[1]),
-                    "rate": float(row[4]) + float(row[5]),  # rate + adjustments
-                }
+            # rate + adjustments
+            rate_entries[(code, int(row[0]), int(row[1]))] = float(row[4]) + float(
+                row[5]
             )
-    rate_lookup = pd.DataFrame(rate_rows)
 
     # Process agg_load the same way CAIRO does in run_system_revenues.
     # When process_agg_load=True, CAIRO does:
@@ -747,7 +1311,7 @@ def _vectorized_run_system_revenues(
     # calculate_energy_charges(agg_load_df, td) — which filters to charge_type=="energy_charge"
     # and merges on [period, tier], then sums to get costs per month.
     #
-    # We replicate this in bulk: filter energy_charge rows, merge rates, multiply.
+    # We replicate this in bulk: filter energy_charge rows, gather rates, multiply.
 
     if not process_agg_load:
         # Non-standard path — fall back to CAIRO
@@ -780,117 +1344,114 @@ def _vectorized_run_system_revenues(
             tariff_strategy=tariff_strategy,
         )
 
+    # Demand charges are priced from the billing kW the vectorized aggregation
+    # attaches; a frame without it (CAIRO's own aggregation, e.g. the tiered
+    # fallback, or a frame that lost its attrs and identity) goes to CAIRO.
+    billing_kw = _billing_kw_of(aggregated_load)
+    if has_demand and billing_kw is None:
+        log.warning(
+            "PATCH_FALLBACK _vectorized_run_system_revenues reason=demand_without_billing_kw "
+            "(no billing kW attached to the aggregated load; billing demand tariffs "
+            "with CAIRO's per-building loop)"
+        )
+        return _orig_rsr(
+            aggregated_load=aggregated_load,
+            aggregated_solar=aggregated_solar,
+            solar_compensation_df=solar_compensation_df,
+            solar_compensation_style=solar_compensation_style,
+            process_agg_load=process_agg_load,
+            prototype_ids=prototype_ids,
+            tariff_config=tariff_config,
+            tariff_strategy=tariff_strategy,
+        )
+
     # --- Vectorized energy charge calculation ---
-    # Filter to energy_charge rows only
+    # Rows are integer-coded (building row, tariff, month, period, tier) so the
+    # rate lookups are dense-table gathers and the (bldg_id, month) sums one
+    # bincount into an (n_bldg, 12) array.
+    bldg_index = pd.Index(prototype_ids)
+    n_bldg = len(bldg_index)
     energy_rows = aggregated_load[
-        aggregated_load["charge_type"] == "energy_charge"
-    ].copy()
-    energy_rows = energy_rows.reset_index()  # bring bldg_id into columns
-
-    # Merge energy rates (by tariff + period + tier)
-    energy_rows = energy_rows.merge(
-        rate_lookup, on=["tariff", "period", "tier"], how="left"
+        aggregated_load["charge_type"].to_numpy() == "energy_charge"
+    ]
+    energy_codes = _agg_row_codes(energy_rows, bldg_index, tariff_index)
+    rates = _coded_lookup(
+        rate_entries,
+        (energy_codes["tariff"], energy_codes["period"], energy_codes["tier"]),
     )
     # For electricity: bill on grid_cons; for gas: bill on load_data (no grid_cons column)
     billing_col = "grid_cons" if "grid_cons" in energy_rows.columns else "load_data"
-    energy_rows["costs"] = energy_rows[billing_col] * energy_rows["rate"]
+    bills = _monthly_cost_matrix(
+        energy_codes, energy_rows[billing_col].to_numpy() * rates, n_bldg
+    )
 
-    # Sum energy costs by (bldg_id, month)
-    monthly_energy = energy_rows.groupby(["bldg_id", "month"], as_index=False)[
-        "costs"
-    ].sum()
+    # --- Vectorized demand charges ---
+    # Billing kW per (month, period, tier) in grid_cons (see _demand_tier_kw).
+    # Period 0 rows price against ur_dc_flat_mat by (month, tier); the rest
+    # against ur_dc_tou_mat by (period, tier).
+    if has_demand and billing_kw is not None:
+        dc_entries: dict[tuple[int, ...], float] = {}
+        for code, td in enumerate(tariff_dicts.values()):
+            if td.get("ur_dc_enable", 0) != 1:
+                continue
+            for row in td.get("ur_dc_flat_mat") or []:
+                dc_entries[(code, int(row[0]) + 1, 0, int(row[1]))] = float(row[3])
+            for row in td.get("ur_dc_tou_mat") or []:
+                for month in range(1, 13):
+                    dc_entries[(code, month, int(row[0]), int(row[1]))] = float(row[3])
+        demand_rows = billing_kw.rows
+        demand_codes = _agg_row_codes(demand_rows, bldg_index, tariff_index)
+        dc_rates = _coded_lookup(
+            dc_entries,
+            (
+                demand_codes["tariff"],
+                demand_codes["month"],
+                demand_codes["period"],
+                demand_codes["tier"],
+            ),
+        )
+        bills += _monthly_cost_matrix(
+            demand_codes, demand_rows["grid_cons"].to_numpy() * dc_rates, n_bldg
+        )
 
-    # Pivot to wide format: rows=bldg_id, columns=month (1..12)
-    monthly_wide = monthly_energy.pivot(
-        index="bldg_id", columns="month", values="costs"
-    )
-    # Ensure all 12 months are present
-    for m in range(1, 13):
-        if m not in monthly_wide.columns:
-            monthly_wide[m] = 0.0
-    monthly_wide = monthly_wide[[m for m in range(1, 13)]]
-
-    # --- Vectorized net-metering solar compensation ---
-    # Only reached when solar_compensation_style == "net_metering" (net_billing
-    # falls back above; style=None skips via has_solar_compensation=False).
+    # --- Vectorized solar compensation (_VECTORIZED_SOLAR_STYLES) ---
+    # Only reached for a vectorized style (others fall back above);
+    # style=None skips via has_solar_compensation=False.
     # Mirrors CAIRO's calculate_compensation: effective sell rate per (period,tier)
     # is (rate + adjustments) * sell_rate, then costs = net_exports * rate * -1.
+    # net_exports is each hour's export (clip(pv - load, 0)) already summed by
+    # (bldg, month, period, tier) from the (n_bldg, 8760) array in the
+    # aggregation matmul, so hourly crediting at a period's sell rate is one
+    # multiply per row. Net billing differs only in the sell_rate column
+    # _return_export_compensation_rate writes into ur_ec_tou_mat.
     if has_solar_compensation and not aggregated_solar.empty:
-        sell_rows = []
+        sell_entries: dict[tuple[int, ...], float] = {}
         for tariff_key, sell_dict in solar_compensation_df_norm.items():
-            if sell_dict is None:
+            if sell_dict is None or tariff_key not in tariff_index:
                 continue
+            code = tariff_index.get_loc(tariff_key)
             for row in sell_dict["ur_ec_tou_mat"]:
                 effective_rate = (float(row[4]) + float(row[5])) * float(row[6])
-                sell_rows.append(
-                    {
-                        "tariff": tariff_key,
-                        "period": float(row[0]),
-                        "tier": float(row[1]),
-                        "sell_rate": effective_rate,
-                    }
-                )
-        sell_lookup = pd.DataFrame(sell_rows)
+                sell_entries[(code, int(row[0]), int(row[1]))] = effective_rate
 
-        solar_df = aggregated_solar.reset_index()
-        solar_df["period"] = solar_df["period"].astype(float)
-        solar_df["tier"] = solar_df["tier"].astype(float)
-        solar_df = solar_df.merge(
-            sell_lookup, on=["tariff", "period", "tier"], how="left"
+        solar_codes = _agg_row_codes(aggregated_solar, bldg_index, tariff_index)
+        sell_rates = _coded_lookup(
+            sell_entries,
+            (solar_codes["tariff"], solar_codes["period"], solar_codes["tier"]),
+        )
+        bills += _monthly_cost_matrix(
+            solar_codes,
+            aggregated_solar["net_exports"].to_numpy() * sell_rates * -1,
+            n_bldg,
         )
-        solar_df["costs"] = solar_df["net_exports"] * solar_df["sell_rate"] * -1
-
-        solar_monthly = solar_df.groupby(["bldg_id", "month"], as_index=False)[
-            "costs"
-        ].sum()
-        solar_wide = solar_monthly.pivot(
-            index="bldg_id", columns="month", values="costs"
-        ).fillna(0.0)
-        for m in range(1, 13):
-            if m not in solar_wide.columns:
-                solar_wide[m] = 0.0
-        solar_wide = solar_wide[[m for m in range(1, 13)]]
-
-        common_ids = monthly_wide.index.intersection(solar_wide.index)
-        if len(common_ids) > 0:
-            monthly_wide.loc[common_ids] += solar_wide.loc[common_ids]
-
-    # --- Vectorized fixed charge addition ---
-    # fixed_charge = ur_monthly_fixed_charge per month per building
-    # min_charge = ur_monthly_min_charge per month (applied per month after fixed+energy)
-    for bldg_id in prototype_ids:
-        tk = tariff_map_dict[bldg_id]
-        td = tariff_dicts[tk]
-        fixed = td.get("ur_monthly_fixed_charge", 0.0) or 0.0
-        min_ch = td.get("ur_monthly_min_charge", 0.0) or 0.0
-
-        if bldg_id not in monthly_wide.index:
-            # Building had zero load — fill all months with fixed/min
-            monthly_wide.loc[bldg_id, :] = 0.0
-
-        # Add fixed charge to each month
-        monthly_wide.loc[bldg_id, :] += fixed
-
-        # Apply min_charge: bill = max(bill, min_charge) per month
-        # CAIRO checks: any(fixed_df["min_charge"] > -1e38) — 0.0 > -1e38 is True,
-        # but for min_charge=0.0 the max() has no effect on positive bills.
-        # We still apply it for correctness.
-        if min_ch > 0.0:
-            monthly_wide.loc[bldg_id, :] = monthly_wide.loc[bldg_id, :].clip(
-                lower=min_ch
-            )
-
-    # Reorder to match prototype_ids order (CAIRO preserves insertion order)
-    monthly_wide = monthly_wide.reindex(prototype_ids)
 
-    # --- Rename columns from 1..12 to month abbreviations and add Annual ---
-    monthly_wide.columns = lookups.months
-    monthly_wide["Annual"] = monthly_wide.sum(axis=1)
+    # --- Fixed charge and min_charge, broadcast per tariff ---
+    bills = _apply_fixed_and_min_charges(
+        bills, [tariff_map_dict[bid] for bid in prototype_ids], tariff_dicts
+    )
 
-    # Clear the index name (CAIRO's output has index.names=[None])
-    monthly_wide.index.name = None
-
-    return monthly_wide
+    # Rows follow prototype_ids order (CAIRO preserves insertion order)
+    return _monthly_bill_frame(bills, prototype_ids, lookups.months)
 
 
 # ---------------------------------------------------------------------------
@@ -949,80 +1510,42 @@ def _vectorized_calculate_gas_bills(
         prototype_ids=prototype_ids,
     )
 
-    # Build a rate lookup DataFrame from ur_ec_tou_mat across all tariffs.
+    # Build a rate lookup from ur_ec_tou_mat across all tariffs, keyed by
+    # (tariff code, period, tier).
     # ur_ec_tou_mat rows: (period, tier, max_usage, max_usage_units, rate, adjustments, ...)
     # Effective rate = rate + adjustments (matching CAIRO's calculate_energy_charges).
-    rate_rows = []
-    for tariff_key, td in tariff_dicts.items():
-        tou_mat = td.get("ur_ec_tou_mat", [])
-        for row in tou_mat:
-            rate_rows.append(
-                {
-                    "tariff": tariff_key,
-                    "period": float(row[0]),
-                    "tier": float(row[1]),
-                    "rate": float(row[4]) + float(row[5]),  # rate + adjustments
-                }
+    tariff_index = pd.Index(list(tariff_dicts))
+    rate_entries: dict[tuple[int, ...], float] = {}
+    for code, td in enumerate(tariff_dicts.values()):
+        for row in td.get("ur_ec_tou_mat", []):
+            # rate + adjustments
+            rate_entries[(code, int(row[0]), int(row[1]))] = float(row[4]) + float(
+                row[5]
             )
-    rate_lookup = pd.DataFrame(rate_rows)
 
-    # Filter to energy_charge rows; reset_index to bring bldg_id into columns
+    # Filter to energy_charge rows and integer-code them
     energy_rows = aggregated_gas_load[
-        aggregated_gas_load["charge_type"] == "energy_charge"
-    ].copy()
-    energy_rows = energy_rows.reset_index()  # bldg_id now a column
-
-    # Merge rates on [tariff, period, tier]
-    energy_rows = energy_rows.merge(
-        rate_lookup, on=["tariff", "period", "tier"], how="left"
+        aggregated_gas_load["charge_type"].to_numpy() == "energy_charge"
+    ]
+    energy_codes = _agg_row_codes(energy_rows, pd.Index(prototype_ids), tariff_index)
+    rates = _coded_lookup(
+        rate_entries,
+        (energy_codes["tariff"], energy_codes["period"], energy_codes["tier"]),
     )
 
-    # Gas consumption is in load_data (therms); no grid_cons column
-    energy_rows["costs"] = energy_rows["load_data"] * energy_rows["rate"]
-
-    # Sum energy costs by (bldg_id, month)
-    monthly_energy = energy_rows.groupby(["bldg_id", "month"], as_index=False)[
-        "costs"
-    ].sum()
-
-    # Pivot to wide format: rows=bldg_id, columns=month (1..12)
-    monthly_wide = monthly_energy.pivot(
-        index="bldg_id", columns="month", values="costs"
+    # Gas consumption is in load_data (therms); no grid_cons column.
+    # Sum energy costs by (bldg_id, month) into an (n_bldg, 12) array.
+    bills = _monthly_cost_matrix(
+        energy_codes, energy_rows["load_data"].to_numpy() * rates, len(prototype_ids)
     )
-    # Ensure all 12 months present
-    for m in range(1, 13):
-        if m not in monthly_wide.columns:
-            monthly_wide[m] = 0.0
-    monthly_wide = monthly_wide[[m for m in range(1, 13)]]
-
-    # Vectorized fixed charge addition + min_charge per building
-    for bldg_id in prototype_ids:
-        tk = tariff_map_dict[bldg_id]
-        td = tariff_dicts[tk]
-        fixed = td.get("ur_monthly_fixed_charge", 0.0) or 0.0
-        min_ch = td.get("ur_monthly_min_charge", 0.0) or 0.0
-
-        if bldg_id not in monthly_wide.index:
-            monthly_wide.loc[bldg_id, :] = 0.0
-
-        monthly_wide.loc[bldg_id, :] += fixed
-
-        if min_ch > 0.0:
-            monthly_wide.loc[bldg_id, :] = monthly_wide.loc[bldg_id, :].clip(
-                lower=min_ch
-            )
-
-    # Reorder to match prototype_ids order
-    monthly_wide = monthly_wide.reindex(prototype_ids)
-
-    # Rename columns 1..12 to month abbreviations and add Annual
-    monthly_wide.columns = lookups.months
-    monthly_wide["Annual"] = monthly_wide.sum(axis=1)
 
-    # Clear the index name (CAIRO's output has index.names=[None])
-    monthly_wide.index.name = None
+    # Fixed charge + min_charge, broadcast per tariff
+    bills = _apply_fixed_and_min_charges(
+        bills, [tariff_map_dict[bid] for bid in prototype_ids], tariff_dicts
+    )
 
-    return monthly_wide
+    # Rows follow prototype_ids order; month abbreviations + Annual
+    return _monthly_bill_frame(bills, prototype_ids, lookups.months)
 
 
 # ---------------------------------------------------------------------------
@@ -1305,6 +1828,27 @@ def _patched_return_eb_and_residual(
 
 _orig_return_cross_sub_metrics = _cairo_postproc.InternalCrossSubsidizationProcessor._return_cross_subsidization_metrics
 
+# run_type the BAT balance checks below run under, when it differs from the
+# one CAIRO simulated with (see bat_check_run_type).
+_bat_check_run_type: str | None = None
+
+
+@contextlib.contextmanager
+def bat_check_run_type(run_type: str) -> Iterator[None]:
+    """Check BAT balance as a *run_type* run inside the block.
+
+    A precalc run calibrated in closed form is simulated by CAIRO as a
+    default run; this keeps the precalc-only checks that the calibrated
+    tariffs recover the revenue requirement.
+    """
+    global _bat_check_run_type
+    previous = _bat_check_run_type
+    _bat_check_run_type = run_type
+    try:
+        yield
+    finally:
+        _bat_check_run_type = previous
+
 
 def _patched_return_cross_subsidization_metrics(
     self: Any,
@@ -1360,7 +1904,7 @@ def _patched_return_cross_subsidization_metrics(
             )
         )
 
-    if self.run_type == "precalc":
+    if (_bat_check_run_type or self.run_type) == "precalc":
         if np.round(bat_df["BAT_vol"].mul(bat_df["weight"]).sum(), 1) != 0:
             _postproc_log.error(
                 "BAT w/ volumetric residual cost allocation imbalanced!"
@@ -1383,9 +1927,13 @@ def _patched_return_cross_subsidization_metrics(
         )
 
     bat_df["dollar_year"] = year_run
-    bat_df.to_csv(
-        self.save_folder / "cross_subsidization" / "cross_subsidization_BAT_values.csv",
-        index=True,
+    bat_path = (
+        self.save_folder / "cross_subsidization" / "cross_subsidization_BAT_values.csv"
+    )
+    bat_df.to_csv(bat_path, index=True)
+    _write_output_parquet(
+        bat_df.rename_axis("bldg_id").sort_index().reset_index(),
+        bat_path.with_suffix(".parquet"),
     )
 
     self._return_average_bat_by_segment(building_metadata, bat_df)
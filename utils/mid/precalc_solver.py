@@ -0,0 +1,235 @@
+"""Closed-form precalc calibration for flat and TOU energy-only tariffs.
+
+CAIRO's precalc scales every ``(period, tier)`` energy rate of a tariff to
+``rate_unity * rel_value`` (``rel_value`` from the precalc period mapping) so
+that weighted bills recover the revenue requirement. When a tariff has no
+demand charges, no minimum bill, no adjustments and one tier per period, its
+annual revenue is linear in ``rate_unity``::
+
+    RR = sum_b w_b * 12 * fixed_charge + rate_unity * sum_p rel_p * kWh_p
+
+where ``kWh_p = sum_b w_b * grid_cons_bp`` over the tariff's buildings. So
+``rate_unity`` has a closed form, computed here from a
+``(n_bldg, 8760) @ (8760, n_periods)`` aggregation instead of CAIRO's
+unity-rate bill pass.
+
+A float revenue requirement shares one ``rate_unity`` across all tariffs (as
+CAIRO does); a per-tariff-key dict (subclass runs) gives each tariff its own.
+``solve_precalc`` returns ``None`` when any tariff does not qualify, and the
+caller falls back to CAIRO's precalc.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, cast
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+TARIFF_FINAL_CONFIG = "tariff_final_config.json"
+HOURS_PER_YEAR = 8760
+MONTHS_PER_YEAR = 12
+# ur_ec_tou_mat row layout: period, tier, max_usage, units, rate, adj[, sell].
+_PERIOD, _TIER, _UNITS, _RATE, _ADJ = 0, 1, 3, 4, 5
+_KWH_UNITS = 0
+
+
+@dataclass(frozen=True, slots=True)
+class PrecalcSolution:
+    """Calibrated PySAM tariff dicts and the ``rate_unity`` behind each."""
+
+    tariffs: dict[str, dict[str, Any]]
+    rate_unity: dict[str, float]
+
+
+def unsupported_reason(tariff: dict[str, Any]) -> str | None:
+    """Why *tariff* (PySAM format) needs CAIRO's precalc, or ``None``."""
+    if int(tariff.get("ur_dc_enable", 0) or 0) == 1:
+        return "demand charges"
+    if float(tariff.get("ur_monthly_min_charge", 0.0) or 0.0) > 0:
+        return "monthly minimum charge"
+    if float(tariff.get("ur_annual_min_charge", 0.0) or 0.0) > 0:
+        return "annual minimum charge"
+    rows = tariff.get("ur_ec_tou_mat") or []
+    if not rows:
+        return "no energy charges"
+    periods = [int(row[_PERIOD]) for row in rows]
+    if len(set(periods)) != len(periods):
+        return "tiered energy charges"
+    if any(int(row[_UNITS]) != _KWH_UNITS for row in rows):
+        return "non-kWh energy charge units"
+    if any(float(row[_ADJ]) != 0.0 for row in rows):
+        return "energy charge adjustments"
+    return None
+
+
+def hour_periods(tariff: dict[str, Any], time_index: pd.DatetimeIndex) -> np.ndarray:
+    """1-based energy period of each hour, from the 12x24 weekday/weekend schedules."""
+    period_lut = np.stack(
+        [
+            np.asarray(tariff["ur_ec_sched_weekday"], dtype=np.int32),
+            np.asarray(tariff["ur_ec_sched_weekend"], dtype=np.int32),
+        ],
+        axis=-1,
+    )
+    index = cast(Any, time_index)
+    day_type = (np.asarray(index.weekday) >= 5).astype(np.int32)
+    return period_lut[np.asarray(index.month) - 1, np.asarray(index.hour), day_type]
+
+
+def billed_kwh(load_elec: pd.DataFrame) -> tuple[np.ndarray, np.ndarray] | None:
+    """``(bldg_ids, grid_cons (n_bldg, 8760))`` as billed by the patched CAIRO.
+
+    ``grid_cons = max(electricity_net, 0)``; exports are not credited because
+    run_scenario bills without solar compensation. Returns ``None`` for loads
+    without ``electricity_net`` that carry PV columns.
+    """
+    bldg_ids = np.asarray(load_elec.index.get_level_values("bldg_id").unique())
+    shape = (len(bldg_ids), HOURS_PER_YEAR)
+    if "electricity_net" in load_elec.columns:
+        net = load_elec["electricity_net"].to_numpy().reshape(shape)
+        return bldg_ids, np.maximum(net, 0)
+    if {"pv_generation", "net_exports"} & set(load_elec.columns):
+        return None
+    return bldg_ids, load_elec["load_data"].to_numpy().reshape(shape)
+
+
+def solve_precalc(
+    tariffs_params: dict[str, dict[str, Any]],
+    tariff_map_df: pd.DataFrame,
+    precalc_mapping: pd.DataFrame,
+    customer_metadata: pd.DataFrame,
+    load_elec: pd.DataFrame,
+    revenue_requirement: float | dict[str, float],
+) -> PrecalcSolution | None:
+    """Calibrate *tariffs_params* to *revenue_requirement* in closed form.
+
+    Arguments are the ones run_scenario passes to ``bs.simulate``:
+    ``tariff_map_df`` has ``bldg_id``/``tariff_key``, ``precalc_mapping`` has
+    ``period``/``tier``/``rel_value``/``tariff`` and ``customer_metadata``
+    carries ``weight``. Returns ``None`` (after logging why) when CAIRO's
+    precalc must run instead.
+    """
+    for key, tariff in tariffs_params.items():
+        reason = unsupported_reason(tariff)
+        if reason is not None:
+            log.info("Closed-form precalc not applicable: %s has %s", key, reason)
+            return None
+    if isinstance(revenue_requirement, dict):
+        missing = set(tariffs_params) - set(revenue_requirement)
+        if missing:
+            log.info(
+                "Closed-form precalc not applicable: no RR for %s", sorted(missing)
+            )
+            return None
+    billed = billed_kwh(load_elec)
+    if billed is None:
+        log.info("Closed-form precalc not applicable: PV loads without net column")
+        return None
+    bldg_ids, grid_cons = billed
+
+    time_index = pd.DatetimeIndex(
+        load_elec.index.get_level_values("time")[:HOURS_PER_YEAR]
+    )
+    weights = (
+        customer_metadata.set_index("bldg_id")["weight"]
+        .reindex(bldg_ids)
+        .to_numpy(dtype=float)
+    )
+    tariff_of = (
+        tariff_map_df.set_index("bldg_id")["tariff_key"].reindex(bldg_ids).to_numpy()
+    )
+    if np.isnan(weights).any() or pd.isna(tariff_of).any():
+        log.info("Closed-form precalc not applicable: buildings missing weight/tariff")
+        return None
+
+    # Per tariff: fixed revenue and unity-rate energy revenue (sum rel_p * kWh_p).
+    fixed_rev: dict[str, float] = {}
+    unity_rev: dict[str, float] = {}
+    rel_values: dict[str, dict[int, float]] = {}
+    for key, tariff in tariffs_params.items():
+        mapping = precalc_mapping[precalc_mapping["tariff"] == key]
+        rel = {
+            int(p): float(v)
+            for p, v in zip(mapping["period"], mapping["rel_value"], strict=True)
+        }
+        periods = [int(row[_PERIOD]) for row in tariff["ur_ec_tou_mat"]]
+        if set(periods) - set(rel):
+            log.info("Closed-form precalc not applicable: %s has no rel_values", key)
+            return None
+        rel_values[key] = rel
+
+        rows = np.flatnonzero(tariff_of == key)
+        w = weights[rows]
+        fixed = float(tariff.get("ur_monthly_fixed_charge", 0.0) or 0.0)
+        fixed_rev[key] = MONTHS_PER_YEAR * fixed * float(w.sum())
+        # Weighted hourly kWh, then one bincount per period (no 8760 x n_bldg temp).
+        hourly_kwh = w @ grid_cons[rows] if len(rows) else np.zeros(HOURS_PER_YEAR)
+        period_kwh = np.bincount(
+            hour_periods(tariff, time_index),
+            weights=hourly_kwh,
+            minlength=max(periods) + 1,
+        )
+        unity_rev[key] = sum(rel[p] * period_kwh[p] for p in periods)
+
+    if isinstance(revenue_requirement, dict):
+        rate_unity = {
+            key: _rate_unity(revenue_requirement[key], fixed_rev[key], unity_rev[key])
+            for key in tariffs_params
+        }
+    else:
+        shared = _rate_unity(
+            revenue_requirement, sum(fixed_rev.values()), sum(unity_rev.values())
+        )
+        rate_unity = dict.fromkeys(tariffs_params, shared)
+
+    calibrated = {}
+    for key, tariff in tariffs_params.items():
+        out = copy.deepcopy(tariff)
+        out["ur_ec_tou_mat"] = [
+            [
+                *row[:_RATE],
+                rate_unity[key] * rel_values[key][int(row[_PERIOD])],
+                *row[_RATE + 1 :],
+            ]
+            for row in tariff["ur_ec_tou_mat"]
+        ]
+        calibrated[key] = out
+    log.info(
+        "Closed-form precalc: rate_unity %s",
+        {k: round(v, 6) for k, v in rate_unity.items()},
+    )
+    return PrecalcSolution(tariffs=calibrated, rate_unity=rate_unity)
+
+
+def _rate_unity(rr: float, fixed_rev: float, unity_rev: float) -> float:
+    if unity_rev <= 0:
+        raise ValueError(
+            f"Cannot calibrate energy rates: unity-rate energy revenue is {unity_rev}"
+        )
+    return (rr - fixed_rev) / unity_rev
+
+
+def write_tariff_final_config(
+    output_dir: Path, tariffs: dict[str, dict[str, Any]]
+) -> Path:
+    """Write calibrated tariffs as CAIRO's ``tariff_final_config.json``."""
+    path = Path(output_dir) / TARIFF_FINAL_CONFIG
+    path.write_text(json.dumps(tariffs, indent=4, default=_json_default))
+    log.info(".... Saved closed-form precalc tariffs: %s", path)
+    return path
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
@@ -51,7 +51,6 @@ from __future__ import annotations
 import argparse
 import subprocess
 import sys
-import tempfile
 import time
 from pathlib import Path
 from typing import cast
@@ -64,6 +63,15 @@ from utils.post.master_run12_passthrough import (
     REFERENCE_COMB_RUN_PAIR,
     load_passthrough_reference_annual,
 )
+from utils.post.parallel_build import (
+    hive_partitions,
+    init_s3_client,
+    map_utilities,
+    read_pair,
+    sync_parquet_to_s3,
+    utility_tag,
+)
+from utils.post.run_manifest import find_manifest_run_dir
 
 BAT_CSV = "cross_subsidization/cross_subsidization_BAT_values.csv"
 UPGRADE_00_RUNS = {
@@ -178,7 +186,7 @@ _t0 = 0.0
 def _log(msg: str) -> float:
     elapsed = time.monotonic() - _t0
     mm, ss = divmod(int(elapsed), 60)
-    print(f"[{mm:02d}:{ss:02d}] {msg}", file=sys.stderr, flush=True)
+    print(f"[{mm:02d}:{ss:02d}] {utility_tag()}{msg}", file=sys.stderr, flush=True)
     return time.monotonic()
 
 
@@ -221,9 +229,15 @@ def _s3_ls_prefixes(s3_path: str) -> list[str]:
 
 
 def _find_run_dir(s3_base: str, run_num: int) -> str:
-    """Find the subdirectory matching a run number under an execution-time prefix."""
-    prefixes = _s3_ls_prefixes(s3_base)
+    """Find the subdirectory matching a run number under an execution-time prefix.
+
+    Resolved from the batch's run manifest (read once per batch); a run the
+    manifest does not name (or a batch without one) is listed on S3.
+    """
     marker = f"_run{run_num}_"
+    if (found := find_manifest_run_dir(s3_base, marker)) is not None:
+        return found
+    prefixes = _s3_ls_prefixes(s3_base)
     for dirname in prefixes:
         if marker in dirname:
             return f"{s3_base.rstrip('/')}/{dirname}"
@@ -392,8 +406,13 @@ def _process_utility(
     state_lower: str,
     output_batch_all_util: str,
     storage_options: dict[str, str] | None,
+    parallel_reads: bool = False,
 ) -> pl.DataFrame:
-    """Build the master BAT table fragment for a single utility."""
+    """Build the master BAT table fragment for a single utility.
+
+    With *parallel_reads*, the delivery and supply BAT values are read
+    concurrently.
+    """
     meta_bldg_ids = set(metadata_for_utility[BLDG_ID].to_list())
     n_bldgs = len(meta_bldg_ids)
 
@@ -408,13 +427,18 @@ def _process_utility(
     )
 
     # --- Read BAT CSVs ---
-    t = _log("  Reading BAT values (delivery run)...")
-    bat_delivery_df = scan(f"{dir_delivery}/{BAT_CSV}").collect()
-    _log_done("  Reading BAT delivery", t, f"{bat_delivery_df.height} rows")
-
-    t = _log("  Reading BAT values (supply run)...")
-    bat_supply_df = scan(f"{dir_supply}/{BAT_CSV}").collect()
-    _log_done("  Reading BAT supply", t, f"{bat_supply_df.height} rows")
+    t = _log("  Reading BAT values (delivery, supply runs)...")
+    bat_delivery_df, bat_supply_df = read_pair(
+        lambda run_dir: scan(f"{run_dir}/{BAT_CSV}").collect(),
+        dir_delivery,
+        dir_supply,
+        parallel=parallel_reads,
+    )
+    _log_done(
+        "  Reading BAT values",
+        t,
+        f"delivery {bat_delivery_df.height} rows, supply {bat_supply_df.height} rows",
+    )
 
     # --- Validate building IDs ---
     delivery_ids = set(bat_delivery_df[BLDG_ID].unique().to_list())
@@ -637,6 +661,14 @@ def _parse_args() -> argparse.Namespace:
         default=None,
         help="Comma-separated list of utilities to process (default: all from state.env).",
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=1,
+        help="Utilities to process concurrently (default: 1, one at a time). With "
+        "more than one, each utility's delivery and supply reads also run "
+        "concurrently.",
+    )
     return parser.parse_args()
 
 
@@ -682,10 +714,23 @@ def main() -> None:
         _log(f"  {u}: {n} buildings")
 
     # --- Process each utility ---
-    all_dfs: list[pl.DataFrame] = []
-    for i, utility in enumerate(utilities, 1):
+    output_s3 = (
+        f"s3://data.sb/switchbox/cairo/outputs/hp_rates/{state}/all_utilities/"
+        f"{output_batch_all_util}/run_{args.run_delivery}+{args.run_supply}/"
+        f"cross_subsidization_BAT_values/"
+    )
+    # With several workers each utility's partition is written as soon as it is
+    # built and its building count checked, so a later failure can leave earlier
+    # partitions published. One worker (the default) writes every partition
+    # only after the final cross-utility validation.
+    stream_partitions = args.max_workers > 1
+    init_s3_client(args.max_workers)
+    if args.max_workers > 1:
+        _log(f"Processing {len(utilities)} utilities on {args.max_workers} workers")
+
+    def build_utility(utility: str) -> pl.DataFrame:
         util_batch = batch_overrides.get(utility, args.batch)
-        _log(f"Processing utility {i}/{len(utilities)}: {utility} (batch={util_batch})")
+        _log(f"Processing utility {utility} (batch={util_batch})")
         s3_base = f"{s3_output_base}/{state}/{utility}/{util_batch}"
 
         meta_for_util = metadata.filter(pl.col("sb.electric_utility") == utility)
@@ -699,6 +744,7 @@ def main() -> None:
             state_lower=state,
             output_batch_all_util=output_batch_all_util,
             storage_options=storage_options,
+            parallel_reads=args.max_workers > 1,
         )
 
         # --- Write per-utility output ---
@@ -707,21 +753,26 @@ def main() -> None:
             f"cross_subsidization_BAT_values/"
         )
         t_util = _log(f"  Writing per-utility output to {per_util_output_s3}...")
-        tmp_util_dir = Path(tempfile.mkdtemp(prefix=f"master_bat_{utility}_"))
-        try:
-            df.write_parquet(tmp_util_dir / "data.parquet")
-            subprocess.run(
-                ["aws", "s3", "sync", str(tmp_util_dir), per_util_output_s3],
-                check=True,
-                capture_output=True,
-            )
-        finally:
-            import shutil
-
-            shutil.rmtree(tmp_util_dir, ignore_errors=True)
+        sync_parquet_to_s3(
+            {"data.parquet": df}, per_util_output_s3, f"master_bat_{utility}_"
+        )
         _log_done(f"  Writing per-utility {utility}", t_util)
 
-        all_dfs.append(df)
+        if stream_partitions:
+            n_bldgs = df[BLDG_ID].n_unique()
+            if n_bldgs != bldgs_per_utility[utility]:
+                raise AssertionError(
+                    f"Utility {utility}: expected {bldgs_per_utility[utility]} "
+                    f"buildings, got {n_bldgs}"
+                )
+            t_util = _log(f"  Writing partition to {output_s3}...")
+            sync_parquet_to_s3(
+                hive_partitions(df), output_s3, f"master_bat_part_{utility}_"
+            )
+            _log_done(f"  Writing partition {utility}", t_util)
+        return df
+
+    all_dfs = list(map_utilities(build_utility, utilities, args.max_workers).values())
 
     # --- Concatenate ---
     t = _log("Concatenating all utilities...")
@@ -767,29 +818,10 @@ def main() -> None:
     _log_done("Validation", t)
 
     # --- Write output (Hive-partitioned parquet) ---
-    output_s3 = (
-        f"s3://data.sb/switchbox/cairo/outputs/hp_rates/{state}/all_utilities/"
-        f"{output_batch_all_util}/run_{args.run_delivery}+{args.run_supply}/"
-        f"cross_subsidization_BAT_values/"
-    )
-    t = _log(f"Writing to {output_s3}...")
-    tmp_dir = Path(tempfile.mkdtemp(prefix="master_bat_"))
-    try:
-        partition_col = "sb.electric_utility"
-        for util_name, util_df in master.group_by(partition_col):
-            part_dir = tmp_dir / f"{partition_col}={util_name[0]}"
-            part_dir.mkdir(parents=True, exist_ok=True)
-            util_df.drop(partition_col).write_parquet(part_dir / "data.parquet")
-        subprocess.run(
-            ["aws", "s3", "sync", str(tmp_dir), output_s3],
-            check=True,
-            capture_output=True,
-        )
-    finally:
-        import shutil
-
-        shutil.rmtree(tmp_dir, ignore_errors=True)
-    _log_done("Writing", t)
+    if not stream_partitions:
+        t = _log(f"Writing to {output_s3}...")
+        sync_parquet_to_s3(hive_partitions(master), output_s3, "master_bat_")
+        _log_done("Writing", t)
 
     total_elapsed = time.monotonic() - _t0
     mm, ss = divmod(int(total_elapsed), 60)
@@ -55,6 +55,7 @@ import polars as pl
 
 from rate_design.hp_rates.pipeline_config import PipelineConfig, load_pipeline_config
 from utils.file_io import get_aws_storage_options
+from utils.input_cache import path_fingerprint
 from utils.post import apply_ny_lmi_to_master_bills as ny_lmi_master_bills
 from utils.post.apply_ny_lmi_to_master_bills import apply_ny_lmi_to_master
 from utils.post.apply_ri_lmi_discounts_to_bills import apply_ri_lmi_to_master
@@ -69,6 +70,7 @@ from utils.post.gas_bills import (
     build_fixed_charge_table,
     build_rate_table,
     compute_gas_bills,
+    gas_input_paths,
     load_gas_tariff_map,
     load_gas_tariffs,
 )
@@ -85,6 +87,7 @@ from utils.post.master_metadata import (
     UTILITY_COLS,
     heating_type_v2,
     load_metadata,
+    metadata_paths,
 )
 from utils.post.pipeline_runs import (
     RunPair,
@@ -97,8 +100,17 @@ from utils.post.pipeline_runs import (
     s3_uri,
     upgrade_for_stage,
 )
+from utils.post.segment_fingerprint import (
+    files_digest,
+    fingerprint_uri,
+    read_fingerprint,
+    run_fingerprint,
+    segment_digest,
+    write_fingerprint,
+)
 
 ELEC_BILLS_CSV = "bills/elec_bills_year_target.csv"
+TABLE = "comb_bills_year_target"
 
 META_COLS = [BLDG_ID, *UTILITY_COLS, *ATTR_COLS]
 
@@ -786,6 +798,78 @@ def _write_hive_partitioned(
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
+# ---------------------------------------------------------------------------
+# Fingerprints
+# ---------------------------------------------------------------------------
+
+
+def _segment_root(output_base_s3: str, state: str, batch: str, segment: str) -> str:
+    """The all-utilities directory holding one segment's master tables."""
+    return f"{output_base_s3}/{state}/all_utilities/{batch}/{segment}"
+
+
+def _shared_fingerprint_parts(
+    state: str, configs: dict[str, PipelineConfig], args: argparse.Namespace
+) -> dict[str, object]:
+    """Fingerprints of the inputs every segment shares."""
+    bases = sorted({c.run_defaults.resstock_base.rstrip("/") for c in configs.values()})
+    lmi = (
+        {
+            "fpl_year": args.lmi_fpl_year,
+            "cpi": path_fingerprint(args.lmi_cpi_s3_path),
+            "participation_rates": args.lmi_participation_rates,
+            "participation_mode": args.lmi_participation_mode,
+            "seed": args.lmi_seed,
+            "calculation_type": args.lmi_calculation_type,
+        }
+        if args.calculate_lmi
+        else None
+    )
+    return {
+        "gas_inputs": files_digest(gas_input_paths(state)),
+        "fuel_prices": [
+            args.price_year,
+            path_fingerprint(args.path_heating_fuel_prices),
+        ],
+        "metadata": {
+            base: [path_fingerprint(p) for p in metadata_paths(base, state.upper())]
+            for base in bases
+        },
+        "lmi": lmi,
+    }
+
+
+def _segment_fingerprint_parts(
+    segment: str,
+    seg_utilities: list[str],
+    *,
+    run_pairs: dict[str, dict[str, RunPair]],
+    configs: dict[str, PipelineConfig],
+    baseline: str,
+    baseline_upgrade: str,
+    baseline_digest: str,
+    shared_parts: dict[str, object],
+) -> dict[str, object]:
+    """Everything one segment's master bills are computed from."""
+    return {
+        "table": TABLE,
+        "segment": segment,
+        "baseline": [baseline, baseline_upgrade],
+        # Other segments join the baseline's output, so they depend on its inputs.
+        "baseline_digest": "" if segment == baseline else baseline_digest,
+        "utilities": {
+            utility: {
+                "delivery": run_fingerprint(run_pairs[utility][segment].dir_delivery),
+                "supply": run_fingerprint(run_pairs[utility][segment].dir_supply),
+                "upgrade": run_pairs[utility][segment].upgrade,
+                "resstock_base": configs[utility].run_defaults.resstock_base,
+            }
+            for utility in seg_utilities
+        },
+        "shared": shared_parts,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -866,6 +950,11 @@ def _parse_args() -> argparse.Namespace:
         default="budget",
         help="LMI bill calculation method (used with --calculate-lmi).",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every segment, even those whose input fingerprint is unchanged.",
+    )
     return parser.parse_args()
 
 
@@ -900,6 +989,53 @@ def main() -> None:
     _log(f"Baseline segment: {baseline} (upgrade {baseline_upgrade})")
     _log(f"Build order: {segments}")
 
+    output_base_s3 = s3_uri(next(iter(configs.values())).output_base).rstrip("/")
+
+    # --- Fingerprint each segment's inputs; skip the unchanged ones ---
+    t = _log("Fingerprinting segment inputs...")
+    shared_parts = _shared_fingerprint_parts(state, configs, args)
+    digests: dict[str, str] = {}
+    stale: list[str] = []
+    fingerprints: dict[str, tuple[str, dict]] = {}
+    if baseline not in segments:
+        stored = read_fingerprint(
+            fingerprint_uri(
+                _segment_root(output_base_s3, state, args.batch, baseline), TABLE
+            )
+        )
+        digests[baseline] = stored["digest"] if stored else ""
+    for segment in segments:
+        seg_utilities = [u for u in utilities if segment in run_pairs.get(u, {})]
+        parts = _segment_fingerprint_parts(
+            segment,
+            seg_utilities,
+            run_pairs=run_pairs,
+            configs=configs,
+            baseline=baseline,
+            baseline_upgrade=baseline_upgrade,
+            baseline_digest=digests.get(baseline, ""),
+            shared_parts=shared_parts,
+        )
+        digests[segment] = segment_digest(parts)
+        uri = fingerprint_uri(
+            _segment_root(output_base_s3, state, args.batch, segment), TABLE
+        )
+        fingerprints[segment] = (uri, parts)
+        stored = read_fingerprint(uri)
+        if args.force or stored is None or stored["digest"] != digests[segment]:
+            stale.append(segment)
+    _log_done(
+        "Fingerprinting segment inputs",
+        t,
+        f"{len(stale)} of {len(segments)} segment(s) to build",
+    )
+    unchanged = [segment for segment in segments if segment not in stale]
+    if unchanged:
+        _log(f"Skipping unchanged segment(s): {unchanged}")
+    if not stale:
+        _log("Nothing to build: every segment matches its stored fingerprint.")
+        return
+
     # --- Load shared data ---
     t = _log(f"Loading gas tariffs for {state}...")
     gas_tariffs = load_gas_tariffs(state)
@@ -937,13 +1073,11 @@ def main() -> None:
         bldgs_per_utility[utility] = n
         _log(f"  {utility}: {n} buildings")
 
-    output_base_s3 = s3_uri(next(iter(configs.values())).output_base).rstrip("/")
-
-    # --- One master table per segment, baseline first ---
-    for seg_i, segment in enumerate(segments, 1):
+    # --- One master table per stale segment, baseline first ---
+    for seg_i, segment in enumerate(stale, 1):
         seg_utilities = [u for u in utilities if segment in run_pairs.get(u, {})]
         _log(
-            f"=== Segment {seg_i}/{len(segments)}: {segment} "
+            f"=== Segment {seg_i}/{len(stale)}: {segment} "
             f"({len(seg_utilities)} utility/ies: {seg_utilities}) ==="
         )
 
@@ -1053,16 +1187,22 @@ def main() -> None:
 
         # --- Write output (Hive-partitioned parquet) ---
         output_s3 = (
-            f"{output_base_s3}/{state}/all_utilities/{args.batch}/{segment}/"
-            f"comb_bills_year_target/"
+            f"{_segment_root(output_base_s3, state, args.batch, segment)}/{TABLE}/"
         )
         t = _log(f"Writing to {output_s3}...")
         _write_hive_partitioned(master, output_s3, "sb.electric_utility")
+        # Written last, so an interrupted build is retried on the next run.
+        write_fingerprint(
+            fingerprints[segment][0], digests[segment], fingerprints[segment][1]
+        )
         _log_done("Writing", t)
 
     total_elapsed = time.monotonic() - _t0
     mm, ss = divmod(int(total_elapsed), 60)
-    _log(f"Done: {len(segments)} segment(s) (total: {mm}m {ss}s)")
+    _log(
+        f"Done: {len(stale)} segment(s) built, {len(unchanged)} unchanged "
+        f"(total: {mm}m {ss}s)"
+    )
 
 
 if __name__ == "__main__":
@@ -28,11 +28,15 @@ from __future__ import annotations
 from utils.numeric import as_float
 
 import argparse
+import contextlib
+import io
 import json
 import sys
 from dataclasses import dataclass
 import polars as pl
+from botocore.exceptions import ClientError
 
+from utils.post.io import parquet_sibling
 from utils.post.validate.load import _s3_get_bytes, _s3_join
 
 # Artifacts to compare: (short_name, relative_path, join_keys)
@@ -62,8 +66,15 @@ class ComparisonResult:
 
 
 def _read_csv_from_s3(s3_dir: str, rel_path: str) -> pl.DataFrame | None:
-    """Read a CSV from S3, returning None if the file doesn't exist."""
+    """Read a CSV from S3, returning None if the file doesn't exist.
+
+    Bills and BAT values are read from their Parquet copy when the run has one.
+    """
     uri = _s3_join(s3_dir, rel_path)
+    parquet_uri = parquet_sibling(uri)
+    if parquet_uri is not None:
+        with contextlib.suppress(ClientError, FileNotFoundError):
+            return pl.read_parquet(io.BytesIO(_s3_get_bytes(parquet_uri)))
     try:
         raw = _s3_get_bytes(uri)
     except Exception:
@@ -57,6 +57,17 @@ def _normalize_tariff_json(data: dict) -> dict:
     return data
 
 
+def gas_input_paths(state: str) -> list[Path]:
+    """Every gas tariff JSON and gas tariff map CSV configured for *state*."""
+    root = _config_root(state)
+    return sorted(
+        [
+            *(root / "tariffs" / "gas").glob("*.json"),
+            *(root / "tariff_maps" / "gas").glob("*.csv"),
+        ]
+    )
+
+
 def load_gas_tariffs(state: str) -> dict[str, dict]:
     """Load all gas tariff JSONs for *state*.
 
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from functools import cache
 from pathlib import Path
 from typing import Literal
 
@@ -21,9 +22,46 @@ def path_or_s3(path_str: str) -> S3Path | Path:
     return Path(path_str)
 
 
-def scan(path: str, fmt: Literal["parquet", "csv"] = "csv") -> pl.LazyFrame:
-    """Lazy-scan a parquet or CSV file (local or S3)."""
-    return pl.scan_parquet(path) if fmt == "parquet" else pl.scan_csv(path)
+def parquet_sibling(path: str) -> str | None:
+    """``foo.parquet`` for a ``foo.csv`` run output, else ``None``."""
+    return path.removesuffix(".csv") + ".parquet" if path.endswith(".csv") else None
+
+
+@cache
+def _s3_parquet_exists(uri: str, storage_options: tuple[tuple[str, str], ...]) -> bool:
+    """Whether ``uri`` exists, probed once per process with the caller's credentials."""
+    try:
+        pl.scan_parquet(uri, storage_options=dict(storage_options)).collect_schema()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _has_parquet_sibling(sibling: str, storage_options: dict[str, str] | None) -> bool:
+    if not sibling.startswith("s3://"):
+        return Path(sibling).exists()
+    return _s3_parquet_exists(sibling, tuple(sorted((storage_options or {}).items())))
+
+
+def scan(
+    path: str,
+    fmt: Literal["parquet", "csv"] = "csv",
+    storage_options: dict[str, str] | None = None,
+) -> pl.LazyFrame:
+    """Lazy-scan a parquet or CSV file (local or S3).
+
+    For ``.csv`` run outputs (bills, BAT values) the zstd Parquet copy written
+    next to the CSV is scanned instead when it exists: typed columns, no CSV
+    parse or schema inference. S3 siblings are probed with ``storage_options``
+    and the answer is cached per path.
+    """
+    if fmt == "csv":
+        sibling = parquet_sibling(path)
+        if sibling is not None and _has_parquet_sibling(sibling, storage_options):
+            path, fmt = sibling, "parquet"
+    if fmt == "parquet":
+        return pl.scan_parquet(path, storage_options=storage_options)
+    return pl.scan_csv(path, storage_options=storage_options)
 
 
 def scan_load_curves_for_utility(
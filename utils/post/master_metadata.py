@@ -35,15 +35,20 @@ ATTR_COLS = [
 ]
 
 
+def metadata_paths(path_resstock_base: str, state_upper: str) -> tuple[str, str]:
+    """The utility-assignment and building-attribute files ``load_metadata`` reads."""
+    base = path_resstock_base.rstrip("/")
+    return (
+        f"{base}/metadata_utility/state={state_upper}/utility_assignment.parquet",
+        f"{base}/metadata/state={state_upper}/upgrade={METADATA_UPGRADE}/metadata-sb.parquet",
+    )
+
+
 def load_metadata(path_resstock_base: str, state_upper: str) -> pl.DataFrame:
     """Utility assignment joined to baseline building attributes, one row per building."""
-    base = path_resstock_base.rstrip("/")
-    assignment = pl.scan_parquet(
-        f"{base}/metadata_utility/state={state_upper}/utility_assignment.parquet"
-    ).select(BLDG_ID, *UTILITY_COLS)
-    attributes = pl.scan_parquet(
-        f"{base}/metadata/state={state_upper}/upgrade={METADATA_UPGRADE}/metadata-sb.parquet"
-    ).select(BLDG_ID, *ATTR_COLS)
+    path_assignment, path_attributes = metadata_paths(path_resstock_base, state_upper)
+    assignment = pl.scan_parquet(path_assignment).select(BLDG_ID, *UTILITY_COLS)
+    attributes = pl.scan_parquet(path_attributes).select(BLDG_ID, *ATTR_COLS)
     return assignment.join(attributes, on=BLDG_ID, how="inner").collect()
 
 
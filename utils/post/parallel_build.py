@@ -0,0 +1,158 @@
+"""Bounded per-utility concurrency for the master-table builders.
+
+``build_master_bills`` and ``build_master_bat`` spend most of each utility
+waiting on S3: run-directory lookups, delivery and supply CSV / Parquet reads,
+``tariff_final_config.json`` fetches and ``aws s3 sync`` uploads. Utilities are
+independent until the final cross-utility validation, so with
+``--max-workers N`` they run on a thread pool of N workers (polars and boto3
+release the GIL while they wait or compute). A utility's delivery and supply
+reads run as a pair, so at most ``2 * N`` S3 reads are in flight.
+
+boto3 calls go through one client created up front (``init_s3_client``):
+creating clients from worker threads is not thread-safe, and one client
+shares one connection pool sized for the worker count.
+"""
+
+from __future__ import annotations
+
+import functools
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+_local = threading.local()
+
+
+def utility_tag() -> str:
+    """``"[utility] "`` inside a per-utility task, else ``""`` (for log lines)."""
+    utility = getattr(_local, "utility", None)
+    return f"[{utility}] " if utility else ""
+
+
+# ---------------------------------------------------------------------------
+# Shared S3 client
+# ---------------------------------------------------------------------------
+
+
+@functools.cache
+def init_s3_client(max_workers: int = 1) -> Any:
+    """Create the process-wide boto3 S3 client (call once, before the pool).
+
+    Also makes cloudpathlib (used by ``utils.post.io.scan`` to probe for
+    Parquet siblings) share the same boto3 session.
+    """
+    import boto3
+    from botocore.config import Config
+    from cloudpathlib import S3Client
+
+    from utils import get_aws_region
+
+    session = boto3.Session(region_name=get_aws_region())
+    S3Client(boto3_session=session).set_as_default_client()
+    # Two concurrent reads per worker, plus headroom for the default pool size.
+    config = Config(max_pool_connections=max(10, 2 * max_workers))
+    return session.client("s3", config=config)
+
+
+def s3_client() -> Any:
+    """The shared client from ``init_s3_client`` (created on first use)."""
+    return init_s3_client()
+
+
+# ---------------------------------------------------------------------------
+# Task execution
+# ---------------------------------------------------------------------------
+
+
+def _tagged[T](fn: Callable[[str], T], arg: str, utility: str | None) -> T:
+    """``fn(arg)`` with log lines tagged by *utility*."""
+    _local.utility = utility
+    try:
+        return fn(arg)
+    finally:
+        _local.utility = None
+
+
+def map_utilities[T](
+    fn: Callable[[str], T], utilities: list[str], max_workers: int
+) -> dict[str, T]:
+    """``{utility: fn(utility)}`` in input order, on up to *max_workers* threads.
+
+    ``max_workers <= 1`` runs the utilities one after another. The first
+    failure (in input order) is re-raised after queued utilities are
+    cancelled.
+    """
+    if max_workers <= 1 or len(utilities) <= 1:
+        return {utility: _tagged(fn, utility, utility) for utility in utilities}
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(utilities)), thread_name_prefix="utility"
+    ) as pool:
+        # Bind through functools.partial so each future carries fn's T.
+        futures = {
+            utility: pool.submit(functools.partial(_tagged, fn, utility, utility))
+            for utility in utilities
+        }
+        try:
+            return {utility: future.result() for utility, future in futures.items()}
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def read_pair[T](
+    read: Callable[[str], T], a: str, b: str, *, parallel: bool
+) -> tuple[T, T]:
+    """``(read(a), read(b))``, run concurrently when *parallel*."""
+    if not parallel:
+        return read(a), read(b)
+    utility = getattr(_local, "utility", None)
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="read") as pool:
+        future_a = pool.submit(functools.partial(_tagged, read, a, utility))
+        future_b = pool.submit(functools.partial(_tagged, read, b, utility))
+        return future_a.result(), future_b.result()
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+
+def sync_parquet_to_s3(
+    files: dict[str, pl.DataFrame], s3_dir: str, prefix: str
+) -> None:
+    """Write ``{relative_path: df}`` as Parquet under a temp dir, then sync to *s3_dir*.
+
+    ``aws s3 sync`` only adds or replaces the given files, so writing one Hive
+    partition (``"sb.electric_utility=x/data.parquet"``) leaves the others in
+    place.
+    """
+    tmp_dir = Path(tempfile.mkdtemp(prefix=prefix))
+    try:
+        for relative, df in files.items():
+            path = tmp_dir / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            df.write_parquet(path)
+        subprocess.run(
+            ["aws", "s3", "sync", str(tmp_dir), s3_dir],
+            check=True,
+            capture_output=True,
+        )
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def hive_partitions(
+    df: pl.DataFrame, partition_col: str = "sb.electric_utility"
+) -> dict[str, pl.DataFrame]:
+    """``{"{col}={value}/data.parquet": df_without_col}`` for each partition value."""
+    return {
+        f"{partition_col}={value[0]}/data.parquet": part.drop(partition_col)
+        for value, part in df.group_by(partition_col)
+    }
@@ -2,7 +2,8 @@
 
 The Prefect pipeline records every completed CAIRO run in
 ``{batch_dir}/.runs/{canonical_run_name}.path`` — a one-line file holding the
-timestamped output directory.  Post-processing consumes those runs in
+timestamped output directory — and in the batch's Parquet run manifest
+(``utils/post/run_manifest.py``), which resolves all runs in one read.  Post-processing consumes those runs in
 delivery+supply pairs, one pair per ``(scenario, stage)``, so this module turns
 a pipeline YAML plus a batch name into the pairs a builder should process.
 
@@ -23,6 +24,7 @@ from rate_design.hp_rates.pipeline_config import (
     PipelineConfig,
     canonical_run_name,
 )
+from utils.post.run_manifest import manifest_run_dirs
 
 STAGES: tuple[str, ...] = ("precalc", "calibrated")
 VARIANTS: tuple[str, ...] = ("delivery", "supply")
@@ -143,6 +145,9 @@ def find_run_pairs(
     """
     root = batch_dir(config, batch)
     names = list(config.scenarios) if scenarios is None else list(scenarios)
+    # One manifest read resolves most runs; any run it does not name (older
+    # batches, or a fragment that was never written) reads its index file.
+    indexed = manifest_run_dirs(root)
 
     pairs: dict[str, RunPair] = {}
     for name in names:
@@ -154,8 +159,12 @@ def find_run_pairs(
                 )
                 for variant in VARIANTS
             }
-            delivery = read_run_dir(root, run_names["delivery"])
-            supply = read_run_dir(root, run_names["supply"])
+            delivery = indexed.get(run_names["delivery"]) or read_run_dir(
+                root, run_names["delivery"]
+            )
+            supply = indexed.get(run_names["supply"]) or read_run_dir(
+                root, run_names["supply"]
+            )
             if delivery is None and supply is None:
                 continue
             if delivery is None or supply is None:
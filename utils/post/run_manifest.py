@@ -0,0 +1,221 @@
+"""Batch-level Parquet manifest of completed CAIRO runs.
+
+``run_scenario`` records every completed run as one row in::
+
+    {batch_dir}/.runs/manifest/{run_name}.parquet
+
+The row holds the run's output directory (as written and as an ``s3://`` URI),
+start / completion times, and one entry per artifact in the run directory:
+relative path, size, row count (Parquet footer or CSV line count) and SHA-256.
+Each run writes its own fragment, so the concurrent runs of a batch never
+contend for one object. A re-run of the same run name overwrites its fragment.
+
+Post-processing resolves every run of a batch with a single read of the
+manifest fragments (``manifest_run_dirs``) instead of listing run directories
+on S3 per utility and per run. Batches written before the manifest existed
+have none, and a run whose fragment was never written is absent from it;
+callers fall back to the run index / listing for every run the manifest does
+not name.
+
+The manifest is read once per process and batch. ``write_manifest_entry``
+invalidates that cache; a long-lived process that reads a batch while other
+processes are still writing to it calls ``clear_manifest_cache`` to see their
+runs.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+import pyarrow.parquet as pq
+
+from utils.file_io import get_aws_storage_options
+
+log = logging.getLogger(__name__)
+
+MANIFEST_SUBDIR = ".runs/manifest"
+_CHUNK_BYTES = 8 * 1024 * 1024
+
+ARTIFACT_SCHEMA = pl.Struct(
+    {
+        "path": pl.String,
+        "size_bytes": pl.Int64,
+        "num_rows": pl.Int64,
+        "sha256": pl.String,
+    }
+)
+MANIFEST_SCHEMA = pl.Schema(
+    {
+        "run_name": pl.String,
+        "run_dir": pl.String,
+        "output_uri": pl.String,
+        "started_at": pl.Datetime("us", "UTC"),
+        "completed_at": pl.Datetime("us", "UTC"),
+        "elapsed_s": pl.Float64,
+        "total_bytes": pl.Int64,
+        "artifacts": pl.List(ARTIFACT_SCHEMA),
+    }
+)
+
+
+def manifest_dir(batch_dir: str | Path) -> str:
+    """The directory holding a batch's manifest fragments (local or S3)."""
+    return f"{str(batch_dir).rstrip('/')}/{MANIFEST_SUBDIR}"
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+
+def _artifact_stats(path: Path, root: Path) -> dict[str, Any]:
+    """Size, row count and SHA-256 of one artifact, from a single read."""
+    digest = hashlib.sha256()
+    size = lines = 0
+    last = b"\n"
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK_BYTES):
+            digest.update(chunk)
+            size += len(chunk)
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    num_rows: int | None = None
+    if path.suffix == ".parquet":
+        num_rows = pq.read_metadata(path).num_rows
+    elif path.suffix == ".csv":
+        # Excludes the header; a final line without a newline is still a row.
+        num_rows = max(lines + (last != b"\n") - 1, 0)
+    return {
+        "path": path.relative_to(root).as_posix(),
+        "size_bytes": size,
+        "num_rows": num_rows,
+        "sha256": digest.hexdigest(),
+    }
+
+
+def describe_artifacts(run_dir: Path) -> list[dict[str, Any]]:
+    """One stats entry per file under *run_dir*, sorted by relative path."""
+    run_dir = Path(run_dir)
+    return [
+        _artifact_stats(path, run_dir)
+        for path in sorted(run_dir.rglob("*"))
+        if path.is_file()
+    ]
+
+
+def _output_uri(run_dir: Path) -> str:
+    # Imported here: pipeline_runs resolves runs through this module.
+    from utils.post.pipeline_runs import s3_uri
+
+    try:
+        return s3_uri(run_dir)
+    except ValueError:
+        return str(run_dir)
+
+
+def write_manifest_entry(
+    batch_dir: Path,
+    run_name: str,
+    run_dir: Path,
+    *,
+    started_at: datetime,
+) -> Path:
+    """Record the completed run *run_name* in *batch_dir*'s manifest."""
+    artifacts = describe_artifacts(run_dir)
+    total_bytes = sum(a["size_bytes"] for a in artifacts)
+    completed_at = datetime.now(UTC)
+    row = {
+        "run_name": run_name,
+        "run_dir": str(run_dir),
+        "output_uri": _output_uri(run_dir),
+        "started_at": started_at,
+        "completed_at": completed_at,
+        "elapsed_s": (completed_at - started_at).total_seconds(),
+        "total_bytes": total_bytes,
+        "artifacts": artifacts,
+    }
+    path = Path(manifest_dir(batch_dir)) / f"{run_name}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pl.DataFrame([row], schema=MANIFEST_SCHEMA).write_parquet(path)
+    clear_manifest_cache()
+    log.info(
+        ".... Wrote run manifest entry: %s (%d artifacts, %d bytes)",
+        path,
+        len(artifacts),
+        total_bytes,
+    )
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+
+def read_run_manifest(batch_dir: str | Path) -> pl.DataFrame:
+    """Every manifest row of a batch in one read; empty when it has none."""
+    root = manifest_dir(batch_dir)
+    if root.startswith("s3://"):
+        storage_options: dict[str, str] | None = get_aws_storage_options()
+    elif Path(root).is_dir():
+        storage_options = None
+    else:
+        return pl.DataFrame(schema=MANIFEST_SCHEMA)
+    try:
+        return pl.read_parquet(
+            f"{root}/*.parquet", schema=MANIFEST_SCHEMA, storage_options=storage_options
+        )
+    except FileNotFoundError:
+        return pl.DataFrame(schema=MANIFEST_SCHEMA)
+
+
+@functools.cache
+def _cached_manifest(batch_dir: str) -> pl.DataFrame:
+    return read_run_manifest(batch_dir)
+
+
+def clear_manifest_cache() -> None:
+    """Forget every manifest read so far; the next lookup re-reads it."""
+    _cached_manifest.cache_clear()
+
+
+def manifest_run_dirs(batch_dir: str) -> dict[str, str]:
+    """``{run_name: output_uri}`` for a batch's manifest, read once per process.
+
+    Not authoritative: empty when the batch predates the manifest, and a run
+    whose fragment was never written is missing. Callers fall back to the run
+    index or a directory listing for any run it does not name.
+    """
+    manifest = _cached_manifest(batch_dir.rstrip("/"))
+    return dict(
+        zip(
+            manifest["run_name"].to_list(),
+            manifest["output_uri"].to_list(),
+            strict=True,
+        )
+    )
+
+
+def manifest_artifact_hashes(batch_dir: str, output_uri: str) -> dict[str, str] | None:
+    """``{artifact path: sha256}`` of the manifest run at *output_uri*, or None."""
+    manifest = _cached_manifest(batch_dir.rstrip("/"))
+    rows = manifest.filter(pl.col("output_uri") == output_uri.rstrip("/"))
+    if rows.is_empty():
+        return None
+    artifacts = rows.row(-1, named=True)["artifacts"]
+    return {a["path"]: a["sha256"] for a in artifacts}
+
+
+def find_manifest_run_dir(batch_dir: str, run_fragment: str) -> str | None:
+    """The output URI of the manifest run whose name contains *run_fragment*."""
+    run_dirs = manifest_run_dirs(batch_dir.rstrip("/"))
+    for run_name, output_uri in sorted(run_dirs.items()):
+        if run_fragment in run_name:
+            return output_uri
+    return None
@@ -0,0 +1,82 @@
+"""Input fingerprints for incremental master-table rebuilds.
+
+A master-table segment (``{scenario}_{stage}``) is a pure function of its
+inputs: the delivery and supply run outputs of each utility, the gas tariff
+JSONs and maps, the ResStock metadata and load-curve release, the EIA fuel
+prices and the LMI options. ``build_master_bills_prefect`` hashes those inputs
+per segment and stores the result next to the segment's output::
+
+    {output_base}/{state}/all_utilities/{batch}/{segment}/{table}.fingerprint.json
+
+A rerun skips every segment whose stored digest matches, and only reloads the
+shared inputs when at least one segment is stale.
+
+Run outputs are identified by the artifact SHA-256s in the batch's run
+manifest (``utils/post/run_manifest.py``), or by their S3 ETags for runs
+recorded before the manifest existed. ResStock load curves are identified by
+release path and upgrade (releases are immutable; listing thousands of files
+per rerun would defeat the point). Segments that join the baseline's bill
+columns include the baseline segment's digest, so rebuilding the baseline, or
+pointing ``bill_change_baseline`` at another segment, invalidates them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from utils.input_cache import cache_key, path_fingerprint
+from utils.post.io import path_or_s3
+from utils.post.run_manifest import manifest_artifact_hashes
+
+# Bump when the builder's logic changes so every segment is rebuilt once.
+FINGERPRINT_VERSION = 1
+
+
+def fingerprint_uri(segment_root: str, table: str) -> str:
+    """Where a segment's fingerprint is stored, next to its ``table`` output."""
+    return f"{segment_root.rstrip('/')}/{table}.fingerprint.json"
+
+
+def run_fingerprint(run_dir: str) -> list[Any]:
+    """Identity of one CAIRO run's outputs: manifest hashes, else S3 ETags."""
+    run_dir = run_dir.rstrip("/")
+    hashes = manifest_artifact_hashes(run_dir.rsplit("/", 1)[0], run_dir)
+    if hashes is not None:
+        return ["manifest", sorted(hashes.items())]
+    return ["listing", path_fingerprint(run_dir)]
+
+
+def files_digest(paths: Iterable[Path]) -> str:
+    """SHA-256 over the names and contents of local files (tariffs, maps)."""
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        h.update(f"{path.name}\0".encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def segment_digest(parts: dict[str, Any]) -> str:
+    """Digest of a segment's fingerprint parts (including ``FINGERPRINT_VERSION``)."""
+    return cache_key("master_segment", {"version": FINGERPRINT_VERSION, **parts})
+
+
+def read_fingerprint(uri: str) -> dict[str, Any] | None:
+    """The stored fingerprint at *uri* (local or S3), or None if absent."""
+    path = path_or_s3(uri)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def write_fingerprint(uri: str, digest: str, parts: dict[str, Any]) -> None:
+    """Store *digest* and the *parts* it was computed from at *uri*."""
+    path = path_or_s3(uri)
+    if isinstance(path, Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps({"digest": digest, "parts": parts}, indent=2, default=str)
+    )
@@ -7,6 +7,9 @@ Each batch_name directory contains one subdirectory per CAIRO run, named:
   {cairo_ts}_{run_name}/
 
 Batch names follow the format: {state}_{YYYYMMDD}{letter}_r{run_range} (e.g., "ny_20260305a_r1-2").
+
+Runs are resolved from the batch's run manifest (``.runs/manifest/``, one read
+per batch) when it has one; older batches are listed run by run.
 """
 
 from __future__ import annotations
@@ -16,6 +19,8 @@ from typing import Any
 
 import boto3
 
+from utils.post.run_manifest import manifest_run_dirs
+
 # S3 bucket that holds all CAIRO outputs for this platform.
 _CAIRO_OUTPUT_BUCKET = "data.sb"
 
@@ -105,6 +110,30 @@ def _find_run_dir(
     return None
 
 
+def _resolve_run_dirs(
+    s3_client: Any,
+    bucket: str,
+    batch_prefix: str,
+    run_names: dict[int, str],
+) -> dict[int, str]:
+    """``{run_num: s3_dir}`` for the runs of ``run_names`` present in one batch.
+
+    Runs named in the batch's run manifest are resolved from it; every other
+    run (the whole batch when it predates the manifest) falls back to
+    :func:`_find_run_dir`.
+    """
+    indexed = manifest_run_dirs(f"s3://{bucket}/{batch_prefix.rstrip('/')}")
+    return {
+        run_num: run_dir
+        for run_num, run_name in run_names.items()
+        if (
+            run_dir := indexed.get(run_name)
+            or _find_run_dir(s3_client, bucket, batch_prefix, run_name)
+        )
+        is not None
+    }
+
+
 def find_latest_complete_batch(
     state: str,
     utility: str,
@@ -150,12 +179,7 @@ def find_latest_complete_batch(
     # Search newest-first so we return the most recent complete batch.
     for batch_name in reversed(batch_names):
         batch_prefix = f"{utility_prefix}{batch_name}/"
-        run_dirs: dict[int, str] = {}
-
-        for run_num, run_name in run_names.items():
-            run_dir = _find_run_dir(s3_client, bucket, batch_prefix, run_name)
-            if run_dir is not None:
-                run_dirs[run_num] = run_dir
+        run_dirs = _resolve_run_dirs(s3_client, bucket, batch_prefix, run_names)
 
         if len(run_dirs) == required_count:
             return batch_name, run_dirs
@@ -208,9 +232,4 @@ def resolve_batch(
     bucket = _CAIRO_OUTPUT_BUCKET
     batch_prefix = f"{_cairo_output_prefix(state, utility)}{batch_name}/"
 
-    return {
-        run_num: run_dir
-        for run_num, run_name in run_names.items()
-        if (run_dir := _find_run_dir(s3_client, bucket, batch_prefix, run_name))
-        is not None
-    }
+    return _resolve_run_dirs(s3_client, bucket, batch_prefix, run_names)
@@ -1,12 +1,14 @@
 """Read CAIRO run outputs from S3 for validation.
 
-CSVs are scanned lazily via ``pl.scan_csv``; JSON files are fetched with ``boto3``.
-Local config reads (input tariffs, RR YAMLs) use standard file I/O.
+Tables are scanned lazily via ``utils.post.io.scan``, which prefers the zstd
+Parquet copy of bills and BAT values over the CSV when a run has one; JSON
+files are fetched with ``boto3``. Local config reads (input tariffs, RR YAMLs)
+use standard file I/O.
 
 Run directory layout::
 
-    bills/{elec,gas,comb}_bills_year_target.csv
-    cross_subsidization/cross_subsidization_BAT_values.csv
+    bills/{elec,gas,comb}_bills_year_target.{csv,parquet}
+    cross_subsidization/cross_subsidization_BAT_values.{csv,parquet}
     customer_metadata.csv
     tariff_final_config.json
 """
@@ -22,6 +24,7 @@ import yaml
 
 from utils import get_project_root
 from utils.loads import ELECTRIC_LOAD_COL, ELECTRIC_PV_COL, grid_consumption_expr
+from utils.post.io import scan
 from utils.post.validate.config import RunConfig
 
 BillType = Literal["elec", "gas", "comb"]
@@ -44,7 +47,7 @@ def _s3_get_bytes(s3_uri: str) -> bytes:
 
 
 def load_bills(s3_dir: str, bill_type: BillType = "elec") -> pl.LazyFrame:
-    """Lazily scan ``bills/{bill_type}_bills_year_target.csv`` from a run directory.
+    """Lazily scan ``bills/{bill_type}_bills_year_target`` from a run directory.
 
     ``bill_type`` is one of ``"elec"`` (default), ``"gas"``, or ``"comb"``.
     """
@@ -52,12 +55,12 @@ def load_bills(s3_dir: str, bill_type: BillType = "elec") -> pl.LazyFrame:
         raise ValueError(
             f"bill_type must be one of {sorted(_VALID_BILL_TYPES)!r}, got {bill_type!r}"
         )
-    return pl.scan_csv(_s3_join(s3_dir, f"bills/{bill_type}_bills_year_target.csv"))
+    return scan(_s3_join(s3_dir, f"bills/{bill_type}_bills_year_target.csv"))
 
 
 def load_bat(s3_dir: str) -> pl.LazyFrame:
-    """Lazily scan ``cross_subsidization/cross_subsidization_BAT_values.csv``."""
-    return pl.scan_csv(_s3_join(s3_dir, _REL_BAT))
+    """Lazily scan ``cross_subsidization/cross_subsidization_BAT_values``."""
+    return scan(_s3_join(s3_dir, _REL_BAT))
 
 
 def load_metadata(s3_dir: str) -> pl.LazyFrame:
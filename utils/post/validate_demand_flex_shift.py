@@ -69,6 +69,7 @@ from utils.cairo import (
     assign_hourly_periods,
     extract_tou_period_rates,
 )
+from utils.loads import BuildingLoads, read_building_loads
 from utils.pre.compute_tou import SeasonTouSpec, load_season_specs
 
 log = logging.getLogger(__name__)
@@ -133,41 +134,17 @@ def load_hp_metadata(
     return hp
 
 
-def load_building_loads(bldg_ids: list[int], loads_dir: Path) -> pd.DataFrame:
+def load_building_loads(bldg_ids: list[int], loads_dir: Path) -> BuildingLoads:
     """Load hourly electric net load for buildings from local parquet.
 
-    Returns pandas DataFrame with MultiIndex (bldg_id, time) and column
-    'electricity_net' in kWh.
+    Returns ``(n_bldg, 8760)`` ``electricity_net`` (kWh) with its bldg_id and
+    time axes; ``.frame`` gives the (bldg_id, time) MultiIndex DataFrame.
     """
-    frames: list[pd.DataFrame] = []
-    missing = 0
-    for bid in bldg_ids:
-        path = loads_dir / f"{bid}-0.parquet"
-        if not path.exists():
-            missing += 1
-            continue
-        df = pl.read_parquet(
-            path,
-            columns=["timestamp", "out.electricity.net.energy_consumption"],
-        ).to_pandas()
-        df = df.rename(
-            columns={
-                "timestamp": "time",
-                "out.electricity.net.energy_consumption": "electricity_net",
-            }
-        )
-        df["bldg_id"] = bid
-        frames.append(df)
-
-    if missing:
-        log.warning("Missing load files for %d of %d buildings", missing, len(bldg_ids))
-    if not frames:
-        raise FileNotFoundError(f"No load files found in {loads_dir}")
-
-    combined = pd.concat(frames, ignore_index=True)
-    combined = combined.set_index(["bldg_id", "time"]).sort_index()
-    log.info("Loaded %d buildings, %d rows", len(frames), len(combined))
-    return combined
+    return read_building_loads(
+        bldg_ids,
+        loads_dir,
+        {"electricity_net": "out.electricity.net.energy_consumption"},
+    )
 
 
 def load_tou_context(
@@ -222,7 +199,7 @@ def reproduce_shift(
         if season_eps == 0.0:
             continue
 
-        season_mask = cast(Any, time_level).month.isin(season_months).to_numpy()
+        season_mask = np.asarray(cast(Any, time_level).month.isin(season_months))
         season_df = loads_df.loc[season_mask].copy().reset_index()
 
         period_lookup = period_map.reset_index()
@@ -1202,11 +1179,9 @@ def main(argv: list[str] | None = None) -> None:
 
     # Load building loads
     log.info("Loading HP building loads...")
-    loads_df = load_building_loads(hp_bldg_ids, cfg["path_loads_dir"])
-    time_idx = pd.DatetimeIndex(
-        loads_df.index.get_level_values("time").unique().sort_values()
-    )
-    period_map = assign_hourly_periods(time_idx, tou_tariff)
+    loads = load_building_loads(hp_bldg_ids, cfg["path_loads_dir"])
+    loads_df = loads.frame
+    period_map = assign_hourly_periods(loads.times, tou_tariff)
 
     # Reproduce the shift
     log.info("Reproducing demand-flex shift (ε=%s)...", args.elasticity)
@@ -38,14 +38,18 @@ import polars as pl
 import yaml
 
 from utils.file_io import get_aws_storage_options
+from utils.loads import BuildingLoads, read_building_loads
 from utils.numeric import as_float
 from utils.cairo import (
     _build_period_consumption,
     _build_period_shift_targets,
+    _building_major_bldg_ids,
     _compute_equivalent_flat_tariff,
+    _period_sums,
     assign_hourly_periods,
     extract_tou_period_rates,
 )
+from utils.post.run_manifest import find_manifest_run_dir, manifest_run_dirs
 from utils.pre.compute_tou import SeasonTouSpec, load_season_specs
 from utils.scenario_config import get_residential_customer_count_from_utility_stats
 
@@ -236,52 +240,20 @@ def load_building_loads(
     bldg_ids: list[int],
     loads_dir: Path,
     sample_size: int | None = None,
-) -> pd.DataFrame:
+) -> BuildingLoads:
     """Load hourly electric net load for a set of buildings from local parquet.
 
-    Returns a pandas DataFrame with MultiIndex (bldg_id, time) and column
-    'electricity_net' in kWh, matching CAIRO's expected format.
+    Returns ``(n_bldg, 8760)`` ``electricity_net`` (kWh) with its bldg_id and
+    time axes; ``.frame`` gives the (bldg_id, time) MultiIndex DataFrame.
     """
     if sample_size and sample_size < len(bldg_ids):
         rng = np.random.default_rng(42)
         bldg_ids = list(rng.choice(bldg_ids, size=sample_size, replace=False))
-
-    frames: list[pd.DataFrame] = []
-    missing = 0
-    for bid in bldg_ids:
-        path = loads_dir / f"{bid}-0.parquet"
-        if not path.exists():
-            missing += 1
-            continue
-        df = pl.read_parquet(
-            path,
-            columns=["timestamp", "out.electricity.net.energy_consumption"],
-        ).to_pandas()
-        df = df.rename(
-            columns={
-                "timestamp": "time",
-                "out.electricity.net.energy_consumption": "electricity_net",
-            }
-        )
-        df["bldg_id"] = bid
-        frames.append(df)
-
-    if missing:
-        log.warning("Missing load files for %d of %d buildings", missing, len(bldg_ids))
-    if not frames:
-        raise FileNotFoundError(
-            f"No load files found in {loads_dir} for {len(bldg_ids)} buildings"
-        )
-
-    combined = pd.concat(frames, ignore_index=True)
-    combined = combined.set_index(["bldg_id", "time"]).sort_index()
-    log.info(
-        "Loaded %d buildings x %d hours = %d rows",
-        len(frames),
-        8760,
-        len(combined),
+    return read_building_loads(
+        bldg_ids,
+        loads_dir,
+        {"electricity_net": "out.electricity.net.energy_consumption"},
     )
-    return combined
 
 
 def load_tou_context(
@@ -396,7 +368,7 @@ def diagnose_season(
     season_name = season_spec.season.name
 
     time_level = pd.DatetimeIndex(loads_df.index.get_level_values("time"))
-    season_mask = cast(Any, time_level).month.isin(season_months).to_numpy()
+    season_mask = np.asarray(cast(Any, time_level).month.isin(season_months))
     season_df = loads_df.loc[season_mask, ["electricity_net"]].copy().reset_index()
 
     period_lookup = period_map.reset_index()
@@ -537,37 +509,228 @@ def diagnose_season(
     )
 
 
+def sweep_season(
+    utility: str,
+    season_spec: SeasonTouSpec,
+    net_2d: np.ndarray,
+    time_idx: pd.DatetimeIndex,
+    bldg_ids: np.ndarray,
+    period_rate: pd.Series,
+    period_map: pd.Series,
+    elasticities: list[float],
+    hp_weights: dict[int, float],
+    total_weighted_customers: float,
+    hp_weighted_customers: float,
+    mc_df: pd.DataFrame | None,
+) -> list[SeasonResult]:
+    """Run :func:`diagnose_season` for every elasticity as one broadcast.
+
+    The constant-elasticity target ``Q_orig * (rate / p_flat) ** eps`` is
+    closed-form, so the ``(n_bldg, n_periods)`` period consumption and the
+    flat comparator are computed once per season and the whole grid is
+    evaluated as an ``(n_eps, n_bldg, n_periods)`` array. The system-level
+    hourly shift for the MC savings is one ``(n_eps, n_bldg) @ (n_bldg, n_hours)``
+    product per period.
+
+    Args:
+        net_2d: ``(n_bldg, n_hours)`` electricity net load, rows in *bldg_ids*
+            order and columns in *time_idx* order.
+        time_idx: Hourly timestamps of the *net_2d* columns.
+        bldg_ids: Building ID per *net_2d* row.
+
+    Returns:
+        One :class:`SeasonResult` per elasticity, in *elasticities* order and
+        equal to what :func:`diagnose_season` returns for each.
+    """
+    season_months = set(season_spec.season.months)
+    season_cols = np.flatnonzero(cast(Any, time_idx).month.isin(season_months))
+    season_times = time_idx[season_cols]
+    net_s = net_2d[:, season_cols]
+    hour_periods = period_map.reindex(season_times).to_numpy()
+    period_values, hour_pidx = np.unique(hour_periods, return_inverse=True)
+    n_periods = len(period_values)
+    n_bldgs = len(bldg_ids)
+
+    period_q = _period_sums(net_s, hour_pidx, n_periods)
+    rates = period_rate.reindex(period_values).to_numpy(dtype=float)
+    class_q = period_q.sum(axis=0)
+    total_demand = float(class_q.sum())
+    if total_demand <= 0:
+        raise ValueError("Cannot compute equivalent flat tariff with zero demand.")
+    p_flat = float(np.nansum(class_q * rates) / total_demand)
+
+    eps = np.asarray(elasticities, dtype=float)[:, None, None]
+    q_target = period_q * (rates / p_flat) ** eps
+    load_shift = q_target - period_q
+    recv_idx = int(np.nanargmin(rates))
+    donors = np.arange(n_periods) != recv_idx
+    load_shift[:, :, recv_idx] = -np.nansum(load_shift[:, :, donors], axis=2)
+
+    peak = rates > p_flat
+    peak_orig = float(period_q[:, peak].sum())
+    peak_shifted = np.nansum(q_target[:, :, peak], axis=(1, 2))
+    peak_reduction_pct = (
+        (peak_orig - peak_shifted) / peak_orig * 100
+        if peak_orig > 0
+        else np.zeros(len(elasticities))
+    )
+    total_shift = np.where(load_shift < 0, load_shift, 0.0).sum(axis=(1, 2))
+
+    peak_rates = pd.unique(rates[peak])
+    offpeak_rates = pd.unique(rates[~peak])
+    peak_rate = float(peak_rates.mean()) if len(peak_rates) > 0 else 0.0
+    offpeak_rate = float(offpeak_rates.mean()) if len(offpeak_rates) > 0 else 0.0
+    rate_spread = peak_rate - offpeak_rate
+
+    arcturus_pct = arcturus_peak_reduction(season_spec.peak_offpeak_ratio) * 100
+    hp_share = (
+        hp_weighted_customers / total_weighted_customers
+        if total_weighted_customers > 0
+        else 0.0
+    )
+
+    delivery_mc_savings = np.zeros(len(elasticities))
+    mc_nonzero = 0
+    mc_peak_overlap = 0
+    if mc_df is not None:
+        mc_season = mc_df[mc_df["timestamp"].dt.month.isin(season_months)]
+        mc_nonzero = int((mc_season["mc_kwh"].abs() > 1e-9).sum())
+        mc_in_peak = mc_season[
+            mc_season["timestamp"].dt.hour.isin(set(season_spec.peak_hours))
+        ]
+        mc_peak_overlap = int((mc_in_peak["mc_kwh"].abs() > 1e-9).sum())
+
+        # Same year alignment as diagnose_season (loads stay in the source year).
+        mc_year = int(mc_season["timestamp"].dt.year.iloc[0])
+        shift_times = pd.DatetimeIndex(pd.to_datetime(season_times))
+        shift_year = int(shift_times.min().year)
+        if mc_year != shift_year:
+            shift_times = shift_times + (
+                pd.Timestamp(f"{mc_year}-01-01") - pd.Timestamp(f"{shift_year}-01-01")
+            )
+        mc_hourly = (
+            mc_season.groupby("timestamp")["mc_kwh"]
+            .sum()
+            .reindex(shift_times, fill_value=0.0)
+            .to_numpy()
+        )
+
+        # Hour h of period p carries load_shift[p] * net[h] / Q_orig[p], so
+        # scale each period's shift by weight / Q_orig and spread with net.
+        weights = pd.Series(bldg_ids).map(hp_weights).fillna(1.0).to_numpy()
+        safe_q = np.where(period_q != 0, period_q, 1.0)
+        per_kwh = np.where(period_q != 0, weights[:, None] / safe_q, 0.0)
+        scaled_shift = np.nan_to_num(load_shift * per_kwh)
+        sys_shift = np.zeros((len(elasticities), len(season_cols)))
+        for p in range(n_periods):
+            cols = np.flatnonzero(hour_pidx == p)
+            sys_shift[:, cols] = scaled_shift[:, :, p] @ net_s[:, cols]
+        delivery_mc_savings = -(sys_shift @ mc_hourly)
+
+    return [
+        SeasonResult(
+            utility=utility,
+            season=season_spec.season.name,
+            elasticity=eps_val,
+            price_ratio=season_spec.peak_offpeak_ratio,
+            base_rate=season_spec.base_rate,
+            peak_hours=list(season_spec.peak_hours),
+            n_peak_hours_per_day=len(season_spec.peak_hours),
+            hp_bldg_count=n_bldgs,
+            hp_weighted_share=hp_share * 100,
+            hp_peak_kwh_orig=peak_orig,
+            hp_peak_kwh_shifted=float(peak_shifted[i]),
+            peak_reduction_pct=float(peak_reduction_pct[i]),
+            kwh_shifted=abs(float(total_shift[i])),
+            system_peak_reduction_pct=float(peak_reduction_pct[i]) * hp_share,
+            p_flat=p_flat,
+            arcturus_peak_reduction_pct=arcturus_pct,
+            delta_vs_arcturus_pct=float(peak_reduction_pct[i]) - arcturus_pct,
+            rate_arbitrage_savings_per_hp=abs(float(total_shift[i]))
+            * rate_spread
+            / n_bldgs
+            if n_bldgs > 0
+            else 0,
+            delivery_mc_savings_total=float(delivery_mc_savings[i]),
+            delivery_mc_savings_per_hp=float(delivery_mc_savings[i]) / n_bldgs
+            if n_bldgs > 0
+            else 0,
+            delivery_mc_nonzero_hours=mc_nonzero,
+            delivery_mc_peak_overlap_hours=mc_peak_overlap,
+        )
+        for i, eps_val in enumerate(elasticities)
+    ]
+
+
 def diagnose_utility(
     ctx: UtilityContext,
-    loads_df: pd.DataFrame,
+    loads: BuildingLoads | pd.DataFrame,
     elasticities: list[float],
     mc_df: pd.DataFrame | None,
 ) -> UtilityResult:
-    """Run full diagnostic for one utility across all seasons and elasticities."""
+    """Run full diagnostic for one utility across all seasons and elasticities.
+
+    *loads* is either :func:`load_building_loads` output or a (bldg_id, time)
+    indexed frame with an ``electricity_net`` column.
+    """
     result = UtilityResult(utility=ctx.utility, delivery_rr=ctx.delivery_rr)
 
     rate_df = extract_tou_period_rates(ctx.tou_tariff)
     period_rate = cast(pd.Series, rate_df.groupby("energy_period")["rate"].first())
-    time_idx = pd.DatetimeIndex(
-        loads_df.index.get_level_values("time").unique().sort_values()
-    )
+
+    # One broadcast per season over the whole epsilon grid when the loads
+    # reshape to (n_bldg, n_hours); otherwise evaluate each epsilon in turn.
+    net_2d: np.ndarray | None = None
+    if isinstance(loads, BuildingLoads):
+        time_idx = loads.times
+        bldg_ids = loads.bldg_ids
+        net_2d = loads.values["electricity_net"]
+    else:
+        time_idx = pd.DatetimeIndex(
+            loads.index.get_level_values("time").unique().sort_values()
+        )
+        bldg_ids = _building_major_bldg_ids(cast(pd.MultiIndex, loads.index), time_idx)
+        if bldg_ids is not None:
+            net_2d = loads["electricity_net"].to_numpy(dtype=float)
+            net_2d = net_2d.reshape(len(bldg_ids), len(time_idx))
     period_map = assign_hourly_periods(time_idx, ctx.tou_tariff)
 
-    for eps in elasticities:
-        for spec in ctx.season_specs:
-            sr = diagnose_season(
+    if net_2d is not None and bldg_ids is not None:
+        by_season = [
+            sweep_season(
                 utility=ctx.utility,
                 season_spec=spec,
-                loads_df=loads_df,
+                net_2d=net_2d,
+                time_idx=time_idx,
+                bldg_ids=bldg_ids,
                 period_rate=period_rate,
                 period_map=period_map,
-                elasticity=eps,
+                elasticities=elasticities,
                 hp_weights=ctx.hp_weights,
                 total_weighted_customers=ctx.total_weighted_customers,
                 hp_weighted_customers=ctx.hp_weighted_customers,
                 mc_df=mc_df,
             )
-            result.season_results.append(sr)
+            for spec in ctx.season_specs
+        ]
+        for i in range(len(elasticities)):
+            result.season_results.extend(srs[i] for srs in by_season)
+    else:
+        for eps in elasticities:
+            for spec in ctx.season_specs:
+                sr = diagnose_season(
+                    utility=ctx.utility,
+                    season_spec=spec,
+                    loads_df=cast(pd.DataFrame, loads),
+                    period_rate=period_rate,
+                    period_map=period_map,
+                    elasticity=eps,
+                    hp_weights=ctx.hp_weights,
+                    total_weighted_customers=ctx.total_weighted_customers,
+                    hp_weighted_customers=ctx.hp_weighted_customers,
+                    mc_df=mc_df,
+                )
+                result.season_results.append(sr)
 
     # RR decrease by elasticity: sum delivery MC savings across seasons
     if ctx.delivery_rr > 0:
@@ -802,7 +965,12 @@ COMPARISON_PAIRS: list[tuple[str, str, str, str]] = [
 
 
 def _find_run_dir(batch_prefix: str, run_fragment: str) -> str | None:
-    """Find the timestamped run directory under a batch prefix on S3."""
+    """Find the timestamped run directory under a batch prefix on S3.
+
+    Uses the batch's run manifest when it has one, else lists the prefix.
+    """
+    if manifest_run_dirs(batch_prefix.rstrip("/")):
+        return find_manifest_run_dir(batch_prefix, run_fragment)
     result = subprocess.run(
         ["aws", "s3", "ls", batch_prefix],
         capture_output=True,
@@ -1295,7 +1463,7 @@ def main(argv: list[str] | None = None) -> None:
         )
 
         log.info("  Loading HP building loads...")
-        loads_df = load_building_loads(
+        loads = load_building_loads(
             hp_bldg_ids, cfg["path_loads_dir"], sample_size=args.sample_size
         )
 
@@ -1329,7 +1497,7 @@ def main(argv: list[str] | None = None) -> None:
             delivery_rr=delivery_rr,
         )
 
-        ur = diagnose_utility(ctx, loads_df, elasticities, mc_df)
+        ur = diagnose_utility(ctx, loads, elasticities, mc_df)
         results.append(ur)
         log.info(
             "  Recommended ε=%.2f, annual savings=$%.2f/hp",
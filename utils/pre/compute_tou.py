@@ -3,7 +3,10 @@
 Provides composable building blocks for rate derivation:
 
 1. **Primitives** — ``find_tou_peak_window``, ``compute_tou_cost_causation_ratio``
-   work on any hourly MC/load slice (full year, single season, etc.).
+   work on any hourly MC/load slice (full year, single season, etc.). Both
+   reduce the slice to a 24-hour ``HourOfDayProfile`` first;
+   ``tou_window_grid`` fits every (width, start) window from that profile in
+   one pass, optionally stacked over seasons, cohorts or MC scenarios.
 2. **Season helpers** — ``Season``, ``season_mask``, ``make_winter_summer_seasons``,
    ``compute_seasonal_base_rates`` let callers iterate over seasons.
 3. **Tariff builders** — handled by ``utils.pre.create_tariff``:
@@ -29,6 +32,7 @@ from typing import Any, cast
 import numpy as np
 import pandas as pd
 
+from utils.calendar_align import replace_year
 from utils.pre.season_config import (
     DEFAULT_TOU_WINTER_MONTHS,
     resolve_winter_summer_months,
@@ -140,6 +144,20 @@ def make_winter_summer_seasons(
 # ---------------------------------------------------------------------------
 
 
+def _with_year(index: pd.DatetimeIndex, year: int) -> pd.DatetimeIndex:
+    """*index* with every timestamp moved to *year* on its wall clock.
+
+    Raises ``ValueError`` like ``Timestamp.replace`` when Feb 29 lands in a
+    common year.
+    """
+    wall = index.tz_localize(None) if index.tz is not None else index
+    times, keep = replace_year(wall.to_numpy(), year)
+    if not keep.all():
+        raise ValueError(f"Feb 29 has no counterpart in {year}")
+    shifted = pd.DatetimeIndex(times)
+    return shifted.tz_localize(index.tz) if index.tz is not None else shifted
+
+
 def combine_marginal_costs(
     bulk_marginal_costs: pd.DataFrame,
     dist_and_sub_tx_marginal_costs: pd.Series,
@@ -174,9 +192,7 @@ def combine_marginal_costs(
         if len(total_bulk) == len(dist_mc):
             try:
                 target_year = int(total_bulk.index[0].year)
-                dist_index = pd.DatetimeIndex(
-                    [ts.replace(year=target_year) for ts in dist_mc.index]
-                )
+                dist_index = _with_year(pd.DatetimeIndex(dist_mc.index), target_year)
                 dist_index = (
                     dist_index.tz_localize(bulk_tz)
                     if dist_index.tz is None
@@ -207,9 +223,7 @@ def combine_marginal_costs(
             if len(total_bulk) == len(btx):
                 try:
                     target_year = int(total_bulk.index[0].year)
-                    btx_index = pd.DatetimeIndex(
-                        [ts.replace(year=target_year) for ts in btx.index]
-                    )
+                    btx_index = _with_year(pd.DatetimeIndex(btx.index), target_year)
                     btx_index = (
                         btx_index.tz_localize(bulk_tz)
                         if btx_index.tz is None
@@ -243,6 +257,167 @@ def combine_marginal_costs(
 # ---------------------------------------------------------------------------
 
 
+HOURS_PER_DAY = 24
+
+
+@dataclass(slots=True)
+class HourOfDayProfile:
+    """Load-weighted MC moments per hour of day (last axis, length 24).
+
+    Everything the fit metric and cost-causation ratio need for any split of
+    the 24 hours into peak and off-peak. Leading axes (seasons, building
+    cohorts, MC scenarios) are carried through every computation below.
+    """
+
+    load: np.ndarray  # sum of L_t over timesteps with that hour of day
+    mc_load: np.ndarray  # sum of MC_t * L_t
+    dispersion: np.ndarray  # sum of L_t * (MC_t - mean_mc_h)^2
+
+    @property
+    def mean_mc(self) -> np.ndarray:
+        """Load-weighted mean MC per hour of day (0 where the hour has no load)."""
+        return _safe_divide(self.mc_load, self.load)
+
+
+@dataclass(slots=True)
+class TwoPeriodFit:
+    """Peak/off-peak fit of candidate splits; trailing axes index candidates."""
+
+    metric: np.ndarray  # load-weighted squared MC residual (compute_tou_fit_metric)
+    peak_load: np.ndarray
+    offpeak_load: np.ndarray
+    peak_avg: np.ndarray  # demand-weighted MC in the peak period
+    offpeak_avg: np.ndarray
+
+    def cost_causation_ratio(self, index: Any = ()) -> float:
+        """Peak / off-peak demand-weighted MC of the candidate at *index*.
+
+        Raises:
+            ValueError: If either period has zero load or the off-peak
+                average is non-positive.
+        """
+        if self.peak_load[index] == 0 or self.offpeak_load[index] == 0:
+            raise ValueError("Peak or off-peak load is zero; cannot compute ratio")
+        if self.offpeak_avg[index] <= 0:
+            raise ValueError("Off-peak demand-weighted MC is non-positive")
+        return float(self.peak_avg[index] / self.offpeak_avg[index])
+
+
+def _safe_divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    return np.divide(num, den, out=np.zeros_like(num, dtype=np.float64), where=den != 0)
+
+
+def hour_of_day_profile(
+    hours: np.ndarray, mc: np.ndarray, load: np.ndarray
+) -> HourOfDayProfile:
+    """Reduce hourly MC and load to per-hour-of-day moments.
+
+    Args:
+        hours: Hour of day (0-23) of each timestep, shape ``(T,)``.
+        mc: Hourly MC ($/kWh), shape ``(..., T)``.
+        load: Hourly load, shape ``(..., T)``; broadcast against *mc*. Zero the
+            load outside a season to profile that season on a leading axis.
+    """
+    hours = np.asarray(hours)
+    mc, load = np.broadcast_arrays(
+        np.asarray(mc, dtype=np.float64), np.asarray(load, dtype=np.float64)
+    )
+    one_hot = (hours[:, None] == np.arange(HOURS_PER_DAY)).astype(np.float64)
+    load_h = load @ one_hot
+    mc_load_h = (mc * load) @ one_hot
+    deviation = mc - _safe_divide(mc_load_h, load_h)[..., hours]
+    return HourOfDayProfile(
+        load=load_h,
+        mc_load=mc_load_h,
+        dispersion=(load * deviation**2) @ one_hot,
+    )
+
+
+def _series_profile(combined_mc: pd.Series, hourly_load: pd.Series) -> HourOfDayProfile:
+    hours = np.asarray(cast(Any, pd.DatetimeIndex(combined_mc.index)).hour)
+    return hour_of_day_profile(
+        hours, combined_mc.to_numpy(dtype=np.float64), np.asarray(hourly_load)
+    )
+
+
+def _period_moments(
+    profile: HourOfDayProfile, masks: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Load, demand-weighted MC and squared residual of each period in *masks*.
+
+    The residual of a period P splits into within-hour and between-hour parts:
+    ``sum_h dispersion_h + sum_{h,k in P} w_h w_k (m_h - m_k)^2 / (2 W_P)``.
+    Every term is non-negative, so flat or perfectly split MC stays at zero
+    (to rounding in MC) instead of inheriting the cancellation error of
+    ``sum L MC^2 - (sum L MC)^2 / W`` at the scale of total load.
+    """
+    w, mean = profile.load, profile.mean_mc
+    load = w @ masks.T
+    avg = _safe_divide(profile.mc_load @ masks.T, load)
+    pair = (
+        w[..., :, None]
+        * w[..., None, :]
+        * (mean[..., :, None] - mean[..., None, :]) ** 2
+    )
+    between = ((pair @ masks.T) * masks.T).sum(axis=-2)
+    residual = profile.dispersion @ masks.T + _safe_divide(between, 2 * load)
+    return load, avg, residual
+
+
+def two_period_fit(profile: HourOfDayProfile, peak_masks: np.ndarray) -> TwoPeriodFit:
+    """Evaluate K candidate peak windows given as a ``(K, 24)`` 0/1 mask array.
+
+    Results have shape ``(..., K)``: the profile's leading axes, then candidate.
+    """
+    peak_masks = np.asarray(peak_masks, dtype=np.float64)
+    peak_load, peak_avg, peak_residual = _period_moments(profile, peak_masks)
+    offpeak_load, offpeak_avg, offpeak_residual = _period_moments(
+        profile, 1.0 - peak_masks
+    )
+    return TwoPeriodFit(
+        metric=peak_residual + offpeak_residual,
+        peak_load=peak_load,
+        offpeak_load=offpeak_load,
+        peak_avg=peak_avg,
+        offpeak_avg=offpeak_avg,
+    )
+
+
+def _peak_mask(peak_hours: list[int]) -> np.ndarray:
+    return np.isin(np.arange(HOURS_PER_DAY), peak_hours)[None, :]
+
+
+def window_peak_hours(start: int, window_hours: int) -> list[int]:
+    """Sorted hours of day in the contiguous window starting at *start*."""
+    return sorted((start + i) % HOURS_PER_DAY for i in range(window_hours))
+
+
+def tou_window_grid(
+    profile: HourOfDayProfile, widths: list[int] | range = range(1, 24)
+) -> TwoPeriodFit:
+    """Fit every contiguous peak window: each width in *widths* x 24 start hours.
+
+    Results have shape ``(..., len(widths), 24)``, indexed by width position
+    and start hour. ``fit.metric.argmin(axis=-1)`` gives each width's best
+    start (the earliest on ties, as a loop over start hours would).
+    """
+    widths = list(widths)
+    if any(n < 1 or n > HOURS_PER_DAY - 1 for n in widths):
+        raise ValueError("window_hours must be between 1 and 23")
+    hour = np.arange(HOURS_PER_DAY)
+    offset = (hour[None, :] - hour[:, None]) % HOURS_PER_DAY  # [start, hour]
+    masks = offset[None, :, :] < np.asarray(widths)[:, None, None]
+    fit = two_period_fit(profile, masks.reshape(-1, HOURS_PER_DAY))
+    shape = (*fit.metric.shape[:-1], len(widths), HOURS_PER_DAY)
+    return TwoPeriodFit(
+        metric=fit.metric.reshape(shape),
+        peak_load=fit.peak_load.reshape(shape),
+        offpeak_load=fit.offpeak_load.reshape(shape),
+        peak_avg=fit.peak_avg.reshape(shape),
+        offpeak_avg=fit.offpeak_avg.reshape(shape),
+    )
+
+
 def compute_tou_fit_metric(
     combined_mc: pd.Series,
     hourly_load: pd.Series,
@@ -254,26 +429,10 @@ def compute_tou_fit_metric(
     windows. Lower values mean the two-period TOU approximation better matches
     the hourly MC profile for the class facing the tariff.
     """
-    hour_of_day = cast(Any, pd.DatetimeIndex(combined_mc.index)).hour
-    is_peak = np.isin(hour_of_day, peak_hours)
-
-    peak_load = hourly_load[is_peak].sum()
-    offpeak_load = hourly_load[~is_peak].sum()
-
-    peak_avg = (
-        (combined_mc[is_peak] * hourly_load[is_peak]).sum() / peak_load
-        if peak_load > 0
-        else 0.0
-    )
-    offpeak_avg = (
-        (combined_mc[~is_peak] * hourly_load[~is_peak]).sum() / offpeak_load
-        if offpeak_load > 0
-        else 0.0
+    fit = two_period_fit(
+        _series_profile(combined_mc, hourly_load), _peak_mask(peak_hours)
     )
-
-    period_rate = np.where(is_peak, peak_avg, offpeak_avg)
-    residuals = (combined_mc.values - period_rate) ** 2 * hourly_load.values
-    return float(residuals.sum())
+    return float(fit.metric[0])
 
 
 def find_tou_peak_window(
@@ -295,17 +454,10 @@ def find_tou_peak_window(
     Returns:
         Sorted list of hour-of-day integers (0-23) forming the peak window.
     """
-    if window_hours < 1 or window_hours > 23:
-        raise ValueError("window_hours must be between 1 and 23")
-
-    best_metric = np.inf
-    best_peak_hours: list[int] = []
-    for start in range(24):
-        peak_hours = sorted((start + i) % 24 for i in range(window_hours))
-        metric = compute_tou_fit_metric(combined_mc, hourly_load, peak_hours)
-        if metric < best_metric:
-            best_metric = metric
-            best_peak_hours = peak_hours
+    fit = tou_window_grid(_series_profile(combined_mc, hourly_load), [window_hours])
+    start = int(fit.metric[0].argmin())
+    best_metric = float(fit.metric[0, start])
+    best_peak_hours = window_peak_hours(start, window_hours)
 
     log.info(
         "TOU peak window %s minimizes load-weighted MC residual metric %.6e",
@@ -333,30 +485,15 @@ def compute_tou_cost_causation_ratio(
     Returns:
         Peak-to-off-peak cost-causation ratio (always >= 1.0).
     """
-    hour_of_day = cast(Any, pd.DatetimeIndex(combined_mc.index)).hour
-    is_peak = np.isin(hour_of_day, peak_hours)
-
-    peak_dw = (combined_mc[is_peak] * hourly_load[is_peak]).sum()
-    peak_load = hourly_load[is_peak].sum()
-
-    offpeak_dw = (combined_mc[~is_peak] * hourly_load[~is_peak]).sum()
-    offpeak_load = hourly_load[~is_peak].sum()
-
-    if peak_load == 0 or offpeak_load == 0:
-        raise ValueError("Peak or off-peak load is zero; cannot compute ratio")
-
-    peak_avg = peak_dw / peak_load
-    offpeak_avg = offpeak_dw / offpeak_load
-
-    if offpeak_avg <= 0:
-        raise ValueError("Off-peak demand-weighted MC is non-positive")
-
-    ratio = float(peak_avg / offpeak_avg)
+    fit = two_period_fit(
+        _series_profile(combined_mc, hourly_load), _peak_mask(peak_hours)
+    )
+    ratio = fit.cost_causation_ratio(0)
     log.info(
         "Cost-causation ratio: %.4f  (peak avg MC=%.6f, off-peak avg MC=%.6f)",
         ratio,
-        peak_avg,
-        offpeak_avg,
+        fit.peak_avg[0],
+        fit.offpeak_avg[0],
     )
     return ratio
 
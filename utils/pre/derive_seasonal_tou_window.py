@@ -35,18 +35,21 @@ import csv
 import logging
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, cast
 
+import numpy as np
 import pandas as pd
 import yaml
 
 from utils.pre.compute_tou import (
     Season,
     combine_marginal_costs,
-    compute_tou_cost_causation_ratio,
-    compute_tou_fit_metric,
-    find_tou_peak_window,
+    compute_tou_fit_metric,  # noqa: F401  (re-exported; callers import it from here)
+    hour_of_day_profile,
     make_winter_summer_seasons,
     season_mask,
+    tou_window_grid,
+    window_peak_hours,
 )
 from utils.pre.derive_seasonal_tou import load_tou_inputs
 from utils.pre.season_config import (
@@ -87,31 +90,37 @@ def sweep_tou_window_hours(
     For each N in *window_range*, for each season: finds the optimal
     contiguous peak window, computes the cost-causation ratio, and evaluates
     the fit metric.  Returns results sorted by ``metric_total`` (ascending).
+    All candidates come from one ``tou_window_grid`` over the seasons' hour-of-
+    day profiles, so the sweep costs about as much as reading the 8760 hours.
 
     Filters out candidates where on-peak price is not strictly greater than
     off-peak price (ratio <= 1.0) in any season, to avoid selecting flat-rate
     or inverted-rate windows.
     """
     mc_index = pd.DatetimeIndex(combined_mc.index)
+    # Zeroing load outside each season profiles every season on a leading axis,
+    # so one grid covers all widths, start hours and seasons.
+    in_season = np.stack([season_mask(mc_index, s) for s in seasons])
+    profile = hour_of_day_profile(
+        np.asarray(cast(Any, mc_index).hour),
+        np.where(in_season, combined_mc.to_numpy(dtype=np.float64), 0.0),
+        np.where(in_season, np.asarray(hourly_load, dtype=np.float64), 0.0),
+    )
+    widths = list(window_range)
+    fit = tou_window_grid(profile, widths)  # (season, width, start)
+    best_starts = fit.metric.argmin(axis=-1)
     results: list[TouWindowSweepResult] = []
 
-    for n in window_range:
+    for i, n in enumerate(widths):
         peak_hours_by_season: dict[str, list[int]] = {}
         ratio_by_season: dict[str, float] = {}
         metric_by_season: dict[str, float] = {}
 
-        for s in seasons:
-            mask = season_mask(mc_index, s)
-            mc_s = combined_mc[mask]
-            load_s = hourly_load[mask]
-
-            peak_hours = find_tou_peak_window(mc_s, load_s, n)
-            ratio = compute_tou_cost_causation_ratio(mc_s, load_s, peak_hours)
-            metric = compute_tou_fit_metric(mc_s, load_s, peak_hours)
-
-            peak_hours_by_season[s.name] = peak_hours
-            ratio_by_season[s.name] = ratio
-            metric_by_season[s.name] = metric
+        for j, s in enumerate(seasons):
+            start = int(best_starts[j, i])
+            peak_hours_by_season[s.name] = window_peak_hours(start, n)
+            ratio_by_season[s.name] = fit.cost_causation_ratio((j, i, start))
+            metric_by_season[s.name] = float(fit.metric[j, i, start])
 
         # Enforce constraint: on-peak price must be strictly greater than off-peak
         # (ratio > 1.0) in all seasons